@@ -169,6 +169,16 @@ if exporter_app:
     app.mount("/metrics", exporter_app, name="metrics-exporter")
 
 
+@app.on_event("shutdown")
+async def _close_async_pools() -> None:
+    """async ルート用の PG プールを解放（未使用 / 未インストールなら何もしない）"""
+    try:
+        from core.repository.async_postgres_impl import close_async_pool
+    except ModuleNotFoundError:
+        return
+    await close_async_pool()
+
+
 # ----------------------------------------------------------------------
 # WebSocket 進捗ストリーミングエンドポイント
 # ----------------------------------------------------------------------
@@ -22,14 +22,16 @@
 
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Path, status
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response, status
 
-from core.repository.factory import get_repo
-from core.schemas.act_schemas import ActDecision
+from core.repository.factory import get_async_repo, get_repo
+from core.schemas.act_schemas import ActAction, ActDecision
 from core.schemas.check_schemas import CheckResult
 from core.act.decision_engine import decide
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, build_filters, fetch_page
 
 router = APIRouter(prefix="/act", tags=["act"])
 
@@ -38,6 +40,7 @@ router = APIRouter(prefix="/act", tags=["act"])
 # ──────────────────────────────────────────────
 _act_repo = get_repo(table="act")
 _check_repo = get_repo(table="check")
+_act_repo_async = get_async_repo(table="act")  # GET 用
 
 
 # =========================================================
@@ -74,8 +77,8 @@ def create_act(
     response_model=ActDecision,
     summary="Get ActDecision",
 )
-def get_act(act_id: str) -> ActDecision:
-    raw = _act_repo.get(act_id)
+async def get_act(act_id: str) -> ActDecision:
+    raw = await _act_repo_async.get(act_id)
     if raw is None:
         raise HTTPException(404, detail="ActDecision not found")
     return ActDecision.model_validate(raw)
@@ -89,5 +92,20 @@ def get_act(act_id: str) -> ActDecision:
     response_model=List[ActDecision],
     summary="List ActDecision",
 )
-def list_act() -> List[ActDecision]:
-    return [ActDecision.model_validate(r) for r in _act_repo.list()]
+async def list_act(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前ページの X-Next-Cursor"),
+    check_id: Optional[str] = None,
+    action: Optional[ActAction] = None,
+    since: Optional[datetime] = Query(None, description="作成時刻 >= since"),
+    until: Optional[datetime] = Query(None, description="作成時刻 < until"),
+) -> List[ActDecision]:
+    filters = build_filters(
+        since, until, check_id=check_id, action=action.value if action else None
+    )
+    rows = await fetch_page(
+        _act_repo_async, request, response, limit=limit, cursor=cursor, filters=filters
+    )
+    return [ActDecision.model_validate(r) for r in rows]
@@ -6,44 +6,85 @@ from __future__ import annotations
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from celery import states
 from celery.backends.base import DisabledBackend
 from celery.result import AsyncResult
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 
 from core.celery_app import celery_app
-from core.repository.factory import get_repo
+from core.repository.factory import get_async_repo, get_repo
 from core.schemas.check_schemas import CheckResult
+from utils.admission import require_admission
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, build_filters, fetch_page
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/check", tags=["check"])
 
 _check_repo = get_repo("check")
 _do_repo = get_repo("do")
+# 読み取り系 (GET) は async ルート + 非同期 Repository でイベントループ上で処理
+_check_repo_async = get_async_repo("check")
 
 
 # --------------------------------------------------------------------- #
 # 内部ユーティリティ
 # --------------------------------------------------------------------- #
 def _upsert(rec: Dict[str, Any]) -> None:
-    """同一 ID 行を delete→create で upsert."""
-    try:
-        _check_repo.delete(rec["id"])
-    except Exception:
-        pass
-    _check_repo.create(rec["id"], rec)
+    """同一 ID 行へフィールドをマージ保存（Repository.patch で 1 往復）."""
+    _check_repo.patch(rec["id"], rec)
 
 
 # --------------------------------------------------------------------- #
 # エンドポイント
 # --------------------------------------------------------------------- #
+@router.post(
+    "/batch",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Enqueue batch Check for all runs of a Plan (Celery)",
+    dependencies=[Depends(require_admission("check"))],
+)
+def enqueue_check_batch(
+    plan_id: str = Query(..., description="評価対象の Plan ID"),
+    since: Optional[datetime] = Query(None, description="Do 作成時刻 >= since"),
+    until: Optional[datetime] = Query(None, description="Do 作成時刻 < until"),
+) -> JSONResponse:
+    """
+    Plan の DONE な全 run（since / until で範囲指定可）を 1 タスクで評価する。
+    結果の Check レコードには batch_id が付く（GET /check/?batch_id= で取得）。
+    """
+    task_id = uuid.uuid4().hex
+    batch_id = f"batch-{task_id[:8]}"
+    args = [
+        batch_id,
+        plan_id,
+        since.isoformat() if since else None,
+        until.isoformat() if until else None,
+    ]
+
+    if celery_app.conf.task_always_eager:
+        from core.tasks.check_tasks import run_check_batch_task  # lazy
+        summary = run_check_batch_task(*args)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"batch_id": batch_id, "task_id": task_id, **summary},
+        )
+    celery_app.send_task(
+        "core.tasks.check_tasks.run_check_batch_task", args=args, task_id=task_id
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"batch_id": batch_id, "task_id": task_id},
+    )
+
+
 @router.post(
     "/{do_id}",
     status_code=status.HTTP_202_ACCEPTED,
     summary="Enqueue Check job (Celery)",
+    dependencies=[Depends(require_admission("check"))],
 )
 def enqueue_check(do_id: str) -> JSONResponse:
     """Check フェーズの Celery タスク登録 & 初期レコード作成"""
@@ -54,18 +95,7 @@ def enqueue_check(do_id: str) -> JSONResponse:
     task_id = uuid.uuid4().hex
     check_id = f"check-{task_id[:8]}"
 
-    # Celery enqueue（eager モードなら同期実行）
-    if celery_app.conf.task_always_eager:
-        from core.tasks.check_tasks import run_check_task  # lazy
-        run_check_task(check_id, do_id)
-    else:
-        celery_app.send_task(
-            "core.tasks.check_tasks.run_check_task",
-            args=[check_id, do_id],
-            task_id=task_id,
-        )
-
-    # 初期レコード
+    # 初期レコード（enqueue より先に作成し、タスク側の更新を上書きしない）
     _upsert(
         {
             "id": check_id,
@@ -77,6 +107,17 @@ def enqueue_check(do_id: str) -> JSONResponse:
         }
     )
 
+    # Celery enqueue（eager モードなら同期実行）
+    if celery_app.conf.task_always_eager:
+        from core.tasks.check_tasks import run_check_task  # lazy
+        run_check_task(check_id, do_id)
+    else:
+        celery_app.send_task(
+            "core.tasks.check_tasks.run_check_task",
+            args=[check_id, do_id],
+            task_id=task_id,
+        )
+
     return JSONResponse(
         status_code=status.HTTP_202_ACCEPTED,
         content={"id": check_id, "task_id": task_id},
@@ -84,8 +125,8 @@ def enqueue_check(do_id: str) -> JSONResponse:
 
 
 @router.get("/{check_id}", response_model=CheckResult, summary="Get Check record")
-def get_check(check_id: str) -> CheckResult:
-    rec = _check_repo.get(check_id)
+async def get_check(check_id: str) -> CheckResult:
+    rec = await _check_repo_async.get(check_id)
     if rec is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Check '{check_id}' not found")
     return CheckResult(**rec)
@@ -110,5 +151,20 @@ def get_check_status(task_id: str) -> Dict[str, Any]:
 
 
 @router.get("/", response_model=List[CheckResult], summary="List Check records")
-def list_check() -> List[CheckResult]:
-    return [CheckResult(**rec) for rec in _check_repo.list()]
+async def list_check(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前ページの X-Next-Cursor"),
+    do_id: Optional[str] = None,
+    batch_id: Optional[str] = Query(None, description="POST /check/batch の batch_id"),
+    status_: Optional[str] = Query(None, alias="status"),
+    since: Optional[datetime] = Query(None, description="作成時刻 >= since"),
+    until: Optional[datetime] = Query(None, description="作成時刻 < until"),
+) -> List[CheckResult]:
+    """新しい順にページング。次ページは Link / X-Next-Cursor ヘッダ"""
+    filters = build_filters(since, until, do_id=do_id, batch_id=batch_id, status=status_)
+    rows = await fetch_page(
+        _check_repo_async, request, response, limit=limit, cursor=cursor, filters=filters
+    )
+    return [CheckResult(**rec) for rec in rows]
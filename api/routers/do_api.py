@@ -9,20 +9,24 @@ from typing import Any, Dict, List, Optional, Tuple, cast
 from celery import states
 from celery.backends.base import DisabledBackend
 from celery.result import AsyncResult
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 
 from core.celery_app import celery_app
-from core.repository.factory import get_repo
+from core.repository.factory import get_async_repo, get_repo
 from core.schemas.do_schemas import DoCreateRequest, DoResponse, DoStatus
 from core.schemas.plan_schemas import PlanResponse
 from core.tasks.do_tasks import run_do_task  # Celery タスク
+from utils.admission import require_admission
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, build_filters, fetch_page
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/do", tags=["do"])
 
 _plan_repo = get_repo("plan")
 _do_repo = get_repo("do")
+# 読み取り系 (GET) は async ルート + 非同期 Repository でイベントループ上で処理
+_do_repo_async = get_async_repo("do")
 
 
 # --------------------------------------------------------------------- #
@@ -65,15 +69,8 @@ def _merge_params(plan: PlanResponse, req: DoCreateRequest) -> Dict[str, Any]:
 
 
 def _upsert(rec: Dict[str, Any]) -> None:
-    """delete→create ではなく既存値をマージして保存する。"""
-    do_id = rec["do_id"]
-    current = _do_repo.get(do_id) or {}
-    current.update(rec)
-    try:
-        _do_repo.delete(do_id)
-    except Exception:
-        pass
-    _do_repo.create(do_id, current)
+    """既存値とマージして保存する（Repository.patch で原子的に 1 往復）。"""
+    _do_repo.patch(rec["do_id"], rec)
 
 
 # --------------------------------------------------------------------- #
@@ -84,6 +81,7 @@ def _upsert(rec: Dict[str, Any]) -> None:
     status_code=status.HTTP_202_ACCEPTED,
     summary="Enqueue Do job (Celery)",
     response_model=Dict[str, str],
+    dependencies=[Depends(require_admission("do"))],
 )
 def enqueue_do(plan_id: str, body: Optional[DoCreateRequest] = None) -> JSONResponse:
     # 1) Plan 存在チェック
@@ -143,8 +141,8 @@ def enqueue_do(plan_id: str, body: Optional[DoCreateRequest] = None) -> JSONResp
 
 
 @router.get("/{do_id}", response_model=DoResponse, summary="Get Do record")
-def get_do(do_id: str) -> DoResponse:
-    rec = _do_repo.get(do_id)
+async def get_do(do_id: str) -> DoResponse:
+    rec = await _do_repo_async.get(do_id)
     if rec is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Do '{do_id}' not found")
     return DoResponse(**rec)
@@ -172,5 +170,21 @@ def get_do_status(task_id: str) -> Dict[str, Any]:
 
 
 @router.get("/", response_model=List[DoResponse], summary="List Do records")
-def list_do() -> List[DoResponse]:
-    return [DoResponse(**v) for v in _do_repo.list()]
+async def list_do(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前ページの X-Next-Cursor"),
+    plan_id: Optional[str] = None,
+    status_: Optional[DoStatus] = Query(None, alias="status"),
+    since: Optional[datetime] = Query(None, description="作成時刻 >= since"),
+    until: Optional[datetime] = Query(None, description="作成時刻 < until"),
+) -> List[DoResponse]:
+    """新しい順にページング。次ページは Link / X-Next-Cursor ヘッダ"""
+    filters = build_filters(
+        since, until, plan_id=plan_id, status=status_.value if status_ else None
+    )
+    rows = await fetch_page(
+        _do_repo_async, request, response, limit=limit, cursor=cursor, filters=filters
+    )
+    return [DoResponse(**v) for v in rows]
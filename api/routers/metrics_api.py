@@ -7,21 +7,28 @@
 # “入口” となるエンドポイント。
 # ---------------------------------------------------------
 # ・POST /metrics/{run_id}   : actual/pred を受け取り指標計算 → Upsert
+#     空配列は 400。計算できない指標（有効行なし / 全て y=0 の MAPE 等）は null
 # ・GET  /metrics/{run_id}   : 単一レコード取得
 # ・GET  /metrics/           : 一覧（r2 フィルタ等の Query 対応）
-# ・GET  /metrics/latest     : 最新 run_id のレコード取得     ← ★追加
+# ・GET  /metrics/latest     : 最新（作成時刻）のレコード取得
+# ・GET  /metrics/series     : (plan_id, symbol, metric) 系列の期間取得
+# ・GET  /metrics/series/latest : 系列の最新 1 点
+# ・GET  /metrics/series/rollup : 日 / 時間ごとの min / max / mean
+#   ※ 固定パスは /{run_id} より前に登録する（後ろだと run_id として解釈される）
 # ---------------------------------------------------------
 from __future__ import annotations
 
 import logging
+import math
 from datetime import datetime, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
-from core.metrics.metrics_calc import calc_metrics
-from core.repository.factory import get_repo
+from core.metrics.engine import DEFAULT_METRICS, evaluate
+from core.repository.factory import get_metrics_ts, get_repo
+from core.repository.metrics_ts import BUCKETS, MetricPoint, Rollup, record_metrics
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/metrics", tags=["metrics"])
@@ -37,6 +44,8 @@ class MetricsPayload(BaseModel):
 
     actual: list[float] = Field(..., description="実績値 (y)")
     pred: list[float] = Field(..., description="予測値 (ŷ)")
+    plan_id: str = Field("", description="時系列ストアの系列キー: Plan ID")
+    symbol: str = Field("", description="時系列ストアの系列キー: 銘柄")
 
 
 class MetricsRecord(BaseModel):
@@ -44,28 +53,50 @@ class MetricsRecord(BaseModel):
 
     run_id: str
     created_at: datetime
-    r2: float
-    mae: float
-    rmse: float
-    mape: float
+    # 計算できない指標は null（NaN は JSON / 永続ストアに載せない）
+    r2: Optional[float] = None
+    mae: Optional[float] = None
+    rmse: Optional[float] = None
+    mape: Optional[float] = None
+
+
+class SeriesPoint(BaseModel):
+    """時系列ストアの 1 点"""
+
+    ts: datetime
+    value: float
+    run_id: str = ""
+
+
+class SeriesRollup(BaseModel):
+    """バケットごとの集約値"""
+
+    bucket: datetime
+    min: float
+    max: float
+    mean: float
+    count: int
 
 
 # ---------------------------------------------------------------------- #
 # helpers
 # ---------------------------------------------------------------------- #
 def _upsert_metrics(rec: MetricsRecord) -> None:
-    """既存 run_id があっても上書き登録（Upsert）"""
-    _metrics_repo.delete(rec.run_id)
+    """既存 run_id があっても上書き登録（create は全実装で Upsert = 1 往復）"""
     _metrics_repo.create(rec.run_id, rec.model_dump(mode="json"))
 
 
 def _list_records() -> list[MetricsRecord]:
-    """Repository → Pydantic へ変換（欠損はスキップ）"""
-    return [
-        MetricsRecord(**_metrics_repo.get(k))
-        for k in _metrics_repo.keys()
-        if _metrics_repo.get(k) is not None
-    ]
+    """Repository → Pydantic へ変換（list() 1 回で全件取得）"""
+    return [MetricsRecord(**raw) for raw in _metrics_repo.list()]
+
+
+def _point(p: MetricPoint) -> SeriesPoint:
+    return SeriesPoint(ts=p.ts, value=p.value, run_id=p.run_id)
+
+
+def _rollup(r: Rollup) -> SeriesRollup:
+    return SeriesRollup(**r._asdict())
 
 
 # ---------------------------------------------------------------------- #
@@ -81,21 +112,102 @@ def create_metrics(run_id: str, payload: MetricsPayload) -> MetricsRecord:
     # --- Validation -------------------------------------------------- #
     if len(payload.actual) != len(payload.pred):
         raise HTTPException(400, "Length mismatch between actual and pred")
+    if not payload.actual:
+        raise HTTPException(400, "actual and pred must not be empty")
 
     # --- Calc --------------------------------------------------------- #
-    metrics = calc_metrics(payload.actual, payload.pred)
+    metrics = evaluate(payload.actual, payload.pred, DEFAULT_METRICS)
 
     rec = MetricsRecord(
         run_id=run_id,
         created_at=datetime.now(timezone.utc),
-        **metrics,
+        **{k: v if math.isfinite(v) else None for k, v in metrics.items()},
     )
     _upsert_metrics(rec)
+    record_metrics(
+        get_metrics_ts(),
+        payload.plan_id,
+        payload.symbol,
+        metrics,
+        ts=rec.created_at,
+        run_id=run_id,
+    )
 
-    logger.info("[MetricsAPI] Upsert run_id=%s r2=%.4f", run_id, rec.r2)
+    logger.info("[MetricsAPI] Upsert run_id=%s r2=%s", run_id, rec.r2)
     return rec
 
 
+# ---------------------------------------------------------------------- #
+# GET /metrics/latest
+# ---------------------------------------------------------------------- #
+@router.get(
+    "/latest",
+    response_model=MetricsRecord,
+    summary="最新のメトリクスを取得",
+)
+def get_latest_metrics() -> MetricsRecord:
+    # 作成時刻の降順キーセットで 1 件だけ読む（全件ロード + ソートをしない）
+    latest = _metrics_repo.list(limit=1)
+    if not latest:
+        raise HTTPException(404, "Metrics repository is empty")
+    return MetricsRecord(**latest[0])
+
+
+# ---------------------------------------------------------------------- #
+# GET /metrics/series*
+# ---------------------------------------------------------------------- #
+@router.get(
+    "/series",
+    response_model=List[SeriesPoint],
+    summary="指標の時系列を期間指定で取得",
+)
+def get_series(
+    metric: str = Query(..., description="指標名 (r2 / mae / rmse / mape …)"),
+    plan_id: str = Query("", description="Plan ID"),
+    symbol: str = Query("", description="銘柄"),
+    since: Optional[datetime] = Query(None, description="開始時刻（含む）"),
+    until: Optional[datetime] = Query(None, description="終了時刻（含まない）"),
+    limit: Optional[int] = Query(None, ge=1, le=10_000),
+) -> List[SeriesPoint]:
+    points = get_metrics_ts().range(plan_id, symbol, metric, since, until, limit=limit)
+    return [_point(p) for p in points]
+
+
+@router.get(
+    "/series/latest",
+    response_model=SeriesPoint,
+    summary="指標系列の最新値を取得",
+)
+def get_series_latest(
+    metric: str = Query(...),
+    plan_id: str = Query(""),
+    symbol: str = Query(""),
+) -> SeriesPoint:
+    point = get_metrics_ts().latest(plan_id, symbol, metric)
+    if point is None:
+        raise HTTPException(404, "Series not found")
+    return _point(point)
+
+
+@router.get(
+    "/series/rollup",
+    response_model=List[SeriesRollup],
+    summary="指標系列を日 / 時間単位で集約（min / max / mean）",
+)
+def get_series_rollup(
+    metric: str = Query(...),
+    plan_id: str = Query(""),
+    symbol: str = Query(""),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    bucket: str = Query("day", description=f"集約単位: {' | '.join(BUCKETS)}"),
+) -> List[SeriesRollup]:
+    if bucket not in BUCKETS:
+        raise HTTPException(400, f"bucket must be one of {sorted(BUCKETS)}")
+    rows = get_metrics_ts().rollup(plan_id, symbol, metric, since, until, bucket=bucket)
+    return [_rollup(r) for r in rows]
+
+
 # ---------------------------------------------------------------------- #
 # GET /metrics/{run_id}
 # ---------------------------------------------------------------------- #
@@ -111,21 +223,6 @@ def get_metrics(run_id: str) -> MetricsRecord:
     return MetricsRecord(**raw)
 
 
-# ---------------------------------------------------------------------- #
-# GET /metrics/latest   ★追加
-# ---------------------------------------------------------------------- #
-@router.get(
-    "/latest",
-    response_model=MetricsRecord,
-    summary="最新 run_id のメトリクスを取得",
-)
-def get_latest_metrics() -> MetricsRecord:
-    if not _metrics_repo.keys():
-        raise HTTPException(404, "Metrics repository is empty")
-    latest_key = sorted(_metrics_repo.keys())[-1]
-    return MetricsRecord(**_metrics_repo.get(latest_key))
-
-
 # ---------------------------------------------------------------------- #
 # GET /metrics/
 # ---------------------------------------------------------------------- #
@@ -141,6 +238,6 @@ def list_metrics(
 ) -> List[MetricsRecord]:
     metrics = _list_records()
     if min_r2 is not None:
-        metrics = [m for m in metrics if m.r2 >= min_r2]
+        metrics = [m for m in metrics if m.r2 is not None and m.r2 >= min_r2]
     # run_id 昇順で返す
     return sorted(metrics, key=lambda m: m.run_id)
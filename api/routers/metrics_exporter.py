@@ -14,12 +14,14 @@
 # 【ルール】
 #   - 指標名には “pdca_***” プレフィクスを必ず付ける
 #   - 10 秒おきのバックグラウンド thread で最新 1 件のみ pull
-#   - ビジネス API とは疎結合。依存は core.repository.factory のみ
+#   - pdca_queue_depth / pdca_tasks_in_flight も常に更新（アドミッション制御の有無に依らない）
+#   - ビジネス API とは疎結合。依存は core.repository.factory / core.ops.admission のみ
 # ---------------------------------------------------------
 
 from __future__ import annotations
 
 import logging
+import math
 import os
 import time
 from threading import Thread
@@ -28,6 +30,7 @@ from typing import Dict, Mapping, Sequence
 from fastapi import FastAPI
 from prometheus_client import Gauge, make_asgi_app
 
+from core.ops.admission import get_admission_controller
 from core.repository.factory import get_repo  # ← あなたの RepoFactory
 
 # --------------------------------------------------------------------------- #
@@ -59,14 +62,15 @@ def _fetch_latest() -> Mapping[str, float] | None:
 
     優先度:
       1) latest()  … 1件だけ返す想定の正式 API
-      2) list()    … list()[0] を最新扱い（ソート済み前提）
+      2) list()    … 新しい順の先頭 1 件だけを limit=1 で取得
       3) keys()    … 昔の仮実装
     """
     if hasattr(_metrics_repo, "latest"):
         return _metrics_repo.latest()  # type: ignore[attr-defined]
 
     if hasattr(_metrics_repo, "list"):
-        items: Sequence[Mapping[str, float]] = _metrics_repo.list()  # type: ignore[attr-defined]
+        # ポーリング毎に全件を読まないよう先頭 1 件だけ
+        items: Sequence[Mapping[str, float]] = _metrics_repo.list(limit=1)  # type: ignore[attr-defined]
         return items[0] if items else None
 
     if hasattr(_metrics_repo, "keys") and hasattr(_metrics_repo, "get"):
@@ -86,10 +90,15 @@ def _poll_latest_metrics(interval: int = 10) -> None:  # pragma: no cover
             latest = _fetch_latest()
             if latest:
                 for name, gauge in _METRIC_GAUGES.items():
-                    gauge.set(float(latest.get(name, 0.0)))
+                    value = latest.get(name, 0.0)  # null = 計算できなかった指標 → NaN
+                    gauge.set(math.nan if value is None else float(value))
         except Exception as exc:  # noqa: BLE001
             logger.warning("[MetricsExporter] polling error: %s", exc)
 
+        # キュー深さ / 実行中 Gauge はリクエストや上限設定が無くても更新し、
+        # オートスケーラが常に新しい値を読めるようにする
+        get_admission_controller().refresh()
+
         time.sleep(interval)
 
 
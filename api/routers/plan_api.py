@@ -8,12 +8,12 @@
 # 【主な役割】
 #   - POST  /plan/        : Plan の新規登録
 #   - GET   /plan/{id}    : 1 件取得
-#   - GET   /plan/        : 一覧取得
+#   - GET   /plan/        : 一覧取得（limit / cursor のキーセットページング）
 #   - DELETE/plan/{id}    : 削除
 #
 # 【連携先・依存関係】
 #   - core.schemas.plan_schemas.PlanCreateRequest / PlanResponse
-#   - core.repository.factory.get_repo
+#   - core.repository.factory.get_repo / get_async_repo（GET は async ルート）
 #
 # 【ルール遵守】
 #   1) メイン銘柄 "Close_main" / "Open_main" は直接扱わない
@@ -27,12 +27,14 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, Response, status
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 
 from core.schemas.plan_schemas import PlanCreateRequest, PlanResponse
-from core.repository.factory import get_repo
+from core.repository.factory import get_async_repo, get_repo
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, build_filters, fetch_page
 
 router = APIRouter(prefix="/plan", tags=["plan"])
 
@@ -40,6 +42,7 @@ router = APIRouter(prefix="/plan", tags=["plan"])
 # Repository の DI
 # --------------------------------------------------
 _repo = get_repo(table="plan")
+_repo_async = get_async_repo(table="plan")  # GET 用（async ルート）
 
 
 # ==================================================
@@ -81,8 +84,8 @@ def create_plan(req: PlanCreateRequest) -> PlanResponse:
     response_model=PlanResponse,
     summary="Get Plan by ID",
 )
-def get_plan(plan_id: str) -> PlanResponse:
-    plan = _repo.get(plan_id)
+async def get_plan(plan_id: str) -> PlanResponse:
+    plan = await _repo_async.get(plan_id)
     if plan is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,8 +102,23 @@ def get_plan(plan_id: str) -> PlanResponse:
     response_model=list[PlanResponse],
     summary="List Plans",
 )
-def list_plans() -> list[PlanResponse]:
-    return [PlanResponse(**p) for p in _repo.list()]
+async def list_plans(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前ページの X-Next-Cursor"),
+    since: Optional[datetime] = Query(None, description="作成時刻 >= since"),
+    until: Optional[datetime] = Query(None, description="作成時刻 < until"),
+) -> list[PlanResponse]:
+    rows = await fetch_page(
+        _repo_async,
+        request,
+        response,
+        limit=limit,
+        cursor=cursor,
+        filters=build_filters(since, until),
+    )
+    return [PlanResponse(**p) for p in rows]
 
 
 # ==================================================
@@ -0,0 +1,96 @@
+# =========================================================
+# ASSIST_KEY: cli/migrate_cli.py
+# =========================================================
+#
+# 【概要】
+#   Repository バックエンド間のテーブル移行 CLI。
+#   コマンド:  `python -m cli.migrate_cli copy --src sqlite --dst postgres -t plan,do,check`
+#              `python -m cli.migrate_cli reindex -t plan,do,check,act`
+#
+# 【主な役割】
+#   - Typer で引数を解析し core/ops/migrate.migrate() を呼び出す
+#   - バッチごとの件数と rows/sec を標準出力へ表示
+#   - --checkpoint の JSON で中断位置を保存し、再実行時にそこから再開
+#   - reindex : Redis の索引 SET / 時刻 ZSET を既存キーから backfill し完了マーカーを
+#               立てる（デプロイ時の必須手順。マーカーが立つまで一覧は全キー SCAN）
+#
+# 【連携先・依存関係】
+#   - core/ops/migrate.py          … ストリーミング移行本体
+#   - core/repository/factory.py   … get_repo(table, backend=...)
+#   - 外部設定: 各バックエンドの接続情報（PG_DSN 系 / REDIS_URL / SQLite パス）
+#
+# 【ルール遵守】
+#   1) 移行先へは UPSERT のみ（移行元・移行先とも削除しない）
+#   2) --restart を付けない限りチェックポイントを尊重する
+# ---------------------------------------------------------
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import typer
+
+from core.ops.migrate import Checkpoint, MigrationStats, migrate
+
+app = typer.Typer(
+    add_completion=False,
+    help="mmopdca 移行 CLI: Repository バックエンド間でテーブルをストリーミングコピー",
+)
+
+
+@app.command()
+def copy(
+    src: str = typer.Option(..., "--src", help="移行元: memory | sqlite | postgres | redis"),
+    dst: str = typer.Option(..., "--dst", help="移行先: memory | sqlite | postgres | redis"),
+    tables: str = typer.Option("plan,do,check", "--tables", "-t", help="カンマ区切りのテーブル名"),
+    batch: int = typer.Option(1000, "--batch", "-b", min=1, help="1 バッチの件数"),
+    checkpoint: Path = typer.Option(
+        Path(".migrate_checkpoint.json"), "--checkpoint", help="再開用チェックポイント"
+    ),
+    restart: bool = typer.Option(False, "--restart", help="チェックポイントを無視して最初から"),
+):
+    """
+    src の各テーブルを作成時刻順に読み、dst へ一括 UPSERT します。
+    """
+    names = [t.strip() for t in tables.split(",") if t.strip()]
+    if restart and checkpoint.exists():
+        checkpoint.unlink()
+    ckpt = Checkpoint.load(checkpoint)
+
+    def report(stats: MigrationStats) -> None:
+        typer.echo(
+            f"[{stats.table}] {stats.rows:>10,} rows  {stats.rate:>10,.0f} rows/s"
+            + ("  done" if stats.done else "")
+        )
+
+    try:
+        results = migrate(names, src, dst, batch=batch, checkpoint=ckpt, report=report)
+    except ValueError as exc:
+        typer.secho(f"❌ {exc}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    total = sum(r.rows for r in results)
+    secs = sum(r.seconds for r in results)
+    typer.echo(f"migrated {total:,} rows in {secs:.1f}s")
+
+
+@app.command()
+def reindex(
+    tables: str = typer.Option("plan,do,check,act", "--tables", "-t", help="カンマ区切りのテーブル名"),
+    backend: str = typer.Option("redis", "--backend", help="対象バックエンド（reindex() を持つもの）"),
+):
+    """
+    索引 SET / 時刻 ZSET を既存キーから作り直します（冪等・再実行可）。
+    """
+    from core.repository.factory import get_repo
+
+    for name in (t.strip() for t in tables.split(",") if t.strip()):
+        repo = get_repo(name, backend=backend)
+        if not hasattr(repo, "reindex"):
+            typer.secho(f"❌ backend {backend!r} has no reindex()", fg=typer.colors.RED)
+            raise typer.Exit(1)
+        typer.echo(f"[{name}] reindexed {repo.reindex():,} docs")
+
+
+if __name__ == "__main__":
+    app()
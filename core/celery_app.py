@@ -79,6 +79,13 @@ celery_app.conf.beat_schedule = {
         ),
     },
 
+    # 日次 3:30：TTL 切れ do / check / act のアーカイブ & 削除
+    # （RETENTION_TTL_DAYS 未設定なら何もしない）
+    "retention-daily": {
+        "task": "core.tasks.retention_tasks.run_retention_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
+
     # 日次深夜 1:00 実行タスク例
     "daily-retrain-plan": {
         "task": "core.tasks.do_tasks.run_do_task",
@@ -93,10 +100,10 @@ celery_app.conf.beat_schedule = {
 
 # ----------------------------------------------------------------------
 # タスク定義の自動読み込み
-# core/tasks/do_tasks.py 内の @celery_app.task デコレータ付きタスクを登録
+# core/tasks/do_tasks.py / retention_tasks.py 内の @celery_app.task デコレータ付きタスクを登録
 # ----------------------------------------------------------------------
 celery_app.autodiscover_tasks(
-    ["core.tasks.do_tasks"],
+    ["core.tasks.do_tasks", "core.tasks.retention_tasks"],
     related_name="tasks",
     force=True,
 )
@@ -0,0 +1,247 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【core/check/bootstrap.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   Check 指標 (MAPE / RMSE / MAE / R²) のブロック・ブートストラップ信頼区間を
+#   NumPy のバッチ演算で求めるユニット。短い検証期間で合否がノイズで
+#   反転していないかを判断する材料にする。
+#
+# 【手法】
+#   - 循環ブロック・ブートストラップ（時系列の自己相関を長さ L のブロックで保持）
+#   - 各指標は行ごとの項 [1, y-ȳ, (y-ȳ)², e², |e|, |e/y|, 1(y≠0)] の総和から決まる
+#     → 全開始位置 s について「ブロック和」 Σ_{i=s}^{s+L-1} を累積和で一度だけ作り、
+#       (B × k) の開始位置行列を一括生成して gather + 総和で B 個の再標本を同時評価
+#   - 既定 L = ⌈n^(1/3)⌉（自己相関の保持に必要な長さで決め、計算量では決めない）
+#   - 1 再標本のコストは O(k)（k = ⌈n/L⌉ ブロック数）。巨大な成果物で時間を抑えたい
+#     ときは max_blocks で k の上限を明示的に指定する（L が伸び、区間はやや保守的になる）
+#   - groups（行ごとの系列番号）を渡すと、ブロックは系列の中だけで循環させて引く
+#     （系列境界をまたぐブロックを作らない / 系列ごとのブロック数は ⌈n_g/L⌉ で固定）。
+#     渡さない場合は入力全体を 1 本の時系列とみなす
+#   - workers > 1 は再標本をプロセスプールで分割（大きな成果物向け）。
+#     各ワーカーの乱数は SeedSequence.spawn で独立・再現可能
+#
+# 【主な役割】
+#   - bootstrap_ci()   : y_true / y_pred → BootstrapCI（指標ごとの [low, high]）
+#   - default_block()  : 既定ブロック長 ⌈n^(1/3)⌉（max_blocks 指定時はブロック数の上限も守る）
+#
+# 【連携先・依存関係】
+#   - core/check/check_executor.py … CHECK_BOOTSTRAP=1 のとき report.ci を付与
+#   - core/check/metric_kernel.py  … 指標の意味（NaN 行除外 / MAPE の y=0 除外 / R² 退化時）
+#
+# 【ルール遵守】
+#   1) print() 禁止 → logging.debug() を使用
+#   2) 戻り値は Python float（NumPy スカラーを外へ出さない）
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from core.check.metric_kernel import KERNEL_METRICS
+
+__all__ = ["BootstrapCI", "bootstrap_ci", "default_block"]
+
+# 1 回の gather で扱う要素数の上限（B×k をこの単位で分割してメモリを抑える）
+_GATHER_ELEMS = 1 << 22
+
+# 項の列番号
+_CNT, _S1, _S2, _SSE, _SAE, _SAPE, _NAPE = range(7)
+
+
+@dataclass(frozen=True)
+class BootstrapCI:
+    intervals: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    resamples: int = 0
+    block: int = 0
+    alpha: float = 0.05
+
+
+def default_block(n: int, max_blocks: int = 0) -> int:
+    """
+    既定ブロック長 ⌈n^(1/3)⌉。max_blocks > 0 ならブロック数 ⌈n/L⌉ がそれを
+    超えないよう L を伸ばす（計算量の上限は呼び出し側が明示的に選ぶ）。
+    """
+    block = max(1, math.ceil(n ** (1.0 / 3.0)))
+    if max_blocks > 0:
+        block = max(block, math.ceil(n / max_blocks))
+    return block
+
+
+def _block_sums(yt: np.ndarray, yp: np.ndarray, block: int, mean: float) -> np.ndarray:
+    """1 系列の全開始位置 s の循環ブロック和 (7, n)（項ごとに連続メモリ）"""
+    n = yt.size
+    err = yp - yt
+    abs_err = np.abs(err)
+    centered = yt - mean  # 全体平均で中心化して桁落ちを防ぐ
+    nonzero = yt != 0
+    ape = np.zeros(n)
+    np.divide(abs_err, np.abs(yt), out=ape, where=nonzero)
+
+    # 末尾に先頭 L-1 行を足して循環させ、累積和の差でブロック和を得る
+    width = n + block - 1
+    terms = np.empty((7, width + 1))
+    terms[:, 0] = 0.0
+    for j, col in (
+        (_S1, centered),
+        (_S2, centered * centered),
+        (_SSE, err * err),
+        (_SAE, abs_err),
+        (_SAPE, ape),
+        (_NAPE, nonzero),
+    ):
+        terms[j, 1 : n + 1] = col
+        terms[j, n + 1 :] = col[: block - 1]
+    terms[_CNT, 1:] = 1.0
+    cum = np.cumsum(terms, axis=1, out=terms)
+    return cum[:, block : block + n] - cum[:, :n]
+
+
+def _metric_matrix(sums: np.ndarray, names: Sequence[str]) -> np.ndarray:
+    """再標本ごとの総和 (B, 7) → 指標値 (B, len(names))"""
+    cnt = sums[:, _CNT]
+    sse = sums[:, _SSE]
+    out = np.empty((sums.shape[0], len(names)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j, name in enumerate(names):
+            if name == "mape":
+                out[:, j] = sums[:, _SAPE] / sums[:, _NAPE] * 100.0
+            elif name == "rmse":
+                out[:, j] = np.sqrt(sse / cnt)
+            elif name == "mae":
+                out[:, j] = sums[:, _SAE] / cnt
+            elif name == "r2":
+                m2 = sums[:, _S2] - sums[:, _S1] ** 2 / cnt
+                degenerate = m2 <= 0.0
+                ratio = sse / np.where(degenerate, 1.0, m2)
+                out[:, j] = np.where(degenerate, np.where(sse == 0.0, 1.0, 0.0), 1.0 - ratio)
+            else:
+                raise KeyError(f"unsupported metric: {name!r}")
+    return out
+
+
+def _slots(
+    yt: np.ndarray, yp: np.ndarray, sizes: Sequence[int], block: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    系列ごとのブロック和を連結した (7, n) と、ブロック枠ごとの
+    (開始位置の下端, 開始位置の個数)。枠の数 = Σ⌈n_g/L_g⌉（L_g = min(L, n_g)）。
+    """
+    mean = float(yt.mean())
+    parts, lows, counts = [], [], []
+    offset = 0
+    for size in sizes:
+        length = min(block, size)
+        parts.append(_block_sums(yt[offset : offset + size], yp[offset : offset + size], length, mean))
+        k = math.ceil(size / length)
+        lows.append(np.full(k, offset))
+        counts.append(np.full(k, size))
+        offset += size
+    return np.concatenate(parts, axis=1), np.concatenate(lows), np.concatenate(counts)
+
+
+def _resample(
+    sums_by_start: np.ndarray,
+    lows: np.ndarray,
+    sizes: np.ndarray,
+    count: int,
+    seed: np.random.SeedSequence,
+    names: Sequence[str],
+) -> np.ndarray:
+    """count 個の再標本の指標値 (count, len(names))。プロセスプールからも呼ぶ"""
+    rng = np.random.default_rng(seed)
+    blocks = lows.size
+    step = max(1, _GATHER_ELEMS // max(blocks, 1))
+    out = np.empty((count, len(names)))
+    sums = np.empty((min(step, count), 7))
+    for lo in range(0, count, step):
+        hi = min(count, lo + step)
+        # 開始位置行列を一括生成（枠ごとに自分の系列の範囲から引く）
+        starts = lows + rng.integers(0, sizes, size=(hi - lo, blocks))
+        for j, row in enumerate(sums_by_start):
+            sums[: hi - lo, j] = row.take(starts).sum(axis=1)
+        out[lo:hi] = _metric_matrix(sums[: hi - lo], names)
+    return out
+
+
+def bootstrap_ci(
+    y_true: Any,
+    y_pred: Any,
+    names: Sequence[str] = KERNEL_METRICS,
+    *,
+    resamples: int = 1000,
+    block: int = 0,
+    alpha: float = 0.05,
+    seed: int = 0,
+    workers: int = 0,
+    max_blocks: int = 0,
+    groups: Any = None,
+) -> BootstrapCI:
+    """
+    指標ごとの (1 - alpha) パーセンタイル信頼区間。
+
+    block=0 は default_block(n, max_blocks)。max_blocks > 0 は明示した block にも
+    ブロック数の上限として効く。groups（行ごとの系列番号）を渡すとブロックは
+    系列内だけで引き、無ければ全体を 1 系列とみなす。各系列の行は時系列順の前提。
+    seed が同じなら結果は再現する（workers 数を変えると乱数列は変わる）。
+    有効行 0 件や区間が求まらない指標は (nan, nan)。
+    """
+    names = [n for n in names if n in KERNEL_METRICS]
+    yt = np.asarray(y_true, dtype=np.float64)
+    yp = np.asarray(y_pred, dtype=np.float64)
+    if yt.shape != yp.shape:
+        raise ValueError(f"length mismatch: y_true={yt.shape} y_pred={yp.shape}")
+    finite = np.isfinite(yt) & np.isfinite(yp)
+    codes = None if groups is None else np.asarray(groups)
+    if codes is not None and codes.shape != yt.shape:
+        raise ValueError(f"length mismatch: groups={codes.shape} y_true={yt.shape}")
+    if not finite.all():
+        yt, yp = yt[finite], yp[finite]
+        codes = None if codes is None else codes[finite]
+    sizes: Sequence[int] = [yt.size]
+    if codes is not None and codes.size:
+        order = np.argsort(codes, kind="stable")  # 系列ごとに連続させる（系列内の順は保つ）
+        yt, yp = yt[order], yp[order]
+        sizes = np.unique(codes[order], return_counts=True)[1].tolist()
+
+    n = int(yt.size)
+    block = block or default_block(n)
+    if max_blocks > 0:
+        block = max(block, math.ceil(n / max_blocks))
+    block = min(block, n) if n else 0
+    if n == 0 or resamples <= 0 or not names:
+        nan = (math.nan, math.nan)
+        return BootstrapCI({name: nan for name in names}, max(resamples, 0), block, alpha)
+
+    sums_by_start, lows, slot_sizes = _slots(yt, yp, sizes, block)
+    root = np.random.SeedSequence(seed)
+    if workers > 1 and resamples >= workers:
+        counts = [len(part) for part in np.array_split(np.arange(resamples), workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(
+                _resample,
+                [sums_by_start] * workers,
+                [lows] * workers,
+                [slot_sizes] * workers,
+                counts,
+                root.spawn(workers),
+                [names] * workers,
+            )
+            values = np.concatenate(list(parts))
+    else:
+        values = _resample(sums_by_start, lows, slot_sizes, resamples, root, names)
+
+    intervals: Dict[str, Tuple[float, float]] = {}
+    for j, name in enumerate(names):
+        col = values[:, j]
+        col = col[np.isfinite(col)]
+        if col.size == 0:
+            intervals[name] = (math.nan, math.nan)
+            continue
+        low, high = np.quantile(col, [alpha / 2.0, 1.0 - alpha / 2.0])
+        intervals[name] = (float(low), float(high))
+    return BootstrapCI(intervals, resamples, block, alpha)
@@ -8,15 +8,48 @@
 #   合否判定を行ったうえで CheckResult を生成します。
 #
 # 【主な役割】
-#   - load_predictions() で DataFrame 読込
+#   - load_predictions(columns=) で必要な列だけ DataFrame 読込（大きい成果物は
+#     iter_prediction_batches() で y_true / y_pred だけを逐次読み）
 #   - load_meta()        で MetaInfo 取得
-#   - MAPE / RMSE / R² を計算
+#   - レジストリで mergeable=True の指標（MAPE / RMSE / MAE / R²）は
+#     metric_kernel.MetricStats で一括計算
+#   - それ以外の登録指標（sMAPE / MASE / 方向一致率 / pinball / 独自指標、
+#     replace=True で差し替えた組み込み指標）は
+#     core/metrics/engine.py で計算。集計と同じ 1 パスで y_true / y_pred（+ キー列）を
+#     溜めて使う（成果物の再読込は無し。ただしこれらの指標 / ブートストラップを
+#     要求した run は y 列全体をメモリに保持する）
+#   - 隣接行を使う指標（MASE / 方向一致率など sequential=True）の全体値は、グループ
+#     キーがあればグループ別の値を行数で加重平均する（系列境界をまたいで計算しない）。
+#     グループキーの無い成果物は 1 系列とみなす
+#   - (symbol, horizon, model_id) 等のグループ別指標を GroupedStats で
+#     1 パス計算し、report.groups に列指向で格納（エンジン指標は行をグループ順に
+#     並べた連結配列を evaluate_segments で同じ長さのグループごとに一括評価）
+#   - 指標ごとの値 / 閾値 / 合否（{name} / {name}_threshold / {name}_passed）も
+#     report に載せる（NaN は null）
 #   - 合否判定 → CheckResult を返却
+#   - 成果物の指紋 × 指標仕様で結果をキャッシュ（core/check/result_cache.py）
+#     → 未変更の成果物の再チェックはフッタ読み 1 回で返る
+#   - run_many() / scan_runs() : Plan の全 run を 1 データセットとして並列スキャンし
+#     run ごとに一括評価（バッチ Check 用）
+#
+# 【外部設定】
+#   CHECK_STREAMING         : auto (default) | 1 | 0
+#                             auto はファイルが CHECK_STREAM_MIN_BYTES 以上ならストリーミング
+#   CHECK_STREAM_MIN_BYTES  : auto 判定の閾値 (default 64 MiB)
+#   CHECK_STREAM_BATCH_ROWS : 1 バッチの行数 (default 65536)
+#   CHECK_GROUP_BY          : グループ別評価のキー列 (default "symbol,horizon,model_id")
+#                             成果物に存在する列だけを使う。空 = グループ別評価なし
+#   CHECK_BOOTSTRAP         : 1 = 指標のブロック・ブートストラップ信頼区間を report.ci に付与
+#   CHECK_BOOTSTRAP_RESAMPLES / _BLOCK / _MAX_BLOCKS / _ALPHA / _SEED / _WORKERS
+#     （グループ列があればブロックはグループ内で引く。_MAX_BLOCKS=0 はブロック数上限なし）
+#                           : 再標本数 (1000) / ブロック長 (0 = 自動) / 有意水準 (0.05) /
+#                             乱数シード (0) / プロセス数 (0 = 同一プロセス)
 #
 # 【連携先・依存関係】
 #   - core/common/io_utils.py            … Parquet & meta I/O
 #   - core/schemas.check_schemas.py      … CheckResult, CheckReport
 #   - core/schemas.meta_schemas.py       … MetricSpec, MetaInfo
+#   - core/metrics/engine.py             … 指標レジストリ（名前の検証・合否の向き）
 #
 # 【ルール遵守】
 #   1) print() 禁止 → logging.debug() を使用
@@ -26,60 +59,365 @@ from __future__ import annotations
 
 import logging
 import math
+import os
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 
-from core.common.io_utils import load_predictions, load_meta
+from core.check import result_cache
+from core.check.bootstrap import BootstrapCI, bootstrap_ci
+from core.check.metric_kernel import (
+    GroupedStats,
+    MetricStats,
+    column_array,
+    column_values,
+    frame_columns,
+)
+from core.common.io_utils import (
+    artifact_path,
+    iter_prediction_batches,
+    load_meta,
+    load_predictions,
+    prediction_columns,
+)
 from core.schemas.check_schemas import CheckResult, CheckReport
-from core.schemas.meta_schemas import MetaInfo
-from core.constants import SUPPORTED_METRICS
+from core.schemas.meta_schemas import MetaInfo, MetricSpec
+from core.metrics import engine as metric_engine
+
+try:
+    import pyarrow.dataset as ds  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    ds = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
-# --------------------------------------------------
-# データフレームライブラリ (polars > pandas 優先)
-# --------------------------------------------------
-try:
-    import polars as pl  # type: ignore
+_STREAMING = os.getenv("CHECK_STREAMING", "auto").lower()
+_STREAM_MIN_BYTES = int(os.getenv("CHECK_STREAM_MIN_BYTES", str(64 * 1024 * 1024)))
+_STREAM_BATCH_ROWS = int(os.getenv("CHECK_STREAM_BATCH_ROWS", "65536"))
+_Y_COLUMNS = ("y_true", "y_pred")
+_GROUP_BY = tuple(
+    c.strip() for c in os.getenv("CHECK_GROUP_BY", "symbol,horizon,model_id").split(",") if c.strip()
+)
+_BOOTSTRAP = os.getenv("CHECK_BOOTSTRAP", "0").lower() in ("1", "true", "yes")
+_BOOTSTRAP_OPTIONS = {
+    "resamples": int(os.getenv("CHECK_BOOTSTRAP_RESAMPLES", "1000")),
+    "block": int(os.getenv("CHECK_BOOTSTRAP_BLOCK", "0")),
+    "max_blocks": int(os.getenv("CHECK_BOOTSTRAP_MAX_BLOCKS", "0")),
+    "alpha": float(os.getenv("CHECK_BOOTSTRAP_ALPHA", "0.05")),
+    "seed": int(os.getenv("CHECK_BOOTSTRAP_SEED", "0")),
+}
+_BOOTSTRAP_WORKERS = int(os.getenv("CHECK_BOOTSTRAP_WORKERS", "0"))
 
-    _DF_LIB = "polars"
-except ModuleNotFoundError:  # pragma: no cover
-    _DF_LIB = "pandas"
 
+def _use_streaming(plan_id: str, run_id: str) -> bool:
+    if _STREAMING in ("1", "true", "yes"):
+        return True
+    if _STREAMING in ("0", "false", "no"):
+        return False
+    path = artifact_path(plan_id, run_id)
+    return path.exists() and path.stat().st_size >= _STREAM_MIN_BYTES
 
-# --------------------------------------------------
-# メトリクス計算ユーティリティ
-# --------------------------------------------------
-def _to_list(obj):
-    return list(obj)
 
+def prediction_stats(
+    plan_id: str, run_id: str, *, streaming: Optional[bool] = None
+) -> MetricStats:
+    """
+    予測成果物の y_true / y_pred から MetricStats を作る。
+
+    streaming=True はレコードバッチごとに統計量を作って merge する
+    （平均・分散は Chan らの並列 Welford 公式で結合）ので、メモリは
+    1 バッチ分で済み、結果は一括計算と一致する。None は CHECK_STREAMING に従う。
+    """
+    if streaming is None:
+        streaming = _use_streaming(plan_id, run_id)
+    if not streaming:
+        df = load_predictions(plan_id, run_id, _Y_COLUMNS)
+        return MetricStats.from_arrays(column_array(df, "y_true"), column_array(df, "y_pred"))
 
-def _mape(y_true, y_pred) -> float:
-    yt = _to_list(y_true)
-    yp = _to_list(y_pred)
-    return float(sum(abs((a - b) / a) for a, b in zip(yt, yp)) / len(yt)) * 100.0
+    stats = MetricStats()
+    for batch in iter_prediction_batches(plan_id, run_id, _Y_COLUMNS, _STREAM_BATCH_ROWS):
+        stats = stats.merge(
+            MetricStats.from_arrays(column_array(batch, "y_true"), column_array(batch, "y_pred"))
+        )
+    return stats
 
 
-def _rmse(y_true, y_pred) -> float:
-    yt = _to_list(y_true)
-    yp = _to_list(y_pred)
-    return float(math.sqrt(sum((a - b) ** 2 for a, b in zip(yt, yp)) / len(yt)))
+class _RowSeries:
+    """
+    MetricStats で結合できない指標 / ブートストラップ用に、集計と同じパスで
+    読んだバッチのキー列と y_true / y_pred を溜める（成果物を読み直さない）。
+    """
 
+    def __init__(self) -> None:
+        self._keys: Dict[str, List[np.ndarray]] = {}
+        self._y_true: List[np.ndarray] = []
+        self._y_pred: List[np.ndarray] = []
 
-def _r2(y_true, y_pred) -> float:
-    yt = _to_list(y_true)
-    yp = _to_list(y_pred)
-    mean_y = sum(yt) / len(yt)
-    ss_tot = sum((a - mean_y) ** 2 for a in yt)
-    ss_res = sum((a - b) ** 2 for a, b in zip(yt, yp))
-    return 1.0 - ss_res / ss_tot if ss_tot != 0 else 0.0
+    def add(self, frame: Any, keys: Sequence[str]) -> None:
+        for k in keys:
+            self._keys.setdefault(k, []).append(column_values(frame, k))
+        self._y_true.append(column_array(frame, "y_true"))
+        self._y_pred.append(column_array(frame, "y_pred"))
 
+    def clear(self) -> None:
+        self.__init__()  # type: ignore[misc]
 
-_METRIC_FUNCS = {
-    "mape": _mape,
-    "rmse": _rmse,
-    "r2": _r2,
-}
+    def arrays(self) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
+        """(キー列, y_true, y_pred) を連結して返す"""
+        if not self._y_true:
+            return {}, np.zeros(0), np.zeros(0)
+        keys = {k: np.concatenate(parts) for k, parts in self._keys.items()}
+        return keys, np.concatenate(self._y_true), np.concatenate(self._y_pred)
+
+
+def _grouped(
+    frame: Any, keys: Sequence[str], series: Optional[_RowSeries] = None
+) -> GroupedStats:
+    if series is not None:
+        series.add(frame, keys)
+    return GroupedStats.from_arrays(
+        {k: column_values(frame, k) for k in keys},
+        column_array(frame, "y_true"),
+        column_array(frame, "y_pred"),
+    )
+
+
+def grouped_prediction_stats(
+    plan_id: str,
+    run_id: str,
+    group_by: Sequence[str] = _GROUP_BY,
+    *,
+    streaming: Optional[bool] = None,
+    series: Optional[_RowSeries] = None,
+) -> GroupedStats:
+    """
+    group_by の列ごとに予測成果物を 1 パスで集計した GroupedStats を返す。
+
+    成果物に無いキー列は無視する（全て無ければ全行 1 グループ）。
+    streaming の扱いは prediction_stats() と同じで、バッチごとの集計を
+    GroupedStats.merge でキー単位に結合する。
+    series を渡すと、同じパスで読んだキー列と y_true / y_pred をそこへ溜める。
+    """
+    if streaming is None:
+        streaming = _use_streaming(plan_id, run_id)
+    names = prediction_columns(plan_id, run_id)
+    if not streaming:
+        if names is None:  # スキーマを事前に読めない環境: 全列を読んで判定
+            df = load_predictions(plan_id, run_id)
+            present = set(frame_columns(df))
+            return _grouped(df, [k for k in group_by if k in present], series)
+        wanted = [k for k in group_by if k in names]
+        return _grouped(load_predictions(plan_id, run_id, [*wanted, *_Y_COLUMNS]), wanted, series)
+
+    keys: Optional[List[str]] = (
+        [k for k in group_by if k in names] if names is not None else None
+    )
+    columns = [*keys, *_Y_COLUMNS] if keys is not None else None
+    stats: Optional[GroupedStats] = None
+    for batch in iter_prediction_batches(plan_id, run_id, columns, _STREAM_BATCH_ROWS):
+        if keys is None:  # スキーマを事前に読めない環境: 最初のバッチで判定
+            present = set(frame_columns(batch))
+            keys = [k for k in group_by if k in present]
+        part = _grouped(batch, keys, series)
+        stats = part if stats is None else stats.merge(part)
+    return stats if stats is not None else GroupedStats.empty(keys or ())
+
+
+def scan_runs(
+    plan_id: str,
+    run_ids: Sequence[str],
+    group_by: Sequence[str] = _GROUP_BY,
+    *,
+    series: Optional[Mapping[str, _RowSeries]] = None,
+) -> Dict[str, GroupedStats]:
+    """
+    複数 run の予測成果物を 1 つの Parquet データセットとしてスキャンし、
+    run ごとの GroupedStats を返す（成果物の無い run は含めない）。
+
+    pyarrow.dataset のスキャナがファイル読み込みとデコードをスレッド並列で行い、
+    各レコードバッチは由来ファイル → run_id で振り分けて merge する。
+    pyarrow が無い環境では run ごとに grouped_prediction_stats() を呼ぶ。
+    series に含まれる run は、読んだキー列と y_true / y_pred もそこへ溜める。
+    """
+    series = series or {}
+    paths: Dict[str, str] = {}
+    for run_id in run_ids:
+        path = artifact_path(plan_id, run_id)
+        if path.exists():
+            paths[str(path)] = run_id
+    if not paths:
+        return {}
+    if ds is None:
+        return {
+            run_id: grouped_prediction_stats(
+                plan_id, run_id, group_by, streaming=False, series=series.get(run_id)
+            )
+            for run_id in paths.values()
+        }
+
+    dataset = ds.dataset(list(paths), format="parquet")
+    names = set(dataset.schema.names)
+    keys = [k for k in group_by if k in names]
+    scanner = dataset.scanner(
+        columns=[*keys, *_Y_COLUMNS], batch_size=_STREAM_BATCH_ROWS, use_threads=True
+    )
+    out: Dict[str, GroupedStats] = {}
+    for tagged in scanner.scan_batches():
+        run_id = paths[tagged.fragment.path]
+        part = _grouped(tagged.record_batch, keys, series.get(run_id))
+        out[run_id] = out[run_id].merge(part) if run_id in out else part
+    for run_id in paths.values():
+        out.setdefault(run_id, GroupedStats.empty(keys))
+    return out
+
+
+def _cache_key(plan_id: str, run_id: str, meta: MetaInfo) -> Optional[str]:
+    """成果物の指紋 + meta.metrics のキャッシュキー（無効 / 成果物無しは None）"""
+    if not result_cache.enabled():
+        return None
+    fingerprint = result_cache.artifact_fingerprint(artifact_path(plan_id, run_id))
+    if fingerprint is None:
+        return None
+    options = _BOOTSTRAP_OPTIONS if _BOOTSTRAP else None
+    return result_cache.cache_key(fingerprint, meta.metrics, _GROUP_BY, options)
+
+
+def _known_specs(meta: MetaInfo) -> List[MetricSpec]:
+    """レジストリに登録済みの指標仕様だけ（未登録は警告してスキップ）"""
+    known = set(metric_engine.available_metrics())
+    specs = []
+    for spec in meta.metrics:
+        if spec.name not in known:
+            logger.warning("Unsupported metric: %s (skip)", spec.name)
+            continue
+        specs.append(spec)
+    return specs
+
+
+def _mergeable(name: str) -> bool:
+    """MetricStats（カーネル経路）で計算する指標か（レジストリの mergeable フラグ）"""
+    return metric_engine.get_metric(name).mergeable
+
+
+def _engine_names(meta: MetaInfo) -> List[str]:
+    """meta.metrics のうち MetricStats で結合できない登録指標"""
+    known = set(metric_engine.available_metrics())
+    return [s.name for s in meta.metrics if s.name in known and not _mergeable(s.name)]
+
+
+def _series_for(meta: MetaInfo) -> Optional[_RowSeries]:
+    """エンジン指標かブートストラップが要る run だけ行を溜める"""
+    return _RowSeries() if _BOOTSTRAP or _engine_names(meta) else None
+
+
+def _engine_groups(
+    grouped: GroupedStats,
+    keys: Mapping[str, np.ndarray],
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    names: Sequence[str],
+) -> Dict[str, List[Optional[float]]]:
+    """
+    エンジン指標のグループ別値（grouped と同じグループ順。NaN は None）。
+    行をグループ順に安定ソートし（グループ内の行順は成果物の順のまま）、
+    区切り位置ごとに evaluate_segments で評価する。最大グループ長への埋め草は
+    作らないので、グループサイズが偏っていてもメモリは行数分で済む。
+    """
+    pos = grouped.locate(keys)
+    order = np.argsort(pos, kind="stable")
+    bounds = np.searchsorted(pos[order], np.arange(len(grouped) + 1))
+    values = metric_engine.evaluate_segments(y_true[order], y_pred[order], bounds, names)
+    return {
+        name: [float(v) if math.isfinite(v) else None for v in values[name]] for name in names
+    }
+
+
+def _pooled(group_values: Sequence[Optional[float]], weights: np.ndarray) -> float:
+    """グループ別の値を行数で加重平均（値の無いグループは除く。全て無ければ NaN）"""
+    vals = np.array([math.nan if v is None else v for v in group_values], dtype=np.float64)
+    ok = np.isfinite(vals) & (weights > 0)
+    if not ok.any():
+        return math.nan
+    return float(np.average(vals[ok], weights=weights[ok]))
+
+
+def _evaluate(
+    meta: MetaInfo, grouped: GroupedStats, series: Optional[_RowSeries]
+) -> Tuple[Dict[str, float], Dict[str, List[Optional[float]]], Optional[BootstrapCI]]:
+    """
+    MetricStats で結合できない指標の (全体値, グループ別値) と
+    （CHECK_BOOTSTRAP=1 なら）信頼区間。いずれも集計パスで溜めた series から計算する。
+    """
+    engine_names = _engine_names(meta)
+    keys, y_true, y_pred = series.arrays() if series is not None else ({}, np.zeros(0), np.zeros(0))
+    if not y_true.size:
+        return {name: math.nan for name in engine_names}, {}, None
+    values: Dict[str, float] = {}
+    groups: Dict[str, List[Optional[float]]] = {}
+    if engine_names:
+        per_group = bool(grouped.keys) and len(grouped) > 0
+        if per_group:
+            groups = _engine_groups(grouped, keys, y_true, y_pred, engine_names)
+        # 隣接行を使う指標は連結配列に掛けず、グループ別の値を集約する
+        flat = [n for n in engine_names if not (per_group and metric_engine.get_metric(n).sequential)]
+        values = metric_engine.evaluate(y_true, y_pred, flat) if flat else {}
+        for name in engine_names:
+            if name not in values:
+                values[name] = _pooled(groups[name], grouped.n)
+    ci = None
+    if _BOOTSTRAP:
+        known = set(metric_engine.available_metrics())
+        names = [s.name for s in meta.metrics if s.name in known and _mergeable(s.name)]
+        # 系列（グループ）境界をまたぐブロックを作らないよう行の所属グループを渡す
+        codes = grouped.locate(keys) if grouped.keys and len(grouped) > 0 else None
+        ci = bootstrap_ci(
+            y_true, y_pred, names, workers=_BOOTSTRAP_WORKERS, groups=codes, **_BOOTSTRAP_OPTIONS
+        )
+    return values, groups, ci
+
+
+def _report_r2(value: float) -> float:
+    """
+    CheckReport.r2 は [-1, 1] 制約なので NaN は -1、範囲外は端に丸める
+    （合否 r2_passed は丸める前の値で判定済み）。
+    """
+    if math.isnan(value):
+        return -1.0
+    return min(1.0, max(-1.0, value))
+
+
+def _scan_isolated(
+    plan_id: str,
+    run_ids: Sequence[str],
+    errors: Dict[str, str],
+    series: Mapping[str, _RowSeries],
+) -> Dict[str, GroupedStats]:
+    """
+    scan_runs() を 1 回で試み、壊れた成果物などで失敗したら run ごとに読み直す。
+    読めなかった run は errors に ``{run_id: メッセージ}`` で記録する。
+    """
+    try:
+        return scan_runs(plan_id, run_ids, series=series)
+    except Exception as exc:  # noqa: BLE001 – 1 run の不良でバッチ全体を止めない
+        logger.warning("Batch scan failed (%s); retrying run by run", exc)
+    for rows in series.values():
+        rows.clear()  # 失敗したスキャンで溜まった途中までの行を捨てる
+    out: Dict[str, GroupedStats] = {}
+    for run_id in run_ids:
+        try:
+            out.update(scan_runs(plan_id, [run_id], series=series))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Check run %s failed: %s", run_id, exc)
+            errors[run_id] = str(exc)
+    return out
+
+
+def _passed(name: str, value: float, threshold: float) -> bool:
+    # 向きはレジストリの higher_is_better（NaN は不合格）
+    if metric_engine.higher_is_better(name):
+        return value >= threshold
+    return value <= threshold
 
 
 # --------------------------------------------------
@@ -91,51 +429,178 @@ class CheckExecutor:
     """
 
     @classmethod
-    def run(cls, plan_id: str, run_id: str) -> CheckResult:
+    def run(
+        cls, plan_id: str, run_id: str, *, streaming: Optional[bool] = None
+    ) -> CheckResult:
         """
         予測 Parquet と meta.json を読み込み、各指標を計算して
-        CheckResult を返す。
+        CheckResult を返す。streaming は prediction_stats() を参照。
         """
-        df = load_predictions(plan_id, run_id)
         meta_dict: Dict[str, Any] = load_meta(plan_id, run_id)
         meta = MetaInfo.model_validate(meta_dict)
-
-        logger.debug("Loaded predictions rows=%d", len(df))
         logger.debug("Loaded meta: %s", meta)
 
-        # --- 真値 / 予測値 Series 取得 ---------------------------------
-        if _DF_LIB == "polars":
-            y_true = df["y_true"]
-            y_pred = df["y_pred"]
-        else:  # pandas
-            y_true = df["y_true"]
-            y_pred = df["y_pred"]
+        # --- 同一成果物 × 同一指標仕様の結果があれば再利用 -----------------
+        key = _cache_key(plan_id, run_id, meta)
+        if key is not None:
+            cached = result_cache.get_many([key]).get(key)
+            if cached is not None:
+                logger.debug("Check cache hit: %s", key)
+                return cls._from_report(meta, run_id, cached)
 
-        # --- メトリクス計算 & 閾値チェック ------------------------------
-        report_dict: Dict[str, Any] = {}
-        for spec in meta.metrics:
-            if spec.name not in SUPPORTED_METRICS:
-                logger.warning("Unsupported metric: %s (skip)", spec.name)
+        # --- 真値 / 予測値の十分統計量（一括 or レコードバッチ逐次） -----
+        #     グループ別に 1 パスで集計し、全体値はその結合から得る
+        series = _series_for(meta)
+        grouped = grouped_prediction_stats(plan_id, run_id, streaming=streaming, series=series)
+        result = cls._result(meta, run_id, grouped, *_evaluate(meta, grouped, series))
+        if key is not None:
+            result_cache.put_many({key: {"report": result.report.model_dump()}})
+        return result
+
+    @classmethod
+    def run_many(
+        cls,
+        plan_id: str,
+        run_ids: Sequence[str],
+        *,
+        errors: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, CheckResult]:
+        """
+        同一 Plan の複数 run をまとめて評価し ``{run_id: CheckResult}`` を返す。
+        成果物は scan_runs() で 1 つのデータセットとして並列に読む。
+        予測成果物 / meta.json の無い run は結果に含めない。
+        読み込み / 評価に失敗した run も結果に含めず、errors を渡せば
+        ``{run_id: エラーメッセージ}`` を記録する（他の run の評価は続ける）。
+        """
+        errors = {} if errors is None else errors
+        metas: Dict[str, MetaInfo] = {}
+        for run_id in run_ids:
+            try:
+                metas[run_id] = MetaInfo.model_validate(load_meta(plan_id, run_id))
+            except (OSError, RuntimeError, ValueError) as exc:
+                logger.warning("Skip run %s: meta unavailable (%s)", run_id, exc)
+
+        # キャッシュ済みの run はスキャン対象から外す
+        keys = {r: k for r in metas if (k := _cache_key(plan_id, r, metas[r])) is not None}
+        hits = result_cache.get_many(keys.values())
+        results: Dict[str, CheckResult] = {
+            run_id: cls._from_report(metas[run_id], run_id, hits[key])
+            for run_id, key in keys.items()
+            if key in hits
+        }
+
+        cached = len(results)
+        todo = [run_id for run_id in metas if run_id not in results]
+        fresh: Dict[str, Dict[str, Any]] = {}
+        series = {r: rows for r in todo if (rows := _series_for(metas[r])) is not None}
+        scanned = _scan_isolated(plan_id, todo, errors, series) if todo else {}
+        for run_id, grouped in scanned.items():
+            meta = metas[run_id]
+            try:
+                results[run_id] = cls._result(
+                    meta, run_id, grouped, *_evaluate(meta, grouped, series.get(run_id))
+                )
+            except Exception as exc:  # noqa: BLE001 – 失敗は run 単位で記録して続行
+                logger.warning("Check run %s failed: %s", run_id, exc, exc_info=True)
+                errors[run_id] = str(exc)
                 continue
+            if run_id in keys:
+                fresh[keys[run_id]] = {"report": results[run_id].report.model_dump()}
+        result_cache.put_many(fresh)
+        logger.debug(
+            "Batch check runs=%d cached=%d failed=%d", len(results), cached, len(errors)
+        )
+        return results
 
-            value = _METRIC_FUNCS[spec.name](y_true, y_pred)
-            passed = (
-                value <= spec.threshold
-                if spec.name != "r2"
-                else value >= spec.threshold
-            )
+    @classmethod
+    def _from_report(cls, meta: MetaInfo, run_id: str, report: Dict[str, Any]) -> CheckResult:
+        """キャッシュ済みレポートから CheckResult を復元する"""
+        return CheckResult(
+            id=f"check_{uuid.uuid4().hex[:8]}",
+            do_id=run_id,
+            created_at=meta.created_at,
+            report=CheckReport(**report),
+        )
+
+    @classmethod
+    def _result(
+        cls,
+        meta: MetaInfo,
+        run_id: str,
+        grouped: GroupedStats,
+        values: Optional[Dict[str, float]] = None,
+        group_values: Optional[Dict[str, List[Optional[float]]]] = None,
+        ci: Optional[BootstrapCI] = None,
+    ) -> CheckResult:
+        """
+        GroupedStats（+ 結合できない指標の全体値 values / グループ別値 group_values と
+        任意の信頼区間）と meta.metrics の閾値から CheckResult を組み立てる
+        """
+        stats = grouped.total()
+        logger.debug("Evaluated predictions rows=%d groups=%d", stats.n, len(grouped))
 
+        # --- メトリクス計算 & 閾値チェック ------------------------------
+        report_dict: Dict[str, Any] = {}
+        values = values or {}
+        group_values = group_values or {}
+        specs = _known_specs(meta)
+        for spec in specs:
+            if _mergeable(spec.name):
+                value = stats.value(spec.name)
+            else:
+                value = values.get(spec.name, math.nan)
             report_dict[spec.name] = value
             report_dict[f"{spec.name}_threshold"] = spec.threshold
-            report_dict[f"{spec.name}_passed"] = passed
+            report_dict[f"{spec.name}_passed"] = _passed(spec.name, value, spec.threshold)
 
         # --- 合否 (全指標をクリアしたら PASS) ---------------------------
         overall_passed = all(v for k, v in report_dict.items() if k.endswith("_passed"))
 
+        # --- 指標ごとの値 / 閾値 / 合否（r2 は CheckReport の項目そのもの） ---
+        extra: Dict[str, Any] = {
+            k: None if isinstance(v, float) and math.isnan(v) else v
+            for k, v in report_dict.items()
+            if k != "r2"
+        }
+
+        # --- グループ別（列指向: 各列の長さ = グループ数） ---------------
+        #     エンジン指標の値が無いとき（行を溜めていない等）は null を並べる
+        if grouped.keys:
+            groups = grouped.columns(spec.name for spec in specs if _mergeable(spec.name))
+            for spec in specs:
+                if not _mergeable(spec.name):
+                    groups[spec.name] = group_values.get(spec.name, [None] * len(grouped))
+                groups[f"{spec.name}_passed"] = [
+                    v is not None and _passed(spec.name, v, spec.threshold)
+                    for v in groups[spec.name]
+                ]
+            extra["groups"] = groups
+
+        # --- ブートストラップ信頼区間 -------------------------------------
+        #     stable = 区間の両端とも点推定と同じ合否（ノイズで反転しない）
+        #     再標本化は MetricStats の十分統計量で行うため、エンジン指標は null
+        if ci is not None:
+            intervals: Dict[str, Any] = {}
+            for spec in specs:
+                low, high = ci.intervals.get(spec.name, (math.nan, math.nan))
+                if math.isnan(low) or math.isnan(high):
+                    intervals[spec.name] = {"low": None, "high": None, "stable": False}
+                    continue
+                point = report_dict[f"{spec.name}_passed"]
+                intervals[spec.name] = {
+                    "low": low,
+                    "high": high,
+                    "stable": _passed(spec.name, low, spec.threshold) == point
+                    and _passed(spec.name, high, spec.threshold) == point,
+                }
+            extra["ci"] = intervals
+            extra["bootstrap"] = {"resamples": ci.resamples, "block": ci.block, "alpha": ci.alpha}
+
         check_report = CheckReport(
-            r2=report_dict.get("r2", 0.0),
+            r2=_report_r2(report_dict.get("r2", 0.0)),
             threshold=report_dict.get("r2_threshold", 0.0),
             passed=report_dict.get("r2_passed", overall_passed),
+            **extra,
         )
 
         check_result = CheckResult(
@@ -150,4 +615,4 @@ class CheckExecutor:
 
 
 # 公開シンボル
-__all__ = ["CheckExecutor"]
+__all__ = ["CheckExecutor", "grouped_prediction_stats", "prediction_stats", "scan_runs"]
@@ -0,0 +1,416 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【core/check/metric_kernel.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   Check フェーズの評価指標 (MAPE / RMSE / MAE / R²) を NumPy で一括計算する
+#   “メトリクスカーネル”。y_true / y_pred の float64 連続バッファから
+#   十分統計量 MetricStats を 1 回の関数呼び出しで作り、全指標をそこから導く。
+#
+# 【主な役割】
+#   - column_array()          : polars / pandas / pyarrow の列を float64 ndarray へ
+#                               （欠損の無い float64 列はゼロコピー）
+#   - MetricStats.from_arrays : 誤差ベクトルを 1 度だけ作り、内積 (BLAS) と総和で
+#                               n / Σ|e| / Σe² / Σ|e/y| / mean(y) / Σ(y-ȳ)² を得る
+#   - MetricStats.merge       : 2 つの統計量を結合（Chan らの並列分散公式）
+#                               → ストリーミング / グループ別集計で再利用
+#   - MetricStats.value(name) : 指標値を返す
+#   - metric_values()         : 十分統計量の配列 → 指標値の配列。指標の式はここだけに置き、
+#                               MetricStats / GroupedStats / core/metrics/engine.py の
+#                               mergeable 指標がすべてこれを使う
+#   - GroupedStats            : (symbol, horizon, model_id) 等のグループ別統計量を
+#                               列指向の配列で保持。キーを整数コードへ因子化し、
+#                               np.bincount で全グループを 1 回で集計する
+#   - GroupedStats.locate     : 行ごとのキー → グループ位置（結合できない指標の
+#                               グループ別評価で行を並べ直す用）
+#
+# 【指標の意味（core/metrics/metrics_calc.calc_metrics と揃える）】
+#   - y_true / y_pred どちらかが NaN / inf の行は全指標から除外
+#   - MAPE は y_true == 0 の行を除外して平均（該当行のみなら NaN）、単位は %
+#   - R² は Σ(y-ȳ)² == 0 のとき sklearn と同じく完全一致 1.0 / それ以外 0.0
+#   - 有効行 0 件は全指標 NaN
+#
+# 【連携先・依存関係】
+#   - core/check/check_executor.py … CheckExecutor.run / grouped_prediction_stats
+#   - core/metrics/engine.py       … 組み込み mergeable 指標（GroupedStats.from_codes に委譲）
+#
+# 【ルール遵守】
+#   1) print() 禁止 → logging.debug() を使用
+#   2) 戻り値は Python float（NumPy スカラーを外へ出さない）
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = [
+    "KERNEL_METRICS",
+    "GroupedStats",
+    "MetricStats",
+    "column_array",
+    "column_values",
+    "frame_columns",
+    "metric_values",
+]
+
+# カーネルが計算できる指標
+KERNEL_METRICS = ("mape", "rmse", "mae", "r2")
+
+
+def metric_values(
+    name: str,
+    n: np.ndarray,
+    m2_true: np.ndarray,
+    sse: np.ndarray,
+    sae: np.ndarray,
+    sape: np.ndarray,
+    n_ape: np.ndarray,
+) -> np.ndarray:
+    """十分統計量（各配列の長さ = 系列 / グループ数）→ 指標値の配列（n == 0 は NaN）"""
+    if name not in KERNEL_METRICS:
+        raise KeyError(f"unsupported metric: {name!r}")
+    n = np.asarray(n, dtype=np.float64)
+    out = np.full(n.shape, math.nan)
+    if name == "mape":
+        np.divide(np.asarray(sape, dtype=np.float64) * 100.0, n_ape, out=out, where=np.asarray(n_ape) > 0)
+        return out
+    if name == "rmse":
+        np.divide(sse, n, out=out, where=n > 0)
+        return np.sqrt(out)
+    if name == "mae":
+        np.divide(sae, n, out=out, where=n > 0)
+        return out
+    # r2: Σ(y-ȳ)² == 0 は完全一致 1.0 / それ以外 0.0（sklearn と同じ）
+    m2 = np.asarray(m2_true, dtype=np.float64)
+    sse = np.asarray(sse, dtype=np.float64)
+    r2 = np.where(m2 > 0, 1.0 - sse / np.where(m2 > 0, m2, 1.0), np.where(sse == 0, 1.0, 0.0))
+    return np.where(n > 0, r2, math.nan)
+
+
+def column_array(df: Any, name: str) -> np.ndarray:
+    """
+    DataFrame / Table の列を 1-D float64 ndarray で返す。
+    float64・欠損無しの列は Parquet 読み込み時のバッファをそのまま参照する。
+    """
+    if hasattr(df, "get_column"):  # polars
+        col = df.get_column(name)
+        return col.to_numpy() if col.dtype.is_float() else col.cast(float).to_numpy()
+    if hasattr(df, "column") and hasattr(df, "schema"):  # pyarrow.Table / RecordBatch
+        col = df.column(name)
+        if hasattr(col, "combine_chunks"):
+            col = col.combine_chunks()
+        return np.asarray(col.to_numpy(zero_copy_only=False), dtype=np.float64)
+    col = df[name]  # pandas / dict of arrays
+    if hasattr(col, "to_numpy"):
+        return col.to_numpy(dtype=np.float64, copy=False)
+    return np.asarray(col, dtype=np.float64)
+
+
+def column_values(df: Any, name: str) -> np.ndarray:
+    """グループキー用: 列を元の型のまま 1-D ndarray で返す（文字列は str 配列）"""
+    if hasattr(df, "get_column"):  # polars
+        arr = df.get_column(name).to_numpy()
+    elif hasattr(df, "column") and hasattr(df, "schema"):  # pyarrow
+        arr = df.column(name).to_numpy(zero_copy_only=False)
+    else:
+        col = df[name]
+        arr = col.to_numpy() if hasattr(col, "to_numpy") else np.asarray(col)
+    arr = np.asarray(arr)
+    # object 列（文字列 / None 混在）は np.unique で比較できるよう str へ揃える
+    return arr.astype(str) if arr.dtype == object else arr
+
+
+def frame_columns(df: Any) -> List[str]:
+    """polars / pandas / pyarrow の列名一覧"""
+    if hasattr(df, "column") and hasattr(df, "schema"):  # pyarrow
+        return list(df.schema.names)
+    return [str(c) for c in df.columns]
+
+
+@dataclass
+class MetricStats:
+    """
+    指標計算の十分統計量。加算的なので merge() で任意に結合できる。
+    """
+
+    n: int = 0
+    mean_true: float = 0.0  # ȳ
+    m2_true: float = 0.0    # Σ(y - ȳ)²（R² の分母）
+    sse: float = 0.0        # Σ(ŷ - y)²
+    sae: float = 0.0        # Σ|ŷ - y|
+    sape: float = 0.0       # Σ|(ŷ - y) / y|（y != 0 の行）
+    n_ape: int = 0          # MAPE の有効行数
+
+    # ---------------------------------------------------------------- #
+    # 構築 / 結合
+    # ---------------------------------------------------------------- #
+    @classmethod
+    def from_arrays(cls, y_true: Any, y_pred: Any) -> "MetricStats":
+        yt = np.asarray(y_true, dtype=np.float64)
+        yp = np.asarray(y_pred, dtype=np.float64)
+        if yt.shape != yp.shape:
+            raise ValueError(f"length mismatch: y_true={yt.shape} y_pred={yp.shape}")
+
+        finite = np.isfinite(yt) & np.isfinite(yp)
+        if not finite.all():
+            yt, yp = yt[finite], yp[finite]
+        n = int(yt.size)
+        if n == 0:
+            return cls()
+
+        err = yp - yt
+        abs_err = np.abs(err)
+        mean_true = float(yt.mean())
+        centered = yt - mean_true
+
+        nonzero = yt != 0
+        n_ape = int(np.count_nonzero(nonzero))
+        if n_ape == n:
+            sape = float(np.sum(abs_err / np.abs(yt)))
+        elif n_ape:
+            sape = float(np.sum(abs_err[nonzero] / np.abs(yt[nonzero])))
+        else:
+            sape = 0.0
+
+        return cls(
+            n=n,
+            mean_true=mean_true,
+            m2_true=float(centered @ centered),
+            sse=float(err @ err),
+            sae=float(abs_err.sum()),
+            sape=sape,
+            n_ape=n_ape,
+        )
+
+    def merge(self, other: "MetricStats") -> "MetricStats":
+        """2 つの部分集合の統計量を結合した新しい MetricStats"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean_true - self.mean_true
+        return MetricStats(
+            n=n,
+            mean_true=self.mean_true + delta * other.n / n,
+            m2_true=self.m2_true + other.m2_true + delta * delta * self.n * other.n / n,
+            sse=self.sse + other.sse,
+            sae=self.sae + other.sae,
+            sape=self.sape + other.sape,
+            n_ape=self.n_ape + other.n_ape,
+        )
+
+    @classmethod
+    def merge_all(cls, parts: Iterable["MetricStats"]) -> "MetricStats":
+        out = cls()
+        for part in parts:
+            out = out.merge(part)
+        return out
+
+    # ---------------------------------------------------------------- #
+    # 指標
+    # ---------------------------------------------------------------- #
+    def value(self, name: str) -> float:
+        fields = (getattr(self, f) for f in _METRIC_FIELDS)
+        return float(metric_values(name, *(np.asarray([v]) for v in fields))[0])
+
+    def values(self, names: Iterable[str] = KERNEL_METRICS) -> Dict[str, float]:
+        return {name: self.value(name) for name in names}
+
+
+# --------------------------------------------------------------------------- #
+# グループ別
+# --------------------------------------------------------------------------- #
+_STAT_FIELDS = ("n", "mean_true", "m2_true", "sse", "sae", "sape", "n_ape")
+_METRIC_FIELDS = ("n", "m2_true", "sse", "sae", "sape", "n_ape")  # metric_values の引数順
+
+
+def _factorize(
+    keys: Mapping[str, np.ndarray], size: int
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    複数キー列 → 行ごとのグループ番号 (0..G-1) と、グループごとのキー値。
+    各列を np.unique で整数化し、混合基数で 1 つの int64 に畳んでから再度 unique。
+    """
+    if not keys:
+        return np.zeros(size, dtype=np.int64), {}
+    codes = np.zeros(size, dtype=np.int64)
+    uniques: List[np.ndarray] = []
+    for col in keys.values():
+        uniq, inv = np.unique(col, return_inverse=True)
+        codes = codes * len(uniq) + inv.reshape(-1)
+        uniques.append(uniq)
+    group_ids, inverse = np.unique(codes, return_inverse=True)
+    out: Dict[str, np.ndarray] = {}
+    rem = group_ids
+    for name, uniq in reversed(list(zip(keys, uniques))):
+        out[name] = uniq[rem % len(uniq)]
+        rem = rem // len(uniq)
+    return inverse.reshape(-1), {name: out[name] for name in keys}
+
+
+def _bincount(codes: np.ndarray, weights: Optional[np.ndarray], size: int) -> np.ndarray:
+    return np.bincount(codes, weights=weights, minlength=size)
+
+
+@dataclass
+class GroupedStats:
+    """
+    グループ別の MetricStats を列指向で保持する（各配列の長さ = グループ数）。
+    キー列が無い場合は全行を 1 グループとして扱う。
+    """
+
+    keys: Dict[str, np.ndarray]
+    n: np.ndarray
+    mean_true: np.ndarray
+    m2_true: np.ndarray
+    sse: np.ndarray
+    sae: np.ndarray
+    sape: np.ndarray
+    n_ape: np.ndarray
+
+    @classmethod
+    def empty(cls, key_names: Sequence[str] = ()) -> "GroupedStats":
+        zeros = np.zeros(0)
+        return cls(
+            {k: np.zeros(0, dtype=object) for k in key_names},
+            *(zeros.astype(np.int64) if f in ("n", "n_ape") else zeros for f in _STAT_FIELDS),
+        )
+
+    @classmethod
+    def from_stats(cls, stats: MetricStats) -> "GroupedStats":
+        return cls({}, *(np.asarray([getattr(stats, f)]) for f in _STAT_FIELDS))
+
+    @classmethod
+    def from_arrays(
+        cls, keys: Mapping[str, Any], y_true: Any, y_pred: Any
+    ) -> "GroupedStats":
+        """行ごとのキー列と y_true / y_pred から全グループの統計量を一括で作る"""
+        if not keys:
+            return cls.from_stats(MetricStats.from_arrays(y_true, y_pred))
+        yt = np.asarray(y_true, dtype=np.float64)
+        yp = np.asarray(y_pred, dtype=np.float64)
+        cols = {k: np.asarray(v) for k, v in keys.items()}
+        if yt.shape != yp.shape or any(c.shape != yt.shape for c in cols.values()):
+            raise ValueError("key / y_true / y_pred columns must have the same length")
+
+        finite = np.isfinite(yt) & np.isfinite(yp)
+        if not finite.all():
+            yt, yp = yt[finite], yp[finite]
+            cols = {k: c[finite] for k, c in cols.items()}
+        codes, uniq = _factorize(cols, yt.size)
+        return cls.from_codes(codes, len(next(iter(uniq.values()))), yt, yp, uniq)
+
+    @classmethod
+    def from_codes(
+        cls,
+        codes: np.ndarray,
+        g: int,
+        yt: np.ndarray,
+        yp: np.ndarray,
+        keys: Optional[Dict[str, np.ndarray]] = None,
+    ) -> "GroupedStats":
+        """
+        行ごとのグループ番号 (0..g-1) と有限値だけの y_true / y_pred から集計する
+        （行の無いグループは n = 0 → 指標は NaN）。
+        """
+        err = yp - yt
+        abs_err = np.abs(err)
+        n = _bincount(codes, None, g).astype(np.int64)
+        mean = np.divide(_bincount(codes, yt, g), n, out=np.zeros(g), where=n > 0)
+        centered = yt - mean[codes]
+        nonzero = yt != 0
+        return cls(
+            keys=keys or {},
+            n=n,
+            mean_true=mean,
+            m2_true=_bincount(codes, centered * centered, g),
+            sse=_bincount(codes, err * err, g),
+            sae=_bincount(codes, abs_err, g),
+            sape=_bincount(codes[nonzero], abs_err[nonzero] / np.abs(yt[nonzero]), g),
+            n_ape=_bincount(codes[nonzero], None, g).astype(np.int64),
+        )
+
+    def __len__(self) -> int:
+        return int(self.n.size)
+
+    # ---------------------------------------------------------------- #
+    # 結合
+    # ---------------------------------------------------------------- #
+    def _combine(self, codes: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+        """codes が同じ行（= グループ）同士を Chan の公式でまとめる"""
+        n = _bincount(codes, self.n.astype(np.float64), size)
+        mean = np.divide(
+            _bincount(codes, self.n * self.mean_true, size), n, out=np.zeros(size), where=n > 0
+        )
+        delta = self.mean_true - mean[codes]
+        return {
+            "n": n.astype(np.int64),
+            "mean_true": mean,
+            "m2_true": _bincount(codes, self.m2_true + self.n * delta * delta, size),
+            "sse": _bincount(codes, self.sse, size),
+            "sae": _bincount(codes, self.sae, size),
+            "sape": _bincount(codes, self.sape, size),
+            "n_ape": _bincount(codes, self.n_ape.astype(np.float64), size).astype(np.int64),
+        }
+
+    def merge(self, other: "GroupedStats") -> "GroupedStats":
+        """同じキー列を持つ 2 つの集計を結合（ストリーミングのバッチ結合用）"""
+        if list(self.keys) != list(other.keys):
+            raise ValueError(f"group keys differ: {list(self.keys)} vs {list(other.keys)}")
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        both = GroupedStats(
+            {k: np.concatenate([self.keys[k], other.keys[k]]) for k in self.keys},
+            *(np.concatenate([getattr(self, f), getattr(other, f)]) for f in _STAT_FIELDS),
+        )
+        codes, uniq = _factorize(both.keys, len(both))
+        size = len(next(iter(uniq.values()))) if uniq else 1
+        return GroupedStats(uniq, **both._combine(codes, size))
+
+    def total(self) -> MetricStats:
+        """全グループを合わせた統計量"""
+        if not len(self):
+            return MetricStats()
+        merged = self._combine(np.zeros(len(self), dtype=np.int64), 1)
+        return MetricStats(**{f: merged[f][0].item() for f in _STAT_FIELDS})
+
+    # ---------------------------------------------------------------- #
+    # 取り出し
+    # ---------------------------------------------------------------- #
+    def stats(self, i: int) -> MetricStats:
+        return MetricStats(**{f: getattr(self, f)[i].item() for f in _STAT_FIELDS})
+
+    def locate(self, keys: Mapping[str, Any]) -> np.ndarray:
+        """
+        行ごとのキー列 → 所属グループの位置（この集計に無いキーの行は -1）。
+        MetricStats で結合できない指標をグループ別に並べ直すのに使う。
+        """
+        g = len(self)
+        both = {k: np.concatenate([self.keys[k], np.asarray(keys[k])]) for k in self.keys}
+        size = len(next(iter(both.values())))
+        codes, uniq = _factorize(both, size)
+        pos = np.full(len(next(iter(uniq.values()))), -1, dtype=np.int64)
+        pos[codes[:g]] = np.arange(g)
+        return pos[codes[g:]]
+
+    def metric(self, name: str) -> np.ndarray:
+        """グループ順の指標値の配列（行の無いグループは NaN）"""
+        return metric_values(name, *(getattr(self, f) for f in _METRIC_FIELDS))
+
+    def values(self, name: str) -> List[Optional[float]]:
+        """グループ順の指標値（NaN は None。JSON にそのまま載せられる）"""
+        return [None if math.isnan(v) else v for v in self.metric(name).tolist()]
+
+    def columns(self, names: Iterable[str] = KERNEL_METRICS) -> Dict[str, List[Any]]:
+        """列指向レポート: キー列 + n + 各指標（いずれも長さ = グループ数）"""
+        out: Dict[str, List[Any]] = {k: v.tolist() for k, v in self.keys.items()}
+        out["n"] = self.n.tolist()
+        for name in names:
+            out[name] = self.values(name)
+        return out
@@ -0,0 +1,168 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【core/check/result_cache.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   Check の評価結果を “予測成果物の指紋 × 指標仕様” をキーに Repository へ
+#   キャッシュするユニット。リトライ / 手動再チェック / ダッシュボード更新で
+#   同じ predictions.parquet を評価し直す際、ファイル本体を読まずに
+#   フッタ読み 1 回で結果を返す。
+#
+# 【主な役割】
+#   - artifact_fingerprint() : 成果物の指紋
+#       footer  … Parquet フッタ（列チャンクのサイズ・オフセット・min/max 統計を
+#                 含む FileMetaData）+ ファイルサイズの SHA-256。末尾数 KB だけ読む
+#       content … ファイル全体の SHA-256（Parquet でない成果物も常にこちら）
+#   - cache_key()            : 指紋 + 指標仕様 (name, threshold) + グループキー列
+#                              + 評価オプション（ブートストラップ設定）のハッシュ。plan / run は含めないので、同一内容の
+#                              成果物は run やワーカーをまたいで再利用される
+#   - get_many() / put_many(): Repository (CHECK_CACHE_TABLE) への一括読み書き
+#
+# 【外部設定】
+#   CHECK_CACHE        : 1 = 有効 (default) / 0 = 無効
+#   CHECK_CACHE_TABLE  : 保存先テーブル (default "check_cache")
+#                        RETENTION_TTL_DAYS に含めれば古いエントリを自動削除
+#   CHECK_FINGERPRINT  : footer (default) | content
+#
+# 【連携先・依存関係】
+#   - core/check/check_executor.py … CheckExecutor.run / run_many
+#   - core/repository/factory.py   … get_repo()（遅延 import・プロセスで 1 回）
+#
+# 【ルール遵守】
+#   1) キャッシュ障害で Check を失敗させない（読み書きエラーは警告してミス扱い）
+#   2) 評価ロジックの意味が変わったら _CACHE_VERSION を上げて旧エントリを無効化
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "artifact_fingerprint",
+    "cache_key",
+    "enabled",
+    "get_many",
+    "put_many",
+]
+
+_CACHE_VERSION = 5  # 5: 信頼区間のブロックをグループ内で引く
+_TABLE = os.getenv("CHECK_CACHE_TABLE", "check_cache")
+_FINGERPRINT = os.getenv("CHECK_FINGERPRINT", "footer").lower()
+_PARQUET_MAGIC = b"PAR1"
+_CHUNK = 1 << 20
+
+
+def enabled() -> bool:
+    return os.getenv("CHECK_CACHE", "1").lower() in ("1", "true", "yes")
+
+
+# --------------------------------------------------------------------------- #
+# fingerprint
+# --------------------------------------------------------------------------- #
+def _footer_digest(path: Path, size: int) -> Optional[str]:
+    """Parquet フッタ（FileMetaData）+ サイズの SHA-256。Parquet でなければ None"""
+    if size < 12:
+        return None
+    with path.open("rb") as fh:
+        fh.seek(-8, os.SEEK_END)
+        tail = fh.read(8)
+        if tail[4:] != _PARQUET_MAGIC:
+            return None
+        length = int.from_bytes(tail[:4], "little")
+        if length + 12 > size:
+            return None
+        fh.seek(-(8 + length), os.SEEK_END)
+        footer = fh.read(length)
+    digest = hashlib.sha256(size.to_bytes(8, "little"))
+    digest.update(footer)
+    return f"footer:{digest.hexdigest()}"
+
+
+def _content_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def artifact_fingerprint(path: Path, mode: Optional[str] = None) -> Optional[str]:
+    """成果物の指紋（ファイルが無ければ None）"""
+    try:
+        size = path.stat().st_size
+        if (mode or _FINGERPRINT) == "footer":
+            fingerprint = _footer_digest(path, size)
+            if fingerprint is not None:
+                return fingerprint
+        return _content_digest(path)
+    except OSError:
+        return None
+
+
+def cache_key(
+    fingerprint: str,
+    metrics: Iterable[Any],
+    group_by: Sequence[str] = (),
+    options: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """
+    指紋と指標仕様（MetricSpec or (name, threshold)）からキャッシュキーを作る。
+    options はレポート内容を変える評価オプション（ブートストラップ設定等）。
+    """
+    specs = sorted(
+        (m.name, float(m.threshold)) if hasattr(m, "name") else (str(m[0]), float(m[1]))
+        for m in metrics
+    )
+    payload = json.dumps(
+        {
+            "v": _CACHE_VERSION,
+            "fp": fingerprint,
+            "metrics": specs,
+            "group_by": list(group_by),
+            "options": dict(options or {}),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return "ckc-" + hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --------------------------------------------------------------------------- #
+# store
+# --------------------------------------------------------------------------- #
+@lru_cache(maxsize=1)
+def _repo() -> Any:
+    """キャッシュ用 Repository（プロセスで 1 回だけ生成し、接続 / プールを使い回す）"""
+    from core.repository.factory import get_repo
+
+    return get_repo(_TABLE)
+
+
+def get_many(keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """``{key: report}``（ヒットしたものだけ）"""
+    keys = list(keys)
+    if not keys or not enabled():
+        return {}
+    try:
+        rows = _repo().get_many(keys)
+    except Exception as exc:  # pragma: no cover - ストア障害はミス扱い
+        logger.warning("[check-cache] read failed: %s", exc)
+        return {}
+    return {k: row["report"] for k, row in rows.items() if isinstance(row.get("report"), dict)}
+
+
+def put_many(entries: Mapping[str, Mapping[str, Any]]) -> None:
+    """``{key: {"report": {...}}}`` を一括 UPSERT"""
+    if not entries or not enabled():
+        return
+    try:
+        _repo().create_many({k: dict(v) for k, v in entries.items()})
+    except Exception as exc:  # pragma: no cover - ストア障害は警告のみ
+        logger.warning("[check-cache] write failed: %s", exc)
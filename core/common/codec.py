@@ -0,0 +1,191 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【core/common/codec.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   Repository / TraceRepo / EventBus が共用するシリアライズ codec。
+#   orjson → 標準 json の順で自動選択し、datetime / NumPy スカラー・配列 /
+#   Decimal / set / UUID を追加設定なしで扱える。
+#
+# 【主な役割】
+#   - Codec           : encode(bytes) / decode / dumps(str) の共通 I/F
+#   - get_codec(name) : "orjson" | "json" | "msgpack" | "auto"
+#   - json_codec()    : テキスト JSON が必要なストア（SQLite TEXT / JSONB /
+#                       Redis の JSON 文字列）用。msgpack 指定時も JSON を返す
+#   - dumps / loads   : json_codec() のショートカット
+#
+# 【外部設定】
+#   REPO_CODEC : auto (default) | orjson | json
+#                auto は orjson が import 可能なら orjson、無ければ標準 json
+#
+# 【ルール遵守】
+#   1) orjson / msgpack は optional（無ければ標準 json で動作）
+#   2) 出力はコンパクト JSON・非 ASCII はそのまま（ensure_ascii=False 相当）
+#   3) orjson が扱えない値（64bit 超の int 等）は encode / decode とも標準 json で再試行する
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import PurePath
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    orjson = None  # type: ignore
+
+try:
+    import msgpack  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    msgpack = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    np = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Codec",
+    "get_codec",
+    "json_codec",
+    "dumps",
+    "loads",
+    "to_builtin",
+]
+
+
+def to_builtin(obj: Any) -> Any:
+    """各 codec の default フック: 標準で扱えない型を JSON 互換へ変換"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (UUID, PurePath)):
+        return str(obj)
+    if hasattr(obj, "model_dump"):  # pydantic v2
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class Codec:
+    """標準 json 実装（フォールバック兼、各 codec の基底）"""
+
+    name = "json"
+    binary = False  # True の codec は dumps()（テキスト）を持たない
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=to_builtin)
+
+    def encode(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode()
+
+    def decode(self, data: str | bytes | bytearray | memoryview) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    loads = decode
+
+    def __repr__(self) -> str:
+        return f"<Codec {self.name}>"
+
+
+class OrjsonCodec(Codec):
+    """orjson 実装（NumPy 配列は OPT_SERIALIZE_NUMPY でゼロコピー変換）"""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self._opts = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=to_builtin, option=self._opts)
+        except TypeError:
+            # 64bit 超の int / 入れ子が深すぎる等 → 標準 json で再試行
+            return Codec.dumps(self, obj).encode()
+
+    def dumps(self, obj: Any) -> str:
+        return self.encode(obj).decode()
+
+    def decode(self, data: str | bytes | bytearray | memoryview) -> Any:
+        try:
+            return orjson.loads(data)
+        except (TypeError, ValueError):
+            # 64bit 超の int 等。壊れた JSON は標準 json 側で JSONDecodeError になる
+            return super().decode(data)
+
+    loads = decode
+
+
+class MsgpackCodec(Codec):
+    """msgpack 実装（バイナリ専用: キュー / ファイル等 bytes を運べる経路用）"""
+
+    name = "msgpack"
+    binary = True
+
+    def dumps(self, obj: Any) -> str:
+        raise TypeError("msgpack codec is binary; use encode() or json_codec()")
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=to_builtin, use_bin_type=True, datetime=False)
+
+    def decode(self, data: str | bytes | bytearray | memoryview) -> Any:
+        if isinstance(data, str):
+            raise TypeError("msgpack codec expects bytes")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    loads = decode
+
+
+_AVAILABLE: Dict[str, Any] = {
+    "json": Codec,
+    "orjson": OrjsonCodec if orjson is not None else None,
+    "msgpack": MsgpackCodec if msgpack is not None else None,
+}
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    名前から codec を返す。None は環境変数 REPO_CODEC（既定 auto）。
+    未インストールの codec を指定した場合は警告して auto にフォールバック。
+    """
+    name = (name or os.getenv("REPO_CODEC", "auto")).lower()
+    if name != "auto":
+        cls = _AVAILABLE.get(name)
+        if cls is not None:
+            return cls()
+        logger.warning("[codec] '%s' is not available – falling back to auto", name)
+    return OrjsonCodec() if orjson is not None else Codec()
+
+
+def json_codec() -> Codec:
+    """テキスト JSON を保存するストア用 codec（msgpack 指定時は auto の JSON）"""
+    codec = get_codec()
+    return codec if not codec.binary else get_codec("auto")
+
+
+def dumps(obj: Any) -> str:
+    """json_codec().dumps のショートカット"""
+    return json_codec().dumps(obj)
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> Any:
+    """json_codec().loads のショートカット"""
+    return json_codec().loads(data)
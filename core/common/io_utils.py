@@ -8,6 +8,11 @@
 #
 # 【主な役割】
 #   - artifacts/ 以下の Parquet ファイル入出力
+#   - load_predictions(columns=, start=, end=, symbols=, horizons=) :
+#     列射影と行フィルタを Parquet リーダへ押し下げ（row group 統計で枝刈り）
+#   - iter_prediction_batches() : 列射影つきのレコードバッチ逐次読み出し
+#   - prediction_columns()      : Parquet スキーマだけを読んで列名を返す
+#     （ファイル全体をメモリへ載せない Check 用）
 #   - pdca_data/ 以下の meta.json 読み書き
 #
 # 【連携先・依存関係】
@@ -16,18 +21,22 @@
 #       ・core/check/check_executor.py … load_predictions(), load_meta()
 #   - 外部設定 :
 #       ・core/constants.py            … ルートパス・ファイル名利用
+#       ・PREDICTIONS_MMAP             … 1 = Parquet を memory map で読む (default 0)
 #
 # 【ルール遵守】
 #   1) pandas / polars のどちらかが import 可能な方を自動選択
-#   2) 例外は “上位で握らずここで握る” (IOError → RuntimeError 変換)
+#   2) 例外は “上位で握らずここで握る” (IOError / ArrowException → RuntimeError 変換。
+#      スキーマに合わない行フィルタは ValueError)
 #   3) CLI デバッグは logging.debug() を使用し print 禁止
 # ---------------------------------------------------------
 from __future__ import annotations
 
 import json
 import logging
+import os
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from core.constants import (
     ARTIFACT_ROOT,
@@ -65,6 +74,17 @@ except ModuleNotFoundError:  # pragma: no cover
         _DF_LIB = "dummy"
         _HAS_PARQUET = False
 
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    import pyarrow.dataset as ds  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    pa = pc = ds = pq = None  # type: ignore
+
+# load_predictions() の既定: Parquet を mmap で読む（ローカルディスク上の大きな成果物向け）
+_MEMORY_MAP = os.getenv("PREDICTIONS_MMAP", "0").lower() in ("1", "true", "yes")
+
 logger = logging.getLogger(__name__)
 
 
@@ -128,23 +148,223 @@ def save_predictions(df: Any, plan_id: str, run_id: str) -> str:
     logger.debug("Predictions saved: %s", path)
     return str(path.resolve())
 
-def load_predictions(plan_id: str, run_id: str) -> Any:
+def _as_datetime(value: Any) -> datetime:
+    """ISO 文字列 / date / datetime → datetime（naive は UTC とみなす）"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _row_conditions(
+    start: Any, end: Any, symbols: Optional[Iterable[str]], horizons: Optional[Iterable[int]]
+) -> List[Tuple[str, str, Any]]:
+    """行フィルタを (列, 演算子, 値) のリストへ（ts は start 以上 end 未満）"""
+    conds: List[Tuple[str, str, Any]] = []
+    if start is not None:
+        conds.append(("ts", ">=", _as_datetime(start)))
+    if end is not None:
+        conds.append(("ts", "<", _as_datetime(end)))
+    if symbols is not None:
+        conds.append(("symbol", "in", [str(v) for v in symbols]))
+    if horizons is not None:
+        conds.append(("horizon", "in", [int(v) for v in horizons]))
+    return conds
+
+
+def _arrow_expression(schema: Any, conds: List[Tuple[str, str, Any]]) -> Any:
+    """
+    pyarrow.dataset 式（Parquet 読み込み時に row group 統計で枝刈りされる）。
+    列の有無と型をスキーマで検証し、合わない条件は ValueError にする
+    （ts は timestamp / date 列のみ。tz 無し列へは UTC に揃えて比較）。
+    """
+    expr = None
+    for name, op, value in conds:
+        if name not in schema.names:
+            raise ValueError(f"filter column '{name}' not in predictions")
+        type_ = schema.field(name).type
+        if name == "ts":
+            if pa.types.is_date(type_):
+                value = value.astimezone(timezone.utc).date()
+            elif not pa.types.is_timestamp(type_):
+                raise ValueError(f"filter column 'ts' must be timestamp or date, got {type_}")
+        field_ = pc.field(name)
+        try:
+            if op == "in":
+                cond = field_.isin(pa.array(value, type=type_))
+            else:
+                bound = pa.scalar(value, type=type_)
+                cond = field_ >= bound if op == ">=" else field_ < bound
+        except pa.ArrowException as exc:
+            raise ValueError(f"filter on '{name}' does not match column type {type_}: {exc}") from exc
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def _polars_conditions(schema: Any, conds: List[Tuple[str, str, Any]]) -> List[Any]:
+    """polars 式のリスト（_arrow_expression と同じ検証。ts は列の tz 有無に揃える）"""
+    exprs = []
+    for name, op, value in conds:
+        if name not in schema:
+            raise ValueError(f"filter column '{name}' not in predictions")
+        dtype = schema[name]
+        if name == "ts":
+            if dtype == pl.Date:
+                value = value.astimezone(timezone.utc).date()
+            elif isinstance(dtype, pl.Datetime):
+                if dtype.time_zone is None:
+                    value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            else:
+                raise ValueError(f"filter column 'ts' must be datetime or date, got {dtype}")
+        col = pl.col(name)
+        if op == "in":
+            exprs.append(col.is_in(value))
+        elif op == ">=":
+            exprs.append(col >= value)
+        else:
+            exprs.append(col < value)
+    return exprs
+
+
+def _filter_frame(df: Any, conds: List[Tuple[str, str, Any]]) -> Any:
+    """Parquet リーダに渡せない環境（pickle 等）向けのメモリ上フィルタ"""
+    for name, op, value in conds:
+        if name not in df.columns:
+            raise ValueError(f"filter column '{name}' not in predictions")
+        col = df[name]
+        if name == "ts":
+            col = pd.to_datetime(col, utc=True)
+        if op == "in":
+            df = df[col.isin(value)]
+        elif op == ">=":
+            df = df[col >= value]
+        else:
+            df = df[col < value]
+    return df
+
+
+def load_predictions(
+    plan_id: str,
+    run_id: str,
+    columns: Optional[Sequence[str]] = None,
+    *,
+    start: Any = None,
+    end: Any = None,
+    symbols: Optional[Iterable[str]] = None,
+    horizons: Optional[Iterable[int]] = None,
+    memory_map: Optional[bool] = None,
+) -> Any:
     """
     Parquet をロードして DataFrame を返却。
+
+    columns      : 読み込む列（列射影。None = 全列）
+    start / end  : ts が start 以上 end 未満の行だけ（naive datetime は UTC）
+    symbols / horizons : その値を持つ行だけ
+    memory_map   : ファイルを mmap して読む（None = 環境変数 PREDICTIONS_MMAP）
+
+    行フィルタは Parquet リーダへ渡すので、条件を満たし得ない row group は
+    統計 (min/max) で読み飛ばされ、不要な列はデコードされない。
     """
     path = artifact_path(plan_id, run_id)
     if not path.exists():
         raise RuntimeError(f"Prediction file not found: {path}")
 
+    cols = list(columns) if columns else None
+    conds = _row_conditions(start, end, symbols, horizons)
+    if memory_map is None:
+        memory_map = _MEMORY_MAP
+
+    if pq is not None and _HAS_PARQUET and _DF_LIB != "dummy":
+        try:
+            schema = pq.read_schema(path, memory_map=memory_map)
+        except (OSError, pa.ArrowException) as exc:
+            raise RuntimeError(f"Failed to read predictions: {path}: {exc}") from exc
+        filters = _arrow_expression(schema, conds) if conds else None  # 不正な条件は ValueError
+        try:
+            table = pq.read_table(path, columns=cols, filters=filters, memory_map=memory_map)
+        except (OSError, pa.ArrowException) as exc:
+            raise RuntimeError(f"Failed to read predictions: {path}: {exc}") from exc
+        return pl.from_arrow(table) if _DF_LIB == "polars" else table.to_pandas()
+
     if _DF_LIB == "polars":
-        return pl.read_parquet(path)
+        try:
+            lf = pl.scan_parquet(path)
+            schema = lf.collect_schema() if hasattr(lf, "collect_schema") else lf.schema
+        except (OSError, pl.exceptions.PolarsError) as exc:
+            raise RuntimeError(f"Failed to read predictions: {path}: {exc}") from exc
+        for cond in _polars_conditions(schema, conds):
+            lf = lf.filter(cond)
+        try:
+            return (lf.select(cols) if cols else lf).collect()
+        except (OSError, pl.exceptions.PolarsError) as exc:
+            raise RuntimeError(f"Failed to read predictions: {path}: {exc}") from exc
     elif _DF_LIB == "pandas":
-        if _HAS_PARQUET:
-            return pd.read_parquet(path)  # type: ignore
-        return pd.read_pickle(path)
+        df = pd.read_parquet(path) if _HAS_PARQUET else pd.read_pickle(path)  # type: ignore
+        df = _filter_frame(df, conds) if conds else df
+        return df[cols] if cols else df
     else:
         return path.read_text(encoding="utf-8")
 
+
+def iter_prediction_batches(
+    plan_id: str,
+    run_id: str,
+    columns: Optional[Sequence[str]] = None,
+    batch_rows: int = 65_536,
+    *,
+    start: Any = None,
+    end: Any = None,
+    symbols: Optional[Iterable[str]] = None,
+    horizons: Optional[Iterable[int]] = None,
+) -> Iterator[Any]:
+    """
+    予測 Parquet を row group → レコードバッチ単位で逐次返す。
+
+    columns を指定するとその列だけをデコードする（列射影）。
+    start / end / symbols / horizons は load_predictions() と同じ行フィルタ。
+    保持するのは常に 1 バッチ分なので、ファイルサイズに依らずメモリは一定。
+    pyarrow が無い環境では load_predictions() の結果を 1 バッチとして返す。
+    """
+    path = artifact_path(plan_id, run_id)
+    if not path.exists():
+        raise RuntimeError(f"Prediction file not found: {path}")
+
+    conds = _row_conditions(start, end, symbols, horizons)
+    if pq is None:
+        yield load_predictions(
+            plan_id, run_id, columns, start=start, end=end, symbols=symbols, horizons=horizons
+        )
+        return
+    cols = list(columns) if columns else None
+    try:
+        if not conds:
+            pf = pq.ParquetFile(path)
+            yield from pf.iter_batches(batch_size=batch_rows, columns=cols)
+            return
+        dataset = ds.dataset(path, format="parquet")
+    except (OSError, pa.ArrowException) as exc:
+        raise RuntimeError(f"Failed to read predictions: {path}: {exc}") from exc
+    filters = _arrow_expression(dataset.schema, conds)  # 不正な条件は ValueError
+    try:
+        yield from dataset.to_batches(columns=cols, filter=filters, batch_size=batch_rows)
+    except (OSError, pa.ArrowException) as exc:
+        raise RuntimeError(f"Failed to read predictions: {path}: {exc}") from exc
+
+
+def prediction_columns(plan_id: str, run_id: str) -> Optional[List[str]]:
+    """
+    予測 Parquet の列名をフッタ（スキーマ）だけ読んで返す。
+    pyarrow が無い / 読めない場合は None（呼び出し側で DataFrame から判定する）。
+    """
+    path = artifact_path(plan_id, run_id)
+    if pq is None or not path.exists():
+        return None
+    try:
+        return list(pq.read_schema(path).names)
+    except (OSError, pa.ArrowException):
+        return None
+
 # --------------------------------------------------
 # Meta JSON 読み書き
 # --------------------------------------------------
@@ -175,6 +395,8 @@ __all__ = [
     "meta_path",
     "save_predictions",
     "load_predictions",
+    "iter_prediction_batches",
+    "prediction_columns",
     "save_meta",
     "load_meta",
 ]
@@ -51,11 +51,17 @@ META_FILENAME: Final[str] = "meta.json"
 
 # ----------------------------------------------------------------------
 # 3) 評価指標 (Check フェーズで公式サポートするもの)
+#    core/metrics/engine.py の組み込み指標。独自指標は register_metric() で追加
 # ----------------------------------------------------------------------
 SUPPORTED_METRICS: Final[tuple[str, ...]] = (
     "mape",
     "rmse",
+    "mae",
     "r2",
+    "smape",
+    "mase",
+    "directional_accuracy",
+    "pinball",
 )
 
 # ----------------------------------------------------------------------
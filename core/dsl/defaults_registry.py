@@ -0,0 +1,267 @@
+# =========================================================
+# ASSIST_KEY: 【core/dsl/defaults_registry.py】
+# =========================================================
+#
+# 【概要】
+#   DefaultsRegistry ― DSL defaults（defaults/**/*.json）と market 名マップ
+#   （defaults/markets/*_defaults.json）をプロセスで 1 回だけ読み、
+#   凍結スナップショットとして全 PlanLoader で共有するレジストリ。
+#   ファイルの mtime / サイズをバックグラウンドでポーリングし、変化があれば
+#   読み直したスナップショットを属性 1 回の代入で差し替える（再起動不要）。
+#
+# 【主な役割】
+#   - get_registry()        : プロセス共有のレジストリ（ディレクトリごと）
+#   - DefaultsRegistry
+#       snapshot()          : 現在のスナップショット（ディスクに触れない）
+#       poll()              : stat だけで変化を検出し、変わっていれば再読込
+#       reload()            : 強制再読込
+#   - DefaultsSnapshot      : defaults / markets（FrozenDict）+ 内容の版数 (SHA-256)
+#
+# 【外部設定】
+#   DSL_DEFAULTS_POLL_SEC : ポーリング間隔秒 (default 2 / 0 = 監視しない)
+#
+# 【連携先・依存関係】
+#   - core/dsl/loader.py : PlanLoader が load_dict() ごとに snapshot() を参照し、
+#                          版数をコンパイル済み Plan キャッシュのキーに含める
+#   - core/dsl/frozen.py : FrozenDict / freeze
+#
+# 【ルール遵守】
+#   1) リクエスト経路（snapshot()）では I/O しない
+#   2) 壊れた JSON は初回読込では警告してスキップ（従来の PlanLoader と同じ挙動）。
+#      再読込では「新たに」読めなくなったファイルがある時だけ旧スナップショットを維持し、
+#      ファイルが変わるまで同じ stamp を読み直さない。起動時から壊れていたファイルは
+#      従来どおりスキップして差し替える（ホットリロードを止めない）
+#   3) fork 後の子プロセスでは監視スレッドを張り直す
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .frozen import FrozenDict, freeze
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "DefaultsRegistry",
+    "DefaultsSnapshot",
+    "deep_merge",
+    "get_registry",
+    "load_defaults",
+    "load_market_mapping",
+]
+
+_POLL_SEC = float(os.getenv("DSL_DEFAULTS_POLL_SEC", "2"))
+
+# ファイルごとの (相対パス, mtime_ns, size)
+Stamp = Tuple[Tuple[str, int, int], ...]
+
+
+# ==================================================================
+# 読み込み
+# ==================================================================
+def deep_merge(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
+    out = dst.copy()
+    for k, v in src.items():
+        if k in out and isinstance(out[k], dict) and isinstance(v, dict):
+            out[k] = deep_merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def load_defaults(defaults_dir: Path, failed: Optional[List[Path]] = None) -> Dict[str, Any]:
+    """defaults 配下の JSON を deep merge（読めないファイルはスキップし failed に追加）"""
+    merged: Dict[str, Any] = {}
+    for fp in sorted(defaults_dir.rglob("*.json")):
+        try:
+            merged = deep_merge(
+                merged,
+                json.loads(fp.read_text(encoding="utf-8")),
+            )
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError) as exc:
+            logger.warning("defaults JSON スキップ: %s – %s", fp, exc)
+            if failed is not None:
+                failed.append(fp)
+    return merged
+
+
+def load_market_mapping(
+    defaults_dir: Path, failed: Optional[List[Path]] = None
+) -> dict[str, str]:
+    """markets/*_defaults.json をマージ（読めないファイルはスキップし failed に追加）"""
+    mapping: dict[str, str] = {}
+    for fp in sorted((defaults_dir / "markets").glob("*_defaults.json")):
+        try:
+            mapping.update(json.loads(fp.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError) as exc:
+            logger.warning("market defaults スキップ: %s – %s", fp, exc)
+            if failed is not None:
+                failed.append(fp)
+    return mapping
+
+
+def _stamp(defaults_dir: Path) -> Stamp:
+    """defaults 配下の全 JSON の (相対パス, mtime_ns, size)。stat のみで中身は読まない"""
+    entries = []
+    stack = [defaults_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=True):
+                        stack.append(Path(entry.path))
+                    elif entry.name.endswith(".json"):
+                        st = entry.stat()
+                        rel = os.path.relpath(entry.path, defaults_dir)
+                        entries.append((rel, st.st_mtime_ns, st.st_size))
+        except OSError:
+            continue
+    return tuple(sorted(entries))
+
+
+# ==================================================================
+# スナップショット
+# ==================================================================
+@dataclass(frozen=True)
+class DefaultsSnapshot:
+    defaults: FrozenDict
+    markets: FrozenDict
+    version: str  # defaults + markets の内容ハッシュ（mtime だけの変化では変わらない）
+    stamp: Stamp = field(repr=False, default=())
+    loaded_at: float = 0.0
+    failed: Tuple[str, ...] = ()  # 読めずにスキップしたファイル（defaults_dir 相対）
+
+
+def _build(defaults_dir: Path, stamp: Stamp) -> DefaultsSnapshot:
+    failed: List[Path] = []
+    defaults = load_defaults(defaults_dir, failed)
+    markets = load_market_mapping(defaults_dir, failed)
+    payload = json.dumps(
+        {"defaults": defaults, "markets": markets},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return DefaultsSnapshot(
+        defaults=freeze(defaults),
+        markets=freeze(markets),
+        version=hashlib.sha256(payload.encode("utf-8")).hexdigest(),
+        stamp=stamp,
+        loaded_at=time.time(),
+        failed=tuple(sorted(os.path.relpath(fp, defaults_dir) for fp in failed)),
+    )
+
+
+# ==================================================================
+# レジストリ
+# ==================================================================
+class DefaultsRegistry:
+    """
+    defaults / market マップの共有レジストリ。
+    snapshot() は現在の不変スナップショットを返すだけで、更新検知は
+    監視スレッド（interval 秒ごとの poll()）が行う。
+    """
+
+    def __init__(self, defaults_dir: Path, interval: Optional[float] = None) -> None:
+        self.defaults_dir = Path(defaults_dir)
+        self.interval = _POLL_SEC if interval is None else interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        stamp = _stamp(self.defaults_dir)
+        self._snapshot = _build(self.defaults_dir, stamp)
+        self._rejected: Optional[Stamp] = None  # 旧スナップショットを維持した時の stamp
+        self.reloads = 0
+        self._start_watcher()
+
+    # ---- read path ---------------------------------------------------- #
+    def snapshot(self) -> DefaultsSnapshot:
+        if self._pid != os.getpid():  # fork 後はスレッドが引き継がれない
+            self._pid = os.getpid()
+            self._thread = None
+            self._start_watcher()
+        return self._snapshot
+
+    # ---- reload ------------------------------------------------------- #
+    def poll(self) -> bool:
+        """mtime / サイズが変わっていれば再読込（変わった場合 True）"""
+        stamp = _stamp(self.defaults_dir)
+        if stamp == self._snapshot.stamp or stamp == self._rejected:
+            return False
+        return self._swap(stamp)
+
+    def reload(self) -> bool:
+        """強制再読込（内容が変わった場合 True）"""
+        return self._swap(_stamp(self.defaults_dir))
+
+    def _swap(self, stamp: Stamp) -> bool:
+        with self._lock:
+            fresh = _build(self.defaults_dir, stamp)
+            newly_failed = set(fresh.failed) - set(self._snapshot.failed)
+            if newly_failed:
+                # 書き込み途中などで新たに読めなくなった: 旧スナップショットを維持。
+                # 同じ stamp は読み直さず、ファイルがもう一度変わった時に再試行
+                self._rejected = stamp
+                logger.warning(
+                    "[dsl-defaults] keep previous snapshot; unreadable: %s",
+                    ", ".join(sorted(newly_failed)),
+                )
+                return False
+            self._rejected = None
+            changed = fresh.version != self._snapshot.version
+            self._snapshot = fresh  # 参照の差し替えのみ（読み手はロック不要）
+            if changed:
+                self.reloads += 1
+                logger.info(
+                    "[dsl-defaults] reloaded %s version=%s", self.defaults_dir, fresh.version[:12]
+                )
+        return changed
+
+    # ---- watcher ------------------------------------------------------ #
+    def _start_watcher(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="dsl-defaults-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as exc:  # pragma: no cover - 監視は止めない
+                logger.warning("[dsl-defaults] poll failed: %s", exc)
+
+    def close(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.interval + 1)
+
+
+_REGISTRIES: Dict[Path, DefaultsRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(defaults_dir: Path) -> DefaultsRegistry:
+    """defaults_dir ごとのプロセス共有レジストリ（初回だけディスクを読む）"""
+    key = Path(defaults_dir).resolve()
+    registry = _REGISTRIES.get(key)
+    if registry is None:
+        with _REGISTRIES_LOCK:
+            registry = _REGISTRIES.get(key)
+            if registry is None:
+                registry = _REGISTRIES[key] = DefaultsRegistry(key)
+    return registry
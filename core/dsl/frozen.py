@@ -0,0 +1,74 @@
+# =========================================================
+# ASSIST_KEY: 【core/dsl/frozen.py】
+# =========================================================
+#
+# 凍結コンテナ ― PlanLoader のコンパイル済み Plan / DefaultsRegistry の
+# スナップショットをプロセス内で共有するための書き換え不可 dict / list。
+# dict / list のサブクラスなので JSON 化・比較・pydantic への受け渡しはそのまま。
+# 書き換えたい場合は thaw()（または copy.deepcopy）で通常の dict / list に戻す。
+# ---------------------------------------------------------
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+__all__ = ["FrozenDict", "FrozenList", "freeze", "thaw"]
+
+
+def _readonly(self: Any, *args: Any, **kwargs: Any) -> None:
+    raise TypeError(f"{type(self).__name__} is immutable; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """書き換え不可の dict（copy / deepcopy / pickle は通常の dict を返す）"""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (dict, (thaw(self),))
+
+
+class FrozenList(list):
+    """書き換え不可の list（copy / deepcopy / pickle は通常の list を返す）"""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    append = extend = insert = pop = remove = reverse = sort = clear = _readonly
+    __iadd__ = __imul__ = _readonly
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (list, (thaw(self),))
+
+
+def freeze(obj: Any) -> Any:
+    """dict / list を再帰的に FrozenDict / FrozenList へ"""
+    if isinstance(obj, (FrozenDict, FrozenList)):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """凍結 Plan の書き換え可能なディープコピー"""
+    if isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(v) for v in obj]
+    return obj
@@ -7,17 +7,38 @@
 #   2. market 名 → ティッカー置換
 #   3. JSON-Schema + pydantic 検証（validate=True 時）
 # した dict を返す Facade。
+#
+# コンパイル済み Plan キャッシュ:
+#   同じ DSL の再アップロード / Do 投入のたびに 1〜3 をやり直さないよう、
+#   「入力 Plan の正規化 JSON + defaults 版数 + schemas 版数」の SHA-256 を
+#   キーに結果を LRU で保持する。返す Plan は FrozenDict / FrozenList で
+#   凍結してあり（キャッシュ共有のため）、書き換えたい場合は thaw() で複製する。
+#
+#   PLAN_CACHE_SIZE : 保持する Plan 数 (default 256 / 0 = 無効)
+#
+# defaults / market マップは DefaultsRegistry（プロセス共有・mtime 監視で
+# ホットリロード）のスナップショットを load_dict() ごとに参照する。
+# 差し替わると版数が変わるので、古いコンパイル結果はキャッシュに当たらない。
+#
+# Schema 検証は DSLValidator.validate_sections()（全セクションを束ねた結合
+# バリデータ 1 回）。生成コードは起動時に precompile() でディスクから読む。
 # ---------------------------------------------------------
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import yaml
 
+from .defaults_registry import DefaultsRegistry, DefaultsSnapshot, get_registry
+from .defaults_registry import deep_merge as _deep_merge
+from .frozen import FrozenDict, FrozenList, freeze, thaw  # noqa: F401 - 再エクスポート
 from .store.fs_store import FSStore
 from .validator import DSLValidator
 
@@ -38,6 +59,8 @@ SCHEMAS_DIR = DSL_ROOT / "schemas"
 _STORE = FSStore(DSL_ROOT)
 _VALIDATOR = DSLValidator(SCHEMAS_DIR)
 
+_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+
 
 # ==================================================================
 # public  API
@@ -49,21 +72,81 @@ class PlanLoader:
       * load_dict(d) : すでに dict 化された DSL
     """
 
-    def __init__(self, validate: bool = True) -> None:
+    def __init__(
+        self, validate: bool = True, registry: Optional[DefaultsRegistry] = None
+    ) -> None:
         if validate and jsonschema is None:
             logger.warning("jsonschema が無いため Schema 検証をスキップします")
         self._validate = validate and jsonschema is not None
 
-        # キャッシュ
-        self._defaults: Dict[str, Any] = _load_defaults()
-        self._market_map: dict[str, str] = _load_market_mapping()
+        # defaults / market マップはプロセス共有のレジストリから
+        self._registry = registry or get_registry(DEFAULTS_DIR)
+        self._schemas: List[Path] = sorted(SCHEMAS_DIR.glob("*_schema.json"))
+
+        # コンパイル済み Plan の LRU（defaults / schemas の版数はキーに含める）
+        self._version = _digest(
+            [f"{fp.name}:{hashlib.sha256(fp.read_bytes()).hexdigest()}" for fp in self._schemas]
+            + [str(self._validate)]
+        )
+        self._cache: "OrderedDict[str, FrozenDict]" = OrderedDict()
+        self._cache_size = _CACHE_SIZE
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+        # JSON Schema バリデータを起動時に用意（生成コードはディスクキャッシュ）
+        if self._validate:
+            _VALIDATOR.precompile()
 
     # -------------------------------------------------------------
     # ★ dict を直接受け取る
     # -------------------------------------------------------------
     def load_dict(self, plan: Dict[str, Any]) -> Dict[str, Any]:
-        merged = _deep_merge(self._defaults, plan)
-        merged = _resolve_market_names(merged, self._market_map)
+        """
+        コンパイル済み（defaults 反映・market 置換・検証済み）の凍結 Plan を返す。
+        同じ内容の Plan は LRU から返す（検証エラーはキャッシュしない）。
+        """
+        snapshot = self._registry.snapshot()
+        key = self._key(plan, snapshot.version) if self._cache_size > 0 else None
+        if key is not None:
+            with self._lock:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return hit
+                self.misses += 1
+
+        compiled = freeze(self._compile(plan, snapshot))
+        if key is not None:
+            with self._lock:
+                self._cache[key] = compiled
+                self._cache.move_to_end(key)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return compiled
+
+    def cache_key(self, plan: Dict[str, Any]) -> Optional[str]:
+        """
+        入力 Plan の正規化 JSON + defaults / schemas 版数の SHA-256。
+        正規化できない Plan（型の混在したキー等）は None = キャッシュしない。
+        """
+        return self._key(plan, self._registry.snapshot().version)
+
+    def _key(self, plan: Dict[str, Any], defaults_version: str) -> Optional[str]:
+        try:
+            return _digest([self._version, defaults_version, _canonical(plan)])
+        except (TypeError, ValueError):
+            return None
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def _compile(self, plan: Dict[str, Any], snapshot: DefaultsSnapshot) -> Dict[str, Any]:
+        # Schema 検証は default 値を書き込むので凍結スナップショットを解凍して使う
+        merged = _deep_merge(thaw(snapshot.defaults), plan)
+        merged = _resolve_market_names(merged, snapshot.markets)
 
         if self._validate:
             _validate_by_schemas(merged)
@@ -116,55 +199,36 @@ def _load_yaml_or_json(path: str | Path) -> Dict[str, Any]:
     )
 
 
-def _load_defaults() -> Dict[str, Any]:
-    merged: Dict[str, Any] = {}
-    for fp in DEFAULTS_DIR.rglob("*.json"):
-        try:
-            merged = _deep_merge(
-                merged,
-                json.loads(fp.read_text(encoding="utf-8")),
-            )
-        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
-            logger.warning("defaults JSON スキップ: %s – %s", fp, exc)
-    return merged
-
-
-def _load_market_mapping() -> dict[str, str]:
-    mapping: dict[str, str] = {}
-    for fp in (DEFAULTS_DIR / "markets").glob("*_defaults.json"):
-        try:
-            mapping.update(json.loads(fp.read_text(encoding="utf-8")))
-        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
-            logger.warning("market defaults スキップ: %s – %s", fp, exc)
-    return mapping
-
-
-def _deep_merge(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
-    out = dst.copy()
-    for k, v in src.items():
-        if k in out and isinstance(out[k], dict) and isinstance(v, dict):
-            out[k] = _deep_merge(out[k], v)
-        else:
-            out[k] = v
-    return out
-
-
 def _resolve_market_names(plan: Dict[str, Any], mp: dict[str, str]) -> Dict[str, Any]:
     uni = plan.get("data", {}).get("universe")
     if isinstance(uni, list):
-        plan["data"]["universe"] = [mp.get(x, x) for x in uni]
+        # data が入力 Plan と共有されている場合があるので置き換えで書く
+        plan["data"] = {**plan["data"], "universe": [mp.get(x, x) for x in uni]}
     return plan
 
 
+def _canonical(obj: Any) -> str:
+    """キー順・空白を正規化した JSON（日付等の非 JSON 値は型名付きの str）"""
+    return json.dumps(
+        obj,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=lambda o: f"{type(o).__name__}:{o}",
+    )
+
+
+def _digest(parts: List[str]) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
 def _validate_by_schemas(plan: Dict[str, Any]) -> None:
-    for schema_fp in SCHEMAS_DIR.glob("*_schema.json"):
-        section = schema_fp.stem.replace("_schema", "")
-        target = plan.get(section) or plan.get("materials", {}).get(section)
-        if target is not None:
-            if schema_fp.name == "models_schema.json":
-                _VALIDATOR.validate_json({"models": target}, schema_fp.name)
-            else:
-                _VALIDATOR.validate_json(target, schema_fp.name)
+    # 全セクション（直下 / materials 配下）を結合バリデータ 1 回で検証
+    _VALIDATOR.validate_sections(plan)
 
 # -----------------------------------------------------------------
 # CLI quick-test:
@@ -5,15 +5,33 @@ from __future__ import annotations
 ・JSON Schema で構文／必須キーを一次検査
 ・pydantic で型／値域を二次検査
 ・baseline セクションの厳格バリデーションを追加 (Sprint‑2)
+・JSON Schema は fastjsonschema の生成コード（+ バイトコード）としてディスクに
+  キャッシュ（<DSL_VALIDATOR_CACHE>/<stem>_<hash>.py）。スキーマ群の SHA-256 が
+  一致する限り、プロセス起動時も再コンパイルせずバイトコードを読むだけ
+・validate_sections() : 全セクション用スキーマを束ねた結合バリデータで Plan を 1 回で検証
+
+ビルド / 起動時の事前生成:
+    python -m core.dsl.validator            # DSL_ROOT/schemas を全てコンパイル
+
+環境変数:
+    DSL_VALIDATOR_CACHE : 生成コードの保存先 (default <schemas_dir>/../.validators)
 
 変更履歴
 ──────────
 2025‑05‑25  v1.2  Pydantic V2 スタイルへ移行
+2025‑10‑19  v1.3  生成コードのディスクキャッシュ・結合バリデータ
 """
 
+import hashlib
 import json
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 try:
     import fastjsonschema  # type: ignore
@@ -56,6 +74,15 @@ except ImportError:  # pragma: no cover - Pydantic v1 fallback
 
         return decorator
 
+logger = logging.getLogger(__name__)
+
+# 生成コードの書式を変えたら上げる（旧キャッシュを無効化）
+_CODEGEN_VERSION = 1
+# validate_sections() が使う結合スキーマの名前（ファイルではなく生成物）
+COMBINED_SCHEMA = "plan_combined"
+# セクション名 → スキーマ内で対象を指すパス（既定はスキーマ全体）
+_SECTION_POINTERS = {"models": "#/properties/models"}
+
 # ---------------------------------------------------------------------------
 # ヘルパー ― $ref の相対パスを絶対 URI へ解決
 # ---------------------------------------------------------------------------
@@ -72,6 +99,23 @@ def _resolve_refs(obj: Any, base: Path) -> None:
         for item in obj:
             _resolve_refs(item, base)
 
+
+def _combined_schema(schemas_dir: Path) -> Dict[str, Any]:
+    """
+    plan_v1 を含む各セクション用スキーマ（*_schema.json）を束ねたスキーマ。
+    セクションは Plan 直下と materials 配下のどちらに置かれても検証する。
+    """
+    sections: Dict[str, Any] = {}
+    for fp in sorted(schemas_dir.glob("*_schema.json")):
+        section = fp.stem.replace("_schema", "")
+        ref = fp.resolve().as_uri() + _SECTION_POINTERS.get(section, "")
+        sections[section] = {"$ref": ref}
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "properties": {**sections, "materials": {"properties": sections}},
+    }
+
 # ---------------------------------------------------------------------------
 # pydantic models — second‑stage validation
 # ---------------------------------------------------------------------------
@@ -101,10 +145,10 @@ class BaselineModel(BaseModel):
             raise ValueError(f"strategy must be one of {sorted(allowed)}")
         return v
 
-    @root_validator(pre=False)
-    def apply_defaults(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+    @model_validator(mode="after")
+    def apply_defaults(self) -> "BaselineModel":
         """Model-level post processing after validation."""
-        return values
+        return self
 
 # ---------------------------------------------------------------------------
 # DSLValidator 本体
@@ -113,27 +157,123 @@ class BaselineModel(BaseModel):
 class DSLValidator:
     """JSON Schema → pydantic の 2 段バリデータ"""
 
-    def __init__(self, schemas_dir: Path) -> None:
+    def __init__(self, schemas_dir: Path, cache_dir: Optional[Path] = None) -> None:
         self.schemas_dir = schemas_dir
-        self._schema_cache: Dict[Path, Any] = {}
+        self.cache_dir = cache_dir or Path(
+            os.getenv("DSL_VALIDATOR_CACHE", schemas_dir.parent / ".validators")
+        )
+        self._schema_cache: Dict[str, Callable[[Any], Any]] = {}
+        self._digest: Optional[str] = None
+        self._lock = threading.Lock()
 
     # ----- fastjsonschema --------------------------------------------------
-    def _compile_schema(self, schema_path: Path):
-        if schema_path not in self._schema_cache:
-            if fastjsonschema is None:  # pragma: no cover — offline CI
-                self._schema_cache[schema_path] = lambda _: None  # type: ignore[arg-type]
-            else:
-                schema = json.loads(schema_path.read_text(encoding="utf-8"))
-                _resolve_refs(schema, schema_path.parent)
-                self._schema_cache[schema_path] = fastjsonschema.compile(schema)
-        return self._schema_cache[schema_path]
+    def schemas_digest(self) -> str:
+        """スキーマ群（$ref 先を含む全 JSON）+ fastjsonschema 版数の SHA-256"""
+        if self._digest is None:
+            h = hashlib.sha256(f"{_CODEGEN_VERSION}:{fastjsonschema.VERSION}".encode())
+            for fp in sorted(self.schemas_dir.glob("*.json")):
+                h.update(fp.name.encode())
+                h.update(hashlib.sha256(fp.read_bytes()).digest())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def _definition(self, schema_file: str) -> Dict[str, Any]:
+        if schema_file == COMBINED_SCHEMA:
+            return _combined_schema(self.schemas_dir)
+        schema_path = self.schemas_dir / schema_file
+        schema = json.loads(schema_path.read_text(encoding="utf-8"))
+        _resolve_refs(schema, schema_path.parent)
+        return schema
+
+    def _load_generated(self, schema_file: str) -> Callable[[Any], Any]:
+        """
+        生成コードをディスクから読む（無い / ハッシュ不一致なら生成して保存）。
+          <stem>_<hash>.py            : fastjsonschema の生成ソース（1 行目にハッシュ）
+          <stem>_<hash>.<tag>.code    : そのバイトコード（PYTHONDONTWRITEBYTECODE でも効く）
+        保存できない環境ではメモリ上でコンパイルする。
+        """
+        digest = self.schemas_digest()
+        stem = Path(schema_file).stem
+        path = self.cache_dir / f"{stem}_{digest[:16]}.py"
+        code_path = path.with_suffix(f".{sys.implementation.cache_tag}.code")
+        header = f"# generated by core/dsl/validator.py from {schema_file} sha256={digest}\n"
+        stamp = bytes.fromhex(digest)
+
+        try:
+            blob = code_path.read_bytes()
+            if blob[: len(stamp)] == stamp:
+                return self._exec(marshal.loads(blob[len(stamp) :]))
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        try:
+            source = path.read_text(encoding="utf-8")
+        except OSError:
+            source = ""
+        if not source.startswith(header):
+            source = header + self._generate(schema_file)
+            self._write(path, source.encode("utf-8"), stem)
+        code = compile(source, str(path), "exec")
+        self._write(code_path, stamp + marshal.dumps(code), None)
+        return self._exec(code)
+
+    def _generate(self, schema_file: str) -> str:
+        code = fastjsonschema.compile_to_code(self._definition(schema_file))
+        # 先頭の関数がルートスキーマのバリデータ（名前は $id 由来なので別名を付ける）
+        entry = re.search(r"^def (\w+)\(", code, re.MULTILINE)
+        return code + f"\n\nvalidate = {entry.group(1)}\n"  # type: ignore[union-attr]
+
+    def _write(self, path: Path, data: bytes, stem: Optional[str]) -> None:
+        """一時ファイル + rename で保存し、stem 指定時は同じスキーマの旧世代を消す"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            if stem is not None:
+                for stale in self.cache_dir.glob(f"{stem}_*"):
+                    if not stale.name.startswith(path.stem):
+                        stale.unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("validator cache not writable (%s): %s", self.cache_dir, exc)
+
+    @staticmethod
+    def _exec(code: Any) -> Callable[[Any], Any]:
+        namespace: Dict[str, Any] = {"__name__": "_dsl_generated_schema"}
+        exec(code, namespace)  # noqa: S102 - 自前で生成したバリデータ
+        return namespace["validate"]
+
+    def _compile_schema(self, schema_file: str) -> Callable[[Any], Any]:
+        validator = self._schema_cache.get(schema_file)
+        if validator is None:
+            with self._lock:
+                validator = self._schema_cache.get(schema_file)
+                if validator is None:
+                    validator = self._load_generated(schema_file)
+                    self._schema_cache[schema_file] = validator
+        return validator
+
+    def precompile(self) -> List[str]:
+        """全スキーマと結合スキーマを生成・ロードしておく（起動時 / ビルド時用）"""
+        if fastjsonschema is None:  # pragma: no cover
+            return []
+        names = sorted(fp.name for fp in self.schemas_dir.glob("*_schema.json"))
+        for name in names:
+            self._compile_schema(name)
+        self._compile_schema(COMBINED_SCHEMA)
+        return names
 
     def validate_json(self, payload: Dict[str, Any], schema_file: str) -> None:
         """JSON Schema による一次検証."""
         if fastjsonschema is None:  # pragma: no cover
             return
-        schema_path = self.schemas_dir / schema_file
-        self._compile_schema(schema_path)(payload)
+        self._compile_schema(schema_file)(payload)
+
+    def validate_sections(self, plan: Dict[str, Any]) -> None:
+        """Plan 内の全セクションを結合バリデータで 1 回で検証."""
+        if fastjsonschema is None:  # pragma: no cover
+            return
+        self._compile_schema(COMBINED_SCHEMA)(plan)
 
     # ----- pydantic second stage -------------------------------------------
     def validate_plan_meta(self, meta: Dict[str, Any]) -> None:
@@ -165,3 +305,11 @@ class DSLValidator:
         if baseline := plan.get("baseline"):
             self.validate_baseline(baseline)
 
+
+if __name__ == "__main__":  # pragma: no cover
+    root = Path(os.getenv("DSL_ROOT", Path(__file__).parent)).resolve()
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else root / "schemas"
+    v = DSLValidator(target)
+    for name in v.precompile():
+        print(f"compiled {name}")
+    print(f"cache: {v.cache_dir} (sha256={v.schemas_digest()[:16]})")
@@ -4,7 +4,7 @@ core.eval.metrics
 モデル評価で共通利用するメトリクス計算ユーティリティ。
 
 * 返却値は必ず **Python float**（NumPy スカラーや ndarray は残さない）
-* 追加メトリクスを実装したら __all__ に追記する
+* 計算は core.metrics.engine に一本化（追加指標は register_metric で登録する）
 """
 
 from __future__ import annotations
@@ -13,12 +13,9 @@ from typing import Any, Dict, SupportsFloat, Union, cast
 
 import numpy as np
 import numpy.typing as npt
-from sklearn.metrics import (
-    mean_absolute_error,
-    mean_absolute_percentage_error,
-    mean_squared_error,
-    r2_score,
-)
+
+from core.metrics.engine import DEFAULT_METRICS
+from core.metrics.engine import evaluate as _engine_evaluate
 
 __all__: list[str] = ["evaluate"]
 
@@ -57,14 +54,11 @@ def evaluate(y_true: ArrayLike, y_pred: ArrayLike) -> Dict[str, float]:
     """
     r2 / MAE / RMSE / MAPE を計算して ``Dict[str, float]`` を返す。
     受け取った入力は list・Series など何でも OK（内部で ndarray 化）。
+    計算は core.metrics.engine（Check と同じ定義: MAPE は y_true == 0 の行を除外）。
     """
     # 何が来ても 1-D float ndarray へ整形
     y_true_arr = np.asarray(y_true, dtype=float).ravel()
     y_pred_arr = np.asarray(y_pred, dtype=float).ravel()
 
-    return {
-        "r2":   _to_float(r2_score(y_true_arr, y_pred_arr)),
-        "mae":  _to_float(mean_absolute_error(y_true_arr, y_pred_arr)),
-        "rmse": _to_float(mean_squared_error(y_true_arr, y_pred_arr, squared=False)),
-        "mape": _to_float(mean_absolute_percentage_error(y_true_arr, y_pred_arr) * 100.0),
-    }
+    metrics = _engine_evaluate(y_true_arr, y_pred_arr, DEFAULT_METRICS)
+    return {name: _to_float(value) for name, value in metrics.items()}
@@ -19,6 +19,8 @@
 #       • core/do/..., core/check/..., core/act/... など publish 呼び出し元
 #   - 外部設定 :
 #       • ENV `EVENT_BUS_MODE=null|outbox|kafka` (TODO: 外部設定へ)
+#       • ENV `EVENT_BUS_CODEC=auto|orjson|json|msgpack` … 送信ペイロードの
+#         エンコード方式（core/common/codec.py, default auto）
 #       • .env で broker URL を後付け予定
 #
 # 【ルール遵守】
@@ -45,6 +47,8 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+from core.common.codec import get_codec, json_codec
+
 logger = logging.getLogger(__name__)
 if not logger.handlers:
     _h = logging.StreamHandler()
@@ -81,6 +85,11 @@ _mode: Literal["null", "outbox", "kafka"] = os.getenv("EVENT_BUS_MODE", "null").
 # TODO: P2 で Kafka producer 実装を追加する
 
 
+def encode_event(envelope: EventEnvelope) -> bytes:
+    """送信用バイト列（datetime 等は codec 側で ISO8601 へ変換）。"""
+    return get_codec(os.getenv("EVENT_BUS_CODEC", "auto")).encode(envelope.model_dump())
+
+
 def publish(event: EventEnvelope | dict[str, Any]) -> None:  # noqa: D401
     """アプリ全域から呼ばれる単一インターフェース。
 
@@ -96,7 +105,9 @@ def publish(event: EventEnvelope | dict[str, Any]) -> None:  # noqa: D401
 
     if _mode == "null":
         # # NOTE: 本番環境では debug ログが溢れないよう INFO 以上に絞る
-        logger.debug("[EventBus] (noop) %s", envelope.json())
+        #   （無効時はシリアライズ自体を行わない）
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[EventBus] (noop) %s", json_codec().dumps(envelope.model_dump()))
         return
 
     if _mode == "outbox":
@@ -115,16 +126,19 @@ def publish(event: EventEnvelope | dict[str, Any]) -> None:  # noqa: D401
 def _publish_outbox(envelope: EventEnvelope) -> None:  # noqa: D401
     """P1 で Postgres outbox テーブルに INSERT 予定。"""
     # FIXME: 実装は後続フェーズ
-    logger.info("[EventBus] (stub‑outbox) stored %s", envelope.event_type)
+    payload = encode_event(envelope)
+    logger.info("[EventBus] (stub‑outbox) stored %s (%d bytes)", envelope.event_type, len(payload))
 
 
 def _publish_kafka(envelope: EventEnvelope) -> None:  # noqa: D401
     """P2 で Kafka / Redpanda へ送信予定。"""
     # FIXME: 実装は後続フェーズ
-    logger.info("[EventBus] (stub‑kafka) sent %s", envelope.event_type)
+    payload = encode_event(envelope)
+    logger.info("[EventBus] (stub‑kafka) sent %s (%d bytes)", envelope.event_type, len(payload))
 
 
 __all__ = [
     "EventEnvelope",
+    "encode_event",
     "publish",
 ]
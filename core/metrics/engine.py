@@ -0,0 +1,301 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【core/metrics/engine.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   評価指標の “単一エンジン”。Check / MetricsCalc / core.eval.evaluate の
+#   3 系統はすべてここを経由し、指標の定義（欠損の扱い・0 除算・R² の退化）と
+#   速度を揃える。指標はレジストリに登録した関数で、独自指標も追加できる。
+#
+# 【主な役割】
+#   - register_metric()  : 指標関数を登録するデコレータ
+#   - get_metric() / available_metrics()
+#   - evaluate()         : 1 系列 → {name: float}
+#   - evaluate_many()    : 複数系列（(S, T) 配列 or 長さの異なる系列のリスト）を
+#                          1 回のバッチ演算で評価 → {name: ndarray (S,)}
+#   - evaluate_segments(): 連結済み 1-D 配列を区切り位置で切った系列群を評価。
+#                          同じ長さの系列ごとに (S_L, L) へ並べるので NaN 埋めの
+#                          (S, 最大長) 行列を作らない（系列長が偏っていても行数分のメモリ）
+#
+# 【指標関数の規約】
+#   fn(yt, yp, valid, **context) -> ndarray (S,)
+#     yt / yp : (S, T) float64。無効セルは 0 で埋めてある
+#     valid   : (S, T) bool。y_true / y_pred とも有限のセルだけ True
+#     context : season（MASE の季節周期, 既定 1）/ y_train（MASE の尺度用の学習系列）/
+#               quantile（pinball の分位点, 既定 0.5）など。未使用のキーは無視する
+#   有効セル 0 件の系列は NaN を返すこと。
+#
+# 【組み込み指標】
+#   mape / rmse / mae / r2          : mergeable=True。式は core/check/metric_kernel.py の
+#                                     metric_values() だけに置き、ここは GroupedStats に委譲
+#                                     （Check のカーネル経路と同じ定義）。mergeable=True は
+#                                     「MetricStats で計算できる」の意味なので KERNEL_METRICS 限定
+#   smape                           : 100·mean(2|e| / (|y|+|ŷ|))、分母 0 の行を除外
+#   mase                            : MAE / mean|y_t - y_{t-m}|（y_train が無ければ y_true）
+#   directional_accuracy            : sign(y_t - y_{t-1}) と sign(ŷ_t - y_{t-1}) の一致率
+#     ※ この 2 つは sequential=True（行の並びに依存）。複数系列を連結した配列に
+#        そのまま掛けると系列境界をまたぐので、Check はグループ別に計算して集約する
+#   pinball                         : 分位点 q の pinball loss の平均
+#
+# 【連携先・依存関係】
+#   - core/check/check_executor.py … 指標名の検証・合否の向き・mergeable で経路選択・
+#                                    非結合指標の計算
+#   - core/check/metric_kernel.py  … mergeable 指標の定義（metric_values / GroupedStats）
+#   - core/metrics/metrics_calc.py … calc_metrics
+#   - core/eval/metrics.py         … evaluate
+#   - api/routers/metrics_api.py   … POST /metrics/{run_id}
+#
+# 【ルール遵守】
+#   1) 戻り値は Python float（evaluate）/ float64 ndarray（evaluate_many）
+#   2) mergeable 指標の意味は metric_kernel.metric_values の 1 箇所で変える
+#      （replace=True・mergeable=False で差し替えると Check もエンジン経路で計算する）
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+import numpy as np
+
+from core.check.metric_kernel import KERNEL_METRICS, GroupedStats
+
+__all__ = [
+    "DEFAULT_METRICS",
+    "MetricDef",
+    "available_metrics",
+    "evaluate",
+    "evaluate_many",
+    "evaluate_segments",
+    "get_metric",
+    "higher_is_better",
+    "register_metric",
+]
+
+MetricFunc = Callable[..., np.ndarray]
+
+# evaluate() の既定（従来の 4 指標）
+DEFAULT_METRICS: Tuple[str, ...] = ("r2", "mae", "rmse", "mape")
+
+
+@dataclass(frozen=True)
+class MetricDef:
+    name: str
+    func: MetricFunc
+    higher_is_better: bool = False
+    mergeable: bool = False  # MetricStats で計算する（Check のストリーミング / グループ別）
+    sequential: bool = False  # 隣接行を使う（連結した複数系列には系列ごとに掛ける）
+
+
+_REGISTRY: Dict[str, MetricDef] = {}
+
+
+def register_metric(
+    name: str,
+    *,
+    higher_is_better: bool = False,
+    mergeable: bool = False,
+    sequential: bool = False,
+    replace: bool = False,
+) -> Callable[[MetricFunc], MetricFunc]:
+    """
+    指標関数を name で登録するデコレータ（同名の再登録は replace=True が必要）。
+    mergeable=True は Check が func ではなく MetricStats で計算する指標の印なので、
+    MetricStats が知っている名前（KERNEL_METRICS）にだけ付けられる。
+    """
+    if mergeable and name not in KERNEL_METRICS:
+        raise ValueError(f"mergeable metrics must be one of {KERNEL_METRICS}: {name!r}")
+
+    def deco(func: MetricFunc) -> MetricFunc:
+        if name in _REGISTRY and not replace:
+            raise ValueError(f"metric already registered: {name!r}")
+        _REGISTRY[name] = MetricDef(name, func, higher_is_better, mergeable, sequential)
+        return func
+
+    return deco
+
+
+def get_metric(name: str) -> MetricDef:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"unsupported metric: {name!r}") from None
+
+
+def available_metrics() -> Tuple[str, ...]:
+    return tuple(_REGISTRY)
+
+
+def higher_is_better(name: str) -> bool:
+    """合否判定の向き（未登録の指標は小さいほど良いとみなす）"""
+    metric = _REGISTRY.get(name)
+    return bool(metric and metric.higher_is_better)
+
+
+# --------------------------------------------------------------------------- #
+# 評価
+# --------------------------------------------------------------------------- #
+def _as_matrix(values: Any) -> np.ndarray:
+    """1-D → (1, T) / 2-D → そのまま / 長さの異なる系列のリスト → NaN 埋めの (S, T)"""
+    if isinstance(values, (list, tuple)) and any(np.ndim(v) > 0 for v in values):
+        rows = [np.asarray(v, dtype=np.float64).ravel() for v in values]
+        arr = np.full((len(rows), max(r.size for r in rows)), np.nan)
+        for i, row in enumerate(rows):
+            arr[i, : row.size] = row
+        return arr
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim <= 1:
+        return arr.reshape(1, -1)
+    if arr.ndim != 2:
+        raise ValueError(f"expected 1-D or 2-D input, got {arr.ndim}-D")
+    return arr
+
+
+def evaluate_many(
+    y_true: Any,
+    y_pred: Any,
+    names: Iterable[str] = DEFAULT_METRICS,
+    **context: Any,
+) -> Dict[str, np.ndarray]:
+    """
+    複数系列を一括評価して ``{name: ndarray (S,)}`` を返す。
+    y_true / y_pred は (S, T) 配列、または系列のリスト（短い系列は末尾を欠損扱い）。
+    """
+    yt = _as_matrix(y_true)
+    yp = _as_matrix(y_pred)
+    if yt.shape != yp.shape:
+        raise ValueError(f"shape mismatch: y_true={yt.shape} y_pred={yp.shape}")
+    valid = np.isfinite(yt) & np.isfinite(yp)
+    if not valid.all():
+        yt = np.where(valid, yt, 0.0)
+        yp = np.where(valid, yp, 0.0)
+    return {name: get_metric(name).func(yt, yp, valid, **context) for name in names}
+
+
+def evaluate_segments(
+    y_true: Any,
+    y_pred: Any,
+    bounds: Any,
+    names: Iterable[str] = DEFAULT_METRICS,
+    **context: Any,
+) -> Dict[str, np.ndarray]:
+    """
+    連結済み 1-D 配列の ``[bounds[i], bounds[i+1])`` を 1 系列として評価し
+    ``{name: ndarray (S,)}`` を返す（S = len(bounds) - 1。空の系列は NaN）。
+    同じ長さの系列をまとめて evaluate_many に渡す（呼び出し回数 = 異なる長さの数）。
+    context は全系列に共通の値だけを渡すこと（系列ごとの y_train は不可）。
+    """
+    yt = np.asarray(y_true, dtype=np.float64).ravel()
+    yp = np.asarray(y_pred, dtype=np.float64).ravel()
+    if yt.shape != yp.shape:
+        raise ValueError(f"length mismatch: y_true={yt.shape} y_pred={yp.shape}")
+    edges = np.asarray(bounds, dtype=np.int64)
+    starts, lengths = edges[:-1], np.diff(edges)
+    names = list(names)
+    out = {name: np.full(lengths.size, math.nan) for name in names}
+    for length in np.unique(lengths[lengths > 0]):
+        idx = np.flatnonzero(lengths == length)
+        rows = starts[idx, None] + np.arange(length)
+        part = evaluate_many(yt[rows], yp[rows], names, **context)
+        for name in names:
+            out[name][idx] = part[name]
+    return out
+
+
+def evaluate(
+    y_true: Any,
+    y_pred: Any,
+    names: Iterable[str] = DEFAULT_METRICS,
+    **context: Any,
+) -> Dict[str, float]:
+    """1 系列を評価して ``{name: float}`` を返す（入力は list / Series / ndarray 何でも可）"""
+    yt = np.asarray(y_true, dtype=np.float64).ravel()
+    yp = np.asarray(y_pred, dtype=np.float64).ravel()
+    if yt.shape != yp.shape:
+        raise ValueError(f"length mismatch: y_true={yt.shape} y_pred={yp.shape}")
+    out = evaluate_many(yt.reshape(1, -1), yp.reshape(1, -1), names, **context)
+    return {name: float(values[0]) for name, values in out.items()}
+
+
+# --------------------------------------------------------------------------- #
+# 組み込み指標
+# --------------------------------------------------------------------------- #
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """den == 0 の要素は NaN"""
+    out = np.full(np.shape(num), math.nan)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _kernel_metric(name: str) -> MetricFunc:
+    """metric_kernel の十分統計量（系列 = グループ）から name を計算する指標関数"""
+
+    def func(yt: np.ndarray, yp: np.ndarray, valid: np.ndarray, **_: Any) -> np.ndarray:
+        rows = np.nonzero(valid)[0]
+        return GroupedStats.from_codes(rows, yt.shape[0], yt[valid], yp[valid]).metric(name)
+
+    return func
+
+
+for _name in KERNEL_METRICS:
+    register_metric(_name, higher_is_better=_name == "r2", mergeable=True)(_kernel_metric(_name))
+_mae = _kernel_metric("mae")  # MASE の分子（mae を差し替えても MASE の定義は変えない）
+
+
+@register_metric("smape")
+def _smape(yt: np.ndarray, yp: np.ndarray, valid: np.ndarray, **_: Any) -> np.ndarray:
+    den = np.abs(yt) + np.abs(yp)
+    ok = valid & (den > 0)
+    ratio = np.zeros_like(yt)
+    np.divide(2.0 * np.abs(yp - yt), den, out=ratio, where=ok)
+    return _ratio(ratio.sum(axis=-1), ok.sum(axis=-1)) * 100.0
+
+
+@register_metric("mase", sequential=True)
+def _mase(
+    yt: np.ndarray,
+    yp: np.ndarray,
+    valid: np.ndarray,
+    *,
+    season: int = 1,
+    y_train: Any = None,
+    **_: Any,
+) -> np.ndarray:
+    """尺度 = 季節ナイーブ予測の MAE（y_train があればその系列で、無ければ y_true で）"""
+    if y_train is None:
+        base, base_valid = yt, valid
+    else:
+        base = _as_matrix(y_train)
+        base_valid = np.isfinite(base)
+        base = np.where(base_valid, base, 0.0)
+        if base.shape[0] == 1 and yt.shape[0] > 1:
+            base = np.broadcast_to(base, (yt.shape[0], base.shape[1]))
+            base_valid = np.broadcast_to(base_valid, base.shape)
+    m = max(int(season), 1)
+    pair = base_valid[:, m:] & base_valid[:, :-m]
+    diffs = np.where(pair, np.abs(base[:, m:] - base[:, :-m]), 0.0)
+    scale = _ratio(diffs.sum(axis=-1), pair.sum(axis=-1))
+    return _ratio(_mae(yt, yp, valid), scale)
+
+
+@register_metric("directional_accuracy", higher_is_better=True, sequential=True)
+def _directional_accuracy(
+    yt: np.ndarray, yp: np.ndarray, valid: np.ndarray, **_: Any
+) -> np.ndarray:
+    """前時点の実測値から見た上下方向の的中率（0〜1）"""
+    pair = valid[:, 1:] & valid[:, :-1]
+    actual = np.sign(yt[:, 1:] - yt[:, :-1])
+    pred = np.sign(yp[:, 1:] - yt[:, :-1])
+    return _ratio(((actual == pred) & pair).sum(axis=-1), pair.sum(axis=-1))
+
+
+@register_metric("pinball")
+def _pinball(
+    yt: np.ndarray, yp: np.ndarray, valid: np.ndarray, *, quantile: float = 0.5, **_: Any
+) -> np.ndarray:
+    q = float(quantile)
+    if not 0.0 < q < 1.0:
+        raise ValueError(f"quantile must be in (0, 1): {quantile}")
+    diff = yt - yp
+    loss = np.maximum(q * diff, (q - 1.0) * diff)
+    return _ratio(np.where(valid, loss, 0.0).sum(axis=-1), valid.sum(axis=-1))
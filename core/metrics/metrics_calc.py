@@ -11,7 +11,7 @@
 # 【主な役割】
 #   - Do フェーズが生成した Parquet/CSV をロード (外部 I/O は呼び出し元)
 #   - ndarray/Series から評価指標を計算し dict で返却
-#   - 計算アルゴリズムは sklearn.metrics / numpy ベースで統一
+#   - 計算は core/metrics/engine.py（Check / core.eval と共通の指標エンジン）に委譲
 #
 # 【連携先・依存関係】
 #   - 他ユニット :
@@ -47,13 +47,9 @@ from __future__ import annotations
 import logging
 from typing import Dict
 
-import numpy as np
 import pandas as pd
-from sklearn.metrics import (
-    mean_absolute_error,
-    mean_squared_error,
-    r2_score,
-)
+
+from core.metrics.engine import evaluate
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -105,22 +101,15 @@ def calc_metrics(
 
     # --- calculations ------------------------------------------------------
 
-    # r2 / mae / rmse (sklearn) --------------------------------------------
-    r2 = r2_score(y_true, y_pred)
-    mae = mean_absolute_error(y_true, y_pred)
-    rmse = mean_squared_error(y_true, y_pred, squared=False)
-
-    # mape (手計算) ----------------------------------------------------------
-    with np.errstate(divide="ignore", invalid="ignore"):
-        ape = np.abs((y_true - y_pred) / y_true)
-        ape = ape[~np.isinf(ape)]  # 0 除回避
-        mape = np.mean(ape) if ape.size else np.nan
+    # 指標エンジン（MAPE は y_true == 0 の行を除外、単位 %）-----------------
+    values = evaluate(y_true, y_pred, ("r2", "mae", "rmse", "mape"))
 
+    # 表示用の丸め（UI / レポート向け。計算自体はエンジンと同一）
     metrics = {
-        "r2": round(float(r2), 4),
-        "mae": round(float(mae), 4),
-        "rmse": round(float(rmse), 4),
-        "mape": round(float(mape * 100), 2),  # [%]
+        "r2": round(values["r2"], 4),
+        "mae": round(values["mae"], 4),
+        "rmse": round(values["rmse"], 4),
+        "mape": round(values["mape"], 2),  # [%]
     }
 
     logger.info(
@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime
 from typing import Final, Literal, TypedDict, cast
@@ -18,7 +17,8 @@ from core.data.loader import load
 from core.data.splitter import split_ts
 from core.eval import evaluate                         # 共通メトリクス
 from core.feature.engineering import make_features
-from core.repository.factory import get_repo
+from core.repository.factory import get_metrics_ts, get_repo
+from core.repository.metrics_ts import record_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -93,9 +93,12 @@ def train(
     metrics = evaluate(y_test, y_pred)            # すべて Python float
 
     # ── 5. Repository へ保存 ────────────────────────────────
-    run_id = f"{symbol}_{pd.Timestamp.utcnow():%Y%m%d%H%M%S}"
-    repo   = get_repo("metrics")
-    repo[run_id] = json.dumps(metrics)  # type: ignore[index]  実行時は OK
+    now    = pd.Timestamp.utcnow()
+    run_id = f"{symbol}_{now:%Y%m%d%H%M%S}"
+    get_repo("metrics").create(
+        run_id, {"run_id": run_id, "created_at": now.isoformat(), **metrics}
+    )
+    record_metrics(get_metrics_ts(), "", symbol, metrics, ts=now.to_pydatetime(), run_id=run_id)
 
     logger.info(
         "[trainer] %s metrics=%s",
@@ -0,0 +1,311 @@
+# =========================================================
+# ASSIST_KEY: 【core/ops/admission.py】
+# =========================================================
+#
+# 【概要】
+#   Enqueue 系エンドポイント (POST /do, POST /check) 用の
+#   “アドミッション制御” ユニット。
+#   ブローカーのキュー深さ / 実行中タスク数を TTL キャッシュ付きで読み、
+#   上限超過時はジョブを積まずに拒否する（= ロードシェディング）。
+#
+# 【主な役割】
+#   - queue depth   : kombu passive queue_declare で message_count を取得
+#   - in-flight     : celery inspect().active() + reserved() の件数
+#   - 判定結果を AdmissionRejected で通知（HTTP 変換は utils/admission.py）
+#   - Prometheus Gauge (pdca_queue_depth / pdca_tasks_in_flight) を更新
+#     → /metrics から HPA / KEDA のオートスケール指標として利用
+#
+# 【連携先・依存関係】
+#   - core/celery_app.py           : ブローカー接続
+#   - utils/admission.py           : FastAPI 依存注入ラッパ
+#   - api/routers/metrics_exporter : 定期ポーリングで Gauge を更新
+#
+# 【外部設定】
+#   ADMISSION_MAX_QUEUE_DEPTH   : キュー深さ上限 (0 = 無効, default 0)
+#   ADMISSION_MAX_IN_FLIGHT     : 実行中 + 予約済みタスク上限 (0 = 無効)
+#   ADMISSION_CACHE_TTL         : プローブ結果のキャッシュ秒数 (default 2.0)
+#   ADMISSION_RETRY_AFTER       : Retry-After 秒 (default 30)
+#   ADMISSION_INSPECT_TIMEOUT   : inspect ブロードキャストの待ち秒 (default 1.0)
+#
+# 【ルール遵守】
+#   1) enqueue 判定 (admit) は上限が有効な軸だけをプローブし、その軸の障害でのみ 503
+#      （上限未設定なら問い合わせない）。Gauge は exporter の refresh() が常に両方更新する
+#   2) Eager モード（テスト / ローカル）では常に許可
+#   3) プローブは 1 スレッドだけが更新し、他は直前の値を読む
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+try:
+    from prometheus_client import Counter, Gauge  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    Counter = Gauge = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "AdmissionLimits",
+    "AdmissionRejected",
+    "AdmissionController",
+    "get_admission_controller",
+]
+
+
+# --------------------------------------------------------------------------- #
+# Prometheus metrics
+# --------------------------------------------------------------------------- #
+if Gauge is not None:
+    _QUEUE_DEPTH = Gauge(
+        "pdca_queue_depth", "Celery broker queue depth (messages)", ["queue"]
+    )
+    _IN_FLIGHT = Gauge(
+        "pdca_tasks_in_flight", "Celery tasks active or reserved by workers"
+    )
+    _REJECTED = Counter(
+        "pdca_admission_rejected_total",
+        "Enqueue requests rejected by admission control",
+        ["endpoint", "reason"],
+    )
+else:  # pragma: no cover
+    _QUEUE_DEPTH = _IN_FLIGHT = _REJECTED = None
+
+
+# --------------------------------------------------------------------------- #
+# 設定 / 例外
+# --------------------------------------------------------------------------- #
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """アドミッション上限値。0 はその軸のチェック無効を意味する。"""
+
+    max_queue_depth: int = 0
+    max_in_flight: int = 0
+    cache_ttl: float = 2.0
+    retry_after: int = 30
+    inspect_timeout: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionLimits":
+        return cls(
+            max_queue_depth=int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "0")),
+            max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "0")),
+            cache_ttl=float(os.getenv("ADMISSION_CACHE_TTL", "2.0")),
+            retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", "30")),
+            inspect_timeout=float(os.getenv("ADMISSION_INSPECT_TIMEOUT", "1.0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_queue_depth > 0 or self.max_in_flight > 0
+
+
+class AdmissionRejected(RuntimeError):
+    """上限超過でジョブを受け付けない場合に送出。"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+# --------------------------------------------------------------------------- #
+# ブローカープローブ（デフォルト実装）
+# --------------------------------------------------------------------------- #
+def _broker_queue_depth(queue: str) -> int:
+    """kombu の passive declare でキュー滞留数を取得（Redis / AMQP 共通）。"""
+    from core.celery_app import celery_app  # lazy: import 循環回避
+
+    with celery_app.connection_for_read() as conn:
+        declared = conn.default_channel.queue_declare(queue=queue, passive=True)
+    return int(declared.message_count)
+
+
+def _make_inflight_probe(timeout: float) -> Callable[[], int]:
+    def _probe() -> int:
+        from core.celery_app import celery_app
+
+        insp = celery_app.control.inspect(timeout=timeout)
+        active = insp.active() or {}
+        reserved = insp.reserved() or {}
+        return sum(len(v) for v in active.values()) + sum(
+            len(v) for v in reserved.values()
+        )
+
+    return _probe
+
+
+# --------------------------------------------------------------------------- #
+# Controller
+# --------------------------------------------------------------------------- #
+class AdmissionController:
+    """
+    キュー深さ / 実行中タスク数を TTL キャッシュして enqueue 可否を判定する。
+
+    Parameters
+    ----------
+    limits : AdmissionLimits
+        上限値。
+    queue : str
+        監視するキュー名（既定は Celery の task_default_queue）。
+    depth_probe / inflight_probe
+        差し替え用プローブ（テストではスタブを渡す）。
+    clock
+        単調時計（テスト用）。
+    """
+
+    def __init__(
+        self,
+        limits: AdmissionLimits,
+        *,
+        queue: str = "celery",
+        depth_probe: Optional[Callable[[str], int]] = None,
+        inflight_probe: Optional[Callable[[], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = limits
+        self.queue = queue
+        self._depth_probe = depth_probe or _broker_queue_depth
+        self._inflight_probe = inflight_probe or _make_inflight_probe(
+            limits.inspect_timeout
+        )
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._expires_at = 0.0
+        self._depth: Optional[int] = None
+        self._in_flight: Optional[int] = None
+        self._depth_error: Optional[str] = None
+        self._in_flight_error: Optional[str] = None
+        self._probe_error: Optional[str] = None
+
+    # ------------------------------------------------------------------ #
+    # 読み取り
+    # ------------------------------------------------------------------ #
+    def snapshot(self) -> dict[str, object]:
+        """キャッシュ済みの (depth, in_flight, error) を返す。期限切れなら更新。"""
+        self._refresh_if_stale()
+        return {
+            "queue": self.queue,
+            "queue_depth": self._depth,
+            "in_flight": self._in_flight,
+            "error": self._probe_error,
+        }
+
+    def refresh(self) -> None:
+        """TTL を無視して即時にプローブする（exporter の定期更新用）。"""
+        with self._lock:
+            self._probe()
+
+    def _refresh_if_stale(self, depth: bool = True, in_flight: bool = True) -> None:
+        if self._clock() < self._expires_at:
+            return
+        # 1 スレッドだけが更新。ロック取得できなければ直前の値で判定する。
+        first = (depth and self._depth is None and self._depth_error is None) or (
+            in_flight and self._in_flight is None and self._in_flight_error is None
+        )
+        if not self._lock.acquire(blocking=first):
+            return
+        try:
+            if self._clock() >= self._expires_at:
+                self._probe(depth, in_flight)
+        finally:
+            self._lock.release()
+
+    def _probe(self, depth: bool = True, in_flight: bool = True) -> None:
+        # exporter の refresh() は上限の有無に関わらず両方を読む（Gauge は常に公開）。
+        # admit() は上限が有効な軸だけを読む（無効な軸の inspect 待ちで enqueue を止めない）
+        if depth:
+            try:
+                self._depth = self._depth_probe(self.queue)
+                self._depth_error = None
+                if _QUEUE_DEPTH is not None:
+                    _QUEUE_DEPTH.labels(queue=self.queue).set(self._depth)
+            except Exception as exc:  # noqa: BLE001 – ブローカー障害は 503 に変換
+                self._depth_error = f"queue depth: {exc}"
+        if in_flight:
+            try:
+                self._in_flight = self._inflight_probe()
+                self._in_flight_error = None
+                if _IN_FLIGHT is not None:
+                    _IN_FLIGHT.set(self._in_flight)
+            except Exception as exc:  # noqa: BLE001
+                self._in_flight_error = f"in-flight: {exc}"
+
+        errors = [e for e in (self._depth_error, self._in_flight_error) if e]
+        self._probe_error = "; ".join(errors) or None
+        if self._probe_error is not None:
+            logger.warning("[Admission] broker probe failed: %s", self._probe_error)
+        self._expires_at = self._clock() + self.limits.cache_ttl
+
+    # ------------------------------------------------------------------ #
+    # 判定
+    # ------------------------------------------------------------------ #
+    def admit(self, endpoint: str) -> None:
+        """
+        受付可なら何もしない。上限超過なら AdmissionRejected。
+
+        * ブローカーに到達できない      → 503
+        * キュー滞留が上限超過           → 503（全体過負荷）
+        * 実行中タスクが上限到達         → 429（短時間で解消見込み）
+        """
+        if not self.limits.enabled:
+            return
+        check_depth = self.limits.max_queue_depth > 0
+        check_in_flight = self.limits.max_in_flight > 0
+        self._refresh_if_stale(check_depth, check_in_flight)
+
+        retry_after = self.limits.retry_after
+        if (check_depth and self._depth_error) or (check_in_flight and self._in_flight_error):
+            self._reject(endpoint, 503, "broker_unavailable", retry_after,
+                         "Task broker is unavailable; please retry later")
+
+        depth = self._depth
+        if self.limits.max_queue_depth and depth is not None and depth >= self.limits.max_queue_depth:
+            self._reject(
+                endpoint, 503, "queue_depth", retry_after,
+                f"Queue '{self.queue}' backlog {depth} >= {self.limits.max_queue_depth}",
+            )
+
+        in_flight = self._in_flight
+        if self.limits.max_in_flight and in_flight is not None and in_flight >= self.limits.max_in_flight:
+            self._reject(
+                endpoint, 429, "in_flight", max(1, retry_after // 3),
+                f"{in_flight} tasks in flight >= {self.limits.max_in_flight}",
+            )
+
+    def _reject(
+        self, endpoint: str, status_code: int, reason: str, retry_after: int, detail: str
+    ) -> None:
+        if _REJECTED is not None:
+            _REJECTED.labels(endpoint=endpoint, reason=reason).inc()
+        logger.info("[Admission] reject %s (%s): %s", endpoint, reason, detail)
+        raise AdmissionRejected(status_code, reason, retry_after, detail)
+
+
+# --------------------------------------------------------------------------- #
+# Singleton
+# --------------------------------------------------------------------------- #
+_instance: Optional[AdmissionController] = None
+_instance_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """プロセス共通のコントローラを返す（初回に環境変数を読む）。"""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                from core.celery_app import celery_app
+
+                _instance = AdmissionController(
+                    AdmissionLimits.from_env(),
+                    queue=celery_app.conf.task_default_queue or "celery",
+                )
+    return _instance
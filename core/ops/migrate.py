@@ -0,0 +1,148 @@
+# =========================================================
+# ASSIST_KEY: 【core/ops/migrate.py】
+# =========================================================
+#
+# 【概要】
+#   Repository バックエンド間（memory / sqlite / postgres / redis）で
+#   plan / do / check 等のテーブルをストリーミング移行するユニット。
+#   CLI は cli/migrate_cli.py。
+#
+# 【主な役割】
+#   - migrate_table() : 移行元を (created_at, id) 昇順のキーセットで batch 件ずつ読み、
+#                       移行先 import_rows() へ書く（メモリ使用量は 1 バッチ分）
+#       * Postgres : COPY FROM STDIN → 一時表 → 1 文 UPSERT
+#       * Redis    : SET / ZADD / SADD を 1 パイプライン
+#       * SQLite   : executemany 1 トランザクション
+#       作成時刻は移行元の値を保つ（一覧の並び順 / カーソルが変わらない）
+#   - Checkpoint      : テーブルごとの最終カーソルを JSON に保存し、中断後に再開
+#   - MigrationStats  : 件数 / 経過秒 / rows/sec
+#
+# 【ルール遵守】
+#   1) import_rows は UPSERT なので、チェックポイント直後のバッチを再投入しても冪等
+#   2) チェックポイントは一時ファイル → os.replace で原子的に更新
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Checkpoint", "MigrationStats", "migrate_table", "migrate"]
+
+
+@dataclass
+class MigrationStats:
+    table: str
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    done: bool = False
+
+    @property
+    def rate(self) -> float:
+        """rows / sec"""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class Checkpoint:
+    """{table: {"cursor": str | None, "rows": int, "done": bool}} を JSON で保持"""
+
+    path: Optional[Path] = None
+    tables: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> "Checkpoint":
+        if path is None or not path.exists():
+            return cls(path)
+        return cls(path, json.loads(path.read_text(encoding="utf-8")))
+
+    def get(self, table: str) -> Dict[str, Any]:
+        return self.tables.get(table, {"cursor": None, "rows": 0, "done": False})
+
+    def update(self, table: str, cursor: Optional[str], rows: int, done: bool) -> None:
+        self.tables[table] = {"cursor": cursor, "rows": rows, "done": done}
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.tables, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def migrate_table(
+    src: Any,
+    dst: Any,
+    table: str,
+    *,
+    batch: int = 1000,
+    cursor: Optional[str] = None,
+    on_batch: Optional[Callable[[MigrationStats, Optional[str]], None]] = None,
+) -> MigrationStats:
+    """
+    src の全行を dst へ移す。cursor を渡すとその位置の次から再開する。
+    on_batch(stats, next_cursor) はバッチ書き込み完了ごとに呼ばれる。
+    """
+    stats = MigrationStats(table)
+    started = time.perf_counter()
+    while True:
+        page = src.list_page(limit=batch, cursor=cursor, order="asc")
+        if page.items:
+            dst.import_rows([(c, i, d) for (c, i), d in zip(page.keys, page.items)])
+        stats.rows += len(page.items)
+        stats.batches += 1
+        stats.seconds = time.perf_counter() - started
+        cursor = page.next_cursor
+        stats.done = cursor is None
+        if on_batch is not None:
+            on_batch(stats, cursor)
+        if stats.done:
+            return stats
+
+
+def migrate(
+    tables: Sequence[str],
+    src_backend: str,
+    dst_backend: str,
+    *,
+    batch: int = 1000,
+    checkpoint: Optional[Checkpoint] = None,
+    report: Optional[Callable[[MigrationStats], None]] = None,
+) -> List[MigrationStats]:
+    """tables を順に移行。checkpoint 済み（done）のテーブルは飛ばす"""
+    from core.repository.factory import get_repo
+
+    if src_backend.lower() == dst_backend.lower():
+        raise ValueError("source and destination backends must differ")
+    ckpt = checkpoint or Checkpoint()
+    results: List[MigrationStats] = []
+    for table in tables:
+        state = ckpt.get(table)
+        if state["done"]:
+            logger.info("[migrate] %s already done (%s rows) – skip", table, state["rows"])
+            continue
+        base_rows = int(state["rows"])
+
+        def _on_batch(stats: MigrationStats, cursor: Optional[str], _t: str = table) -> None:
+            ckpt.update(_t, cursor, base_rows + stats.rows, stats.done)
+            if report is not None:
+                report(stats)
+
+        stats = migrate_table(
+            get_repo(table, backend=src_backend),
+            get_repo(table, backend=dst_backend),
+            table,
+            batch=batch,
+            cursor=state["cursor"],
+            on_batch=_on_batch,
+        )
+        logger.info(
+            "[migrate] %s rows=%s %.0f rows/s", table, stats.rows, stats.rate
+        )
+        results.append(stats)
+    return results
@@ -0,0 +1,201 @@
+# =========================================================
+# ASSIST_KEY: 【core/ops/retention.py】
+# =========================================================
+#
+# 【概要】
+#   do / check / act 等のレコードに TTL を設け、期限切れ分を
+#   Parquet (zstd) でコールドアーカイブしてから Repository から削除する
+#   “リテンション” ユニット。beat タスク (core/tasks/retention_tasks.py) から
+#   定期実行する。
+#
+# 【主な役割】
+#   - RetentionConfig.from_env() : テーブル別 TTL / バッチ / スループット上限
+#   - run_retention()            : 全テーブルを順に処理し件数を返す
+#       1) list_page(created_at__lt=cutoff, order="asc") で古い順に 1 バッチ取得
+#       2) artifacts/archive/{table}/ へ Parquet（pyarrow 無しなら JSONL.gz）で退避
+#       3) delete_many() でバッチ削除（Postgres は id = ANY(...) の 1 文）
+#       4) RETENTION_MAX_ROWS / RETENTION_RATE で 1 回あたりの処理量を制限
+#   - TTL 設定の解釈 (parse_ttls / key_ttl_seconds) は core/repository/ttl.py
+#     （Redis 実装と共有するためストレージ層に置き、ここでは再エクスポートのみ）
+#   - 時系列指標ストア (metrics_ts) の purge_expired() も同じジョブで実行
+#
+# 【外部設定】
+#   RETENTION_TTL_DAYS      : "do=30,check=30,act=90"（空 = 無効）
+#   RETENTION_BATCH         : 1 バッチの件数 (default 1000)
+#   RETENTION_MAX_ROWS      : 1 回の実行でテーブルあたり削除する上限 (default 100000)
+#   RETENTION_RATE          : 削除スループット上限 rows/sec (default 0 = 無制限)
+#   RETENTION_ARCHIVE       : 1 = アーカイブしてから削除 (default) / 0 = 削除のみ
+#   RETENTION_ARCHIVE_DIR   : 退避先 (default ARTIFACT_ROOT/archive)
+#   RETENTION_REDIS_GRACE_DAYS : Redis EXPIRE の猶予日数（core/repository/ttl.py 参照）
+#
+# 【ルール遵守】
+#   1) アーカイブに失敗したバッチは削除しない（データを失わない）
+#   2) pyarrow は optional（無ければ gzip JSONL にフォールバック）
+#   3) Repository は factory 経由で遅延 import（redis_impl からの import と循環させない）
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from core.common.codec import dumps
+from core.repository.ttl import key_ttl_seconds, parse_ttls
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    pa = pq = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "RetentionConfig",
+    "RetentionResult",
+    "parse_ttls",
+    "key_ttl_seconds",
+    "archive_batch",
+    "purge_table",
+    "run_retention",
+]
+
+
+def _default_archive_dir() -> Path:
+    from core.constants import ARTIFACT_ROOT
+
+    return ARTIFACT_ROOT / "archive"
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    ttl_days: Mapping[str, float] = field(default_factory=dict)
+    batch: int = 1000
+    max_rows: int = 100_000
+    rate: float = 0.0
+    archive: bool = True
+    archive_dir: Optional[Path] = None
+
+    @classmethod
+    def from_env(cls) -> "RetentionConfig":
+        archive_dir = os.getenv("RETENTION_ARCHIVE_DIR")
+        return cls(
+            ttl_days=parse_ttls(os.getenv("RETENTION_TTL_DAYS", "")),
+            batch=max(1, int(os.getenv("RETENTION_BATCH", "1000"))),
+            max_rows=max(0, int(os.getenv("RETENTION_MAX_ROWS", "100000"))),
+            rate=float(os.getenv("RETENTION_RATE", "0")),
+            archive=os.getenv("RETENTION_ARCHIVE", "1").lower() in ("1", "true", "yes"),
+            archive_dir=Path(archive_dir) if archive_dir else None,
+        )
+
+
+@dataclass
+class RetentionResult:
+    table: str
+    cutoff: datetime
+    deleted: int = 0
+    archives: List[str] = field(default_factory=list)
+    truncated: bool = False  # max_rows に達して打ち切った
+
+
+# --------------------------------------------------------------------------- #
+# archive
+# --------------------------------------------------------------------------- #
+def archive_batch(
+    table: str, rows: List[Tuple[str, str, Dict[str, Any]]], out_dir: Path
+) -> Path:
+    """
+    (created_at, id, doc) のバッチを 1 ファイルへ書き出してパスを返す。
+    列は id / created_at / data(JSON 文字列)。
+    """
+    out_dir = out_dir / table
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"{table}-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{rows[0][1]}"
+    if pq is not None:
+        path = out_dir / f"{stem}.parquet"
+        tbl = pa.table(
+            {
+                "id": [i for _, i, _ in rows],
+                "created_at": [c for c, _, _ in rows],
+                "data": [dumps(d) for _, _, d in rows],
+            }
+        )
+        pq.write_table(tbl, path, compression="zstd")
+    else:
+        path = out_dir / f"{stem}.jsonl.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            for created, id_, doc in rows:
+                fh.write(dumps({"id": id_, "created_at": created, "data": doc}) + "\n")
+    return path
+
+
+# --------------------------------------------------------------------------- #
+# purge
+# --------------------------------------------------------------------------- #
+def purge_table(
+    repo: Any,
+    table: str,
+    cutoff: datetime,
+    cfg: RetentionConfig,
+) -> RetentionResult:
+    """cutoff より前に作成されたレコードを古い順にアーカイブ → 削除"""
+    from core.repository.base import CREATED_LT
+
+    res = RetentionResult(table, cutoff)
+    out_dir = cfg.archive_dir or _default_archive_dir()
+    filters = {CREATED_LT: cutoff.isoformat()}
+    started = time.monotonic()
+    while True:
+        limit = cfg.batch
+        if cfg.max_rows:
+            limit = min(limit, cfg.max_rows - res.deleted)
+            if limit <= 0:
+                res.truncated = True
+                break
+        # 削除しながら進むので常に先頭ページを読む（カーソル不要）
+        page = repo.list_page(limit=limit, filters=filters, order="asc")
+        if not page.items:
+            break
+        ids = [obj_id for _, obj_id in page.keys]
+        if cfg.archive:
+            rows = [(str(c), i, d) for (c, i), d in zip(page.keys, page.items)]
+            res.archives.append(str(archive_batch(table, rows, out_dir)))
+        repo.delete_many(ids)
+        res.deleted += len(ids)
+        if cfg.rate > 0:
+            ahead = res.deleted / cfg.rate - (time.monotonic() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+        if page.next_cursor is None:
+            break
+    trim = getattr(repo, "trim", None)
+    if callable(trim) and not res.truncated:
+        trim(cutoff)  # Redis: EXPIRE 済みキーの時刻 ZSET エントリを掃除
+    return res
+
+
+def run_retention(
+    cfg: Optional[RetentionConfig] = None, now: Optional[datetime] = None
+) -> List[RetentionResult]:
+    """設定された全テーブル + 時系列指標ストアのリテンションを 1 回実行"""
+    from core.repository.factory import get_metrics_ts, get_repo
+
+    cfg = cfg or RetentionConfig.from_env()
+    now = now or datetime.now(timezone.utc)
+    results: List[RetentionResult] = []
+    for table, days in sorted(cfg.ttl_days.items()):
+        res = purge_table(get_repo(table), table, now - timedelta(days=days), cfg)
+        logger.info(
+            "[retention] %s deleted=%s archives=%s truncated=%s",
+            table, res.deleted, len(res.archives), res.truncated,
+        )
+        results.append(res)
+    purged = get_metrics_ts().purge_expired()
+    if purged:
+        logger.info("[retention] metrics_ts purged=%s", purged)
+    return results
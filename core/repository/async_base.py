@@ -0,0 +1,183 @@
+# =========================================================
+# core/repository/async_base.py
+# =========================================================
+#
+# 非同期 Repository インターフェース
+# ----------------------------------
+# * FastAPI の `async def` ルートから await で呼ぶための共通 ABC。
+#   同期版 BaseRepository と同じシグネチャ（create/get/list/delete/
+#   exists/patch）を coroutine として定義する。
+# * 各バックエンドの実装
+#     - async_memory_impl   : MemoryRepository とストア共有
+#     - async_sqlite_impl   : aiosqlite
+#     - async_redis_impl    : redis.asyncio
+#     - async_postgres_impl : psycopg3 AsyncConnectionPool
+# * ネイティブ非同期ドライバが無い場合は ThreadedAsyncRepository が
+#   同期 Repository をワーカースレッドへ逃がす（イベントループは塞がない）。
+# ---------------------------------------------------------
+
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .base import Page, unique_ids
+
+
+class AsyncBaseRepository(ABC):
+    """
+    抽象 非同期 Repository 基底クラス
+
+    Parameters
+    ----------
+    table : str
+        対象となるテーブル名・コレクション名など。
+    tenant_id : str, default ''
+        マルチテナント用 ID。シングルテナントの場合は空文字列。
+    """
+
+    def __init__(self, *, table: str, tenant_id: str = "") -> None:
+        self.table: str = table
+        self.tenant_id: str = tenant_id
+
+    # -----------------------------------------------------
+    # CRUD 抽象メソッド
+    # -----------------------------------------------------
+    @abstractmethod
+    async def create(self, obj_id: str, data: Dict[str, Any]) -> None:
+        """id をキーにオブジェクトを保存（同 ID があれば上書き）"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, obj_id: str) -> Dict[str, Any] | None:
+        """id で 1 件取得。無ければ None"""
+        raise NotImplementedError
+
+    async def list(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> List[Dict[str, Any]]:
+        """tenant 内のオブジェクトを新しい順で一覧取得（引数は list_page と同じ）"""
+        return (await self.list_page(limit, cursor, filters, order)).items
+
+    @abstractmethod
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        """(created_at, id) のキーセットで 1 ページ取得（BaseRepository.list_page 参照）"""
+        raise NotImplementedError
+
+    async def list_by(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+        **eq: Any,
+    ) -> List[Dict[str, Any]]:
+        """等値条件での検索（BaseRepository.list_by 参照）"""
+        return await self.list(limit, cursor, eq, order)
+
+    @abstractmethod
+    async def delete(self, obj_id: str) -> None:
+        """id を指定して削除（存在しなくてもエラーにしない）"""
+        raise NotImplementedError
+
+    async def exists(self, obj_id: str) -> bool:
+        """存在確認（既定は get() 経由）"""
+        return await self.get(obj_id) is not None
+
+    # -----------------------------------------------------
+    # バルク操作（BaseRepository.create_many 等と同じ契約）
+    # -----------------------------------------------------
+    async def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        """{id: data} をまとめて保存（既定は create() のループ）"""
+        for obj_id, data in items.items():
+            await self.create(obj_id, data)
+
+    async def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """複数 id をまとめて取得（存在しない id は含めない）"""
+        out: Dict[str, Dict[str, Any]] = {}
+        for obj_id in unique_ids(obj_ids):
+            doc = await self.get(obj_id)
+            if doc is not None:
+                out[obj_id] = doc
+        return out
+
+    async def delete_many(self, obj_ids: Iterable[str]) -> None:
+        """複数 id をまとめて削除（既定は delete() のループ）"""
+        for obj_id in unique_ids(obj_ids):
+            await self.delete(obj_id)
+
+    # -----------------------------------------------------
+    # 部分更新
+    # -----------------------------------------------------
+    async def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        """
+        トップレベルのキーをマージ保存（無ければ partial で新規作成）。
+
+        既定実装は原子的ではない。各バックエンドで上書きすること。
+        """
+        current = await self.get(obj_id) or {}
+        current.update(partial)
+        await self.create(obj_id, current)
+
+    async def aclose(self) -> None:
+        """接続を解放する（必要な実装のみ上書き）"""
+
+
+class ThreadedAsyncRepository(AsyncBaseRepository):
+    """
+    同期 Repository を asyncio.to_thread で包むアダプタ。
+
+    aiosqlite / redis.asyncio / psycopg_pool が無い環境でも
+    get_async_repo() が常に同じインターフェースを返せるようにする。
+    """
+
+    def __init__(self, sync_repo: Any) -> None:
+        super().__init__(
+            table=getattr(sync_repo, "table", ""),
+            tenant_id=getattr(sync_repo, "tenant_id", ""),
+        )
+        self.sync = sync_repo
+
+    async def create(self, obj_id: str, data: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.sync.create, obj_id, data)
+
+    async def get(self, obj_id: str) -> Dict[str, Any] | None:
+        return await asyncio.to_thread(self.sync.get, obj_id)
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        return await asyncio.to_thread(self.sync.list_page, limit, cursor, filters, order)
+
+    async def delete(self, obj_id: str) -> None:
+        await asyncio.to_thread(self.sync.delete, obj_id)
+
+    async def exists(self, obj_id: str) -> bool:
+        return await asyncio.to_thread(self.sync.exists, obj_id)
+
+    async def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.sync.patch, obj_id, partial)
+
+    async def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self.sync.create_many, items)
+
+    async def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self.sync.get_many, list(obj_ids))
+
+    async def delete_many(self, obj_ids: Iterable[str]) -> None:
+        await asyncio.to_thread(self.sync.delete_many, list(obj_ids))
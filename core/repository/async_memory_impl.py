@@ -0,0 +1,59 @@
+# =========================================================
+#  core/repository/async_memory_impl.py
+# =========================================================
+"""
+インメモリ実装の非同期版。
+
+MemoryRepository とクラス変数のストア / ロックを共有するため、
+同期ルート（Celery タスク等）で書いた内容を async ルートから即座に読める。
+I/O が無いので await 中にイベントループへ制御を返すことは無い。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from .async_base import AsyncBaseRepository
+from .base import Page
+from .memory_impl import MemoryRepository
+
+
+class AsyncMemoryRepository(AsyncBaseRepository):
+    """MemoryRepository の async ラッパ。"""
+
+    def __init__(self, table: str = "default") -> None:
+        super().__init__(table=table)
+        self._sync = MemoryRepository(table=table)
+
+    async def create(self, key: str, record: Dict[str, Any]) -> None:
+        self._sync.create(key, record)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._sync.get(key)
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        return self._sync.list_page(limit, cursor, filters, order)
+
+    async def delete(self, key: str) -> None:
+        self._sync.delete(key)
+
+    async def exists(self, key: str) -> bool:
+        return self._sync.exists(key)
+
+    async def patch(self, key: str, partial: Dict[str, Any]) -> None:
+        self._sync.patch(key, partial)
+
+    async def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        self._sync.create_many(items)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return self._sync.get_many(keys)
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        self._sync.delete_many(keys)
@@ -0,0 +1,158 @@
+# =====================================================================
+# core/repository/async_postgres_impl.py
+# ---------------------------------------------------------------------
+#  psycopg-3 非同期ドライバで実装する JSONB 汎用ストア
+#  • SQL / プール設定は postgres_impl と共用（build_statements / PG_POOL_*）
+#  • バルク API も同じ unnest / ANY(%s) 文で 1 往復
+#  • AsyncConnectionPool はイベントループに紐付くため、初回 await 時に
+#    そのループ上で open する（import 時には接続しない）
+# =====================================================================
+# pyright: reportMissingImports=false
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from psycopg_pool import AsyncConnectionPool  # type: ignore
+
+from core.common.codec import dumps
+
+from .async_base import AsyncBaseRepository
+from .base import Page, build_query, page_from_rows, unique_ids
+from .postgres_impl import (
+    _conninfo,
+    _pool_kwargs,
+    build_statements,
+    create_many_params,
+    list_statement,
+)
+
+logger = logging.getLogger(__name__)
+
+_APOOL: Optional[Any] = None
+_APOOL_LOCK: Optional[asyncio.Lock] = None
+
+
+async def _apool() -> Any:
+    """プロセス共通の AsyncConnectionPool を遅延生成して返す"""
+    global _APOOL, _APOOL_LOCK
+    if _APOOL is not None:
+        return _APOOL
+    if _APOOL_LOCK is None:
+        _APOOL_LOCK = asyncio.Lock()
+    async with _APOOL_LOCK:
+        if _APOOL is None:
+            pool = AsyncConnectionPool(
+                _conninfo(),
+                check=getattr(AsyncConnectionPool, "check_connection", None),
+                name="mmopdca-pg-async",
+                open=False,
+                **_pool_kwargs(),
+            )
+            await pool.open()
+            _APOOL = pool
+            logger.info(
+                "[PG] async pool opened min=%s max=%s", pool.min_size, pool.max_size
+            )
+    return _APOOL
+
+
+async def close_async_pool() -> None:
+    """非同期プールを閉じる（FastAPI shutdown / テスト用）"""
+    global _APOOL
+    if _APOOL is not None:
+        await _APOOL.close()
+        _APOOL = None
+
+
+class AsyncPostgresRepository(AsyncBaseRepository):
+    """PostgreSQL(JSONB) Repository の非同期版"""
+
+    def __init__(self, *, table: str, schema: str = "public") -> None:
+        super().__init__(table=table)
+        self.schema = schema
+        self._sql = build_statements(schema, table)
+        self._initialized = False
+
+    async def _lazy(self) -> Any:
+        """プールを取得し、初回のみテーブルを用意"""
+        pool = await _apool()
+        if not self._initialized:
+            async with pool.connection() as cx:
+                await cx.execute(self._sql["ddl"])
+            self._initialized = True
+        return pool
+
+    async def create(self, obj_id: str, data: Mapping[str, Any]) -> None:
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            await cx.execute(
+                self._sql["create"], (self.tenant_id, obj_id, dumps(data))
+            )
+
+    async def patch(self, obj_id: str, partial: Mapping[str, Any]) -> None:
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            await cx.execute(
+                self._sql["patch"], (self.tenant_id, obj_id, dumps(partial))
+            )
+
+    async def get(self, obj_id: str) -> Optional[Dict[str, Any]]:
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            cur = await cx.execute(self._sql["get"], (self.tenant_id, obj_id))
+            row = await cur.fetchone()
+        return row[0] if row else None
+
+    async def exists(self, obj_id: str) -> bool:
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            cur = await cx.execute(self._sql["exists"], (self.tenant_id, obj_id))
+            return await cur.fetchone() is not None
+
+    async def delete(self, obj_id: str) -> None:
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            await cx.execute(self._sql["delete"], (self.tenant_id, obj_id))
+
+    async def create_many(self, items: Mapping[str, Mapping[str, Any]]) -> None:
+        if not items:
+            return
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            await cx.execute(self._sql["create_many"], create_many_params(self.tenant_id, items))
+
+    async def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = unique_ids(obj_ids)
+        if not ids:
+            return {}
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            cur = await cx.execute(self._sql["get_many"], (self.tenant_id, ids))
+            found = dict(await cur.fetchall())
+        return {i: found[i] for i in ids if i in found}
+
+    async def delete_many(self, obj_ids: Iterable[str]) -> None:
+        ids = unique_ids(obj_ids)
+        if not ids:
+            return
+        pool = await self._lazy()
+        async with pool.connection() as cx:
+            await cx.execute(self._sql["delete_many"], (self.tenant_id, ids))
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        pool = await self._lazy()
+        q = build_query(limit, cursor, filters, order)
+        sql, params = list_statement(self.schema, self.table, self.tenant_id, q)
+        async with pool.connection() as cx:
+            cur = await cx.execute(sql, params)
+            rows = await cur.fetchall()
+        return page_from_rows(rows, q.limit)
@@ -0,0 +1,293 @@
+# =========================================================
+# ASSIST_KEY: 【core/repository/async_redis_impl.py】
+# =========================================================
+#
+# 【概要】
+#   RedisRepository の非同期版（redis.asyncio）。
+#   キー形式 / 値形式は同期版と同一（``{prefix}:{id}`` → JSON 文字列）
+#   なので、Celery ワーカーが同期版で書いたレコードをそのまま読める。
+#
+# 【主な役割】
+#   - create / get / patch / delete / list / exists を coroutine で提供
+#   - create_many / get_many / delete_many は MSET・MGET・pipeline（同期版と同じ）
+#   - patch は WATCH/MULTI の楽観ロック（同期版と同じ方針）
+#   - セカンダリ索引 SET / 時刻 ZSET も同期版と同じキーで更新 / 参照
+#     （backfill は同期版 reindex()。完了マーカーが立つまで list は SCAN）
+#   - RETENTION_TTL_DAYS 対象テーブルの EXPIRE 付与も同期版と同じ
+#
+# 【連携先・依存関係】
+#   - core.repository.factory.get_async_repo … DI 入口
+#   - 外部設定 : 環境変数 `REDIS_URL`
+# ---------------------------------------------------------
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis  # optional – redis-py>=4.2
+
+from core.common.codec import dumps, loads
+
+from .async_base import AsyncBaseRepository
+from .base import (
+    ListQuery,
+    Page,
+    build_query,
+    chunked,
+    matches,
+    page_from_rows,
+    paginate,
+    unique_ids,
+)
+from .indexes import indexed_fields
+from .ttl import key_ttl_seconds
+from .redis_impl import (
+    _BATCH,
+    WriteFn,
+    after_cursor,
+    index_keys,
+    index_lookup_keys,
+    ms_to_iso,
+    now_ms,
+    page_keys,
+    ready_key,
+    score_bounds,
+    ts_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedisRepository(AsyncBaseRepository):
+    """1 Key = 1 JSON ドキュメントの非同期ストア"""
+
+    def __init__(
+        self,
+        table: str = "mmop",
+        *,
+        url: str | None = None,
+        db: int = 1,
+        **redis_opts: Any,
+    ) -> None:
+        super().__init__(table=table)
+        self._prefix: str = f"{table}:"
+        self._indexed = sorted(indexed_fields(table))
+        self._ts = ts_key(table)
+        self._ttl = key_ttl_seconds(table)
+        redis_url = url or os.getenv("REDIS_URL") or f"redis://127.0.0.1:6379/{db}"
+        # from_url は接続を張らない（初回コマンド時にプールから取得）
+        self._r: aioredis.Redis = aioredis.from_url(
+            redis_url, decode_responses=True, **redis_opts
+        )
+        logger.debug("[AsyncRedisRepo] init prefix=%s url=%s", self._prefix, redis_url)
+
+    def _k(self, id_: str) -> str:
+        return f"{self._prefix}{id_}"
+
+    # ------------------------------------------------------------------#
+    # public CRUD
+    # ------------------------------------------------------------------#
+    async def create(self, id_: str, doc: Dict[str, Any]) -> None:
+        if not self._indexed:
+            async with self._r.pipeline() as pipe:
+                pipe.set(self._k(id_), dumps(doc), ex=self._ttl)
+                pipe.zadd(self._ts, {id_: now_ms()}, nx=True)
+                await pipe.execute()
+            return
+        await self._write(id_, lambda _old: doc)
+
+    async def patch(self, id_: str, partial: Dict[str, Any]) -> None:
+        await self._write(id_, lambda old: {**(old or {}), **partial})
+
+    async def _write(
+        self, id_: str, build: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]
+    ) -> None:
+        await self._write_many([id_], lambda _id, old: build(old))
+
+    async def _write_many(self, ids: Sequence[str], build: WriteFn) -> None:
+        """WATCH/MULTI で本体・索引 SET・時刻 ZSET を同時更新（同期版 _write_many と同じ）"""
+        for chunk in chunked(ids, _BATCH):
+            keys = [self._k(i) for i in chunk]
+            async with self._r.pipeline() as pipe:
+                while True:
+                    try:
+                        await pipe.watch(*keys)
+                        raws = await pipe.mget(keys)
+                        pipe.multi()
+                        ts = now_ms()
+                        for id_, key, raw in zip(chunk, keys, raws):
+                            old = loads(raw) if raw is not None else None
+                            new = build(id_, old)
+                            if new is None:
+                                pipe.delete(key)
+                                pipe.zrem(self._ts, id_)
+                            else:
+                                pipe.set(key, dumps(new), ex=self._ttl)
+                                pipe.zadd(self._ts, {id_: ts}, nx=True)
+                            before = index_keys(self.table, self._indexed, old)
+                            after = index_keys(self.table, self._indexed, new)
+                            for ix in before - after:
+                                pipe.srem(ix, id_)
+                            for ix in after - before:
+                                pipe.sadd(ix, id_)
+                        await pipe.execute()
+                        break
+                    except redis.WatchError:
+                        logger.debug("[AsyncRedisRepo] write conflict keys=%s – retry", len(keys))
+                        continue
+
+    async def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        if self._indexed:
+            await self._write_many(list(items), lambda id_, _old: items[id_])
+            return
+        for chunk in chunked(list(items), _BATCH):
+            ts = now_ms()
+            async with self._r.pipeline() as pipe:
+                pipe.mset({self._k(i): dumps(items[i]) for i in chunk})
+                if self._ttl:
+                    for i in chunk:
+                        pipe.expire(self._k(i), self._ttl)
+                pipe.zadd(self._ts, {i: ts for i in chunk}, nx=True)
+                await pipe.execute()
+
+    async def get_many(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        uniq = unique_ids(ids)
+        return {i: d for i, d in zip(uniq, await self._mget(uniq)) if d is not None}
+
+    async def delete_many(self, ids: Iterable[str]) -> None:
+        uniq = unique_ids(ids)
+        if self._indexed:
+            await self._write_many(uniq, lambda _id, _old: None)
+            return
+        for chunk in chunked(uniq, _BATCH):
+            async with self._r.pipeline() as pipe:
+                pipe.delete(*[self._k(i) for i in chunk])
+                pipe.zrem(self._ts, *chunk)
+                await pipe.execute()
+
+    async def get(self, id_: str) -> Dict[str, Any] | None:
+        raw = await self._r.get(self._k(id_))
+        return loads(raw) if raw is not None else None
+
+    async def delete(self, id_: str) -> None:
+        if not self._indexed:
+            async with self._r.pipeline() as pipe:
+                pipe.delete(self._k(id_))
+                pipe.zrem(self._ts, id_)
+                await pipe.execute()
+            return
+        await self._write(id_, lambda _old: None)
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        """同期版 list_page と同じ経路（索引 SET → ZMSCORE → ページ分 MGET / 時刻 ZSET / SCAN）"""
+        q = build_query(limit, cursor, filters, order)
+        if not await self._r.exists(ready_key(self.table)):
+            return paginate(await self._scan_rows(), q)
+
+        groups = index_lookup_keys(self.table, self._indexed, q)
+        source: AsyncIterator[Tuple[str, str, Dict[str, Any]]]
+        if groups:
+            ids = await self._index_ids(groups)
+            keys = page_keys(q, ids, await self._zmscore(ids))
+            source = self._rows_for_scores(keys, q.limit)
+        else:
+            source = self._zscan(q)
+
+        rows: List[Tuple[str, str, Dict[str, Any]]] = []
+        want = None if q.limit is None else q.limit + 1
+        async for created, id_, doc in source:
+            if matches(doc, q.eq):
+                rows.append((created, id_, doc))
+                if want is not None and len(rows) >= want:
+                    break
+        return page_from_rows(rows, q.limit)
+
+    async def exists(self, id_: str) -> bool:
+        return await self._r.exists(self._k(id_)) > 0
+
+    async def aclose(self) -> None:
+        # redis-py 5.0.1 で close() → aclose() に改名
+        closer = getattr(self._r, "aclose", None) or self._r.close
+        await closer()
+
+    # ------------------------------------------------------------------#
+    # private
+    # ------------------------------------------------------------------#
+    async def _mget(self, ids: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        out: List[Optional[Dict[str, Any]]] = []
+        for i in range(0, len(ids), _BATCH):
+            chunk = ids[i : i + _BATCH]
+            raws = await self._r.mget([self._k(x) for x in chunk])
+            for id_, raw in zip(chunk, raws):
+                try:
+                    out.append(loads(raw) if raw is not None else None)
+                except ValueError:  # pragma: no cover
+                    logger.warning("[AsyncRedisRepo] invalid JSON on id=%s", id_)
+                    out.append(None)
+        return out
+
+    async def _zscan(self, q: ListQuery) -> AsyncIterator[Tuple[str, str, Dict[str, Any]]]:
+        lo, hi = score_bounds(q)
+        offset = 0
+        while True:
+            if q.desc:
+                batch = await self._r.zrevrangebyscore(
+                    self._ts, hi, lo, start=offset, num=_BATCH, withscores=True
+                )
+            else:
+                batch = await self._r.zrangebyscore(
+                    self._ts, lo, hi, start=offset, num=_BATCH, withscores=True
+                )
+            if not batch:
+                return
+            offset += len(batch)
+            batch = [(m, s) for m, s in batch if after_cursor(q, s, m)]
+            docs = await self._mget([m for m, _ in batch])
+            for (id_, score), doc in zip(batch, docs):
+                if doc is not None:
+                    yield ms_to_iso(score), id_, doc
+
+    async def _index_ids(self, groups: List[List[str]]) -> List[str]:
+        if all(len(keys) == 1 for keys in groups):
+            return sorted(await self._r.sinter([keys[0] for keys in groups]))
+        ids: Optional[Set[str]] = None
+        for keys in groups:
+            members: Set[str] = set(await self._r.sunion(keys))
+            ids = members if ids is None else ids & members
+            if not ids:
+                break
+        return sorted(ids or ())
+
+    async def _zmscore(self, ids: Sequence[str]) -> List[Optional[float]]:
+        async with self._r.pipeline(transaction=False) as pipe:
+            for chunk in chunked(ids, _BATCH):
+                pipe.zmscore(self._ts, list(chunk))
+            results = await pipe.execute()
+        return [s for scores in results for s in scores]
+
+    async def _rows_for_scores(
+        self, keys: Sequence[Tuple[float, str]], limit: Optional[int]
+    ) -> AsyncIterator[Tuple[str, str, Dict[str, Any]]]:
+        size = _BATCH if limit is None else min(_BATCH, limit + 1)
+        for chunk in chunked(keys, size):
+            for (score, id_), doc in zip(chunk, await self._mget([i for _, i in chunk])):
+                if doc is not None:
+                    yield ms_to_iso(score), id_, doc
+
+    async def _scan_rows(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """reindex() 完了前の経路: SCAN + MGET"""
+        ids = [k[len(self._prefix):] async for k in self._r.scan_iter(f"{self._prefix}*", count=_BATCH)]
+        return [
+            (str(doc.get("created_at") or ""), id_, doc)
+            for id_, doc in zip(ids, await self._mget(ids))
+            if doc is not None
+        ]
@@ -0,0 +1,181 @@
+# =========================================================
+# ASSIST_KEY: core/repository/async_sqlite_impl.py
+# =========================================================
+#
+# SQLite JSON ストアの非同期版（aiosqlite）
+# -----------------------------------------------------------
+# * スキーマ作成 / 旧テーブル救済は同期版 SQLiteRepository に任せ、
+#   初回生成時に 1 度だけ実行する。
+# * 接続は初回 await 時に遅延オープン（イベントループ外での生成に対応）。
+# * 接続は 1 本を全コルーチンで共有するため、書き込みは _transaction() で
+#   asyncio.Lock により直列化する（他リクエストの文が同じトランザクションに
+#   混ざって commit / rollback されないように）。
+# * patch の UPSERT 文は sqlite_impl.patch_statement を共用。
+# * バルク API も sqlite_impl の create_many_params / many_statements を共用。
+# -----------------------------------------------------------
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Mapping, Optional
+
+import aiosqlite  # optional – 無ければ factory が ThreadedAsyncRepository へ
+
+from core.common.codec import dumps, loads
+
+from .async_base import AsyncBaseRepository
+from .base import Page, build_query, page_from_rows, unique_ids
+from .sqlite_impl import (
+    SQLiteRepository,
+    create_many_params,
+    create_sql,
+    list_statement,
+    many_statements,
+    patch_statement,
+    pragma_statements,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSQLiteRepository(AsyncBaseRepository):
+    """{tenant_id, id} 複合 PK の JSON ストア（aiosqlite）"""
+
+    def __init__(
+        self,
+        path: str | Path = "mmopdca.db",
+        table: str = "plan",
+        tenant_id: str = "public",
+    ) -> None:
+        super().__init__(table=table, tenant_id=tenant_id)
+        self.path = str(path)
+        self.quoted = f'"{table}"'
+        # DDL は同期版で保証（同じファイル / 同じテーブル定義を共有）
+        self._sync = SQLiteRepository(path=path, table=table, tenant_id=tenant_id)
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._conn_lock: Optional[asyncio.Lock] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+
+    # ------------------------------------------------------------------ #
+    # 接続
+    # ------------------------------------------------------------------ #
+    async def _cx(self) -> aiosqlite.Connection:
+        if self._conn is not None:
+            return self._conn
+        if self._conn_lock is None:
+            self._conn_lock = asyncio.Lock()
+        async with self._conn_lock:
+            if self._conn is None:
+                conn = await aiosqlite.connect(self.path)
+                # SQLITE_MODE=production なら WAL 等も同期版と同じ設定に揃える
+                for pragma in pragma_statements(self._sync.production):
+                    await conn.execute(pragma)
+                self._conn = conn
+        return self._conn
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """書き込み 1 件分のトランザクション（ロック保持中に commit / 失敗時 rollback）"""
+        cx = await self._cx()
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            try:
+                yield cx
+            except BaseException:
+                await cx.rollback()
+                raise
+            await cx.commit()
+
+    async def aclose(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------ #
+    # CRUD
+    # ------------------------------------------------------------------ #
+    async def create(self, obj_id: str, data: Dict[str, Any]) -> None:
+        params = (self.tenant_id, obj_id, dumps(data))
+        async with self._transaction() as cx:
+            try:
+                await cx.execute(create_sql(self.quoted), params)
+            except sqlite3.OperationalError:
+                await cx.execute(create_sql(self.quoted, legacy=True), params)
+
+    async def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        stmt = patch_statement(self.quoted, self.tenant_id, obj_id, partial)
+        if stmt is not None:
+            try:
+                async with self._transaction() as cx:
+                    await cx.execute(*stmt)
+                return
+            except sqlite3.OperationalError as exc:  # rollback 済み
+                logger.debug("[AsyncSQLiteRepo] native patch unavailable: %s", exc)
+        await asyncio.to_thread(self._sync.patch, obj_id, partial)
+
+    async def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        rows = create_many_params(self.tenant_id, items)
+        if not rows:
+            return
+        async with self._transaction() as cx:
+            try:
+                await cx.executemany(create_sql(self.quoted), rows)
+            except sqlite3.OperationalError:
+                await cx.executemany(create_sql(self.quoted, legacy=True), rows)
+
+    async def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = unique_ids(obj_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        cx = await self._cx()
+        for stmt in many_statements("SELECT id, data", self.quoted, self.tenant_id, ids):
+            async with cx.execute(*stmt) as cur:
+                found.update((i, loads(d)) for i, d in await cur.fetchall())
+        return {i: found[i] for i in ids if i in found}
+
+    async def delete_many(self, obj_ids: Iterable[str]) -> None:
+        ids = unique_ids(obj_ids)
+        async with self._transaction() as cx:
+            for stmt in many_statements("DELETE", self.quoted, self.tenant_id, ids):
+                await cx.execute(*stmt)
+
+    async def get(self, obj_id: str) -> Dict[str, Any] | None:
+        cx = await self._cx()
+        async with cx.execute(
+            f"SELECT data FROM {self.quoted} WHERE tenant_id = ? AND id = ?",
+            (self.tenant_id, obj_id),
+        ) as cur:
+            row = await cur.fetchone()
+        return loads(row[0]) if row else None
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        q = build_query(limit, cursor, filters, order)
+        cx = await self._cx()
+        async with cx.execute(*list_statement(self.quoted, self.tenant_id, q)) as cur:
+            rows = [(c, i, loads(d)) for c, i, d in await cur.fetchall()]
+        return page_from_rows(rows, q.limit)
+
+    async def delete(self, obj_id: str) -> None:
+        async with self._transaction() as cx:
+            await cx.execute(
+                f"DELETE FROM {self.quoted} WHERE tenant_id = ? AND id = ?",
+                (self.tenant_id, obj_id),
+            )
+
+    async def exists(self, obj_id: str) -> bool:
+        cx = await self._cx()
+        async with cx.execute(
+            f"SELECT 1 FROM {self.quoted} WHERE tenant_id = ? AND id = ? LIMIT 1",
+            (self.tenant_id, obj_id),
+        ) as cur:
+            return await cur.fetchone() is not None
@@ -7,12 +7,178 @@
 # * すべての Repository 実装（memory / sqlite / postgres …）の親。
 # * マルチテナント対応を見据えて `tenant_id` を追加。
 # * CRUD のシグネチャのみ定義し、実装は各サブクラスへ委譲。
+# * patch() は汎用フォールバック付き。実装側で原子的に上書きする。
+# * list() / list_page() は (created_at, id) のキーセットページング。
+#   カーソル / フィルタの解釈はここで共通化し、SQL 化は各実装で行う。
+# * create_many() / get_many() / delete_many() は N 件を O(1) 往復で扱う
+#   バルク API。既定実装は 1 件ずつのループなので各実装で上書きする。
 # ---------------------------------------------------------
 
 from __future__ import annotations
 
+import base64
+import json
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+# フィルタキーは SQL / JSON パスへ直接埋め込むため識別子に限定する
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# 行の作成時刻（ストレージ側の created_at 列）に対する範囲フィルタ
+CREATED_GTE = "created_at__gte"
+CREATED_LT = "created_at__lt"
+
+_T = TypeVar("_T")
+
+
+class Page(NamedTuple):
+    """list_page() の戻り値。next_cursor が None なら最終ページ。"""
+
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    # items と同じ並びの (created_at, id)。保存キーが本文に無いテーブルの
+    # 一括処理（リテンション / バックエンド間移行）用
+    keys: Tuple[Tuple[Any, str], ...] = ()
+
+
+class ListQuery(NamedTuple):
+    """検証済みの list 条件（各実装が SQL / スキャン条件へ変換する）"""
+
+    limit: Optional[int]
+    after: Optional[Tuple[str, str]]  # カーソル位置 (created_at, id)
+    eq: Dict[str, Any]  # トップレベルキーの等値（list/tuple/set は IN）
+    created_gte: Optional[datetime]
+    created_lt: Optional[datetime]
+    desc: bool
+
+
+def encode_cursor(created_at: Any, obj_id: str) -> str:
+    """(created_at, id) を URL セーフな不透明文字列にする"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([str(created_at), obj_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """encode_cursor の逆変換。壊れたカーソルは ValueError"""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(cursor + pad))
+    except Exception as exc:  # noqa: BLE001 – 入力不正はすべて ValueError に揃える
+        raise ValueError(f"invalid cursor: {cursor!r}") from exc
+    return str(created_at), str(obj_id)
+
+
+def _as_utc(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        dt = value
+    else:  # py3.9/3.10 の fromisoformat は末尾 "Z" を解釈しない
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def build_query(
+    limit: Optional[int],
+    cursor: Optional[str],
+    filters: Optional[Mapping[str, Any]],
+    order: str,
+) -> ListQuery:
+    """list() 引数を検証して ListQuery にまとめる"""
+    if order not in ("asc", "desc"):
+        raise ValueError(f"order must be 'asc' or 'desc': {order!r}")
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be >= 1: {limit}")
+
+    eq: Dict[str, Any] = {}
+    gte = lt = None
+    for key, value in (filters or {}).items():
+        if key == CREATED_GTE:
+            gte = _as_utc(value)
+        elif key == CREATED_LT:
+            lt = _as_utc(value)
+        elif _FIELD_RE.match(key):
+            eq[key] = list(value) if isinstance(value, (list, tuple, set, frozenset)) else value
+        else:
+            raise ValueError(f"invalid filter field: {key!r}")
+
+    after = decode_cursor(cursor) if cursor else None
+    return ListQuery(limit, after, eq, gte, lt, order == "desc")
+
+
+def matches(doc: Mapping[str, Any], eq: Mapping[str, Any]) -> bool:
+    """等値フィルタの Python 評価（SQL を持たない実装用）"""
+    for key, want in eq.items():
+        got = doc.get(key)
+        if isinstance(want, list):
+            if got not in want:
+                return False
+        elif got != want:
+            return False
+    return True
+
+
+def paginate(
+    rows: Iterable[Tuple[str, str, Dict[str, Any]]], q: ListQuery
+) -> Page:
+    """
+    (created_at, id, doc) の列をメモリ上でフィルタ・整列・切り出す。
+
+    created_at は ISO8601 (UTC) 文字列で、辞書順 = 時刻順であること。
+    """
+    gte = q.created_gte.isoformat() if q.created_gte else None
+    lt = q.created_lt.isoformat() if q.created_lt else None
+    selected = []
+    for created, obj_id, doc in rows:
+        if gte is not None and created < gte:
+            continue
+        if lt is not None and created >= lt:
+            continue
+        if q.after is not None:
+            key = (created, obj_id)
+            if (key >= q.after) if q.desc else (key <= q.after):
+                continue
+        if not matches(doc, q.eq):
+            continue
+        selected.append((created, obj_id, doc))
+
+    selected.sort(key=lambda r: (r[0], r[1]), reverse=q.desc)
+    return page_from_rows(selected, q.limit)
+
+
+def page_from_rows(
+    rows: List[Tuple[Any, str, Dict[str, Any]]], limit: Optional[int]
+) -> Page:
+    """limit+1 件取得した結果から Page を作る（次ページ有無の判定）"""
+    cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        cursor = encode_cursor(rows[-1][0], rows[-1][1])
+    return Page([r[2] for r in rows], cursor, tuple((r[0], r[1]) for r in rows))
+
+
+def chunked(items: Sequence[_T], size: int) -> Iterator[Sequence[_T]]:
+    """バルク API 用: 1 文 / 1 コマンドあたりの件数上限で分割する"""
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def unique_ids(obj_ids: Iterable[str]) -> List[str]:
+    """重複を除いた id 列（入力順を保持）"""
+    return list(dict.fromkeys(obj_ids))
 
 
 class BaseRepository(ABC):
@@ -44,12 +210,111 @@ class BaseRepository(ABC):
         """id で 1 件取得。無ければ None"""
         raise NotImplementedError
 
+    def list(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> List[Dict[str, Any]]:
+        """tenant 内のオブジェクトを新しい順で一覧取得（引数は list_page と同じ）"""
+        return self.list_page(limit, cursor, filters, order).items
+
     @abstractmethod
-    def list(self) -> List[Dict[str, Any]]:
-        """tenant 内のオブジェクトを新しい順で一覧取得"""
+    def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        """
+        (created_at, id) のキーセットページングで 1 ページ取得する。
+
+        Parameters
+        ----------
+        limit : int | None
+            最大件数。None なら全件（next_cursor は常に None）。
+        cursor : str | None
+            前ページの Page.next_cursor。
+        filters : Mapping | None
+            トップレベルキーの等値条件（値が list なら IN）と
+            ``created_at__gte`` / ``created_at__lt``（行の作成時刻）。
+        order : "desc" | "asc"
+            created_at の並び順。
+        """
         raise NotImplementedError
 
+    def list_by(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+        **eq: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        等値条件での検索（``list(filters=eq)`` の糖衣）。
+
+        indexes.SECONDARY_INDEXES に登録したフィールドは索引で引かれる。
+        例: ``repo.list_by(plan_id="plan_x", status="RUNNING")``
+        """
+        return self.list(limit, cursor, eq, order)
+
     @abstractmethod
     def delete(self, obj_id: str) -> None:
         """id を指定して削除（存在しなくてもエラーにしない）"""
         raise NotImplementedError
+
+    # -----------------------------------------------------
+    # バルク操作
+    # -----------------------------------------------------
+    def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        """
+        {id: data} をまとめて保存（同 ID は上書き = create と同じ意味）。
+
+        既定実装は create() のループ。各バックエンドは 1 文 / 1 パイプラインで上書きすること。
+        """
+        for obj_id, data in items.items():
+            self.create(obj_id, data)
+
+    def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数 id をまとめて取得し {id: data} を返す。
+
+        存在しない id は結果に含めない。キー順は obj_ids の順（重複は 1 回）。
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        for obj_id in unique_ids(obj_ids):
+            doc = self.get(obj_id)
+            if doc is not None:
+                out[obj_id] = doc
+        return out
+
+    def delete_many(self, obj_ids: Iterable[str]) -> None:
+        """複数 id をまとめて削除（存在しない id は無視）"""
+        for obj_id in unique_ids(obj_ids):
+            self.delete(obj_id)
+
+    def import_rows(self, rows: Sequence[Tuple[Any, str, Dict[str, Any]]]) -> None:
+        """
+        (created_at, id, data) をまとめて UPSERT し、作成時刻も元の値で保存する
+        （バックエンド間移行用。created_at は datetime か ISO8601 文字列）。
+
+        既定実装は create_many() で、作成時刻は保存時刻になる。
+        """
+        self.create_many({obj_id: data for _, obj_id, data in rows})
+
+    # -----------------------------------------------------
+    # 部分更新
+    # -----------------------------------------------------
+    def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        """
+        トップレベルのキーをマージ保存（無ければ partial で新規作成）。
+
+        既定実装は get → merge → create の 3 往復で原子的ではない。
+        各バックエンドはネイティブな 1 往復・原子的実装で上書きすること。
+        """
+        current = self.get(obj_id) or {}
+        current.update(partial)
+        self.create(obj_id, current)
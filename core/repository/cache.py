@@ -0,0 +1,467 @@
+# =========================================================
+# ASSIST_KEY: 【core/repository/cache.py】
+# =========================================================
+#
+# 【概要】
+#   Repository 用の read-through キャッシュ層。
+#   get_repo() / get_async_repo() が返す任意の Repository を包み、
+#   get / get_many / exists をプロセス内 LRU から返す。
+#   ステータスポーリング（GET /do/{id} 等）や enqueue_do の Plan 再読込で
+#   同じレコードを何度も DB へ取りに行くのを避けるのが目的。
+#
+# 【主な役割】
+#   - RepoCache              : 件数上限付き LRU + TTL + ネガティブキャッシュ
+#   - CachedRepository       : 同期 Repository のデコレータ
+#   - AsyncCachedRepository  : 非同期 Repository のデコレータ
+#   - 書き込み (create / patch / delete / *_many) はローカル無効化 +
+#     Redis pub/sub で他 Pod / Celery ワーカーへ無効化をブロードキャスト
+#   - Prometheus Counter (pdca_repo_cache_requests_total /
+#     pdca_repo_cache_invalidations_total) でヒット率を可視化
+#
+# 【外部設定】
+#   REPO_CACHE_TABLES      : キャッシュするテーブル (例 "plan,do"。空 = 無効)
+#   REPO_CACHE_MAX         : 保持件数上限（全テーブル合計, default 4096）
+#   REPO_CACHE_TTL         : ヒット値の有効秒数 (default 5.0)
+#   REPO_CACHE_NEG_TTL     : 「存在しない」結果の有効秒数 (default 1.0, 0 = 無効)
+#   REPO_CACHE_CHANNEL     : 無効化用 pub/sub チャネル (default "mmopdca:repo-cache")
+#   REPO_CACHE_REDIS_URL   : pub/sub 接続先（未設定なら REDIS_URL。どちらも無ければ
+#                            ブロードキャスト無し = プロセス内のみ）
+#
+# 【ルール遵守】
+#   1) list / list_page / list_by はキャッシュしない（常に最新の一覧）
+#   2) 書き込み側にも同じ REPO_CACHE_TABLES を設定すること
+#      （無効化は書いたプロセスが publish する）。取りこぼしは TTL で収束
+#   3) 値は codec (core/common/codec.py) の JSON 文字列で保持し、ヒットのたびに新しい dict を返す
+#      （呼び出し側の破壊的変更がキャッシュへ波及しない）
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from core.common.codec import dumps, loads
+
+from .async_base import AsyncBaseRepository
+from .base import Page, unique_ids
+
+try:
+    from prometheus_client import Counter  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    Counter = None  # type: ignore
+
+try:
+    import redis  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    redis = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CacheConfig",
+    "RepoCache",
+    "CachedRepository",
+    "AsyncCachedRepository",
+    "get_repo_cache",
+    "maybe_cached",
+    "maybe_cached_async",
+]
+
+# --------------------------------------------------------------------------- #
+# Prometheus metrics
+# --------------------------------------------------------------------------- #
+if Counter is not None:
+    _REQUESTS = Counter(
+        "pdca_repo_cache_requests_total",
+        "Repository cache lookups",
+        ["table", "result"],  # hit / negative_hit / miss
+    )
+    _INVALIDATIONS = Counter(
+        "pdca_repo_cache_invalidations_total",
+        "Repository cache invalidations",
+        ["table", "source"],  # local / remote
+    )
+else:  # pragma: no cover
+    _REQUESTS = _INVALIDATIONS = None
+
+_MISSING = object()  # ネガティブキャッシュの番兵
+
+
+# --------------------------------------------------------------------------- #
+# 設定
+# --------------------------------------------------------------------------- #
+@dataclass(frozen=True)
+class CacheConfig:
+    """キャッシュ設定。tables が空ならキャッシュ無効。"""
+
+    tables: FrozenSet[str] = frozenset()
+    max_entries: int = 4096
+    ttl: float = 5.0
+    negative_ttl: float = 1.0
+    channel: str = "mmopdca:repo-cache"
+    redis_url: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "CacheConfig":
+        tables = os.getenv("REPO_CACHE_TABLES", "")
+        return cls(
+            tables=frozenset(t.strip() for t in tables.split(",") if t.strip()),
+            max_entries=int(os.getenv("REPO_CACHE_MAX", "4096")),
+            ttl=float(os.getenv("REPO_CACHE_TTL", "5.0")),
+            negative_ttl=float(os.getenv("REPO_CACHE_NEG_TTL", "1.0")),
+            channel=os.getenv("REPO_CACHE_CHANNEL", "mmopdca:repo-cache"),
+            redis_url=os.getenv("REPO_CACHE_REDIS_URL") or os.getenv("REDIS_URL"),
+        )
+
+
+# --------------------------------------------------------------------------- #
+# LRU + TTL 本体
+# --------------------------------------------------------------------------- #
+class RepoCache:
+    """
+    (table, id) → JSON 文字列 / _MISSING の LRU。
+
+    読み込み中に書き込みが割り込んだ場合に古い値を入れ直さないよう、
+    キーごとの世代番号を持つ（version() で取得 → put() 時に一致した時だけ保存）。
+    clear() / 世代表の掃除ではエポックを進め、進行中の put をすべて捨てる。
+    """
+
+    def __init__(self, config: CacheConfig) -> None:
+        self.config = config
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._gen: Dict[Tuple[str, str], int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self._origin = uuid.uuid4().hex
+        self._bus: Any = None
+        self._pubsub_thread: Any = None
+
+    # ---- lookup ------------------------------------------------------- #
+    def lookup(self, table: str, obj_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(hit, value)。ネガティブヒットは (True, None)"""
+        key = (table, obj_id)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            self._count(table, "miss")
+            return False, None
+        if entry[1] is _MISSING:
+            self._count(table, "negative_hit")
+            return True, None
+        self._count(table, "hit")
+        return True, loads(entry[1])
+
+    def version(self, table: str, obj_id: str) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._gen.get((table, obj_id), 0)
+
+    def put(
+        self,
+        table: str,
+        obj_id: str,
+        value: Optional[Mapping[str, Any]],
+        version: Tuple[int, int],
+    ) -> None:
+        """DB から読んだ値を保存（読み込み開始後に無効化されていれば捨てる）"""
+        ttl = self.config.ttl if value is not None else self.config.negative_ttl
+        if ttl <= 0:
+            return
+        key = (table, obj_id)
+        stored = dumps(value) if value is not None else _MISSING
+        with self._lock:
+            if (self._epoch, self._gen.get(key, 0)) != version:
+                return
+            self._data[key] = (time.monotonic() + ttl, stored)
+            self._data.move_to_end(key)
+            while len(self._data) > self.config.max_entries:
+                self._data.popitem(last=False)
+
+    # ---- invalidation ------------------------------------------------- #
+    def invalidate(self, table: str, obj_ids: Iterable[str], *, broadcast: bool = True) -> None:
+        ids = list(obj_ids)
+        if not ids:
+            return
+        with self._lock:
+            for obj_id in ids:
+                key = (table, obj_id)
+                self._data.pop(key, None)
+                self._gen[key] = self._gen.get(key, 0) + 1
+            if len(self._gen) > 4 * self.config.max_entries:
+                # 世代表の肥大化防止。エポックを進めるので進行中の put は捨てられる
+                self._gen.clear()
+                self._epoch += 1
+        if _INVALIDATIONS is not None:
+            _INVALIDATIONS.labels(table, "local" if broadcast else "remote").inc(len(ids))
+        if broadcast:
+            self._publish(table, ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._gen.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    # ---- pub/sub ------------------------------------------------------ #
+    def start_bus(self) -> None:
+        """Redis pub/sub の購読スレッドを起動（接続できなければプロセス内のみで動作）"""
+        url = self.config.redis_url
+        if not url or redis is None or self._bus is not None:
+            return
+        try:
+            client = redis.from_url(url, decode_responses=True)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.config.channel: self._on_message})
+            self._pubsub_thread = pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True, exception_handler=self._on_bus_error
+            )
+            self._bus = client
+            logger.info("[RepoCache] invalidation bus subscribed channel=%s", self.config.channel)
+        except Exception as exc:  # noqa: BLE001 – キャッシュ無効化は TTL で収束させる
+            logger.warning("[RepoCache] pub/sub unavailable (%s) – local invalidation only", exc)
+
+    def _publish(self, table: str, ids: List[str]) -> None:
+        if self._bus is None:
+            return
+        msg = json.dumps({"o": self._origin, "t": table, "ids": ids})
+        try:
+            self._bus.publish(self.config.channel, msg)
+        except Exception as exc:  # noqa: BLE001 – 書き込み自体は成功させる
+            logger.warning("[RepoCache] publish failed: %s", exc)
+
+    def _on_message(self, message: Mapping[str, Any]) -> None:
+        try:
+            body = json.loads(message["data"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if body.get("o") == self._origin:
+            return  # 自プロセスの書き込みはローカルで無効化済み
+        self.invalidate(str(body.get("t")), map(str, body.get("ids") or ()), broadcast=False)
+
+    def _on_bus_error(self, exc: Exception, pubsub: Any, thread: Any) -> None:
+        # 購読が切れている間の無効化は受け取れないので全消去して安全側へ
+        logger.warning("[RepoCache] pub/sub error: %s – cache cleared", exc)
+        self.clear()
+        time.sleep(1.0)
+
+    def _count(self, table: str, result: str) -> None:
+        if _REQUESTS is not None:
+            _REQUESTS.labels(table, result).inc()
+
+
+# --------------------------------------------------------------------------- #
+# Repository デコレータ
+# --------------------------------------------------------------------------- #
+class CachedRepository:
+    """
+    同期 Repository を包む read-through キャッシュ。
+
+    キャッシュ対象外のメソッド（keys / reindex / list_range 等）は
+    __getattr__ でそのまま内側の Repository へ委譲する。
+    無効化を伴う書き込みは create / update / patch / delete / *_many のみ。
+    """
+
+    def __init__(self, repo: Any, cache: RepoCache) -> None:
+        self.inner = repo
+        self.cache = cache
+        self.table: str = getattr(repo, "table", "")
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "inner":  # 初期化前（copy / pickle 時）の再帰防止
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    # ---- read --------------------------------------------------------- #
+    def get(self, obj_id: str) -> Optional[Dict[str, Any]]:
+        hit, value = self.cache.lookup(self.table, obj_id)
+        if hit:
+            return value
+        version = self.cache.version(self.table, obj_id)
+        value = self.inner.get(obj_id)
+        self.cache.put(self.table, obj_id, value, version)
+        return value
+
+    def exists(self, obj_id: str) -> bool:
+        return self.get(obj_id) is not None
+
+    def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """ヒット分を除いた id だけを内側の get_many で 1 往復取得"""
+        ids = unique_ids(obj_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, Tuple[int, int]] = {}
+        for obj_id in ids:
+            hit, value = self.cache.lookup(self.table, obj_id)
+            if not hit:
+                missing[obj_id] = self.cache.version(self.table, obj_id)
+            elif value is not None:
+                found[obj_id] = value
+        if missing:
+            fetched = self.inner.get_many(list(missing))
+            for obj_id, version in missing.items():
+                self.cache.put(self.table, obj_id, fetched.get(obj_id), version)
+            found.update(fetched)
+        return {i: found[i] for i in ids if i in found}
+
+    def list(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self.inner.list(*args, **kwargs)
+
+    def list_page(self, *args: Any, **kwargs: Any) -> Page:
+        return self.inner.list_page(*args, **kwargs)
+
+    # ---- write（内側へ書いてから無効化） ------------------------------ #
+    def create(self, obj_id: str, data: Dict[str, Any]) -> None:
+        self.inner.create(obj_id, data)
+        self.cache.invalidate(self.table, [obj_id])
+
+    def update(self, obj_id: str, data: Dict[str, Any]) -> None:
+        self.inner.update(obj_id, data)
+        self.cache.invalidate(self.table, [obj_id])
+
+    def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        self.inner.patch(obj_id, partial)
+        self.cache.invalidate(self.table, [obj_id])
+
+    def delete(self, obj_id: str) -> None:
+        self.inner.delete(obj_id)
+        self.cache.invalidate(self.table, [obj_id])
+
+    def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        self.inner.create_many(items)
+        self.cache.invalidate(self.table, list(items))
+
+    def delete_many(self, obj_ids: Iterable[str]) -> None:
+        ids = unique_ids(obj_ids)
+        self.inner.delete_many(ids)
+        self.cache.invalidate(self.table, ids)
+
+    def import_rows(self, rows: Sequence[Tuple[Any, str, Dict[str, Any]]]) -> None:
+        self.inner.import_rows(rows)
+        self.cache.invalidate(self.table, [obj_id for _, obj_id, _ in rows])
+
+
+class AsyncCachedRepository(AsyncBaseRepository):
+    """非同期 Repository 版（CachedRepository と同じ RepoCache を共有）"""
+
+    def __init__(self, repo: AsyncBaseRepository, cache: RepoCache) -> None:
+        super().__init__(table=repo.table, tenant_id=repo.tenant_id)
+        self.inner = repo
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "inner":  # 初期化前（copy / pickle 時）の再帰防止
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def get(self, obj_id: str) -> Optional[Dict[str, Any]]:
+        hit, value = self.cache.lookup(self.table, obj_id)
+        if hit:
+            return value
+        version = self.cache.version(self.table, obj_id)
+        value = await self.inner.get(obj_id)
+        self.cache.put(self.table, obj_id, value, version)
+        return value
+
+    async def exists(self, obj_id: str) -> bool:
+        return await self.get(obj_id) is not None
+
+    async def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = unique_ids(obj_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, Tuple[int, int]] = {}
+        for obj_id in ids:
+            hit, value = self.cache.lookup(self.table, obj_id)
+            if not hit:
+                missing[obj_id] = self.cache.version(self.table, obj_id)
+            elif value is not None:
+                found[obj_id] = value
+        if missing:
+            fetched = await self.inner.get_many(list(missing))
+            for obj_id, version in missing.items():
+                self.cache.put(self.table, obj_id, fetched.get(obj_id), version)
+            found.update(fetched)
+        return {i: found[i] for i in ids if i in found}
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        return await self.inner.list_page(limit, cursor, filters, order)
+
+    async def create(self, obj_id: str, data: Dict[str, Any]) -> None:
+        await self.inner.create(obj_id, data)
+        self.cache.invalidate(self.table, [obj_id])
+
+    async def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        await self.inner.patch(obj_id, partial)
+        self.cache.invalidate(self.table, [obj_id])
+
+    async def delete(self, obj_id: str) -> None:
+        await self.inner.delete(obj_id)
+        self.cache.invalidate(self.table, [obj_id])
+
+    async def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        await self.inner.create_many(items)
+        self.cache.invalidate(self.table, list(items))
+
+    async def delete_many(self, obj_ids: Iterable[str]) -> None:
+        ids = unique_ids(obj_ids)
+        await self.inner.delete_many(ids)
+        self.cache.invalidate(self.table, ids)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+# --------------------------------------------------------------------------- #
+# Singleton / factory hook
+# --------------------------------------------------------------------------- #
+_CACHE: Optional[RepoCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_repo_cache() -> RepoCache:
+    """プロセス共通の RepoCache（初回に pub/sub 購読を開始）"""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                cache = RepoCache(CacheConfig.from_env())
+                if cache.config.tables:
+                    cache.start_bus()
+                _CACHE = cache
+    return _CACHE
+
+
+def _enabled(table: str) -> bool:
+    return table in CacheConfig.from_env().tables
+
+
+def maybe_cached(repo: Any, table: str) -> Any:
+    """REPO_CACHE_TABLES に含まれるテーブルなら CachedRepository で包む"""
+    return CachedRepository(repo, get_repo_cache()) if _enabled(table) else repo
+
+
+def maybe_cached_async(repo: AsyncBaseRepository, table: str) -> AsyncBaseRepository:
+    """maybe_cached の非同期版"""
+    return AsyncCachedRepository(repo, get_repo_cache()) if _enabled(table) else repo
@@ -4,12 +4,15 @@
 #
 # DoRepository ― Do フェーズ結果を永続化する PostgreSQL リポジトリ
 #   * 基底の PostgresRepository(JSONB 版) をほぼそのまま継承
-#   * 将来、Do 専用インデックスや検索 API を足したい場合は
-#     ここに override／utility を追加していく
+#     （接続は postgres_impl のプロセス共通 ConnectionPool を共有）
+#   * Do 専用の検索 API（list_by_plan）をここに置く。
+#     インデックス定義は core/repository/indexes.py
 # ---------------------------------------------------------
 
 from __future__ import annotations
 
+from typing import Any, Dict, List, Optional
+
 from core.repository.postgres_impl import PostgresRepository
 
 
@@ -29,16 +32,20 @@ class DoRepository(PostgresRepository):
         super().__init__(table="do", schema=schema)
 
     # -----------------------------------------------------------------
-    # 将来拡張ポイント（例）
+    # 検索 API（indexes.SECONDARY_INDEXES の ix_do__plan_id_status を使用）
     # -----------------------------------------------------------------
-    # def list_by_plan(self, plan_id: str) -> list[dict]:
-    #     """
-    #     指定 Plan に紐づく Do 結果を新しい順で返す。
-    #     """
-    #     q = """
-    #         SELECT data
-    #           FROM {schema}.do
-    #          WHERE data->>'plan_id' = %s
-    #          ORDER BY data->>'created_at' DESC
-    #     """.format(schema=self.schema)
-    #     return [row["data"] for row in self._execute(q, (plan_id,))]
+    def list_by_plan(
+        self,
+        plan_id: str,
+        *,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        指定 Plan に紐づく Do 結果を新しい順で返す（status で更に絞り込み可）。
+        """
+        eq: Dict[str, Any] = {"plan_id": plan_id}
+        if status is not None:
+            eq["status"] = status
+        return self.list_by(limit=limit, cursor=cursor, **eq)
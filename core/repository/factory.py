@@ -6,13 +6,21 @@
 #     • sqlite                       – 単一ファイル SQLite
 #     • postgres  (optional)        – PostgreSQL
 #     • redis     (optional)        – Redis Key-Value
+#   get_async_repo() は同じ切り替えで async 実装を返す。
+#   REPO_CACHE_TABLES に含まれるテーブルは read-through キャッシュ
+#   (core/repository/cache.py) で包んで返す。
+#   get_metrics_ts() は評価指標の時系列ストア (core/repository/metrics_ts.py)。
 # =====================================================================
 from __future__ import annotations
 
 import logging
 import os
 
+from .async_base import AsyncBaseRepository, ThreadedAsyncRepository
+from .async_memory_impl import AsyncMemoryRepository
+from .cache import maybe_cached, maybe_cached_async
 from .memory_impl import MemoryRepository
+from .metrics_ts import MemoryMetricsTS, MetricsTSStore, PostgresMetricsTS, SQLiteMetricsTS
 from .sqlite_impl import SQLiteRepository
 
 logger = logging.getLogger(__name__)
@@ -34,6 +42,22 @@ except ModuleNotFoundError:
     RedisRepository = None  # type: ignore[assignment]
     _HAS_REDIS = False
 
+# ── Async back-ends（FastAPI の async ルート用） ─────────
+try:
+    from .async_sqlite_impl import AsyncSQLiteRepository  # type: ignore
+except ModuleNotFoundError:
+    AsyncSQLiteRepository = None  # type: ignore[assignment,misc]
+
+try:
+    from .async_postgres_impl import AsyncPostgresRepository  # type: ignore
+except ModuleNotFoundError:
+    AsyncPostgresRepository = None  # type: ignore[assignment,misc]
+
+try:
+    from .async_redis_impl import AsyncRedisRepository  # type: ignore
+except ModuleNotFoundError:
+    AsyncRedisRepository = None  # type: ignore[assignment,misc]
+
 _SUPPORTED = (
     {"memory", "sqlite"}
     | ({"postgres"} if _HAS_PG else set())
@@ -41,7 +65,21 @@ _SUPPORTED = (
 )
 
 
-def get_repo(table: str = "plan"):
+def get_repo(table: str = "plan", *, backend: str | None = None):
+    """
+    Repository を返す（REPO_CACHE_TABLES 対象ならキャッシュ付き）。
+
+    Parameters
+    ----------
+    table : str
+        コレクション / テーブル名
+    backend : str, optional
+        DB_BACKEND の代わりに使うバックエンド名（移行 CLI 等で 2 系統を同時に開く用）
+    """
+    return maybe_cached(_make_repo(table, backend), table)
+
+
+def _make_repo(table: str, backend: str | None = None):
     """
     Repository を返す（Memory / SQLite / Postgres / Redis）。
 
@@ -49,8 +87,10 @@ def get_repo(table: str = "plan"):
     ----------
     table : str
         コレクション / テーブル名
+    backend : str, optional
+        未指定なら環境変数 DB_BACKEND
     """
-    backend = os.getenv("DB_BACKEND", "memory").lower()
+    backend = (backend or os.getenv("DB_BACKEND", "memory")).lower()
 
     # SQLite
     if backend == "sqlite":
@@ -72,3 +112,57 @@ def get_repo(table: str = "plan"):
             backend,
         )
     return MemoryRepository(table=table)
+
+
+def get_async_repo(table: str = "plan") -> AsyncBaseRepository:
+    """get_repo() の非同期版（REPO_CACHE_TABLES 対象ならキャッシュ付き）"""
+    return maybe_cached_async(_make_async_repo(table), table)
+
+
+def _make_async_repo(table: str) -> AsyncBaseRepository:
+    """
+    get_repo() の非同期版。DB_BACKEND に対応するネイティブ非同期実装を返す。
+
+    ドライバ（aiosqlite / psycopg_pool / redis.asyncio）が無い場合は
+    同期 Repository を ThreadedAsyncRepository で包んで返すため、
+    呼び出し側は常に await で扱える。
+    """
+    backend = os.getenv("DB_BACKEND", "memory").lower()
+
+    if backend == "sqlite" and AsyncSQLiteRepository is not None:
+        return AsyncSQLiteRepository(table=table)
+
+    if backend == "postgres" and AsyncPostgresRepository is not None:
+        schema = os.getenv("PG_SCHEMA", "public")
+        return AsyncPostgresRepository(table=table, schema=schema)
+
+    if backend == "redis" and AsyncRedisRepository is not None:
+        return AsyncRedisRepository(table=table)
+
+    if backend in ("memory", "") or backend not in _SUPPORTED:
+        return AsyncMemoryRepository(table=table)
+
+    logger.info("[RepoFactory] async driver for '%s' not installed → threaded", backend)
+    return ThreadedAsyncRepository(_make_repo(table))
+
+
+_TS_STORE: MetricsTSStore | None = None
+
+
+def get_metrics_ts() -> MetricsTSStore:
+    """
+    評価指標の時系列ストアを返す（プロセス内シングルトン）。
+
+    METRICS_TS_BACKEND（既定 DB_BACKEND）で切り替え、redis / 未知の値は
+    MemoryMetricsTS にフォールバックする。
+    """
+    global _TS_STORE
+    if _TS_STORE is None:
+        backend = os.getenv("METRICS_TS_BACKEND", os.getenv("DB_BACKEND", "memory")).lower()
+        if backend == "sqlite":
+            _TS_STORE = SQLiteMetricsTS()
+        elif backend == "postgres" and _HAS_PG:
+            _TS_STORE = PostgresMetricsTS(schema=os.getenv("PG_SCHEMA", "public"))
+        else:
+            _TS_STORE = MemoryMetricsTS()
+    return _TS_STORE
@@ -0,0 +1,69 @@
+# =========================================================
+# ASSIST_KEY: 【core/repository/indexes.py】
+# =========================================================
+#
+# 【概要】
+#   JSON ドキュメントストア用の “宣言的セカンダリインデックス” 定義。
+#   テーブルごとにトップレベルキーの組を登録しておくと、各バックエンドが
+#   同じ定義から索引を張る。
+#
+# 【バックエンド別の実体】
+#   - SQLite   : (tenant_id, json_extract(data,'$.k1'), ..., created_at, id)
+#                の式インデックス（_ensure_schema で作成）
+#   - Postgres : (tenant_id, (data->>'k1'), ..., created_at, id) の式インデックス
+#                （Alembic 5c1f0e7d2a9b が CONCURRENTLY で作成。実行時には作らない）
+#   - Redis    : 値ごとの SET  ``_idx:{table}:{field}:{value}`` → {id, ...}
+#                （既存キーへの backfill は RedisRepository.reindex() /
+#                 ``python -m cli.migrate_cli reindex``）
+#   - Memory   : 無し（全件走査で十分な規模のみ想定）
+#
+# 【ルール遵守】
+#   1) フィールドは文字列 / 数値 / bool / None のスカラー値のみ索引対象
+#   2) 定義を変えたら Alembic リビジョンも追加し、Redis は reindex を再実行すること
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Tuple
+
+__all__ = [
+    "SECONDARY_INDEXES",
+    "register_index",
+    "index_specs",
+    "indexed_fields",
+    "index_name",
+]
+
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# テーブル → 複合インデックス（左端一致で前方の列だけの検索にも効く）
+SECONDARY_INDEXES: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    # 「Plan X の RUNNING な Do 一覧」（ダッシュボード）/ 状態別件数
+    "do": (("plan_id", "status"), ("status",)),
+    "check": (("do_id",), ("status",)),
+    "act": (("check_id",),),
+}
+
+
+def register_index(table: str, *fields: str) -> None:
+    """インデックス定義を追加する（Repository 生成前に呼ぶこと）"""
+    if not fields or not all(_FIELD_RE.match(f) for f in fields):
+        raise ValueError(f"invalid index fields: {fields!r}")
+    specs = SECONDARY_INDEXES.get(table, ())
+    if tuple(fields) not in specs:
+        SECONDARY_INDEXES[table] = specs + (tuple(fields),)
+
+
+def index_specs(table: str) -> Tuple[Tuple[str, ...], ...]:
+    """テーブルに定義された複合インデックスの一覧"""
+    return SECONDARY_INDEXES.get(table, ())
+
+
+def indexed_fields(table: str) -> FrozenSet[str]:
+    """いずれかのインデックスに含まれるフィールド集合"""
+    return frozenset(f for spec in index_specs(table) for f in spec)
+
+
+def index_name(table: str, fields: Tuple[str, ...]) -> str:
+    """DB 上のインデックス名（SQLite / Postgres 共通）"""
+    return f"ix_{table}__{'_'.join(fields)}"
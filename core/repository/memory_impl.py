@@ -3,12 +3,17 @@
 # =========================================================
 """
 インメモリ実装 ― unittest やローカル開発用の軽量レポジトリ。
-スレッドセーフ性は（現状の用途では）考慮していません。
+読み書き単体のスレッドセーフ性は考慮していないが、patch() は
+read-modify-write のためテーブル共通ロックで保護する。
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .base import Page, _as_utc, build_query, paginate, unique_ids
 
 
 class MemoryRepository:
@@ -16,6 +21,10 @@ class MemoryRepository:
 
     # テーブル名 → ストア(dict) のシングルトン管理
     _TABLES: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    # テーブル名 → {key: 作成時刻 ISO8601}（list の並び順 / カーソル用）
+    _CREATED: Dict[str, Dict[str, str]] = {}
+    # patch() の read-modify-write を直列化するロック
+    _LOCK = threading.RLock()
 
     # --------------------------------------------------
     # constructor
@@ -23,12 +32,14 @@ class MemoryRepository:
     def __init__(self, table: str = "default") -> None:
         self.table = table
         MemoryRepository._TABLES.setdefault(table, {})
+        MemoryRepository._CREATED.setdefault(table, {})
 
     # --------------------------------------------------
     # CRUD
     # --------------------------------------------------
     def create(self, key: str, record: Dict[str, Any]) -> None:
         """Create or replace a record in the in-memory store."""
+        self._touch(key)
         self._store()[key] = record.copy()
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
@@ -50,21 +61,92 @@ class MemoryRepository:
         レコード削除。存在しなくてもエラーにはしない。
         """
         self._store().pop(key, None)
+        MemoryRepository._CREATED[self.table].pop(key, None)
+
+    def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        """複数件をまとめて作成 / 上書き（ロック内で一括反映）。"""
+        with MemoryRepository._LOCK:
+            store = self._store()
+            for key, record in items.items():
+                self._touch(key)
+                store[key] = record.copy()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数キーをまとめて取得。存在しないキーは結果に含めない。
+        """
+        store = self._store()
+        return {k: store[k] for k in unique_ids(keys) if k in store}
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """複数キーをまとめて削除（存在しなくてもエラーにしない）。"""
+        with MemoryRepository._LOCK:
+            created = MemoryRepository._CREATED[self.table]
+            for key in unique_ids(keys):
+                self._store().pop(key, None)
+                created.pop(key, None)
+
+    def import_rows(self, rows: Sequence[Tuple[Any, str, Dict[str, Any]]]) -> None:
+        """(created_at, key, record) を作成時刻ごと取り込む（移行用）。"""
+        with MemoryRepository._LOCK:
+            store = self._store()
+            created = MemoryRepository._CREATED[self.table]
+            for ts, key, record in rows:
+                created[key] = _as_utc(ts).isoformat(timespec="microseconds")
+                store[key] = record.copy()
 
-    def list(self) -> List[Dict[str, Any]]:
+    def list(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> List[Dict[str, Any]]:
         """
-        全レコード一覧を返す。
+        レコード一覧を返す（既定は全件・新しい順）。
         """
-        return list(self._store().values())
+        return self.list_page(limit, cursor, filters, order).items
+
+    def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        """
+        (作成時刻, key) のキーセットで 1 ページ返す（BaseRepository と同じ契約）。
+        """
+        q = build_query(limit, cursor, filters, order)
+        created = MemoryRepository._CREATED[self.table]
+        rows = [(created.get(k, ""), k, v) for k, v in list(self._store().items())]
+        return paginate(rows, q)
+
+    def list_by(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+        **eq: Any,
+    ) -> List[Dict[str, Any]]:
+        """等値条件での検索（索引は持たず全件走査）。"""
+        return self.list(limit, cursor, eq, order)
 
     # --------------------------------------------------
     # 追加分（metrics／Do 用）
     # --------------------------------------------------
+    def patch(self, key: str, partial: Dict[str, Any]) -> None:
+        """存在すれば既存レコードとマージし、無ければ作成（ロック内で原子的）。"""
+        with MemoryRepository._LOCK:
+            merged = self._store().get(key, {}).copy()
+            merged.update(partial)
+            self._touch(key)
+            self._store()[key] = merged
+
     def upsert(self, key: str, record: Dict[str, Any]) -> None:
-        """存在すれば既存レコードとマージし、無ければ作成。"""
-        merged = self._store().get(key, {}).copy()
-        merged.update(record)
-        self._store()[key] = merged
+        """patch() 互換エイリアス。"""
+        self.patch(key, record)
 
     def put(self, key: str, record: Dict[str, Any]) -> None:
         """metrics_repo 互換エイリアス。"""
@@ -83,3 +165,9 @@ class MemoryRepository:
     # --------------------------------------------------
     def _store(self) -> Dict[str, Dict[str, Any]]:
         return MemoryRepository._TABLES[self.table]
+
+    def _touch(self, key: str) -> None:
+        """初回書き込み時だけ作成時刻を記録（上書きでは並び順を変えない）"""
+        MemoryRepository._CREATED[self.table].setdefault(
+            key, datetime.now(timezone.utc).isoformat(timespec="microseconds")
+        )
@@ -10,7 +10,7 @@
 #   - put(key, metrics)  : 指標レコードを保存
 #   - get(key)           : 1 レコード取得
 #   - keys()             : ソート用にキー一覧を返す
-#   - latest()           : 直近レコードを取得（ユーティリティ）
+#   - latest()           : 直近に put したレコードを取得（O(1)）
 #
 # 【連携先・依存関係】
 #   - core/repository/factory.py : `get_repo("metrics")` で注入
@@ -41,8 +41,9 @@ class MemoryMetricsRepository:
 
     # ---- CRUD ----------------------------------------------------- #
     def put(self, key: str, metrics: Dict[str, float]) -> None:
-        """Upsert – 同じ key があれば上書き。"""
+        """Upsert – 同じ key があれば上書き（挿入順の末尾へ移動）。"""
         with self._lock:
+            self._store.pop(key, None)
             self._store[key] = metrics
 
     def get(self, key: str) -> Optional[Dict[str, float]]:
@@ -56,12 +57,11 @@ class MemoryMetricsRepository:
             return list(self._store.keys())
 
     def latest(self) -> Optional[Dict[str, float]]:
-        """一番新しいキー (= 辞書順最大) のレコードを返す。"""
+        """最後に put したレコードを返す（dict の挿入順末尾）。"""
         with self._lock:
             if not self._store:
                 return None
-            latest_key = max(self._store.keys())
-            return self._store[latest_key]
+            return self._store[next(reversed(self._store))]
 
 
 # -------------------------------------------------------- #
@@ -0,0 +1,488 @@
+# =========================================================
+# ASSIST_KEY: 【core/repository/metrics_ts.py】
+# =========================================================
+#
+# 【概要】
+#   モデル品質指標 (r2 / mae / rmse / mape …) の時系列ストア。
+#   系列キー (plan_id, symbol, metric) ごとに (ts, value) を時刻順で保持し、
+#   最新値・期間取得・日次 / 時間ロールアップ・保持期間での削除を提供する。
+#
+# 【主な役割】
+#   - MetricPoint / Rollup        : 読み書きの単位
+#   - MetricsTSStore (ABC)        : write / latest / range / rollup / purge
+#   - MemoryMetricsTS             : 系列ごとのソート済みリング（上限件数で古い順に破棄）
+#   - SQLiteMetricsTS             : PK (plan_id, symbol, metric, ts) の WITHOUT ROWID 表
+#   - PostgresMetricsTS           : 同 PK の metrics_ts 表（Alembic 8d3a6f2b9c41）
+#   - record_metrics()            : dict → MetricPoint 群に展開して書き込む糖衣
+#
+#   latest は PK の末尾 1 件（索引の逆順 1 ステップ = O(log n)）、
+#   range は PK の範囲走査、rollup は DB 側 GROUP BY で集計する。
+#
+# 【外部設定】
+#   METRICS_TS_BACKEND        : memory | sqlite | postgres（既定 DB_BACKEND。
+#                               redis は memory へフォールバック）
+#   METRICS_TS_MEMORY_CAP     : memory 実装の系列あたり最大点数 (default 10000)
+#   METRICS_TS_RETENTION_DAYS : purge_expired() の保持日数 (default 0 = 無期限)
+#
+# 【連携先・依存関係】
+#   - core/repository/factory.py : get_metrics_ts()
+#   - api/routers/metrics_api.py : /metrics/series 系エンドポイント
+#   - core/tasks/check_tasks.py  : Check 完了時に指標を記録
+#   - core/models/trainer.py     : 学習後のテストスコアを記録
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .sqlite_impl import connect, thread_connection
+
+__all__ = [
+    "BUCKETS",
+    "MetricPoint",
+    "Rollup",
+    "MetricsTSStore",
+    "MemoryMetricsTS",
+    "SQLiteMetricsTS",
+    "PostgresMetricsTS",
+    "record_metrics",
+]
+
+# ロールアップ粒度 → 秒
+BUCKETS: Dict[str, int] = {"hour": 3600, "day": 86400}
+
+_MEMORY_CAP = int(os.getenv("METRICS_TS_MEMORY_CAP", "10000"))
+
+
+class MetricPoint(NamedTuple):
+    plan_id: str
+    symbol: str
+    metric: str
+    ts: datetime  # UTC
+    value: float
+    run_id: str = ""
+
+
+class Rollup(NamedTuple):
+    bucket: datetime  # バケット開始時刻 (UTC)
+    min: float
+    max: float
+    mean: float
+    count: int
+
+
+# --------------------------------------------------------------------------- #
+# helpers
+# --------------------------------------------------------------------------- #
+def _utc(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _to_ms(value: Any) -> int:
+    return int(round(_utc(value).timestamp() * 1000))
+
+
+def _from_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def _bucket_seconds(bucket: str) -> int:
+    try:
+        return BUCKETS[bucket]
+    except KeyError:
+        raise ValueError(f"bucket must be one of {sorted(BUCKETS)}: {bucket!r}") from None
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> Optional[datetime]:
+    """METRICS_TS_RETENTION_DAYS から削除境界を計算（0 なら None）"""
+    days = float(os.getenv("METRICS_TS_RETENTION_DAYS", "0"))
+    if days <= 0:
+        return None
+    return (now or datetime.now(timezone.utc)) - timedelta(days=days)
+
+
+# --------------------------------------------------------------------------- #
+# Interface
+# --------------------------------------------------------------------------- #
+class MetricsTSStore(ABC):
+    """(plan_id, symbol, metric) 系列の時系列ストア"""
+
+    @abstractmethod
+    def write(self, points: Iterable[MetricPoint]) -> int:
+        """点をまとめて書き込む（同じ系列・同じ ts は上書き）。書き込んだ件数を返す"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def latest(self, plan_id: str, symbol: str, metric: str) -> Optional[MetricPoint]:
+        """系列の最新 1 点"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def range(
+        self,
+        plan_id: str,
+        symbol: str,
+        metric: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        *,
+        limit: Optional[int] = None,
+    ) -> List[MetricPoint]:
+        """[since, until) の点を時刻昇順で返す"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def rollup(
+        self,
+        plan_id: str,
+        symbol: str,
+        metric: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        *,
+        bucket: str = "day",
+    ) -> List[Rollup]:
+        """[since, until) をバケット（UTC の時 / 日）ごとの min / max / mean / count に集約"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def purge(self, before: datetime) -> int:
+        """before より古い点を全系列から削除し、削除件数を返す"""
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        """METRICS_TS_RETENTION_DAYS を超えた点を削除（無効なら 0）"""
+        cutoff = retention_cutoff()
+        return self.purge(cutoff) if cutoff is not None else 0
+
+
+def record_metrics(
+    store: MetricsTSStore,
+    plan_id: str,
+    symbol: str,
+    metrics: Mapping[str, Any],
+    *,
+    ts: Optional[datetime] = None,
+    run_id: str = "",
+) -> int:
+    """{metric: value} のうち有限の数値だけを 1 時刻の点として書き込む"""
+    at = _utc(ts or datetime.now(timezone.utc))
+    points = [
+        MetricPoint(plan_id, symbol, name, at, float(value), run_id)
+        for name, value in metrics.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    ]
+    return store.write(points) if points else 0
+
+
+# --------------------------------------------------------------------------- #
+# Memory
+# --------------------------------------------------------------------------- #
+class _Series:
+    """ts 昇順の並列リスト（末尾追加が主なので insert はほぼ O(1)）"""
+
+    __slots__ = ("ts", "vals")
+
+    def __init__(self) -> None:
+        self.ts: List[int] = []
+        self.vals: List[Tuple[float, str]] = []
+
+
+class MemoryMetricsTS(MetricsTSStore):
+    """
+    プロセス内の系列ごとリングバッファ。
+    上限 (METRICS_TS_MEMORY_CAP) を超えると最古の点から捨てる。
+    """
+
+    # 系列キー → _Series（MemoryRepository と同様にプロセス内で共有）
+    _SERIES: Dict[Tuple[str, str, str], _Series] = {}
+    _LOCK = threading.RLock()
+
+    def __init__(self, capacity: int = _MEMORY_CAP) -> None:
+        self.capacity = capacity
+
+    def write(self, points: Iterable[MetricPoint]) -> int:
+        n = 0
+        with self._LOCK:
+            for p in points:
+                s = self._SERIES.setdefault((p.plan_id, p.symbol, p.metric), _Series())
+                ms = _to_ms(p.ts)
+                i = bisect_left(s.ts, ms)
+                if i < len(s.ts) and s.ts[i] == ms:
+                    s.vals[i] = (p.value, p.run_id)
+                else:
+                    s.ts.insert(i, ms)
+                    s.vals.insert(i, (p.value, p.run_id))
+                    overflow = len(s.ts) - self.capacity
+                    if overflow > 0:
+                        del s.ts[:overflow]
+                        del s.vals[:overflow]
+                n += 1
+        return n
+
+    def latest(self, plan_id: str, symbol: str, metric: str) -> Optional[MetricPoint]:
+        with self._LOCK:
+            s = self._SERIES.get((plan_id, symbol, metric))
+            if s is None or not s.ts:
+                return None
+            value, run_id = s.vals[-1]
+            return MetricPoint(plan_id, symbol, metric, _from_ms(s.ts[-1]), value, run_id)
+
+    def _slice(
+        self, key: Tuple[str, str, str], since: Optional[datetime], until: Optional[datetime]
+    ) -> Tuple[List[int], List[Tuple[float, str]]]:
+        s = self._SERIES.get(key)
+        if s is None:
+            return [], []
+        lo = bisect_left(s.ts, _to_ms(since)) if since is not None else 0
+        hi = bisect_left(s.ts, _to_ms(until)) if until is not None else len(s.ts)
+        return s.ts[lo:hi], s.vals[lo:hi]
+
+    def range(self, plan_id, symbol, metric, since=None, until=None, *, limit=None):
+        with self._LOCK:
+            ts, vals = self._slice((plan_id, symbol, metric), since, until)
+        if limit is not None:
+            ts, vals = ts[:limit], vals[:limit]
+        return [
+            MetricPoint(plan_id, symbol, metric, _from_ms(t), v, r)
+            for t, (v, r) in zip(ts, vals)
+        ]
+
+    def rollup(self, plan_id, symbol, metric, since=None, until=None, *, bucket="day"):
+        width = _bucket_seconds(bucket) * 1000
+        with self._LOCK:
+            ts, vals = self._slice((plan_id, symbol, metric), since, until)
+        out: List[Rollup] = []
+        start = 0
+        while start < len(ts):
+            b = ts[start] // width * width
+            end = bisect_right(ts, b + width - 1, lo=start)
+            chunk = [v for v, _ in vals[start:end]]
+            out.append(Rollup(_from_ms(b), min(chunk), max(chunk), sum(chunk) / len(chunk), len(chunk)))
+            start = end
+        return out
+
+    def purge(self, before: datetime) -> int:
+        cut = _to_ms(before)
+        n = 0
+        with self._LOCK:
+            for key in list(self._SERIES):
+                s = self._SERIES[key]
+                i = bisect_left(s.ts, cut)
+                if i:
+                    del s.ts[:i]
+                    del s.vals[:i]
+                    n += i
+                if not s.ts:
+                    del self._SERIES[key]
+        return n
+
+
+# --------------------------------------------------------------------------- #
+# SQLite
+# --------------------------------------------------------------------------- #
+_SQLITE_DDL = """
+CREATE TABLE IF NOT EXISTS metrics_ts (
+    plan_id TEXT    NOT NULL,
+    symbol  TEXT    NOT NULL,
+    metric  TEXT    NOT NULL,
+    ts      INTEGER NOT NULL,            -- epoch ミリ秒 (UTC)
+    value   REAL    NOT NULL,
+    run_id  TEXT    NOT NULL DEFAULT '',
+    PRIMARY KEY (plan_id, symbol, metric, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_metrics_ts__ts ON metrics_ts (ts);
+"""
+
+
+class SQLiteMetricsTS(MetricsTSStore):
+    """SQLite 実装（接続方針は SQLiteRepository と同じ SQLITE_MODE に従う）"""
+
+    def __init__(self, path: str | Path = "mmopdca.db", *, mode: str | None = None) -> None:
+        self.path = str(path)
+        self.production = (mode or os.getenv("SQLITE_MODE", "default").lower()) == "production"
+        self._conn: Optional[sqlite3.Connection] = (
+            None if self.production else connect(self.path, production=False)
+        )
+        with self.conn:
+            self.conn.executescript(_SQLITE_DDL)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self._conn if self._conn is not None else thread_connection(self.path)
+
+    @staticmethod
+    def _where(since: Optional[datetime], until: Optional[datetime]) -> Tuple[str, List[Any]]:
+        sql, params = "", []
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(_to_ms(since))
+        if until is not None:
+            sql += " AND ts < ?"
+            params.append(_to_ms(until))
+        return sql, params
+
+    def write(self, points: Iterable[MetricPoint]) -> int:
+        rows = [(p.plan_id, p.symbol, p.metric, _to_ms(p.ts), p.value, p.run_id) for p in points]
+        if rows:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO metrics_ts (plan_id, symbol, metric, ts, value, run_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (plan_id, symbol, metric, ts) "
+                    "DO UPDATE SET value = excluded.value, run_id = excluded.run_id",
+                    rows,
+                )
+        return len(rows)
+
+    def latest(self, plan_id, symbol, metric):
+        row = self.conn.execute(
+            "SELECT ts, value, run_id FROM metrics_ts "
+            "WHERE plan_id = ? AND symbol = ? AND metric = ? ORDER BY ts DESC LIMIT 1",
+            (plan_id, symbol, metric),
+        ).fetchone()
+        if row is None:
+            return None
+        return MetricPoint(plan_id, symbol, metric, _from_ms(row[0]), row[1], row[2])
+
+    def range(self, plan_id, symbol, metric, since=None, until=None, *, limit=None):
+        cond, params = self._where(since, until)
+        sql = (
+            "SELECT ts, value, run_id FROM metrics_ts "
+            f"WHERE plan_id = ? AND symbol = ? AND metric = ?{cond} ORDER BY ts"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self.conn.execute(sql, [plan_id, symbol, metric, *params]).fetchall()
+        return [MetricPoint(plan_id, symbol, metric, _from_ms(t), v, r) for t, v, r in rows]
+
+    def rollup(self, plan_id, symbol, metric, since=None, until=None, *, bucket="day"):
+        width = _bucket_seconds(bucket) * 1000
+        cond, params = self._where(since, until)
+        rows = self.conn.execute(
+            "SELECT (ts / ?) * ? AS b, MIN(value), MAX(value), AVG(value), COUNT(*) "
+            f"FROM metrics_ts WHERE plan_id = ? AND symbol = ? AND metric = ?{cond} "
+            "GROUP BY b ORDER BY b",
+            [width, width, plan_id, symbol, metric, *params],
+        ).fetchall()
+        return [Rollup(_from_ms(b), lo, hi, mean, n) for b, lo, hi, mean, n in rows]
+
+    def purge(self, before: datetime) -> int:
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM metrics_ts WHERE ts < ?", (_to_ms(before),))
+        return cur.rowcount
+
+
+# --------------------------------------------------------------------------- #
+# PostgreSQL
+# --------------------------------------------------------------------------- #
+class PostgresMetricsTS(MetricsTSStore):
+    """
+    PostgreSQL 実装。本番の表は Alembic 8d3a6f2b9c41 で作成済み
+    （初回アクセス時の CREATE ... IF NOT EXISTS は開発環境向け）。
+    """
+
+    def __init__(self, *, schema: str = "public") -> None:
+        self.tbl = f'"{schema}".metrics_ts'
+        self._ddl = f'''
+            CREATE SCHEMA IF NOT EXISTS "{schema}";
+            CREATE TABLE IF NOT EXISTS {self.tbl} (
+                plan_id TEXT             NOT NULL,
+                symbol  TEXT             NOT NULL,
+                metric  TEXT             NOT NULL,
+                ts      TIMESTAMPTZ      NOT NULL,
+                value   DOUBLE PRECISION NOT NULL,
+                run_id  TEXT             NOT NULL DEFAULT '',
+                PRIMARY KEY (plan_id, symbol, metric, ts)
+            );
+            CREATE INDEX IF NOT EXISTS ix_metrics_ts__ts ON {self.tbl} (ts);
+        '''
+        self._initialized = False
+
+    def _cx(self) -> Any:
+        from .postgres_impl import _conn  # psycopg は optional → 遅延 import
+
+        cm = _conn()
+        if not self._initialized:
+            with _conn() as cx:
+                cx.execute(self._ddl)
+            self._initialized = True
+        return cm
+
+    @staticmethod
+    def _where(since: Optional[datetime], until: Optional[datetime]) -> Tuple[str, List[Any]]:
+        sql, params = "", []
+        if since is not None:
+            sql += " AND ts >= %s"
+            params.append(_utc(since))
+        if until is not None:
+            sql += " AND ts < %s"
+            params.append(_utc(until))
+        return sql, params
+
+    def write(self, points: Iterable[MetricPoint]) -> int:
+        rows = [(p.plan_id, p.symbol, p.metric, _utc(p.ts), p.value, p.run_id) for p in points]
+        if rows:
+            with self._cx() as cx, cx.cursor() as cur:
+                cur.executemany(
+                    f"INSERT INTO {self.tbl} (plan_id, symbol, metric, ts, value, run_id) "
+                    "VALUES (%s, %s, %s, %s, %s, %s) "
+                    "ON CONFLICT (plan_id, symbol, metric, ts) "
+                    "DO UPDATE SET value = EXCLUDED.value, run_id = EXCLUDED.run_id",
+                    rows,
+                )
+        return len(rows)
+
+    def latest(self, plan_id, symbol, metric):
+        with self._cx() as cx:
+            row = cx.execute(
+                f"SELECT ts, value, run_id FROM {self.tbl} "
+                "WHERE plan_id = %s AND symbol = %s AND metric = %s ORDER BY ts DESC LIMIT 1",
+                (plan_id, symbol, metric),
+            ).fetchone()
+        if row is None:
+            return None
+        return MetricPoint(plan_id, symbol, metric, _utc(row[0]), row[1], row[2])
+
+    def range(self, plan_id, symbol, metric, since=None, until=None, *, limit=None):
+        cond, params = self._where(since, until)
+        sql = (
+            f"SELECT ts, value, run_id FROM {self.tbl} "
+            f"WHERE plan_id = %s AND symbol = %s AND metric = %s{cond} ORDER BY ts"
+        )
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with self._cx() as cx:
+            rows = cx.execute(sql, [plan_id, symbol, metric, *params]).fetchall()
+        return [MetricPoint(plan_id, symbol, metric, _utc(t), v, r) for t, v, r in rows]
+
+    def rollup(self, plan_id, symbol, metric, since=None, until=None, *, bucket="day"):
+        _bucket_seconds(bucket)  # 検証のみ（date_trunc の単位名と同じ）
+        cond, params = self._where(since, until)
+        with self._cx() as cx:
+            rows = cx.execute(
+                "SELECT date_trunc(%s, ts AT TIME ZONE 'UTC') AS b, "
+                "MIN(value), MAX(value), AVG(value), COUNT(*) "
+                f"FROM {self.tbl} WHERE plan_id = %s AND symbol = %s AND metric = %s{cond} "
+                "GROUP BY b ORDER BY b",
+                [bucket, plan_id, symbol, metric, *params],
+            ).fetchall()
+        return [Rollup(_utc(b), lo, hi, mean, n) for b, lo, hi, mean, n in rows]
+
+    def purge(self, before: datetime) -> int:
+        with self._cx() as cx:
+            cur = cx.execute(f"DELETE FROM {self.tbl} WHERE ts < %s", (_utc(before),))
+            return cur.rowcount
@@ -4,23 +4,37 @@
 #  psycopg-3 同期ドライバで実装する JSONB 汎用ストア
 #  • tenant_id + id を複合 PK に
 #  • eager=False なら pytest で DB が無くても import が通る
+#  • 接続は psycopg_pool.ConnectionPool（プロセス共通・上限付き）から
+#    チェックアウトし、待ち時間 / 保持時間を Prometheus に記録
+#
+#  環境変数
+#    PG_POOL_MIN / PG_POOL_MAX      : プールサイズ (default 1 / 10)
+#    PG_POOL_TIMEOUT                : チェックアウト待ち上限秒 (default 30)
+#    PG_POOL_MAX_IDLE / _LIFETIME   : アイドル / 生存上限秒 (300 / 3600)
+#    PG_STATEMENT_TIMEOUT_MS        : statement_timeout (default 30000, 0=無効)
 # =====================================================================
 # Pylance(Pyright) の optional dependency 警告を抑制
 # pyright: reportMissingImports=false
 
 from __future__ import annotations
 
-import json
+import atexit
 import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
 from typing import (
     Any,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Mapping,
     MutableMapping,
     Optional,
     Sequence,
+    Tuple,
     TYPE_CHECKING,
 )
 
@@ -31,15 +45,48 @@ if TYPE_CHECKING:
 
 try:
     import psycopg  # type: ignore
+    from psycopg.conninfo import make_conninfo  # type: ignore
     from psycopg.rows import dict_row  # type: ignore
 except ModuleNotFoundError:
     psycopg = None  # type: ignore
+    make_conninfo = None  # type: ignore
     dict_row = None  # type: ignore
 
-from .base import BaseRepository
+try:
+    from psycopg.types.json import set_json_dumps, set_json_loads  # type: ignore
+except ModuleNotFoundError:
+    set_json_dumps = set_json_loads = None  # type: ignore
+
+try:
+    from psycopg_pool import ConnectionPool  # type: ignore
+except ModuleNotFoundError:
+    ConnectionPool = None  # type: ignore
+
+try:
+    from prometheus_client import Histogram  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – optional dependency
+    Histogram = None  # type: ignore
+
+from core.common.codec import dumps, json_codec
+
+from .base import (
+    BaseRepository,
+    ListQuery,
+    Page,
+    _as_utc,
+    build_query,
+    page_from_rows,
+    unique_ids,
+)
 
 logger = logging.getLogger(__name__)
 
+# JSONB の読み出しも共通 codec で（psycopg 既定は標準 json.loads）。
+# 行は dict で返るので呼び出し側で dict(...) に包み直さない。
+if set_json_loads is not None:
+    set_json_loads(json_codec().loads)
+    set_json_dumps(dumps)
+
 
 def _get_env_var(name: str) -> str | None:
     """環境変数（bytes 版も含む）から文字列を取得"""
@@ -75,27 +122,218 @@ def _make_dsn() -> str | Dict[str, Any]:
     }
 
 
-# コネクションは Any 扱い（実行時に psycopg がなければ runtime error）
-_CX: Optional[Any] = None
+# --------------------------------------------------------------------------- #
+# Connection Pool
+# --------------------------------------------------------------------------- #
+if Histogram is not None:
+    _CHECKOUT_WAIT = Histogram(
+        "pdca_pg_pool_wait_seconds", "Time spent waiting for a pooled PG connection"
+    )
+    _CHECKOUT_HOLD = Histogram(
+        "pdca_pg_pool_hold_seconds", "Time a pooled PG connection was checked out"
+    )
+else:  # pragma: no cover
+    _CHECKOUT_WAIT = _CHECKOUT_HOLD = None
+
+# プールは Any 扱い（実行時に psycopg_pool がなければ runtime error）
+_POOL: Optional[Any] = None
+_POOL_LOCK = threading.Lock()
+
 
+def _conninfo() -> str:
+    dsn = _make_dsn()
+    return dsn if isinstance(dsn, str) else make_conninfo(**dsn)
 
-def _cx() -> Any:  # type: ignore[return]
-    """シングルトンで psycopg.Connection を返す"""
-    global _CX
-    if _CX is None or getattr(_CX, "closed", True):
-        if psycopg is None:
-            raise RuntimeError(
-                "psycopg がインストールされていません。\n"
-                "DB_BACKEND を memory/sqlite/redis に変更するか "
-                "`poetry install --with db` を実行してください。"
+
+def _pool_kwargs() -> Dict[str, Any]:
+    """同期 / 非同期プール共通のサイズ・タイムアウト設定（環境変数から）"""
+    conn_kwargs: Dict[str, Any] = {"autocommit": True}
+    stmt_timeout = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "30000"))
+    if stmt_timeout > 0:
+        conn_kwargs["options"] = f"-c statement_timeout={stmt_timeout}"
+    return {
+        "min_size": int(os.getenv("PG_POOL_MIN", "1")),
+        "max_size": int(os.getenv("PG_POOL_MAX", "10")),
+        "timeout": float(os.getenv("PG_POOL_TIMEOUT", "30")),
+        "max_idle": float(os.getenv("PG_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("PG_POOL_MAX_LIFETIME", "3600")),
+        "kwargs": conn_kwargs,
+    }
+
+
+def _pool() -> Any:
+    """プロセス共通の ConnectionPool を遅延生成して返す"""
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            if psycopg is None or ConnectionPool is None:
+                raise RuntimeError(
+                    "psycopg / psycopg_pool がインストールされていません。\n"
+                    "DB_BACKEND を memory/sqlite/redis に変更するか "
+                    "`poetry install --with db` を実行してください。"
+                )
+            _POOL = ConnectionPool(
+                _conninfo(),
+                # チェックアウト時に死活確認（壊れた接続は破棄して再接続）
+                check=getattr(ConnectionPool, "check_connection", None),
+                name="mmopdca-pg",
+                open=True,
+                **_pool_kwargs(),
+            )
+            atexit.register(close_pool)
+            logger.info(
+                "[PG] pool opened min=%s max=%s", _POOL.min_size, _POOL.max_size
             )
-        dsn = _make_dsn()
-        _CX = (
-            psycopg.connect(dsn, autocommit=True)
-            if isinstance(dsn, str)
-            else psycopg.connect(autocommit=True, **dsn)
-        )
-    return _CX
+    return _POOL
+
+
+@contextmanager
+def _conn() -> Iterator[Any]:
+    """プールから接続を借りる。待ち時間 / 保持時間をメトリクスに記録"""
+    t0 = time.perf_counter()
+    with _pool().connection() as cx:
+        t1 = time.perf_counter()
+        if _CHECKOUT_WAIT is not None:
+            _CHECKOUT_WAIT.observe(t1 - t0)
+        try:
+            yield cx
+        finally:
+            if _CHECKOUT_HOLD is not None:
+                _CHECKOUT_HOLD.observe(time.perf_counter() - t1)
+
+
+def pool_stats() -> Dict[str, int]:
+    """psycopg_pool の統計 (pool_size, pool_available, requests_waiting …)"""
+    return dict(_POOL.get_stats()) if _POOL is not None else {}
+
+
+def close_pool() -> None:
+    """プールを閉じる（atexit / テスト用）"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
+
+
+def build_statements(schema: str, table: str) -> Dict[str, str]:
+    """
+    同期 / 非同期実装で共用する SQL 文を組み立てる。
+
+    ddl はテーブルのみ。セカンダリインデックス（indexes.SECONDARY_INDEXES）は
+    稼働中テーブルをロックしないよう Alembic 5c1f0e7d2a9b が
+    CREATE INDEX CONCURRENTLY で作成する（実行時には作らない）。
+    """
+    tbl = f'"{schema}"."{table}"'
+    return {
+        "ddl": f'''
+        CREATE SCHEMA IF NOT EXISTS "{schema}";
+        CREATE TABLE IF NOT EXISTS {tbl} (
+            tenant_id  TEXT        NOT NULL DEFAULT '',
+            id         TEXT        NOT NULL,
+            data       JSONB       NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (tenant_id, id)
+        );
+        ''',
+        "create": (
+            f"INSERT INTO {tbl} (tenant_id,id,data) "
+            "VALUES (%s,%s,%s) "
+            "ON CONFLICT (tenant_id,id) DO UPDATE SET data = EXCLUDED.data"
+        ),
+        # JSONB `||` でトップレベルキーをマージする 1 往復の原子的 UPSERT
+        "patch": (
+            f"INSERT INTO {tbl} (tenant_id,id,data) "
+            "VALUES (%s,%s,%s::jsonb) "
+            f"ON CONFLICT (tenant_id,id) DO UPDATE SET data = {tbl}.data || EXCLUDED.data"
+        ),
+        "get": f"SELECT data FROM {tbl} WHERE tenant_id=%s AND id=%s",
+        "exists": f"SELECT 1 FROM {tbl} WHERE tenant_id=%s AND id=%s LIMIT 1",
+        "delete": f"DELETE FROM {tbl} WHERE tenant_id=%s AND id=%s",
+        # バルク系: 配列パラメータ 1 個で N 件を 1 往復
+        # （COPY は ON CONFLICT を持てないため UPSERT には unnest を使う）
+        "create_many": (
+            f"INSERT INTO {tbl} (tenant_id,id,data) "
+            "SELECT %s, u.id, u.data FROM unnest(%s::text[], %s::jsonb[]) AS u(id, data) "
+            "ON CONFLICT (tenant_id,id) DO UPDATE SET data = EXCLUDED.data"
+        ),
+        # import_rows: COPY で一時表へ流し込み → 1 文で UPSERT（作成時刻も移す）
+        "import_tmp": (
+            "CREATE TEMP TABLE IF NOT EXISTS _import_rows "
+            "(tenant_id TEXT, id TEXT, data JSONB, created_at TIMESTAMPTZ) ON COMMIT DELETE ROWS"
+        ),
+        "import_copy": "COPY _import_rows (tenant_id, id, data, created_at) FROM STDIN",
+        "import_merge": (
+            f"INSERT INTO {tbl} (tenant_id,id,data,created_at) "
+            "SELECT DISTINCT ON (id) tenant_id, id, data, created_at FROM _import_rows "
+            "ON CONFLICT (tenant_id,id) DO UPDATE "
+            "SET data = EXCLUDED.data, created_at = EXCLUDED.created_at"
+        ),
+        "get_many": f"SELECT id, data FROM {tbl} WHERE tenant_id=%s AND id = ANY(%s)",
+        "delete_many": f"DELETE FROM {tbl} WHERE tenant_id=%s AND id = ANY(%s)",
+    }
+
+
+def create_many_params(
+    tenant_id: str, items: Mapping[str, Mapping[str, Any]]
+) -> Tuple[str, List[str], List[str]]:
+    """build_statements()["create_many"] 用のパラメータ (tenant, ids[], docs[])"""
+    return (
+        tenant_id,
+        list(items.keys()),
+        [dumps(d) for d in items.values()],
+    )
+
+
+def list_statement(
+    schema: str, table: str, tenant_id: str, q: ListQuery
+) -> Tuple[str, List[Any]]:
+    """
+    list_page() 用の SELECT 文（同期 / 非同期実装で共用）。
+
+    * 文字列の等値は ``data->>'key' = %s``（式インデックスと同じ形）
+    * それ以外の型は ``data->'key' = %s::jsonb`` で型ごと比較
+    * (created_at, id) の行値比較でキーセットページング、limit + 1 件取得
+    """
+    where = ["tenant_id=%s"]
+    params: List[Any] = [tenant_id]
+    for key, want in q.eq.items():
+        if want is None:
+            where.append(f"data->>'{key}' IS NULL")
+        elif isinstance(want, list) and all(isinstance(v, str) for v in want):
+            where.append(f"data->>'{key}' = ANY(%s)")
+            params.append(want)
+        elif isinstance(want, list):
+            where.append(f"data->'{key}' = ANY(%s::jsonb[])")
+            params.append([dumps(v) for v in want])
+        elif isinstance(want, str):
+            where.append(f"data->>'{key}' = %s")
+            params.append(want)
+        else:
+            where.append(f"data->'{key}' = %s::jsonb")
+            params.append(dumps(want))
+    if q.created_gte is not None:
+        where.append("created_at >= %s")
+        params.append(q.created_gte)
+    if q.created_lt is not None:
+        where.append("created_at < %s")
+        params.append(q.created_lt)
+    if q.after is not None:
+        where.append(f"(created_at, id) {'<' if q.desc else '>'} (%s::timestamptz, %s)")
+        params.extend(q.after)
+
+    direction = "DESC" if q.desc else "ASC"
+    sql = (
+        f'SELECT created_at, id, data FROM "{schema}"."{table}" '
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY created_at {direction}, id {direction}"
+    )
+    if q.limit is not None:
+        sql += " LIMIT %s"
+        params.append(q.limit + 1)
+    return sql, params
 
 
 class PostgresRepository(BaseRepository):
@@ -118,6 +356,7 @@ class PostgresRepository(BaseRepository):
         super().__init__(table=table)
         self.table = table
         self.schema = schema
+        self._sql = build_statements(schema, table)
         self._initialized = False
         if eager:
             self._ensure_table()
@@ -126,18 +365,8 @@ class PostgresRepository(BaseRepository):
         """最初の操作時にスキーマ・テーブルを作成"""
         if self._initialized:
             return
-        ddl = f'''
-        CREATE SCHEMA IF NOT EXISTS "{self.schema}";
-        CREATE TABLE IF NOT EXISTS "{self.schema}"."{self.table}" (
-            tenant_id  TEXT        NOT NULL DEFAULT '',
-            id         TEXT        NOT NULL,
-            data       JSONB       NOT NULL,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-            PRIMARY KEY (tenant_id, id)
-        );
-        '''
-        with _cx().cursor() as cur:
-            cur.execute(ddl)
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["ddl"])
         self._initialized = True
 
     def _lazy(self) -> None:
@@ -148,56 +377,91 @@ class PostgresRepository(BaseRepository):
     def create(self, obj_id: str, data: Mapping[str, Any]) -> None:
         """INSERT あるいは UPDATE (upsert)"""
         self._lazy()
-        sql = (
-            f'INSERT INTO "{self.schema}"."{self.table}" (tenant_id,id,data) '
-            "VALUES (%s,%s,%s) "
-            "ON CONFLICT (tenant_id,id) DO UPDATE SET data = EXCLUDED.data"
-        )
-        with _cx().cursor() as cur:
-            cur.execute(sql, (self.tenant_id, obj_id, json.dumps(dict(data))))
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["create"], (self.tenant_id, obj_id, dumps(data)))
 
     update = create  # upsert alias
 
+    def patch(self, obj_id: str, partial: Mapping[str, Any]) -> None:
+        """JSONB `||` でトップレベルキーをマージする 1 往復の原子的 UPSERT"""
+        self._lazy()
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["patch"], (self.tenant_id, obj_id, dumps(partial)))
+
+    def create_many(self, items: Mapping[str, Mapping[str, Any]]) -> None:
+        """unnest() による 1 文の一括 UPSERT"""
+        if not items:
+            return
+        self._lazy()
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["create_many"], create_many_params(self.tenant_id, items))
+
+    def import_rows(self, rows: Sequence[Tuple[Any, str, Mapping[str, Any]]]) -> None:
+        """
+        COPY FROM STDIN で一時表へ流し込み、INSERT ... SELECT で一括 UPSERT。
+        行ごとの INSERT より桁違いに速く、同じバッチを再投入しても冪等。
+        """
+        if not rows:
+            return
+        self._lazy()
+        with _conn() as cx, cx.transaction(), cx.cursor() as cur:
+            cur.execute(self._sql["import_tmp"])
+            with cur.copy(self._sql["import_copy"]) as copy:
+                for ts, obj_id, data in rows:
+                    copy.write_row((self.tenant_id, obj_id, dumps(data), _as_utc(ts)))
+            cur.execute(self._sql["import_merge"])
+
+    def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """``id = ANY(%s)`` で 1 往復取得（存在しない id は含めない）"""
+        ids = unique_ids(obj_ids)
+        if not ids:
+            return {}
+        self._lazy()
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["get_many"], (self.tenant_id, ids))
+            found = dict(cur.fetchall())
+        return {i: found[i] for i in ids if i in found}
+
+    def delete_many(self, obj_ids: Iterable[str]) -> None:
+        ids = unique_ids(obj_ids)
+        if not ids:
+            return
+        self._lazy()
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["delete_many"], (self.tenant_id, ids))
+
     def get(self, obj_id: str) -> Optional[Dict[str, Any]]:
         """キーに対応する JSON を取得"""
         self._lazy()
-        sql = (
-            f'SELECT data FROM "{self.schema}"."{self.table}" '
-            "WHERE tenant_id=%s AND id=%s"
-        )
-        with _cx().cursor(row_factory=dict_row) as cur:  # type: ignore[arg-type]
-            cur.execute(sql, (self.tenant_id, obj_id))
+        with _conn() as cx, cx.cursor(row_factory=dict_row) as cur:  # type: ignore[arg-type]
+            cur.execute(self._sql["get"], (self.tenant_id, obj_id))
             row = cur.fetchone()
-        return dict(row["data"]) if row else None
+        return row["data"] if row else None
     
     def exists(self, obj_id: str) -> bool:
         self._lazy()
-        sql = (
-            f'SELECT 1 FROM "{self.schema}"."{self.table}" '
-            "WHERE tenant_id=%s AND id=%s LIMIT 1"
-        )
-        with _cx().cursor() as cur:
-            cur.execute(sql, (self.tenant_id, obj_id))
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["exists"], (self.tenant_id, obj_id))
             return cur.fetchone() is not None
 
     def delete(self, obj_id: str) -> None:
         """キーを削除"""
         self._lazy()
-        sql = (
-            f'DELETE FROM "{self.schema}"."{self.table}" '
-            "WHERE tenant_id=%s AND id=%s"
-        )
-        with _cx().cursor() as cur:
-            cur.execute(sql, (self.tenant_id, obj_id))
-
-    def list(self) -> List[Dict[str, Any]]:
-        """このテナントの全エントリを降順で取得"""
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(self._sql["delete"], (self.tenant_id, obj_id))
+
+    def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        """(created_at, id) キーセットで 1 ページ取得（フィルタは SQL に押し下げ）"""
         self._lazy()
-        sql = (
-            f'SELECT data FROM "{self.schema}"."{self.table}" '
-            "WHERE tenant_id=%s ORDER BY created_at DESC"
-        )
-        with _cx().cursor(row_factory=dict_row) as cur:  # type: ignore[arg-type]
-            cur.execute(sql, (self.tenant_id,))
+        q = build_query(limit, cursor, filters, order)
+        sql, params = list_statement(self.schema, self.table, self.tenant_id, q)
+        with _conn() as cx, cx.cursor() as cur:
+            cur.execute(sql, params)
             rows = cur.fetchall()
-        return [dict(r["data"]) for r in rows]
+        return page_from_rows(rows, q.limit)
@@ -7,7 +7,20 @@
 #   “シンプル Key-Value（1 Key ＝ 1 JSON）” な Repository を実装します。
 #
 # 【主な役割】
-#   - create / get / update / delete / list の CRUD API を提供
+#   - create / get / update / patch / delete / list の CRUD API を提供
+#   - indexes.SECONDARY_INDEXES のフィールドは値ごとの SET
+#     ``_idx:{table}:{field}:{value}`` に id を保持し、list_by / フィルタで使用
+#   - 作成時刻の ZSET ``_ts:{table}``（score = epoch ミリ秒, ZADD NX）で
+#     新しい順の一覧 / 時刻範囲クエリを実現。本体は MGET でバッチ取得
+#   - 索引 SET / 時刻 ZSET は reindex() が全キーから backfill し、完了マーカー
+#     ``_reindexed:{table}`` を立てる。マーカーが無い間の list は全キー SCAN
+#     （索引導入前の旧キーも漏らさない）。デプロイ時に一度
+#     ``python -m cli.migrate_cli reindex -t plan,do,check,act`` を実行すること
+#   - create_many / get_many / delete_many は MSET・MGET・pipeline で
+#     _BATCH 件あたり 1 往復
+#   - RETENTION_TTL_DAYS 対象テーブルは書き込みごとに EXPIRE（TTL + 猶予）を付与。
+#     TTL 設定は core/repository/ttl.py。アーカイブ / 削除は core/ops/retention.py、
+#     trim() は本体が期限切れで消えた id を時刻 ZSET / 索引 SET から掃除
 #   - Redis をバックエンドに、Celery や API 間で共有出来る永続ストアを確保
 #
 # 【連携先・依存関係】
@@ -32,12 +45,170 @@ from __future__ import annotations
 import json
 import logging
 import os
-from typing import Any, Dict, List, Sequence
+import time
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import redis  # redis-py
 
+from core.common.codec import dumps, loads
+
+from .base import (
+    ListQuery,
+    Page,
+    build_query,
+    chunked,
+    matches,
+    page_from_rows,
+    paginate,
+    unique_ids,
+)
+from .indexes import indexed_fields
+from .ttl import key_ttl_seconds
+
 logger = logging.getLogger(__name__)
 
+# MGET / ZRANGE 1 回あたりの件数
+_BATCH = int(os.getenv("REDIS_REPO_BATCH", "500"))
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def index_key(table: str, field: str, value: Any) -> str:
+    """値ごとの索引 SET のキー（``{table}:*`` の SCAN には掛からない）"""
+    token = value if isinstance(value, str) else json.dumps(value)
+    return f"_idx:{table}:{field}:{token}"
+
+
+def index_keys(table: str, fields: Iterable[str], doc: Optional[Mapping[str, Any]]) -> Set[str]:
+    """doc が所属すべき索引 SET の集合（スカラー値のみ。欠損は null 扱い）"""
+    if doc is None:
+        return set()
+    return {
+        index_key(table, f, doc.get(f))
+        for f in fields
+        if isinstance(doc.get(f), _SCALARS)
+    }
+
+
+# build(id, old_doc | None) -> new_doc | None（None は削除）
+WriteFn = Callable[[str, Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]
+
+
+def ts_key(table: str) -> str:
+    """作成時刻 ZSET のキー"""
+    return f"_ts:{table}"
+
+
+def ready_key(table: str) -> str:
+    """reindex() 完了マーカーのキー（これが立つまで list は SCAN 経路）"""
+    return f"_reindexed:{table}"
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def ms_to_iso(ms: float) -> str:
+    """ZSET の score → created_at 文字列（カーソル / 範囲比較用）"""
+    dt = datetime.fromtimestamp(int(ms) / 1000, tz=timezone.utc)
+    return dt.isoformat(timespec="milliseconds")
+
+
+def iso_to_ms(value: Any) -> int:
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(round(dt.timestamp() * 1000))
+
+
+def score_bounds(q: ListQuery) -> Tuple[str, str]:
+    """
+    ListQuery → ZRANGEBYSCORE の (min, max)。
+
+    カーソル位置の score は「含む」で指定し、同一 score 内の id 比較は
+    呼び出し側 (after_cursor) で行う。
+    """
+    lo, lo_open = float("-inf"), False
+    hi, hi_open = float("inf"), False
+    if q.created_gte is not None:
+        lo = iso_to_ms(q.created_gte)
+    if q.created_lt is not None:
+        hi, hi_open = iso_to_ms(q.created_lt), True
+    if q.after is not None:
+        at = iso_to_ms(q.after[0])
+        if q.desc and at < hi:
+            hi, hi_open = at, False
+        elif not q.desc and at > lo:
+            lo, lo_open = at, False
+
+    def fmt(v: float, open_: bool) -> str:
+        if v in (float("inf"), float("-inf")):
+            return "+inf" if v > 0 else "-inf"
+        return f"{'(' if open_ else ''}{int(v)}"
+
+    return fmt(lo, lo_open), fmt(hi, hi_open)
+
+
+def after_cursor(q: ListQuery, score: float, id_: str) -> bool:
+    """カーソルより後ろ（次ページ側）の行か"""
+    if q.after is None:
+        return True
+    key, at = (int(score), id_), (iso_to_ms(q.after[0]), q.after[1])
+    return key < at if q.desc else key > at
+
+
+def page_keys(
+    q: ListQuery, ids: Sequence[str], scores: Sequence[Optional[float]]
+) -> List[Tuple[float, str]]:
+    """
+    索引で得た id 群を ZMSCORE の score で時刻範囲・カーソル判定し、
+    (score, id) のページ順に並べる（本体はまだ読まない）。
+    時刻 ZSET に無い id は _zscan と同じく対象外（reindex() で補完）。
+    """
+    lo = iso_to_ms(q.created_gte) if q.created_gte is not None else None
+    hi = iso_to_ms(q.created_lt) if q.created_lt is not None else None
+    keys = [
+        (score, id_)
+        for id_, score in zip(ids, scores)
+        if score is not None
+        and (lo is None or score >= lo)
+        and (hi is None or score < hi)
+        and after_cursor(q, score, id_)
+    ]
+    keys.sort(reverse=q.desc)
+    return keys
+
+
+def index_lookup_keys(table: str, fields: Iterable[str], q: ListQuery) -> List[List[str]]:
+    """
+    フィルタのうち索引があるフィールドについて、
+    フィールドごとの「和集合を取る索引キー」のリストを返す。
+    """
+    groups: List[List[str]] = []
+    for field in fields:
+        if field not in q.eq:
+            continue
+        want = q.eq[field]
+        values = want if isinstance(want, list) else [want]
+        if all(isinstance(v, _SCALARS) for v in values):
+            groups.append([index_key(table, field, v) for v in values])
+    return groups
+
 
 class RedisRepository:
     """
@@ -67,7 +238,10 @@ class RedisRepository:
             redis.Redis へそのまま渡す接続情報
         """
         prefix = table or key_prefix or "mmop"
+        self.table: str = prefix
         self._prefix: str = f"{prefix}:"
+        self._indexed = sorted(indexed_fields(prefix))
+        self._ttl = key_ttl_seconds(prefix)  # None = 期限なし
 
         # --------------------------------------------------
         # 接続先 URL 生成
@@ -107,40 +281,360 @@ class RedisRepository:
     # public CRUD
     # ------------------------------------------------------------------#
     def create(self, id_: str, doc: Dict[str, Any]) -> None:
-        """Upsert（存在すれば上書き）"""
-        self._r.set(self._k(id_), json.dumps(doc))
+        """Upsert（存在すれば上書き。作成時刻は初回のみ記録）"""
+        if not self._indexed:
+            pipe = self._r.pipeline()  # MULTI/EXEC で 1 往復
+            pipe.set(self._k(id_), dumps(doc), ex=self._ttl)
+            pipe.zadd(self._ts, {id_: now_ms()}, nx=True)
+            pipe.execute()
+            return
+        self._write(id_, lambda _old: doc)
 
     update = create  # エイリアス
 
+    def patch(self, id_: str, partial: Dict[str, Any]) -> None:
+        """トップレベルキーをマージ保存（WATCH/MULTI の楽観ロック。詳細は _write）"""
+        self._write(id_, lambda old: {**(old or {}), **partial})
+
     def get(self, id_: str) -> Dict[str, Any] | None:
         raw = self._r.get(self._k(id_))
-        return json.loads(raw) if raw is not None else None
+        return loads(raw) if raw is not None else None
 
     def delete(self, id_: str) -> None:
-        self._r.delete(self._k(id_))
+        if not self._indexed:
+            pipe = self._r.pipeline()
+            pipe.delete(self._k(id_))
+            pipe.zrem(self._ts, id_)
+            pipe.execute()
+            return
+        self._write(id_, lambda _old: None)
+
+    def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        """MSET + ZADD NX を _BATCH 件ずつ 1 往復で（索引付きテーブルは _write_many）"""
+        if self._indexed:
+            self._write_many(list(items), lambda id_, _old: items[id_])
+            return
+        for chunk in chunked(list(items), _BATCH):
+            ts = now_ms()
+            pipe = self._r.pipeline()
+            pipe.mset({self._k(i): dumps(items[i]) for i in chunk})
+            if self._ttl:
+                for i in chunk:
+                    pipe.expire(self._k(i), self._ttl)
+            pipe.zadd(self._ts, {i: ts for i in chunk}, nx=True)
+            pipe.execute()
+
+    def import_rows(self, rows: Sequence[Tuple[Any, str, Dict[str, Any]]]) -> None:
+        """
+        (created_at, id, doc) を _BATCH 件ずつ 1 パイプラインで取り込む（移行用）。
+        時刻 ZSET の score は元の作成時刻で上書きし、索引 SET は旧値との差分で更新。
+        """
+        for chunk in chunked(list(rows), _BATCH):
+            olds = self._mget([i for _, i, _ in chunk]) if self._indexed else [None] * len(chunk)
+            pipe = self._r.pipeline(transaction=False)
+            for (created, id_, doc), old in zip(chunk, olds):
+                pipe.set(self._k(id_), dumps(doc), ex=self._ttl)
+                pipe.zadd(self._ts, {id_: iso_to_ms(created)})
+                before = index_keys(self.table, self._indexed, old)
+                after = index_keys(self.table, self._indexed, doc)
+                for ix in before - after:
+                    pipe.srem(ix, id_)
+                for ix in after - before:
+                    pipe.sadd(ix, id_)
+            pipe.execute()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """MGET でまとめて取得（存在しない id は含めない）"""
+        uniq = unique_ids(ids)
+        return {i: d for i, d in zip(uniq, self._mget(uniq)) if d is not None}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        uniq = unique_ids(ids)
+        if self._indexed:
+            self._write_many(uniq, lambda _id, _old: None)
+            return
+        for chunk in chunked(uniq, _BATCH):
+            pipe = self._r.pipeline()
+            pipe.delete(*[self._k(i) for i in chunk])
+            pipe.zrem(self._ts, *chunk)
+            pipe.execute()
+
+    def list(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> List[Dict[str, Any]]:
+        """prefix に一致するキーを取得（引数は list_page と同じ）"""
+        return self.list_page(limit, cursor, filters, order).items
+
+    def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        """
+        キーセットページング（BaseRepository と同じ契約）。
+
+        * 索引付きフィールドで絞れる場合 : SET の積集合 → ZMSCORE →
+          (score, id) でカーソル / 範囲判定・整列 → ページ分 (limit+1) だけ MGET
+        * それ以外 : 時刻 ZSET を score 範囲でバッチ走査し MGET
+        * reindex() 完了マーカーが無い間 : 全キー SCAN（索引に載っていない旧キーも返す）
+        """
+        q = build_query(limit, cursor, filters, order)
+        if not self._r.exists(ready_key(self.table)):
+            return paginate(self._iter_rows(), q)
+
+        groups = index_lookup_keys(self.table, self._indexed, q)
+        source: Iterator[Tuple[str, str, Dict[str, Any]]]
+        if groups:
+            ids = self._index_ids(groups)
+            source = self._rows_for_scores(page_keys(q, ids, self._zmscore(ids)), q.limit)
+        else:
+            source = self._zscan(q)
+
+        rows: List[Tuple[str, str, Dict[str, Any]]] = []
+        want = None if q.limit is None else q.limit + 1
+        for created, id_, doc in source:
+            if matches(doc, q.eq):
+                rows.append((created, id_, doc))
+                if want is not None and len(rows) >= want:
+                    break
+        return page_from_rows(rows, q.limit)
+
+    def list_by(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+        **eq: Any,
+    ) -> List[Dict[str, Any]]:
+        """索引付きフィールドでの等値検索（list(filters=eq) の糖衣）"""
+        return self.list(limit, cursor, eq, order)
+
+    def list_range(
+        self,
+        since: Any = None,
+        until: Any = None,
+        *,
+        limit: Optional[int] = None,
+        order: str = "asc",
+    ) -> List[Dict[str, Any]]:
+        """作成時刻 [since, until) のドキュメントを時刻順で返す"""
+        filters: Dict[str, Any] = {}
+        if since is not None:
+            filters["created_at__gte"] = since
+        if until is not None:
+            filters["created_at__lt"] = until
+        return self.list(limit, None, filters, order)
+
+    def count_range(self, since: Any = None, until: Any = None) -> int:
+        """作成時刻 [since, until) の件数（ZCOUNT のみ・本体は読まない）"""
+        lo = str(iso_to_ms(since)) if since is not None else "-inf"
+        hi = f"({iso_to_ms(until)}" if until is not None else "+inf"
+        return int(self._r.zcount(self._ts, lo, hi))
 
-    def list(self) -> List[Dict[str, Any]]:
-        """prefix に一致するキーを全件取得（少量想定）"""
-        docs: List[Dict[str, Any]] = []
-        for key in self._scan_iter():
-            raw = self._r.get(key)
-            if raw is None:
-                continue
-            try:
-                docs.append(json.loads(raw))
-            except json.JSONDecodeError:  # pragma: no cover
-                logger.warning("[RedisRepo] invalid JSON on key=%s", key)
-        return docs
-    
     def exists(self, id_: str) -> bool:
         return self._r.exists(self._k(id_)) > 0
 
+    def trim(self, before: Any) -> int:
+        """
+        before より前の時刻 ZSET エントリのうち、本体が EXPIRE / 削除で消えた id を
+        ZSET と索引 SET の両方から取り除く（戻り値は掃除した id 数）。
+        リテンションジョブが before 以前の本体を削除し終えた後に呼ぶこと。
+        """
+        hi = f"({iso_to_ms(before)}"
+        ix_keys = list(self._r.scan_iter(f"_idx:{self.table}:*", count=_BATCH)) if self._indexed else []
+        removed = offset = 0
+        while True:
+            ids = self._r.zrangebyscore(self._ts, "-inf", hi, start=offset, num=_BATCH)
+            if not ids:
+                return removed
+            pipe = self._r.pipeline(transaction=False)
+            for id_ in ids:
+                pipe.exists(self._k(id_))
+            dead = [i for i, alive in zip(ids, pipe.execute()) if not alive]
+            offset += len(ids) - len(dead)  # 消した分だけ後ろが前に詰まる
+            if not dead:
+                continue
+            pipe = self._r.pipeline(transaction=False)
+            for key in ix_keys:
+                pipe.srem(key, *dead)
+            pipe.zrem(self._ts, *dead)
+            pipe.execute()
+            removed += len(dead)
+
+    def reindex(self) -> int:
+        """
+        索引 SET / 時刻 ZSET を全キーから作り直す（索引追加後や旧データの backfill）。
+
+        作成時刻はドキュメントの ``created_at`` があればそれを、無ければ現在時刻。
+        既存の ZSET score は保持する（NX）。実行中は完了マーカーを外して list を
+        SCAN 経路へ戻し、最後にマーカーを立てて索引経路へ切り替える（冪等）。
+        """
+        self._r.delete(ready_key(self.table))
+        for key in self._r.scan_iter(f"_idx:{self.table}:*"):
+            self._r.delete(key)
+        n = 0
+        pipe = self._r.pipeline(transaction=False)
+        for _created, id_, doc in self._iter_rows():
+            try:
+                score = iso_to_ms(doc["created_at"])
+            except (KeyError, TypeError, ValueError):
+                score = now_ms()
+            pipe.zadd(self._ts, {id_: score}, nx=True)
+            for ix in index_keys(self.table, self._indexed, doc):
+                pipe.sadd(ix, id_)
+            n += 1
+            if n % _BATCH == 0:
+                pipe.execute()
+        pipe.execute()
+        self._r.set(ready_key(self.table), now_ms())
+        logger.info("[RedisRepo] reindexed %s docs prefix=%s", n, self._prefix)
+        return n
+
     # ------------------------------------------------------------------#
     # private
     # ------------------------------------------------------------------#
+    @property
+    def _ts(self) -> str:
+        return ts_key(self.table)
+
     def _scan_iter(self) -> Sequence[str]:
         """型アノテ付きラッパー"""
-        return self._r.scan_iter(f"{self._prefix}*")
+        return self._r.scan_iter(f"{self._prefix}*", count=_BATCH)
+
+    def _write(self, id_: str, build: Any) -> None:
+        """1 キー版の _write_many（build(old_doc | None) -> new_doc | None）"""
+        self._write_many([id_], lambda _id, old: build(old))
+
+    def _write_many(self, ids: Sequence[str], build: WriteFn) -> None:
+        """
+        WATCH/MULTI で _BATCH 件ずつキーを書き換え、索引 SET / 時刻 ZSET も
+        同じトランザクションで更新する。
+
+        build(id, old_doc | None) -> new_doc | None（None は削除）
+        Lua + cjson は数値を 14 桁に丸め、空 dict を [] に変換するため
+        採用せず、MGET → (MULTI ... EXEC) の 2 往復で原子性を確保する。
+        競合時は WatchError でそのバッチを再試行。
+        """
+        for chunk in chunked(ids, _BATCH):
+            keys = [self._k(i) for i in chunk]
+            with self._r.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(*keys)
+                        raws = pipe.mget(keys)
+                        pipe.multi()
+                        ts = now_ms()
+                        for id_, key, raw in zip(chunk, keys, raws):
+                            old = loads(raw) if raw is not None else None
+                            new = build(id_, old)
+                            if new is None:
+                                pipe.delete(key)
+                                pipe.zrem(self._ts, id_)
+                            else:
+                                pipe.set(key, dumps(new), ex=self._ttl)
+                                pipe.zadd(self._ts, {id_: ts}, nx=True)
+                            before = index_keys(self.table, self._indexed, old)
+                            after = index_keys(self.table, self._indexed, new)
+                            for ix in before - after:
+                                pipe.srem(ix, id_)
+                            for ix in after - before:
+                                pipe.sadd(ix, id_)
+                        pipe.execute()
+                        break
+                    except redis.WatchError:
+                        logger.debug("[RedisRepo] write conflict keys=%s – retry", len(keys))
+                        continue
+
+    def _mget(self, ids: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """id 列をまとめて MGET（壊れた JSON は None）"""
+        out: List[Optional[Dict[str, Any]]] = []
+        for i in range(0, len(ids), _BATCH):
+            chunk = ids[i : i + _BATCH]
+            for id_, raw in zip(chunk, self._r.mget([self._k(x) for x in chunk])):
+                if raw is None:
+                    out.append(None)
+                    continue
+                try:
+                    out.append(loads(raw))
+                except ValueError:  # pragma: no cover
+                    logger.warning("[RedisRepo] invalid JSON on id=%s", id_)
+                    out.append(None)
+        return out
+
+    def _zscan(self, q: ListQuery) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """時刻 ZSET を score 範囲で _BATCH 件ずつ読み、MGET で本体を取得"""
+        lo, hi = score_bounds(q)
+        offset = 0
+        while True:
+            if q.desc:
+                batch = self._r.zrevrangebyscore(
+                    self._ts, hi, lo, start=offset, num=_BATCH, withscores=True
+                )
+            else:
+                batch = self._r.zrangebyscore(
+                    self._ts, lo, hi, start=offset, num=_BATCH, withscores=True
+                )
+            if not batch:
+                return
+            offset += len(batch)
+            batch = [(m, s) for m, s in batch if after_cursor(q, s, m)]
+            docs = self._mget([m for m, _ in batch])
+            for (id_, score), doc in zip(batch, docs):
+                if doc is not None:  # ZSET に残った削除済み id は無視
+                    yield ms_to_iso(score), id_, doc
+
+    def _index_ids(self, groups: List[List[str]]) -> List[str]:
+        """索引 SET の積集合（フィールド内の複数値は和集合）。id のみで本体は読まない"""
+        if all(len(keys) == 1 for keys in groups):
+            return sorted(self._r.sinter([keys[0] for keys in groups]))
+        ids: Optional[Set[str]] = None
+        for keys in groups:
+            members: Set[str] = set(self._r.sunion(keys))
+            ids = members if ids is None else ids & members
+            if not ids:
+                break
+        return sorted(ids or ())
+
+    def _zmscore(self, ids: Sequence[str]) -> List[Optional[float]]:
+        """時刻 ZSET の score を _BATCH 件ずつ ZMSCORE（1 往復）"""
+        pipe = self._r.pipeline(transaction=False)
+        for chunk in chunked(ids, _BATCH):
+            pipe.zmscore(self._ts, list(chunk))
+        return [s for scores in pipe.execute() for s in scores]
+
+    def _rows_for_scores(
+        self, keys: Sequence[Tuple[float, str]], limit: Optional[int]
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """並べ済み (score, id) を先頭から limit+1 件ずつ MGET（消費された分だけ読む）"""
+        size = _BATCH if limit is None else min(_BATCH, limit + 1)
+        for chunk in chunked(keys, size):
+            for (score, id_), doc in zip(chunk, self._mget([i for _, i in chunk])):
+                if doc is not None:
+                    yield ms_to_iso(score), id_, doc
+
+    def _iter_rows(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """SCAN で (created_at, id, doc) を列挙（reindex() 完了前の list / reindex 本体）"""
+        keys: List[str] = []
+        for key in self._scan_iter():
+            keys.append(key)
+            if len(keys) >= _BATCH:
+                yield from self._rows_for_keys(keys)
+                keys = []
+        if keys:
+            yield from self._rows_for_keys(keys)
+
+    def _rows_for_keys(self, keys: List[str]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        ids = [k[len(self._prefix):] for k in keys]
+        for id_, doc in zip(ids, self._mget(ids)):
+            if doc is not None:
+                yield str(doc.get("created_at") or ""), id_, doc
 
 
 # --------------------------- self-test ---------------------------
@@ -4,17 +4,332 @@
 #
 # SQLite 汎用 JSON ストア（tenant_id, id, data, created_at）
 # -----------------------------------------------------------
+# 環境変数
+#   SQLITE_MODE              : default | production
+#       production … WAL / synchronous=NORMAL / mmap / busy_timeout を設定し、
+#                    接続は「スレッドごと × DB ファイルごと」に 1 本を共有する
+#                    （ファイルパス必須。":memory:" はスレッド間で共有されない）
+#   SQLITE_MMAP_SIZE         : mmap_size バイト (default 256MiB, production のみ)
+#   SQLITE_BUSY_TIMEOUT_MS   : ロック待ち上限 (default 5000)
+#   SQLITE_CACHED_STATEMENTS : 接続ごとのプリペアドステートメント LRU (default 256)
+#   SQLITE_GROUP_COMMIT_MS   : >0 で patch()（ステータス更新）を専用ライタが
+#                              この時間窓でまとめて 1 トランザクションでコミット
+# -----------------------------------------------------------
 
 from __future__ import annotations
 
-import json
+import logging
+import os
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from core.common.codec import dumps, loads
+
+from .base import (
+    BaseRepository,
+    ListQuery,
+    Page,
+    _as_utc,
+    build_query,
+    chunked,
+    page_from_rows,
+    unique_ids,
+)
+from .indexes import index_name, index_specs
 
-from .base import BaseRepository
+logger = logging.getLogger(__name__)
 
 _SQLITE_PRAGMA_FK = "PRAGMA foreign_keys = ON;"
+# get_many / delete_many の IN (...) 1 文あたりの件数
+# （SQLITE_MAX_VARIABLE_NUMBER が 999 の旧ビルドでも tenant_id 分と合わせて収まる）
+IN_BATCH = 500
+
+_MODE = os.getenv("SQLITE_MODE", "default").lower()
+_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+_GROUP_COMMIT_MS = float(os.getenv("SQLITE_GROUP_COMMIT_MS", "0"))
+# グループコミット 1 回あたりの最大文数
+_GROUP_COMMIT_MAX = 512
+
+
+def pragma_statements(production: bool) -> List[str]:
+    """接続直後に流す PRAGMA（同期 / 非同期実装で共用）"""
+    stmts = [_SQLITE_PRAGMA_FK, f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS};"]
+    if production:
+        stmts += [
+            "PRAGMA journal_mode = WAL;",
+            # WAL では NORMAL でも破損しない（電源断で直近コミットのみ失い得る）
+            "PRAGMA synchronous = NORMAL;",
+            f"PRAGMA mmap_size = {_MMAP_SIZE};",
+            "PRAGMA temp_store = MEMORY;",
+        ]
+    return stmts
+
+
+def connect(path: str, *, production: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        path,
+        # production はスレッドローカル接続なので同一スレッド検査を有効のまま使う
+        check_same_thread=production,
+        cached_statements=_CACHED_STATEMENTS,
+    )
+    for pragma in pragma_statements(production):
+        conn.execute(pragma)
+    return conn
+
+
+_LOCAL = threading.local()
+
+
+def thread_connection(path: str) -> sqlite3.Connection:
+    """現在のスレッド用の production 接続（同じファイルの Repository 間で共有）"""
+    conns: Optional[Dict[str, sqlite3.Connection]] = getattr(_LOCAL, "conns", None)
+    if conns is None:
+        conns = _LOCAL.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = connect(path, production=True)
+    return conn
+
+
+class GroupCommitter:
+    """
+    書き込み文をキューに溜め、専用スレッドが時間窓ごとに
+    1 トランザクションでまとめてコミットする。
+
+    submit() はその文を含むバッチのコミット完了まで待つため、
+    呼び出し側から見た永続性 / read-after-write は通常の書き込みと同じ。
+    """
+
+    def __init__(self, path: str, window_ms: float) -> None:
+        self.path = path
+        self.window = window_ms / 1000
+        self._q: "queue.Queue[Tuple[str, Sequence[Any], Future]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"sqlite-group-commit:{path}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, sql: str, params: Sequence[Any]) -> None:
+        fut: Future = Future()
+        self._q.put((sql, params, fut))
+        fut.result()
+
+    def _run(self) -> None:
+        conn = connect(self.path, production=True)
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < _GROUP_COMMIT_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for sql, params, _ in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error:
+                # 1 文の失敗でバッチ全体を巻き戻したので、1 文ずつやり直して個別に通知
+                for sql, params, fut in batch:
+                    try:
+                        with conn:
+                            conn.execute(sql, params)
+                        fut.set_result(None)
+                    except sqlite3.Error as exc:
+                        fut.set_exception(exc)
+                continue
+            for _, _, fut in batch:
+                fut.set_result(None)
+
+
+_COMMITTERS: Dict[str, GroupCommitter] = {}
+_COMMITTERS_LOCK = threading.Lock()
+
+
+def group_committer(path: str) -> GroupCommitter:
+    """DB ファイルごとに 1 つのグループコミットライタ"""
+    with _COMMITTERS_LOCK:
+        committer = _COMMITTERS.get(path)
+        if committer is None:
+            committer = _COMMITTERS[path] = GroupCommitter(path, _GROUP_COMMIT_MS)
+        return committer
+
+
+def index_ddl(quoted: str, table: str) -> List[str]:
+    """
+    indexes.SECONDARY_INDEXES から式インデックスの DDL を作る。
+
+    式は list_statement の json_extract(data, '$.key') と同形にして
+    プランナが一致判定できるようにし、末尾の (created_at, id) で
+    ORDER BY も索引順に読めるようにする。
+    """
+    stmts = []
+    for spec in index_specs(table):
+        cols = ", ".join(f"json_extract(data, '$.{f}')" for f in spec)
+        stmts.append(
+            f"CREATE INDEX IF NOT EXISTS {index_name(table, spec)} "
+            f"ON {quoted}(tenant_id, {cols}, created_at, id);"
+        )
+    return stmts
+
+
+def create_sql(quoted: str, *, legacy: bool = False) -> str:
+    """
+    create() 用の UPSERT 文。
+
+    INSERT OR REPLACE は行を削除→再挿入するため created_at が更新され、
+    キーセットページング中に行が先頭へ移動してしまう。ON CONFLICT で
+    data だけを置き換え、created_at（= 並び順）を保つ。
+    """
+    if legacy:
+        return f"INSERT OR REPLACE INTO {quoted} (tenant_id, id, data) VALUES (?, ?, ?)"
+    return (
+        f"INSERT INTO {quoted} (tenant_id, id, data) VALUES (?, ?, ?) "
+        "ON CONFLICT (tenant_id, id) DO UPDATE SET data = excluded.data"
+    )
+
+
+def create_many_params(
+    tenant_id: str, items: Mapping[str, Dict[str, Any]]
+) -> List[Tuple[str, str, str]]:
+    """create_many() の executemany 用パラメータ列"""
+    return [
+        (tenant_id, obj_id, dumps(data))
+        for obj_id, data in items.items()
+    ]
+
+
+def import_sql(quoted: str, *, legacy: bool = False) -> str:
+    """import_rows() 用: created_at も元の値で UPSERT する文"""
+    if legacy:
+        return (
+            f"INSERT OR REPLACE INTO {quoted} (tenant_id, id, data, created_at) "
+            "VALUES (?, ?, ?, ?)"
+        )
+    return (
+        f"INSERT INTO {quoted} (tenant_id, id, data, created_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (tenant_id, id) DO UPDATE "
+        "SET data = excluded.data, created_at = excluded.created_at"
+    )
+
+
+def many_statements(
+    verb: str, quoted: str, tenant_id: str, obj_ids: Sequence[str]
+) -> Iterator[Tuple[str, List[Any]]]:
+    """
+    get_many / delete_many 用に id 列を IN_BATCH 件ずつの
+    ``{verb} FROM t WHERE tenant_id = ? AND id IN (?, ...)`` へ分割する。
+    """
+    for chunk in chunked(obj_ids, IN_BATCH):
+        marks = ", ".join("?" * len(chunk))
+        yield (
+            f"{verb} FROM {quoted} WHERE tenant_id = ? AND id IN ({marks})",
+            [tenant_id, *chunk],
+        )
+
+
+def patch_statement(
+    quoted: str, tenant_id: str, obj_id: str, partial: Dict[str, Any]
+) -> Tuple[str, List[Any]] | None:
+    """
+    patch() 用の UPSERT 文とパラメータを組み立てる（同期 / 非同期実装で共用）。
+
+    json_patch() は RFC 7396 準拠で null を「キー削除」と解釈し、
+    ネストした dict も再帰マージしてしまうため、dict.update() と同じ
+    意味になる json_set(data, '$."key"', json(value), ...) を使う。
+    JSON パスに埋め込めないキー（" を含む）がある場合は None を返す。
+    """
+    if any('"' in str(k) for k in partial):
+        return None
+
+    set_args: List[str] = []
+    params: List[Any] = [tenant_id, obj_id, dumps(partial)]
+    for key, value in partial.items():
+        set_args.append("?, json(?)")
+        params.append(f'$."{key}"')
+        params.append(dumps(value))
+
+    on_conflict = (
+        f"DO UPDATE SET data = json_set(data, {', '.join(set_args)})"
+        if set_args
+        else "DO NOTHING"
+    )
+    sql = f"""
+        INSERT INTO {quoted} (tenant_id, id, data)
+        VALUES (?, ?, ?)
+        ON CONFLICT (tenant_id, id) {on_conflict}
+    """
+    return sql, params
+
+
+def _sql_value(value: Any) -> Any:
+    """json_extract() の戻り値と比較できる形にする"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return dumps(value)
+    return value
+
+
+def _sql_ts(dt: datetime) -> str:
+    """created_at 列と同じ 'YYYY-MM-DD HH:MM:SS.fff' (UTC) 形式"""
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def list_statement(
+    quoted: str, tenant_id: str, q: ListQuery
+) -> Tuple[str, List[Any]]:
+    """
+    list_page() 用の SELECT 文を組み立てる（同期 / 非同期実装で共用）。
+
+    * 等値フィルタは json_extract(data, '$.key') に押し下げる
+      （キーは build_query で識別子に限定済み → 式インデックスと一致する）
+    * カーソルは行値比較 (created_at, id) < (?, ?) でキーセットページング
+    * 次ページ有無の判定用に limit + 1 件取得する
+    """
+    where = ["tenant_id = ?"]
+    params: List[Any] = [tenant_id]
+    for key, want in q.eq.items():
+        expr = f"json_extract(data, '$.{key}')"
+        if want is None:
+            where.append(f"{expr} IS NULL")
+        elif isinstance(want, list):
+            where.append(f"{expr} IN ({', '.join('?' * len(want))})")
+            params.extend(_sql_value(v) for v in want)
+        else:
+            where.append(f"{expr} = ?")
+            params.append(_sql_value(want))
+    if q.created_gte is not None:
+        where.append("created_at >= ?")
+        params.append(_sql_ts(q.created_gte))
+    if q.created_lt is not None:
+        where.append("created_at < ?")
+        params.append(_sql_ts(q.created_lt))
+    if q.after is not None:
+        where.append(f"(created_at, id) {'<' if q.desc else '>'} (?, ?)")
+        params.extend(q.after)
+
+    direction = "DESC" if q.desc else "ASC"
+    sql = (
+        f"SELECT created_at, id, data FROM {quoted} "
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY created_at {direction}, id {direction}"
+    )
+    if q.limit is not None:
+        sql += " LIMIT ?"
+        params.append(q.limit + 1)
+    return sql, params
 
 
 class SQLiteRepository(BaseRepository):
@@ -27,16 +342,30 @@ class SQLiteRepository(BaseRepository):
         path: str | Path = "mmopdca.db",
         table: str = "plan",
         tenant_id: str = "public",
+        *,
+        mode: str | None = None,
     ) -> None:
         self.table = table
         self.tenant_id = tenant_id
         self.quoted = f'"{table}"'
+        self.path = str(path)
+        self.production = (mode or _MODE) == "production"
 
-        self.conn = sqlite3.connect(str(path), check_same_thread=False)
-        self.conn.execute(_SQLITE_PRAGMA_FK)
+        # default: インスタンス専用の接続 1 本（従来どおり）
+        # production: conn プロパティがスレッドローカル接続を返す
+        self._conn: Optional[sqlite3.Connection] = (
+            None if self.production else connect(self.path, production=False)
+        )
+        self._committer: Optional[GroupCommitter] = (
+            group_committer(self.path) if self.production and _GROUP_COMMIT_MS > 0 else None
+        )
 
         self._ensure_schema()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self._conn if self._conn is not None else thread_connection(self.path)
+
     # ------------------------------------------------------------------ #
     # スキーマ保証
     # ------------------------------------------------------------------ #
@@ -49,7 +378,8 @@ class SQLiteRepository(BaseRepository):
                     tenant_id  TEXT NOT NULL DEFAULT 'public',
                     id         TEXT NOT NULL,
                     data       TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    created_at TIMESTAMP NOT NULL
+                               DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
                     PRIMARY KEY (tenant_id, id)
                 );
                 """
@@ -72,27 +402,88 @@ class SQLiteRepository(BaseRepository):
                 # 既存 PK(id) を複合 PK に作り直すのは難しいため、
                 # 移行時は dump/restore を推奨（MVP ではスキップ）
 
-            # ③ created_at 降順インデックス
+            # ③ キーセットページング用 (created_at, id) インデックス
             self.conn.execute(
                 f"""
-                CREATE INDEX IF NOT EXISTS idx_{self.table}__tenant_created_at
-                ON {self.quoted}(tenant_id, created_at DESC);
+                CREATE INDEX IF NOT EXISTS idx_{self.table}__tenant_created_at_id
+                ON {self.quoted}(tenant_id, created_at, id);
                 """
             )
 
+            # ④ セカンダリインデックス（indexes.py の宣言に従う）
+            for ddl in index_ddl(self.quoted, self.table):
+                self.conn.execute(ddl)
+
     # ------------------------------------------------------------------ #
     # CRUD
     # ------------------------------------------------------------------ #
     def create(self, obj_id: str, data: Dict[str, Any]) -> None:
+        params = (self.tenant_id, obj_id, dumps(data))
+        try:
+            with self.conn:
+                self.conn.execute(create_sql(self.quoted), params)
+        except sqlite3.OperationalError:
+            # 旧テーブル (PK=id のみ) は ON CONFLICT (tenant_id, id) 不可
+            with self.conn:
+                self.conn.execute(create_sql(self.quoted, legacy=True), params)
+
+    def create_many(self, items: Mapping[str, Dict[str, Any]]) -> None:
+        """executemany で 1 トランザクションにまとめて UPSERT"""
+        rows = create_many_params(self.tenant_id, items)
+        if not rows:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany(create_sql(self.quoted), rows)
+        except sqlite3.OperationalError:
+            with self.conn:
+                self.conn.executemany(create_sql(self.quoted, legacy=True), rows)
+
+    def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """IN (...) を IN_BATCH 件ずつ発行してまとめて取得"""
+        ids = unique_ids(obj_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        for stmt in many_statements("SELECT id, data", self.quoted, self.tenant_id, ids):
+            found.update((i, loads(d)) for i, d in self.conn.execute(*stmt))
+        return {i: found[i] for i in ids if i in found}
+
+    def delete_many(self, obj_ids: Iterable[str]) -> None:
+        ids = unique_ids(obj_ids)
         with self.conn:
-            self.conn.execute(
-                f"""
-                INSERT OR REPLACE INTO {self.quoted}
-                    (tenant_id, id, data)
-                VALUES(?, ?, ?)
-                """,
-                (self.tenant_id, obj_id, json.dumps(data, ensure_ascii=False)),
-            )
+            for stmt in many_statements("DELETE", self.quoted, self.tenant_id, ids):
+                self.conn.execute(*stmt)
+
+    def patch(self, obj_id: str, partial: Dict[str, Any]) -> None:
+        """1 文の UPSERT でトップレベルキーをマージ（詳細は patch_statement）。"""
+        stmt = patch_statement(self.quoted, self.tenant_id, obj_id, partial)
+        if stmt is None:
+            super().patch(obj_id, partial)
+            return
+        try:
+            if self._committer is not None:
+                self._committer.submit(*stmt)
+                return
+            with self.conn:
+                self.conn.execute(*stmt)
+        except sqlite3.OperationalError as exc:
+            # 旧テーブル (PK=id のみ) は ON CONFLICT 対象が無い → 汎用実装へ
+            logger.debug("[SQLiteRepo] native patch unavailable: %s", exc)
+            super().patch(obj_id, partial)
+
+    def import_rows(self, rows: Sequence[Tuple[Any, str, Dict[str, Any]]]) -> None:
+        """作成時刻つきで executemany UPSERT（1 トランザクション）"""
+        params = [
+            (self.tenant_id, obj_id, dumps(data), _sql_ts(_as_utc(ts)))
+            for ts, obj_id, data in rows
+        ]
+        if not params:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany(import_sql(self.quoted), params)
+        except sqlite3.OperationalError:
+            with self.conn:
+                self.conn.executemany(import_sql(self.quoted, legacy=True), params)
 
     def get(self, obj_id: str) -> Dict[str, Any] | None:
         cur = self.conn.execute(
@@ -103,18 +494,19 @@ class SQLiteRepository(BaseRepository):
             (self.tenant_id, obj_id),
         )
         row = cur.fetchone()
-        return json.loads(row[0]) if row else None
+        return loads(row[0]) if row else None
 
-    def list(self) -> List[Dict[str, Any]]:
-        cur = self.conn.execute(
-            f"""
-            SELECT data FROM {self.quoted}
-            WHERE tenant_id = ?
-            ORDER BY created_at DESC
-            """,
-            (self.tenant_id,),
-        )
-        return [json.loads(r[0]) for r in cur.fetchall()]
+    def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+        order: str = "desc",
+    ) -> Page:
+        q = build_query(limit, cursor, filters, order)
+        cur = self.conn.execute(*list_statement(self.quoted, self.tenant_id, q))
+        rows = [(c, i, loads(d)) for c, i, d in cur.fetchall()]
+        return page_from_rows(rows, q.limit)
 
     def delete(self, obj_id: str) -> None:
         with self.conn:
@@ -137,7 +529,9 @@ class SQLiteRepository(BaseRepository):
     # housekeeping
     # ------------------------------------------------------------------ #
     def __del__(self) -> None:  # noqa: D401
+        # スレッドローカル接続（production）は他インスタンスと共有なので閉じない
         try:
-            self.conn.close()
+            if self._conn is not None:
+                self._conn.close()
         except Exception:  # pragma: no cover
             pass
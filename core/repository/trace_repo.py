@@ -7,10 +7,11 @@ core/repository/trace_repo.py
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Dict, Generator, Iterable, Iterator, List
 
+from core.common.codec import json_codec
+
 TRACE_ROOT = Path("pdca_data/trace")  # ローカル保管先
 
 
@@ -37,8 +38,8 @@ class TraceRepo:
         1 イベントを追記保存。event は JSON シリアライズ可能 dict。
         """
         f = self._file(run_id)
-        with f.open("a", encoding="utf-8") as fp:
-            fp.write(json.dumps(event, ensure_ascii=False) + "\n")
+        with f.open("ab") as fp:
+            fp.write(json_codec().encode(event) + b"\n")
 
     def stream(self, run_id: str) -> Iterator[Dict]:
         """
@@ -48,10 +49,11 @@ class TraceRepo:
         if not f.exists():
             return iter([])  # 空イテレータ
 
-        with f.open("r", encoding="utf-8") as fp:
+        codec = json_codec()
+        with f.open("rb") as fp:
             for line in fp:
                 if line.strip():
-                    yield json.loads(line)
+                    yield codec.decode(line)
 
     # 便利メソッド --------------------------------------------------------- #
 
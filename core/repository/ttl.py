@@ -0,0 +1,57 @@
+# =========================================================
+# ASSIST_KEY: 【core/repository/ttl.py】
+# =========================================================
+#
+# 【概要】
+#   テーブル別のレコード保持期間 (TTL) 設定。
+#   ストレージ層（Redis の EXPIRE）と運用層（core/ops/retention.py の
+#   アーカイブ / 削除ジョブ）が同じ定義を参照するため、依存の向きが
+#   repository → ops にならないようここに置く。
+#
+# 【主な役割】
+#   - parse_ttls(spec)       : "do=30,check=7.5" → {"do": 30.0, "check": 7.5}
+#   - key_ttl_seconds(table) : Redis キーの EXPIRE 秒（TTL + 猶予）。
+#       beat が止まっていてもキーが無限に残らないための安全網
+#
+# 【外部設定】
+#   RETENTION_TTL_DAYS         : "do=30,check=30,act=90"（空 = 無効）
+#   RETENTION_REDIS_GRACE_DAYS : Redis EXPIRE を TTL より何日長くするか (default 1)
+#
+# 【ルール遵守】
+#   1) 他ユニットを import しない（redis_impl / retention の双方から読まれる）
+# ---------------------------------------------------------
+from __future__ import annotations
+
+import logging
+import os
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["parse_ttls", "key_ttl_seconds"]
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """``"do=30,check=30"`` → ``{"do": 30.0, "check": 30.0}``（0 以下は無視）"""
+    out: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, sep, days = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            value = float(days)
+        except ValueError:
+            logger.warning("[retention] invalid TTL %r – ignored", item)
+            continue
+        if value > 0:
+            out[name.strip()] = value
+    return out
+
+
+def key_ttl_seconds(table: str) -> Optional[int]:
+    """Redis キーに付ける EXPIRE 秒（対象外テーブルは None）"""
+    days = parse_ttls(os.getenv("RETENTION_TTL_DAYS", "")).get(table)
+    if days is None:
+        return None
+    grace = float(os.getenv("RETENTION_REDIS_GRACE_DAYS", "1"))
+    return int((days + max(grace, 0.0)) * 86400)
@@ -8,20 +8,28 @@
 # run_check_task:
 #   • PENDING → RUNNING → SUCCESS/FAILURE を管理
 #   • Do フェーズの完了待ち & メトリクス充足待ち
-#   • SQLiteRepository は delete/create で upsert
+#   • 状態更新は Repository.patch（1 往復・原子的マージ）
 #   • datetime は UTC ISO8601形式
+#
+# run_check_batch_task:
+#   • Plan の DONE な Do（任意で作成時刻の範囲）をまとめて 1 ジョブで評価
+#   • 成果物は CheckExecutor.run_many で 1 データセットとして並列スキャン
+#   • Check レコードは create_many で一括書き込み（batch_id 付き）
+#   • 評価に失敗した run は FAILURE + error として記録し、残りの run は続行
 # ---------------------------------------------------------
 
 from __future__ import annotations
 
 import logging
+import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List
-
+from typing import Any, Dict, List, Optional
 
 from celery.exceptions import Retry
 from core.celery_app import celery_app
-from core.repository.factory import get_repo
+from core.repository.base import CREATED_GTE, CREATED_LT
+from core.repository.factory import get_metrics_ts, get_repo
+from core.repository.metrics_ts import record_metrics
 from core.schemas.check_schemas import CheckReport
 from core.schemas.do_schemas import DoStatus  # Do フェーズの状態定義
 
@@ -32,13 +40,9 @@ _do_repo = get_repo("do")
 
 def _upsert(check_id: str, rec: Dict[str, Any]) -> None:
     """
-    同 ID があれば削除し、新規レコードを作成して upsert を実現
+    既存レコードへフィールドをマージ保存（無ければ作成）
     """
-    try:
-        _check_repo.delete(check_id)
-    except Exception:
-        pass
-    _check_repo.create(check_id, rec)
+    _check_repo.patch(check_id, rec)
 
 
 @celery_app.task(
@@ -52,19 +56,16 @@ def _upsert(check_id: str, rec: Dict[str, Any]) -> None:
 def run_check_task(self, check_id: str, do_id: str) -> None:
     """Check フェーズを実行し、レポジトリにレポートを記録する Celery タスク"""
 
-    # 1) RUNNING 状態を保存
-    rec = _check_repo.get(check_id) or {
-        "id": check_id,
-        "do_id": do_id,
-        "created_at": datetime.now(timezone.utc).isoformat(),
-    }
-    rec.update(
+    # 1) RUNNING 状態を保存（初期レコードは API 側で enqueue 前に作成済み）
+    _upsert(
+        check_id,
         {
+            "id": check_id,
+            "do_id": do_id,
             "status": "RUNNING",
             "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
+        },
     )
-    _upsert(check_id, rec)
 
     try:
         # 2) Do フェーズ結果取得
@@ -106,30 +107,148 @@ def run_check_task(self, check_id: str, do_id: str) -> None:
         )
 
         # 4) SUCCESS と report を保存
-        rec = _check_repo.get(check_id) or {}
-        rec.update(
+        _upsert(
+            check_id,
             {
                 "status": status_report,
                 "report": {"status": status_report, **report.model_dump()},
                 "completed_at": datetime.now(timezone.utc).isoformat(),
-            }
+            },
         )
-        _upsert(check_id, rec)
+
+        # 5) 指標を時系列ストアへ記録（失敗してもレポート保存は成立させる）
+        try:
+            record_metrics(
+                get_metrics_ts(),
+                str(rec_do.get("plan_id") or ""),
+                str(rec_do.get("symbol") or ""),
+                report.model_dump(exclude={"threshold", "passed"}),
+                run_id=do_id,
+            )
+        except Exception as exc:  # pragma: no cover - ストア障害は警告のみ
+            logger.warning("metrics time-series write failed: %s", exc)
 
     except Retry:
         # Retry は Celery に再スケジュールさせるためそのまま伝搬
         raise
     except Exception as exc:
-        # 5) 例外時は FAILURE とエラーメッセージを保存
+        # 6) 例外時は FAILURE とエラーメッセージを保存
         logger.error("Check task failed: %s", exc, exc_info=True)
-        rec = _check_repo.get(check_id) or {}
-        rec.update(
+        _upsert(
+            check_id,
             {
                 "status": "FAILURE",
                 "error": str(exc),
                 "completed_at": datetime.now(timezone.utc).isoformat(),
-            }
+            },
         )
-        _upsert(check_id, rec)
         # Celery にも例外として伝搬
         raise
+
+
+# ---------------------------------------------------------------------- #
+# バッチ Check
+# ---------------------------------------------------------------------- #
+_DO_PAGE = 500
+
+
+def _done_runs(
+    plan_id: str, since: Optional[str] = None, until: Optional[str] = None
+) -> Dict[str, str]:
+    """Plan の DONE な Do を新しい順に走査し ``{run_id: do_id}`` を返す"""
+    filters: Dict[str, Any] = {"plan_id": plan_id, "status": DoStatus.DONE.value}
+    if since:
+        filters[CREATED_GTE] = since
+    if until:
+        filters[CREATED_LT] = until
+    runs: Dict[str, str] = {}
+    cursor: Optional[str] = None
+    while True:
+        page = _do_repo.list_page(limit=_DO_PAGE, cursor=cursor, filters=filters)
+        for (_, do_id), rec in zip(page.keys, page.items):
+            run_id = (rec.get("result") or {}).get("run_id")
+            if run_id:
+                runs.setdefault(str(run_id), do_id)
+        cursor = page.next_cursor
+        if cursor is None:
+            return runs
+
+
+@celery_app.task(
+    name="core.tasks.check_tasks.run_check_batch_task",
+    acks_late=True,
+)
+def run_check_batch_task(
+    batch_id: str,
+    plan_id: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Plan の全 run（または作成時刻の範囲）を 1 ジョブで Check し、集計を返す"""
+    from core.check.check_executor import CheckExecutor  # lazy: numpy を遅延 import
+
+    runs = _done_runs(plan_id, since, until)
+    errors: Dict[str, str] = {}
+    results = CheckExecutor.run_many(plan_id, list(runs), errors=errors)
+
+    now = datetime.now(timezone.utc).isoformat()
+    records: Dict[str, Dict[str, Any]] = {}
+    for run_id, result in results.items():
+        report = result.report
+        status_report = "SUCCESS" if report.passed else "FAILURE"
+        check_id = f"check-{uuid.uuid4().hex[:8]}"
+        records[check_id] = {
+            "id": check_id,
+            "do_id": runs[run_id],
+            "batch_id": batch_id,
+            "status": status_report,
+            "report": {"status": status_report, **report.model_dump()},
+            "created_at": now,
+            "completed_at": now,
+        }
+    # 評価に失敗した run は run_check_task と同じく FAILURE + error で記録
+    for run_id, message in errors.items():
+        check_id = f"check-{uuid.uuid4().hex[:8]}"
+        records[check_id] = {
+            "id": check_id,
+            "do_id": runs[run_id],
+            "batch_id": batch_id,
+            "status": "FAILURE",
+            "error": message,
+            "created_at": now,
+            "completed_at": now,
+        }
+    if records:
+        _check_repo.create_many(records)
+
+    # 指標を時系列ストアへ（失敗してもレコード保存は成立させる）
+    try:
+        store = get_metrics_ts()
+        for run_id, result in results.items():
+            report = result.report.model_dump(exclude={"threshold", "passed", "groups"})
+            record_metrics(
+                store,
+                plan_id,
+                "",
+                {k: v for k, v in report.items() if not k.endswith("_threshold")},
+                run_id=runs[run_id],
+            )
+    except Exception as exc:  # pragma: no cover - ストア障害は警告のみ
+        logger.warning("metrics time-series write failed: %s", exc)
+
+    passed = sum(1 for rec in records.values() if rec["status"] == "SUCCESS")
+    summary = {
+        "batch_id": batch_id,
+        "plan_id": plan_id,
+        "runs": len(runs),
+        "evaluated": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "errors": sorted(runs[r] for r in errors),
+        "missing": sorted(runs[r] for r in runs if r not in results and r not in errors),
+    }
+    logger.info(
+        "[check-batch] %s plan=%s runs=%d evaluated=%d passed=%d",
+        batch_id, plan_id, summary["runs"], summary["evaluated"], passed,
+    )
+    return summary
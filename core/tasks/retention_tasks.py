@@ -0,0 +1,32 @@
+# =========================================================
+# File: core/tasks/retention_tasks.py
+# Name: リテンション（TTL 切れレコードのアーカイブ & 削除）Celery タスク
+# =========================================================
+
+from __future__ import annotations
+
+import logging
+from typing import Dict
+
+from core.celery_app import celery_app
+from core.ops.retention import RetentionConfig, run_retention
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------------------------
+# 運用用：RETENTION_TTL_DAYS に従って期限切れレコードを退避・削除
+# ----------------------------------------------------------------------
+@celery_app.task(
+    name="core.tasks.retention_tasks.run_retention_task",
+    acks_late=True,
+    ignore_result=False,
+)
+def run_retention_task() -> Dict[str, int]:
+    """
+    テーブルごとの削除件数を返す。TTL 未設定なら何もしない
+    （時系列指標の purge は METRICS_TS_RETENTION_DAYS のみで動く）。
+    """
+    cfg = RetentionConfig.from_env()
+    results = run_retention(cfg)
+    return {r.table: r.deleted for r in results}
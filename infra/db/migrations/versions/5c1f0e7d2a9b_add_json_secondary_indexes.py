@@ -0,0 +1,84 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【infra/db/migrations/versions/5c1f0e7d2a9b_add_json_secondary_indexes.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   plan / do / check / act の JSONB ドキュメントに対する
+#   セカンダリインデックスを追加するマイグレーション。
+#     - (tenant_id, created_at, id)              … キーセットページング
+#     - (tenant_id, (data->>'k'), ..., created_at, id) … list_by / フィルタ
+#
+# 【注意】
+#   - 定義は core/repository/indexes.py の SECONDARY_INDEXES と一致させる
+#     （マイグレーションは履歴なのでアプリコードを import せず値を固定）。
+#   - 稼働中テーブルをロックしないよう CREATE INDEX CONCURRENTLY を
+#     autocommit ブロックで実行する。IF NOT EXISTS で再実行も安全。
+#
+# ---------------------------------------------------------
+
+"""add json secondary indexes
+
+Revision ID: 5c1f0e7d2a9b
+Revises: 11b979e6aa33
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple, Union
+
+from alembic import op
+
+# ──────────────────────────────────────────────────────────
+# Alembic メタデータ
+# ──────────────────────────────────────────────────────────
+revision: str = "5c1f0e7d2a9b"
+down_revision: Union[str, None] = "11b979e6aa33"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 対象テーブル
+_TABLES = ("plan", "do", "check", "act")
+
+# core/repository/indexes.py SECONDARY_INDEXES のスナップショット
+_INDEXES: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "do": (("plan_id", "status"), ("status",)),
+    "check": (("do_id",), ("status",)),
+    "act": (("check_id",),),
+}
+
+
+def _statements() -> Tuple[Tuple[str, str], ...]:
+    """(index 名, CREATE 文) の一覧"""
+    out = []
+    for tbl in _TABLES:
+        name = f"ix_{tbl}__created_id"
+        out.append(
+            (name, f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                   f'ON "{tbl}" (tenant_id, created_at, id);')
+        )
+        for spec in _INDEXES.get(tbl, ()):
+            name = f"ix_{tbl}__{'_'.join(spec)}"
+            cols = ", ".join(f"(data->>'{f}')" for f in spec)
+            out.append(
+                (name, f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                       f'ON "{tbl}" (tenant_id, {cols}, created_at, id);')
+            )
+    return tuple(out)
+
+
+# ──────────────────────────────────────────────────────────
+# upgrade / downgrade
+# ──────────────────────────────────────────────────────────
+def upgrade() -> None:  # noqa: D401
+    """Apply index additions."""
+    with op.get_context().autocommit_block():
+        for _, ddl in _statements():
+            op.execute(ddl)
+
+
+def downgrade() -> None:  # noqa: D401
+    """Revert index additions."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(_statements()):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
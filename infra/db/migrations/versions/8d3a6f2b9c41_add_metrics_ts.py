@@ -0,0 +1,61 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【infra/db/migrations/versions/8d3a6f2b9c41_add_metrics_ts.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   評価指標の時系列表 metrics_ts を追加するマイグレーション。
+#     - PK (plan_id, symbol, metric, ts) … 最新値 / 期間取得 / ロールアップ
+#     - ix_metrics_ts__ts                … 保持期間での一括削除
+#
+# 【注意】
+#   - 定義は core/repository/metrics_ts.py の PostgresMetricsTS と一致させる
+#     （マイグレーションは履歴なのでアプリコードを import せず値を固定）。
+#
+# ---------------------------------------------------------
+
+"""add metrics_ts table
+
+Revision ID: 8d3a6f2b9c41
+Revises: 5c1f0e7d2a9b
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# ──────────────────────────────────────────────────────────
+# Alembic メタデータ
+# ──────────────────────────────────────────────────────────
+revision: str = "8d3a6f2b9c41"
+down_revision: Union[str, None] = "5c1f0e7d2a9b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# ──────────────────────────────────────────────────────────
+# upgrade / downgrade
+# ──────────────────────────────────────────────────────────
+def upgrade() -> None:  # noqa: D401
+    """Create metrics_ts."""
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS metrics_ts (
+            plan_id TEXT             NOT NULL,
+            symbol  TEXT             NOT NULL,
+            metric  TEXT             NOT NULL,
+            ts      TIMESTAMPTZ      NOT NULL,
+            value   DOUBLE PRECISION NOT NULL,
+            run_id  TEXT             NOT NULL DEFAULT '',
+            PRIMARY KEY (plan_id, symbol, metric, ts)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_metrics_ts__ts ON metrics_ts (ts);")
+
+
+def downgrade() -> None:  # noqa: D401
+    """Drop metrics_ts."""
+    op.execute("DROP TABLE IF EXISTS metrics_ts;")
@@ -11,6 +11,7 @@ import api.routers.plan_dsl_api as plan_dsl_module
 import api.routers.do_api as do_module
 
 # MemoryRepo で本番 DB 依存を切る
+from core.repository.async_memory_impl import AsyncMemoryRepository
 from core.repository.memory_impl import MemoryRepository
 
 
@@ -27,6 +28,10 @@ def _patch_repo(monkeypatch: pytest.MonkeyPatch):
     # Do ルータ
     monkeypatch.setattr(do_module, "_plan_repo", mem_plan_repo, raising=True)
     monkeypatch.setattr(do_module, "_do_repo", mem_do_repo, raising=True)
+    # GET /do/{id} は async Repository 経由（同じメモリストアを参照）
+    monkeypatch.setattr(
+        do_module, "_do_repo_async", AsyncMemoryRepository(table="do"), raising=True
+    )
 
 
 @pytest.fixture()
@@ -0,0 +1,32 @@
+# tests/api/test_metrics_api.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.routers.metrics_api as metrics_module
+from core.repository.memory_impl import MemoryRepository
+
+
+@pytest.fixture()
+def client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(metrics_module, "_metrics_repo", MemoryRepository(table="metrics_test"))
+    app = FastAPI()
+    app.include_router(metrics_module.router)
+    return TestClient(app)
+
+
+def test_empty_payload_is_rejected(client: TestClient):
+    res = client.post("/metrics/run-empty", json={"actual": [], "pred": []})
+    assert res.status_code == 400
+    assert client.get("/metrics/run-empty").status_code == 404
+
+
+def test_undefined_metrics_are_stored_as_null(client: TestClient):
+    res = client.post("/metrics/run-zero", json={"actual": [0.0, 0.0], "pred": [1.0, 2.0]})
+    assert res.status_code == 201
+    body = res.json()
+    assert body["mape"] is None  # y == 0 のみ → MAPE は定義できない
+    assert body["mae"] == pytest.approx(1.5)
+
+    assert client.get("/metrics/run-zero").json()["mape"] is None
+    assert [m["run_id"] for m in client.get("/metrics/", params={"min_r2": 0}).json()] == ["run-zero"]
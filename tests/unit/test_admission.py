@@ -0,0 +1,108 @@
+# tests/unit/test_admission.py
+
+import pytest
+
+from core.ops.admission import AdmissionController, AdmissionLimits, AdmissionRejected
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _controller(depth: list[int], in_flight: int = 0, **limits):
+    calls = {"depth": 0}
+
+    def depth_probe(queue: str) -> int:
+        calls["depth"] += 1
+        return depth[0]
+
+    clock = _Clock()
+    ctl = AdmissionController(
+        AdmissionLimits(**limits),
+        depth_probe=depth_probe,
+        inflight_probe=lambda: in_flight,
+        clock=clock,
+    )
+    return ctl, clock, calls
+
+
+def test_disabled_never_probes():
+    ctl, _, calls = _controller([10_000])
+    ctl.admit("do")
+    assert calls["depth"] == 0
+
+
+def test_queue_depth_rejects_with_503_and_retry_after():
+    ctl, _, _ = _controller([500], max_queue_depth=100, retry_after=20)
+    with pytest.raises(AdmissionRejected) as exc:
+        ctl.admit("do")
+    assert exc.value.status_code == 503
+    assert exc.value.retry_after == 20
+    assert exc.value.reason == "queue_depth"
+
+
+def test_in_flight_rejects_with_429():
+    ctl, _, _ = _controller([0], in_flight=8, max_in_flight=8)
+    with pytest.raises(AdmissionRejected) as exc:
+        ctl.admit("check")
+    assert exc.value.status_code == 429
+
+
+def test_probe_is_cached_until_ttl():
+    depth = [10]
+    ctl, clock, calls = _controller(depth, max_queue_depth=100, cache_ttl=5.0)
+    ctl.admit("do")
+    ctl.admit("do")
+    assert calls["depth"] == 1
+
+    depth[0] = 1_000
+    ctl.admit("do")  # 期限内なのでキャッシュ値で通る
+    clock.now = 6.0
+    with pytest.raises(AdmissionRejected):
+        ctl.admit("do")
+    assert calls["depth"] == 2
+
+
+def test_broker_error_sheds_load():
+    def broken(queue: str) -> int:
+        raise ConnectionError("down")
+
+    ctl = AdmissionController(
+        AdmissionLimits(max_queue_depth=10), depth_probe=broken, inflight_probe=lambda: 0
+    )
+    with pytest.raises(AdmissionRejected) as exc:
+        ctl.admit("do")
+    assert exc.value.reason == "broker_unavailable"
+
+
+def test_refresh_exports_gauges_without_limits():
+    ctl, _, calls = _controller([42], in_flight=3)
+    ctl.refresh()
+    snap = ctl.snapshot()
+    assert (snap["queue_depth"], snap["in_flight"]) == (42, 3)
+    assert calls["depth"] == 1
+
+
+def test_admit_only_probes_enabled_axes():
+    def broken_inspect() -> int:
+        raise TimeoutError("inspect timed out")
+
+    calls = {"depth": 0}
+
+    def depth_probe(queue: str) -> int:
+        calls["depth"] += 1
+        return 5
+
+    ctl = AdmissionController(
+        AdmissionLimits(max_queue_depth=10), depth_probe=depth_probe, inflight_probe=broken_inspect
+    )
+    ctl.admit("do")  # in-flight は上限 0 なので inspect しない / 障害でも拒否しない
+    assert calls["depth"] == 1 and ctl.snapshot()["in_flight"] is None
+
+    ctl.refresh()  # exporter は両方読む
+    assert "in-flight" in (ctl.snapshot()["error"] or "")
+    ctl.admit("do")
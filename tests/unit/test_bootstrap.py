@@ -0,0 +1,78 @@
+# tests/unit/test_bootstrap.py
+import math
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.check.bootstrap import bootstrap_ci, default_block  # noqa: E402
+from core.check.metric_kernel import MetricStats  # noqa: E402
+
+
+def _data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))  # 自己相関のある系列
+    return y_true, y_true + rng.normal(0.0, 2.0, n)
+
+
+def test_interval_brackets_point_estimate_and_is_reproducible():
+    y_true, y_pred = _data(2_000)
+    y_pred[::97] = np.nan
+    point = MetricStats.from_arrays(y_true, y_pred).values()
+
+    ci = bootstrap_ci(y_true, y_pred, resamples=500, seed=7)
+    assert ci.block == default_block(2_000 - math.ceil(2_000 / 97))
+    for name, (low, high) in ci.intervals.items():
+        assert low <= point[name] <= high, name
+    assert bootstrap_ci(y_true, y_pred, resamples=500, seed=7) == ci
+
+    narrow = bootstrap_ci(y_true, y_pred, resamples=500, alpha=0.5, seed=7)
+    assert narrow.intervals["rmse"][1] - narrow.intervals["rmse"][0] < (
+        ci.intervals["rmse"][1] - ci.intervals["rmse"][0]
+    )
+
+
+def test_degenerate_inputs():
+    ones = np.ones(50)
+    assert bootstrap_ci(ones, ones, ["r2", "rmse"]).intervals == {"r2": (1.0, 1.0), "rmse": (0.0, 0.0)}
+    empty = bootstrap_ci([], [], ["mape"]).intervals["mape"]
+    assert all(math.isnan(v) for v in empty)
+
+
+def test_default_block_is_cube_root_and_cap_is_explicit():
+    assert default_block(1_000_000) == 100
+    assert default_block(1_000_000, max_blocks=1024) == math.ceil(1_000_000 / 1024)
+    y_true, y_pred = _data(8_000)
+    assert bootstrap_ci(y_true, y_pred, ["rmse"], resamples=10).block == 20
+    assert bootstrap_ci(y_true, y_pred, ["rmse"], resamples=10, block=5, max_blocks=100).block == 80
+
+
+def test_blocks_are_drawn_within_groups():
+    # 偶数行 = 系列 0（誤差 0）、奇数行 = 系列 1（誤差 2）。系列ごとのブロック数は固定なので
+    # 系列内で引けば MAE は常に 1、系列をまたいで引くとばらつく
+    y_true = np.zeros(100)
+    y_pred = np.tile([0.0, 2.0], 50)
+    codes = np.tile([0, 1], 50)
+    within = bootstrap_ci(y_true, y_pred, ["mae"], resamples=200, block=10, groups=codes)
+    assert within.intervals["mae"] == (1.0, 1.0)
+    pooled = bootstrap_ci(y_true[np.argsort(codes)], y_pred[np.argsort(codes)], ["mae"], resamples=200, block=10)
+    low, high = pooled.intervals["mae"]
+    assert low < 1.0 < high
+    with pytest.raises(ValueError):
+        bootstrap_ci(y_true, y_pred, groups=codes[:10])
+
+
+def test_process_pool_matches_shape():
+    y_true, y_pred = _data(5_000, seed=1)
+    ci = bootstrap_ci(y_true, y_pred, ["rmse"], resamples=400, workers=2)
+    low, high = ci.intervals["rmse"]
+    assert low < MetricStats.from_arrays(y_true, y_pred).value("rmse") < high
+
+
+@pytest.mark.benchmark
+def test_thousands_of_resamples_under_a_second():
+    y_true, y_pred = _data(200_000, seed=2)
+    started = time.perf_counter()
+    bootstrap_ci(y_true, y_pred, resamples=2_000, max_blocks=1024)
+    assert time.perf_counter() - started < 1.0
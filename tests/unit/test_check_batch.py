@@ -0,0 +1,125 @@
+# tests/unit/test_check_batch.py
+import uuid
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("celery.exceptions")  # core.tasks.check_tasks が要求
+
+import core.common.io_utils as io_utils  # noqa: E402
+import core.tasks.check_tasks as check_tasks  # noqa: E402
+from core.check import result_cache  # noqa: E402
+from core.repository.memory_impl import MemoryRepository  # noqa: E402
+
+
+def _write(plan_id, run_id, y_pred_shift=0.0):
+    y_true = np.linspace(1.0, 100.0, 500)
+    table = pa.table({"symbol": ["AAA"] * y_true.size, "y_true": y_true, "y_pred": y_true + y_pred_shift})
+    path = io_utils.artifact_path(plan_id, run_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, path)
+    io_utils.save_meta(
+        {
+            "plan_id": plan_id,
+            "run_id": run_id,
+            "train_start": "2025-01-01",
+            "train_end": "2025-06-30",
+            "predict_horizon": 1,
+            "metrics": [{"name": "rmse", "threshold": 1.0}, {"name": "r2", "threshold": 0.9}],
+        },
+        plan_id,
+        run_id,
+    )
+    return path
+
+
+@pytest.fixture()
+def batch(tmp_path, monkeypatch):
+    """
+    成果物 3 件（合格 / 不合格 / 壊れた Parquet）と DONE な Do 3 件 + 対象外 2 件。
+    Repository は全てテストごとの MemoryRepository。
+    """
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path / "artifacts")
+    monkeypatch.setattr(io_utils, "PDCA_META_ROOT", tmp_path / "meta")
+    suffix = uuid.uuid4().hex[:6]
+    cache = MemoryRepository(table=f"check_cache_{suffix}")
+    monkeypatch.setattr(result_cache, "_repo", lambda: cache)
+    do_repo = MemoryRepository(table=f"do_{suffix}")
+    check_repo = MemoryRepository(table=f"check_{suffix}")
+    monkeypatch.setattr(check_tasks, "_do_repo", do_repo)
+    monkeypatch.setattr(check_tasks, "_check_repo", check_repo)
+    monkeypatch.setattr(check_tasks, "_DO_PAGE", 2)  # カーソルを跨いだ走査も通す
+    written = []
+    monkeypatch.setattr(check_tasks, "get_metrics_ts", lambda: None)
+    monkeypatch.setattr(check_tasks, "record_metrics", lambda store, *a, **kw: written.append(kw["run_id"]))
+
+    _write("plan", "run-a")
+    _write("plan", "run-b", y_pred_shift=1_000.0)
+    _write("plan", "run-c").write_bytes(b"not parquet")
+    rows = [
+        ("2025-01-01T00:00:00+00:00", "do-a", {"plan_id": "plan", "status": "DONE", "result": {"run_id": "run-a"}}),
+        ("2025-01-02T00:00:00+00:00", "do-b", {"plan_id": "plan", "status": "DONE", "result": {"run_id": "run-b"}}),
+        ("2025-01-03T00:00:00+00:00", "do-c", {"plan_id": "plan", "status": "DONE", "result": {"run_id": "run-c"}}),
+        ("2025-01-04T00:00:00+00:00", "do-x", {"plan_id": "plan", "status": "FAILED", "result": {"run_id": "run-x"}}),
+        ("2025-01-05T00:00:00+00:00", "do-y", {"plan_id": "other", "status": "DONE", "result": {"run_id": "run-y"}}),
+    ]
+    do_repo.import_rows(rows)
+    return check_repo, written
+
+
+def test_done_runs_discovers_plan_runs_in_range(batch):
+    assert check_tasks._done_runs("plan") == {"run-a": "do-a", "run-b": "do-b", "run-c": "do-c"}
+    assert check_tasks._done_runs(
+        "plan", since="2025-01-02T00:00:00+00:00", until="2025-01-03T00:00:00+00:00"
+    ) == {"run-b": "do-b"}
+
+
+def test_batch_records_reports_and_failures(batch):
+    check_repo, written = batch
+    summary = check_tasks.run_check_batch_task("batch-1", "plan")
+
+    assert summary == {
+        "batch_id": "batch-1",
+        "plan_id": "plan",
+        "runs": 3,
+        "evaluated": 2,
+        "passed": 1,
+        "failed": 1,
+        "errors": ["do-c"],
+        "missing": [],
+    }
+    records = {rec["do_id"]: rec for rec in check_repo.list()}
+    assert set(records) == {"do-a", "do-b", "do-c"}
+    assert all(rec["batch_id"] == "batch-1" for rec in records.values())
+    assert records["do-a"]["status"] == "SUCCESS" and records["do-a"]["report"]["passed"]
+    assert records["do-b"]["status"] == "FAILURE" and "error" not in records["do-b"]
+    broken = records["do-c"]
+    assert broken["status"] == "FAILURE" and broken["error"] and "report" not in broken
+    assert sorted(written) == ["do-a", "do-b"]
+
+
+def test_batch_endpoint_runs_eagerly_before_do_id_route(batch, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import api.routers.check_api as check_api
+    from core.celery_app import celery_app
+
+    # /batch が /{do_id} より先に登録されていないと do_id="batch" として扱われる
+    paths = [route.path for route in check_api.router.routes if "POST" in getattr(route, "methods", ())]
+    assert paths.index("/check/batch") < paths.index("/check/{do_id}")
+
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    app = FastAPI()
+    app.include_router(check_api.router)
+    res = TestClient(app).post("/check/batch", params={"plan_id": "plan"})
+
+    assert res.status_code == 202
+    body = res.json()
+    assert body["batch_id"].startswith("batch-") and body["task_id"]
+    assert body["runs"] == 3 and body["evaluated"] == 2 and body["errors"] == ["do-c"]
+    assert {rec["batch_id"] for rec in batch[0].list()} == {body["batch_id"]}
@@ -0,0 +1,222 @@
+# tests/unit/test_check_cache.py
+import uuid
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+import core.check.check_executor as check_executor  # noqa: E402
+import core.common.io_utils as io_utils  # noqa: E402
+from core.check import result_cache  # noqa: E402
+from core.repository.memory_impl import MemoryRepository  # noqa: E402
+
+
+def _write(plan_id, run_id, y_pred_shift=0.0):
+    y_true = np.linspace(1.0, 100.0, 2_000)
+    table = pa.table({"symbol": ["AAA"] * y_true.size, "y_true": y_true, "y_pred": y_true + y_pred_shift})
+    path = io_utils.artifact_path(plan_id, run_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, path)
+    io_utils.save_meta(
+        {
+            "plan_id": plan_id,
+            "run_id": run_id,
+            "train_start": "2025-01-01",
+            "train_end": "2025-06-30",
+            "predict_horizon": 1,
+            "metrics": [{"name": "rmse", "threshold": 1.0}, {"name": "r2", "threshold": 0.9}],
+        },
+        plan_id,
+        run_id,
+    )
+    return path
+
+
+@pytest.fixture()
+def artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path / "artifacts")
+    monkeypatch.setattr(io_utils, "PDCA_META_ROOT", tmp_path / "meta")
+    repo = MemoryRepository(table=f"check_cache_{uuid.uuid4().hex[:6]}")
+    monkeypatch.setattr(result_cache, "_repo", lambda: repo)
+    return repo
+
+
+def test_fingerprint_tracks_content(artifacts, tmp_path):
+    a = _write("plan", "run-a")
+    b = _write("plan", "run-b")
+    c = _write("plan", "run-c", y_pred_shift=0.5)
+
+    footer = result_cache.artifact_fingerprint(a, "footer")
+    assert footer.startswith("footer:")
+    assert footer == result_cache.artifact_fingerprint(b, "footer")
+    assert footer != result_cache.artifact_fingerprint(c, "footer")
+    assert result_cache.artifact_fingerprint(a, "content").startswith("sha256:")
+
+    other = tmp_path / "predictions.pkl"
+    other.write_bytes(b"not parquet")
+    assert result_cache.artifact_fingerprint(other, "footer").startswith("sha256:")
+    assert result_cache.artifact_fingerprint(tmp_path / "missing.parquet") is None
+
+
+def test_recheck_is_served_from_cache(artifacts, monkeypatch):
+    _write("plan", "run-a")
+    _write("plan", "run-b")  # 同一内容の別 run
+    first = check_executor.CheckExecutor.run("plan", "run-a")
+
+    def boom(*args, **kwargs):
+        raise AssertionError("artifact should not be re-read")
+
+    monkeypatch.setattr(check_executor, "grouped_prediction_stats", boom)
+    monkeypatch.setattr(check_executor, "scan_runs", boom)
+    again = check_executor.CheckExecutor.run("plan", "run-a")
+    other = check_executor.CheckExecutor.run_many("plan", ["run-b"])["run-b"]
+
+    assert again.report.model_dump() == first.report.model_dump()
+    assert other.report.model_dump() == first.report.model_dump()
+    assert len(artifacts.list(limit=10)) == 1
+
+
+def test_bootstrap_ci_is_reported_and_keyed_separately(artifacts, monkeypatch):
+    _write("plan", "run-a", y_pred_shift=0.5)
+    plain = check_executor.CheckExecutor.run("plan", "run-a")
+    monkeypatch.setattr(check_executor, "_BOOTSTRAP", True)
+    boot = check_executor.CheckExecutor.run("plan", "run-a")
+
+    assert "ci" not in plain.report.model_dump()
+    report = boot.report.model_dump()
+    assert set(report["ci"]) == {"rmse", "r2"}
+    # 誤差が一定 0.5 なので RMSE の区間は点推定に潰れる
+    assert report["ci"]["rmse"]["low"] == pytest.approx(0.5)
+    assert report["ci"]["rmse"]["high"] == pytest.approx(0.5)
+    assert report["ci"]["rmse"]["stable"] is True
+    assert report["bootstrap"]["resamples"] == 1000
+    assert len(artifacts.list(limit=10)) == 2
+
+
+def test_engine_metrics_are_checked(artifacts, monkeypatch):
+    from core.metrics import engine
+
+    _write("plan", "run-a", y_pred_shift=0.5)
+    meta = io_utils.load_meta("plan", "run-a")
+    meta["metrics"] += [{"name": "smape", "threshold": 5.0}, {"name": "directional_accuracy", "threshold": 0.9}]
+    io_utils.save_meta(meta, "plan", "run-a")
+
+    reads = []
+    for name in ("load_predictions", "iter_prediction_batches"):
+        real = getattr(check_executor, name)
+        monkeypatch.setattr(
+            check_executor, name, lambda *a, _real=real, **kw: reads.append(a) or _real(*a, **kw)
+        )
+    report = check_executor.CheckExecutor.run("plan", "run-a").report.model_dump()
+    assert len(reads) == 1  # エンジン指標のために成果物を読み直さない
+
+    # 単調増加の系列に一定のずれ → 方向は全て一致
+    assert report["directional_accuracy"] == 1.0 and report["directional_accuracy_passed"]
+    assert 0.0 < report["smape"] < 5.0 and report["smape_threshold"] == 5.0
+    assert report["rmse"] == pytest.approx(0.5) and report["r2_passed"]
+
+    # グループ別もエンジン指標を含めて評価する
+    groups = report["groups"]
+    y = np.linspace(1.0, 100.0, 2_000)
+    assert groups["symbol"] == ["AAA"]
+    assert groups["smape"] == [pytest.approx(engine.evaluate(y, y + 0.5, ["smape"])["smape"])]
+    assert groups["directional_accuracy_passed"] == [True]
+
+
+def test_engine_group_metrics_with_skewed_groups(artifacts, monkeypatch):
+    from core.metrics import engine
+
+    _write("plan", "run-a")
+    meta = io_utils.load_meta("plan", "run-a")
+    meta["metrics"] = [{"name": "smape", "threshold": 5.0}]
+    io_utils.save_meta(meta, "plan", "run-a")
+    rng = np.random.default_rng(5)
+    symbols = ["BIG"] * 30_000 + [f"S{i:03d}" for i in range(200) for _ in range(3)]
+    y_true = rng.normal(50.0, 5.0, len(symbols))
+    y_pred = y_true + rng.normal(0.0, 1.0, len(symbols))
+    pq.write_table(
+        pa.table({"symbol": symbols, "y_true": y_true, "y_pred": y_pred}),
+        io_utils.artifact_path("plan", "run-a"),
+    )
+
+    cells = []
+    many = engine.evaluate_many
+    monkeypatch.setattr(
+        engine, "evaluate_many", lambda yt, yp, *a, **kw: cells.append(np.size(yt)) or many(yt, yp, *a, **kw)
+    )
+    groups = check_executor.CheckExecutor.run("plan", "run-a").report.model_dump()["groups"]
+
+    assert sum(cells) <= 2 * len(symbols)  # 全体値 + グループ別。(201, 30000) の埋め草は作らない
+    sym = np.asarray(symbols)
+    for name, value in zip(groups["symbol"], groups["smape"]):
+        rows = sym == name
+        assert value == pytest.approx(engine.evaluate(y_true[rows], y_pred[rows], ["smape"])["smape"])
+
+
+def test_replaced_builtin_metric_is_used_by_check(artifacts, monkeypatch):
+    from core.metrics import engine
+
+    monkeypatch.setattr(engine, "_REGISTRY", dict(engine._REGISTRY))
+
+    @engine.register_metric("rmse", replace=True)  # mergeable=False → Check もエンジン経路
+    def _scaled_rmse(yt, yp, valid, **_):
+        return 10.0 * np.sqrt(np.where(valid, (yp - yt) ** 2, 0.0).sum(axis=-1) / valid.sum(axis=-1))
+
+    _write("plan", "run-a", y_pred_shift=0.5)
+    report = check_executor.CheckExecutor.run("plan", "run-a").report.model_dump()
+    assert report["rmse"] == pytest.approx(5.0) and not report["rmse_passed"]
+    assert report["groups"]["rmse"] == [pytest.approx(5.0)]
+    assert report["r2_passed"]  # 差し替えていない指標はカーネル経路のまま
+
+
+def test_sequential_metrics_do_not_cross_series(artifacts):
+    _write("plan", "run-a")
+    meta = io_utils.load_meta("plan", "run-a")
+    meta["metrics"] = [{"name": "mase", "threshold": 1.0}, {"name": "directional_accuracy", "threshold": 0.5}]
+    io_utils.save_meta(meta, "plan", "run-a")
+    # 上昇系列と下降系列が 1 行ずつ交互に並ぶ成果物
+    up, down = np.linspace(1.0, 100.0, 500), np.linspace(100.0, 1.0, 500)
+    y_true = np.column_stack([up, down]).ravel()
+    pq.write_table(
+        pa.table({"symbol": ["UP", "DOWN"] * 500, "y_true": y_true, "y_pred": y_true + 0.5}),
+        io_utils.artifact_path("plan", "run-a"),
+    )
+
+    report = check_executor.CheckExecutor.run("plan", "run-a").report.model_dump()
+    step = 99.0 / 499
+    assert report["groups"]["mase"] == [pytest.approx(0.5 / step)] * 2
+    assert report["mase"] == pytest.approx(0.5 / step)  # 連結配列のままなら ≪ 0.01
+    assert report["directional_accuracy"] == pytest.approx(
+        np.mean(report["groups"]["directional_accuracy"])
+    )
+
+
+def test_run_many_isolates_failed_runs(artifacts):
+    _write("plan", "run-a")
+    _write("plan", "run-b", y_pred_shift=1_000.0)  # R² ≪ -1
+    _write("plan", "run-c").write_bytes(b"not parquet")
+
+    errors = {}
+    results = check_executor.CheckExecutor.run_many("plan", ["run-a", "run-b", "run-c"], errors=errors)
+
+    assert set(results) == {"run-a", "run-b"} and set(errors) == {"run-c"}
+    assert results["run-a"].report.passed
+    bad = results["run-b"].report
+    assert bad.r2 == -1.0 and not bad.passed
+
+
+def test_cache_repository_is_created_once(monkeypatch):
+    import core.repository.factory as factory
+
+    calls = []
+    repo = MemoryRepository(table=f"check_cache_{uuid.uuid4().hex[:6]}")
+    monkeypatch.setattr(factory, "get_repo", lambda table: calls.append(table) or repo)
+    result_cache._repo.cache_clear()
+    try:
+        result_cache.put_many({"k1": {"report": {"r2": 1.0}}})
+        assert result_cache.get_many(["k1", "k2"]) == {"k1": {"r2": 1.0}}
+        assert calls == [result_cache._TABLE]
+    finally:
+        result_cache._repo.cache_clear()
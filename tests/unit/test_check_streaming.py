@@ -0,0 +1,177 @@
+# tests/unit/test_check_streaming.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+import core.check.check_executor as check_executor  # noqa: E402
+import core.common.io_utils as io_utils  # noqa: E402
+
+
+def test_streaming_stats_match_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path)
+    rng = np.random.default_rng(1)
+    n = 50_000
+    y_true = rng.normal(50.0, 5.0, n)
+    y_true[::997] = 0.0  # MAPE の除外行もバッチ境界をまたいで混ぜる
+    table = pa.table(
+        {
+            "symbol": ["AAA"] * n,
+            "horizon": np.ones(n, dtype=np.int64),
+            "y_true": y_true,
+            "y_pred": y_true + rng.normal(0.0, 1.0, n),
+        }
+    )
+    path = io_utils.artifact_path("plan", "run")
+    path.parent.mkdir(parents=True)
+    pq.write_table(table, path, row_group_size=4_096)
+
+    batches = []
+    original = io_utils.iter_prediction_batches
+
+    def spy(*args, **kwargs):
+        for batch in original(*args, **kwargs):
+            batches.append(batch.schema.names)
+            yield batch
+
+    monkeypatch.setattr(check_executor, "iter_prediction_batches", spy)
+    monkeypatch.setattr(check_executor, "_STREAM_BATCH_ROWS", 3_000)
+
+    streamed = check_executor.prediction_stats("plan", "run", streaming=True)
+    in_memory = check_executor.prediction_stats("plan", "run", streaming=False)
+
+    assert len(batches) > 10
+    assert all(names == ["y_true", "y_pred"] for names in batches)  # 列射影
+    assert streamed.n == in_memory.n == n
+    assert streamed.values() == pytest.approx(in_memory.values(), rel=1e-9)
+
+
+def test_grouped_streaming_matches_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path)
+    rng = np.random.default_rng(2)
+    n = 20_000
+    y_true = rng.normal(50.0, 5.0, n)
+    table = pa.table(
+        {
+            "symbol": rng.choice(np.array(["AAA", "BBB", "CCC", "DDD"]), n),
+            "horizon": rng.integers(1, 6, n),
+            "model_id": rng.choice(np.array(["lgbm", "arima"]), n),
+            "y_true": y_true,
+            "y_pred": y_true + rng.normal(0.0, 1.0, n),
+        }
+    )
+    path = io_utils.artifact_path("plan", "run")
+    path.parent.mkdir(parents=True)
+    pq.write_table(table, path, row_group_size=2_048)
+    monkeypatch.setattr(check_executor, "_STREAM_BATCH_ROWS", 1_500)
+
+    streamed = check_executor.grouped_prediction_stats("plan", "run", streaming=True)
+    in_memory = check_executor.grouped_prediction_stats("plan", "run", streaming=False)
+
+    assert list(streamed.keys) == ["symbol", "horizon", "model_id"]
+    assert len(streamed) == len(in_memory) == 4 * 5 * 2
+    a, b = streamed.columns(), in_memory.columns()
+    assert a["symbol"] == b["symbol"] and a["horizon"] == b["horizon"] and a["n"] == b["n"]
+    assert a["rmse"] == pytest.approx(b["rmse"], rel=1e-9)
+    assert a["r2"] == pytest.approx(b["r2"], rel=1e-9)
+    assert streamed.total().n == n
+
+
+def test_scan_runs_matches_per_run_evaluation(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path)
+    rng = np.random.default_rng(4)
+    for i in range(5):
+        n = 3_000 + i * 500
+        y_true = rng.normal(20.0 + i, 2.0, n)
+        table = pa.table(
+            {
+                "symbol": rng.choice(np.array(["AAA", "BBB"]), n),
+                "horizon": rng.integers(1, 3, n),
+                "y_true": y_true,
+                "y_pred": y_true + rng.normal(0.0, 0.5 + i, n),
+            }
+        )
+        path = io_utils.artifact_path("plan", f"run{i}")
+        path.parent.mkdir(parents=True)
+        pq.write_table(table, path, row_group_size=1_000)
+    monkeypatch.setattr(check_executor, "_STREAM_BATCH_ROWS", 700)
+
+    runs = [f"run{i}" for i in range(5)] + ["missing"]
+    scanned = check_executor.scan_runs("plan", runs)
+
+    assert sorted(scanned) == runs[:5]
+    for run_id, grouped in scanned.items():
+        expected = check_executor.grouped_prediction_stats("plan", run_id, streaming=False)
+        assert list(grouped.keys) == ["symbol", "horizon"]
+        a, b = grouped.columns(), expected.columns()
+        assert a["symbol"] == b["symbol"] and a["n"] == b["n"]
+        assert a["rmse"] == pytest.approx(b["rmse"], rel=1e-9)
+
+
+def test_load_predictions_pushes_down_columns_and_filters(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path)
+    n = 20_000
+    start = np.datetime64("2025-01-01T00:00", "us")
+    table = pa.table(
+        {
+            "symbol": np.repeat(np.array(["AAA", "BBB"]), n // 2),
+            "ts": start + np.arange(n).astype("timedelta64[m]"),
+            "horizon": np.tile(np.array([1, 2], dtype=np.int64), n // 2),
+            "y_true": np.arange(n, dtype=np.float64),
+            "y_pred": np.arange(n, dtype=np.float64),
+        }
+    )
+    path = io_utils.artifact_path("plan", "run")
+    path.parent.mkdir(parents=True)
+    pq.write_table(table, path, row_group_size=1_000)
+
+    df = io_utils.load_predictions(
+        "plan",
+        "run",
+        ["y_true"],
+        start="2025-01-02T00:00:00Z",
+        end="2025-01-03",
+        symbols=["AAA"],
+        horizons=[2],
+        memory_map=True,
+    )
+    y = check_executor.column_array(df, "y_true")
+    assert list(check_executor.frame_columns(df)) == ["y_true"]
+    assert y.size == 720  # 1 日 1440 分のうち horizon=2 の半分
+    assert y.min() == 1441 and y.max() == 2879
+
+    batches = list(io_utils.iter_prediction_batches("plan", "run", ["y_true"], 500, symbols=["BBB"]))
+    assert sum(b.num_rows for b in batches) == n // 2
+
+    with pytest.raises(ValueError):
+        io_utils.load_predictions("plan", "run", ["y_true"], start="not-a-date")
+
+
+def test_load_predictions_validates_filters(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ARTIFACT_ROOT", tmp_path)
+    start = np.datetime64("2025-01-01T00:00", "us")
+    ts = start + np.arange(48).astype("timedelta64[h]")  # tz 無し列
+    path = io_utils.artifact_path("plan", "run")
+    path.parent.mkdir(parents=True)
+    pq.write_table(pa.table({"ts": ts, "y_true": np.arange(48, dtype=np.float64)}), path)
+
+    # aware な境界は UTC に揃えて比較（JST 2025-01-02 09:00 = UTC 00:00）
+    jst = "2025-01-02T09:00:00+09:00"
+    y = check_executor.column_array(io_utils.load_predictions("plan", "run", ["y_true"], start=jst), "y_true")
+    assert y.min() == 24 and y.size == 24
+    with monkeypatch.context() as m:
+        m.setattr(io_utils, "pq", None)  # polars の scan_parquet 経路
+        df = io_utils.load_predictions("plan", "run", ["y_true"], start=jst)
+    assert check_executor.column_array(df, "y_true").min() == 24
+
+    with pytest.raises(ValueError, match="horizon"):
+        io_utils.load_predictions("plan", "run", horizons=[1])
+    pq.write_table(pa.table({"ts": ts.astype(str), "y_true": np.zeros(48)}), path)
+    with pytest.raises(ValueError, match="timestamp"):
+        io_utils.load_predictions("plan", "run", start="2025-01-01")
+    path.write_bytes(b"not parquet")
+    with pytest.raises(RuntimeError):
+        io_utils.load_predictions("plan", "run")
+    with pytest.raises(RuntimeError):
+        list(io_utils.iter_prediction_batches("plan", "run", symbols=["AAA"]))
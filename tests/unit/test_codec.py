@@ -0,0 +1,45 @@
+# tests/unit/test_codec.py
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from core.common.codec import Codec, get_codec, json_codec
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_json_codecs_handle_extended_types(name):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    codec = get_codec(name)
+    ts = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    text = codec.dumps({"ts": ts, "d": Decimal("1.5"), "tags": {"a"}, "名前": "値"})
+    assert "名前" in text  # 非 ASCII はエスケープしない
+    assert codec.loads(text) == {"ts": ts.isoformat(), "d": 1.5, "tags": ["a"], "名前": "値"}
+    assert codec.decode(codec.encode({"big": 2**70})) == {"big": 2**70}
+
+
+def test_numpy_scalars_and_arrays():
+    np = pytest.importorskip("numpy")
+    codec = json_codec()
+    out = codec.loads(codec.dumps({"x": np.float32(0.5), "n": np.int64(3), "a": np.arange(3)}))
+    assert out == {"x": 0.5, "n": 3, "a": [0, 1, 2]}
+
+
+def test_msgpack_is_binary_only_and_json_codec_falls_back(monkeypatch):
+    pytest.importorskip("msgpack")
+    codec = get_codec("msgpack")
+    assert codec.decode(codec.encode({"a": [1, 2]})) == {"a": [1, 2]}
+    with pytest.raises(TypeError):
+        codec.dumps({})
+
+    get_codec.cache_clear()
+    monkeypatch.setenv("REPO_CODEC", "msgpack")
+    try:
+        assert not json_codec().binary
+    finally:
+        get_codec.cache_clear()
+
+
+def test_unknown_codec_falls_back_to_auto():
+    assert isinstance(get_codec("no-such-codec"), Codec)
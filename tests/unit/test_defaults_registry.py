@@ -0,0 +1,115 @@
+# tests/unit/test_defaults_registry.py
+import json
+import os
+
+import pytest
+
+from core.dsl import defaults_registry
+from core.dsl.defaults_registry import DefaultsRegistry
+
+
+def _write(path, payload, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture()
+def defaults(tmp_path):
+    _write(tmp_path / "models_defaults.json", {"models": {"LSTM": {"enable": True}}}, 1)
+    _write(tmp_path / "markets" / "equity_defaults.json", {"Microsoft": "MSFT"}, 1)
+    return tmp_path
+
+
+def test_snapshot_is_frozen_and_loaded_once(defaults, monkeypatch):
+    registry = DefaultsRegistry(defaults, interval=0)
+    snap = registry.snapshot()
+    assert snap.defaults["models"]["LSTM"]["enable"] is True
+    assert snap.markets == {"Microsoft": "MSFT"}
+    with pytest.raises(TypeError):
+        snap.defaults["models"]["LSTM"]["enable"] = False
+
+    def boom(*args, **kwargs):
+        raise AssertionError("request path must not touch disk")
+
+    monkeypatch.setattr(defaults_registry, "_stamp", boom)
+    monkeypatch.setattr(defaults_registry, "load_defaults", boom)
+    assert registry.snapshot() is snap
+
+
+def test_poll_swaps_snapshot_on_change(defaults):
+    registry = DefaultsRegistry(defaults, interval=0)
+    before = registry.snapshot()
+    assert registry.poll() is False
+
+    _write(defaults / "markets" / "equity_defaults.json", {"Microsoft": "MSFT", "Apple": "AAPL"}, 2)
+    assert registry.poll() is True
+    after = registry.snapshot()
+    assert after is not before and after.version != before.version
+    assert after.markets["Apple"] == "AAPL"
+    assert before.markets == {"Microsoft": "MSFT"}  # 旧スナップショットは不変
+
+    # 内容が同じなら mtime が変わっても版数は同じ
+    os.utime(defaults / "models_defaults.json", ns=(3, 3))
+    assert registry.poll() is False
+    assert registry.snapshot().version == after.version
+
+
+def test_broken_json_is_skipped(defaults):
+    (defaults / "broken_defaults.json").write_text("{", encoding="utf-8")
+    registry = DefaultsRegistry(defaults, interval=0)
+    assert "models" in registry.snapshot().defaults
+
+
+def test_reload_keeps_snapshot_while_file_is_unreadable(defaults):
+    registry = DefaultsRegistry(defaults, interval=0)
+    before = registry.snapshot()
+
+    path = defaults / "models_defaults.json"
+    path.write_text('{"models": {"LSTM"', encoding="utf-8")  # 書き込み途中
+    os.utime(path, ns=(2, 2))
+    assert registry.poll() is False
+    assert registry.snapshot() is before
+
+    _write(path, {"models": {"LSTM": {"enable": False}}}, 3)
+    assert registry.poll() is True
+    assert registry.snapshot().defaults["models"]["LSTM"]["enable"] is False
+
+
+def test_watcher_thread_reloads(defaults):
+    registry = DefaultsRegistry(defaults, interval=0.01)
+    try:
+        _write(defaults / "extra_defaults.json", {"extra": 1}, 5)
+        for _ in range(500):
+            if "extra" in registry.snapshot().defaults:
+                break
+            registry._stop.wait(0.01)
+        assert registry.snapshot().defaults["extra"] == 1
+    finally:
+        registry.close()
+
+
+def test_get_registry_is_shared(defaults, monkeypatch):
+    monkeypatch.setattr(defaults_registry, "_REGISTRIES", {})
+    monkeypatch.setattr(defaults_registry, "_POLL_SEC", 0)
+    registry = defaults_registry.get_registry(defaults)
+    assert registry is defaults_registry.get_registry(defaults)
+    assert registry._thread is None
+
+
+def test_file_broken_since_startup_does_not_block_reload(defaults, monkeypatch):
+    (defaults / "broken_defaults.json").write_text("{", encoding="utf-8")
+    registry = DefaultsRegistry(defaults, interval=0)
+    assert registry.snapshot().failed == ("broken_defaults.json",)
+
+    _write(defaults / "markets" / "equity_defaults.json", {"Apple": "AAPL"}, 2)
+    assert registry.poll() is True  # 起動時から壊れているファイルは差し替えを止めない
+    assert registry.snapshot().markets == {"Apple": "AAPL"}
+
+    calls = []
+    monkeypatch.setattr(
+        defaults_registry, "_build", lambda *a: calls.append(a) or pytest.fail("re-parsed")
+    )
+    assert registry.poll() is False  # stamp が進んだので毎回読み直さない
+    assert calls == []
@@ -0,0 +1,81 @@
+# tests/unit/test_dsl_validator.py
+import shutil
+from pathlib import Path
+
+import pytest
+
+fastjsonschema = pytest.importorskip("fastjsonschema")
+pytest.importorskip("pydantic")
+
+from core.dsl import validator as dsl_validator  # noqa: E402
+
+SCHEMAS = Path(dsl_validator.__file__).parent / "schemas"
+
+
+@pytest.fixture()
+def schemas(tmp_path):
+    target = tmp_path / "schemas"
+    shutil.copytree(SCHEMAS, target)
+    return target
+
+
+def _boom(*args, **kwargs):
+    raise AssertionError("schema should not be recompiled")
+
+
+def test_generated_code_is_reused_across_processes(schemas, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    names = dsl_validator.DSLValidator(schemas, cache).precompile()
+    assert "models_schema.json" in names
+    assert len(list(cache.glob("*.py"))) == len(names) + 1  # + 結合バリデータ
+
+    # 別プロセス相当: 新しいインスタンスはコンパイルせずディスクから読む
+    monkeypatch.setattr(fastjsonschema, "compile_to_code", _boom)
+    v = dsl_validator.DSLValidator(schemas, cache)
+    v.precompile()
+    v.validate_json({"models": {}}, "models_schema.json")
+
+
+def test_schema_change_invalidates_cache(schemas, tmp_path):
+    cache = tmp_path / "cache"
+    old = dsl_validator.DSLValidator(schemas, cache)
+    old.precompile()
+
+    fp = schemas / "markets_schema.json"
+    fp.write_text(fp.read_text(encoding="utf-8").replace("}", "} ", 1), encoding="utf-8")
+    new = dsl_validator.DSLValidator(schemas, cache)
+    new.precompile()
+
+    assert new.schemas_digest() != old.schemas_digest()
+    stamps = {p.name.split(".")[0].rsplit("_", 1)[1] for p in cache.iterdir()}
+    assert stamps == {new.schemas_digest()[:16]}  # 旧世代は削除
+
+
+def test_corrupt_bytecode_is_regenerated(schemas, tmp_path):
+    cache = tmp_path / "cache"
+    dsl_validator.DSLValidator(schemas, cache).precompile()
+    for code in cache.glob("*.code"):
+        code.write_bytes(b"garbage")
+    v = dsl_validator.DSLValidator(schemas, cache)
+    v.validate_sections({"models": {}})
+
+
+def test_combined_validator_checks_every_section(schemas, tmp_path):
+    v = dsl_validator.DSLValidator(schemas, tmp_path / "cache")
+    bad = {"LSTM": {"dropout_rate": "x"}}
+
+    v.validate_sections({"plan_id": "p", "data": {"universe": ["MSFT"]}})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        v.validate_sections({"models": bad})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        v.validate_sections({"materials": {"models": bad}})
+    # 個別スキーマ（{"models": ...} で包む従来の呼び方）と同じ判定
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        v.validate_json({"models": bad}, "models_schema.json")
+
+
+def test_unwritable_cache_falls_back_to_memory(schemas, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    v = dsl_validator.DSLValidator(schemas, blocker / "cache")
+    v.validate_sections({"models": {}})
@@ -0,0 +1,109 @@
+# tests/unit/test_metric_kernel.py
+import math
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.check.metric_kernel import GroupedStats, MetricStats  # noqa: E402
+
+
+def _reference(y_true, y_pred):
+    """旧 CheckExecutor の純 Python 実装（ベンチマークの比較対象）"""
+    yt, yp = list(y_true), list(y_pred)
+    n = len(yt)
+    mean_y = sum(yt) / n
+    ss_tot = sum((a - mean_y) ** 2 for a in yt)
+    ss_res = sum((a - b) ** 2 for a, b in zip(yt, yp))
+    return {
+        "mape": sum(abs((a - b) / a) for a, b in zip(yt, yp)) / n * 100.0,
+        "rmse": math.sqrt(ss_res / n),
+        "r2": 1.0 - ss_res / ss_tot,
+    }
+
+
+def _data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.normal(100.0, 10.0, n)
+    return y_true, y_true + rng.normal(0.0, 2.0, n)
+
+
+def test_matches_reference_and_merge_is_exact():
+    y_true, y_pred = _data(10_000)
+    stats = MetricStats.from_arrays(y_true, y_pred)
+    for name, want in _reference(y_true, y_pred).items():
+        assert stats.value(name) == pytest.approx(want, rel=1e-9)
+    assert stats.value("mae") == pytest.approx(np.abs(y_pred - y_true).mean())
+
+    parts = [MetricStats.from_arrays(y_true[i:i + 999], y_pred[i:i + 999]) for i in range(0, 10_000, 999)]
+    merged = MetricStats.merge_all(parts)
+    assert merged.values() == pytest.approx(stats.values(), rel=1e-9)
+
+
+def test_nan_and_zero_denominator_semantics():
+    stats = MetricStats.from_arrays([0.0, 2.0, np.nan, 4.0], [1.0, 1.0, 3.0, np.inf])
+    assert stats.n == 2  # NaN / inf の行は除外
+    assert stats.value("mape") == pytest.approx(50.0)  # y_true == 0 は MAPE から除外
+    assert math.isnan(MetricStats.from_arrays([0.0], [1.0]).value("mape"))
+    assert MetricStats.from_arrays([3.0, 3.0], [3.0, 3.0]).value("r2") == 1.0
+    assert MetricStats.from_arrays([3.0, 3.0], [3.0, 4.0]).value("r2") == 0.0
+    assert math.isnan(MetricStats.from_arrays([], []).value("rmse"))
+    with pytest.raises(ValueError):
+        MetricStats.from_arrays([1.0], [1.0, 2.0])
+
+
+def test_grouped_matches_per_group_and_merges_by_key():
+    rng = np.random.default_rng(3)
+    n = 6_000
+    symbol = rng.choice(np.array(["AAA", "BBB", "CCC"]), n)
+    horizon = rng.integers(1, 4, n)
+    model_id = rng.choice(np.array(["m1", "m2"]), n)
+    y_true, y_pred = _data(n, seed=3)
+    y_true[::101] = 0.0
+    y_pred[::257] = np.nan
+    keys = {"symbol": symbol, "horizon": horizon, "model_id": model_id}
+
+    grouped = GroupedStats.from_arrays(keys, y_true, y_pred)
+    assert len(grouped) == 3 * 3 * 2
+    report = grouped.columns(["mape", "rmse", "r2"])
+    for i in range(len(grouped)):
+        mask = (
+            (symbol == report["symbol"][i])
+            & (horizon == report["horizon"][i])
+            & (model_id == report["model_id"][i])
+        )
+        expected = MetricStats.from_arrays(y_true[mask], y_pred[mask])
+        assert report["n"][i] == expected.n
+        for name in ("mape", "rmse", "r2"):
+            assert report[name][i] == pytest.approx(expected.value(name), rel=1e-9)
+
+    # バッチ分割 → キー単位の merge は一括集計と一致し、total() は全体値と一致
+    half = n // 2
+    parts = [
+        GroupedStats.from_arrays({k: v[s] for k, v in keys.items()}, y_true[s], y_pred[s])
+        for s in (slice(0, half), slice(half, n))
+    ]
+    merged = parts[0].merge(parts[1]).columns()
+    for key, column in grouped.columns().items():
+        if key in ("mape", "rmse", "mae", "r2"):
+            assert merged[key] == pytest.approx(column, rel=1e-9)
+        else:
+            assert merged[key] == column
+    total = grouped.total()
+    assert total.values() == pytest.approx(MetricStats.from_arrays(y_true, y_pred).values())
+
+
+@pytest.mark.benchmark
+def test_kernel_is_much_faster_than_pure_python():
+    y_true, y_pred = _data(1_000_000)
+
+    t0 = time.perf_counter()
+    MetricStats.from_arrays(y_true, y_pred).values()
+    kernel = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _reference(y_true.tolist(), y_pred.tolist())
+    legacy = time.perf_counter() - t0
+
+    assert kernel * 10 < legacy, f"kernel={kernel:.4f}s legacy={legacy:.4f}s"
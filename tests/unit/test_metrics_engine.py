@@ -0,0 +1,126 @@
+# tests/unit/test_metrics_engine.py
+import math
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.check.metric_kernel import MetricStats  # noqa: E402
+from core.metrics import engine  # noqa: E402
+
+
+def _data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.normal(100.0, 10.0, n)
+    y_pred = y_true + rng.normal(0.0, 2.0, n)
+    return y_true, y_pred
+
+
+def test_builtin_metrics_match_metric_kernel():
+    y_true, y_pred = _data(5_000)
+    y_true[::97] = 0.0  # MAPE の y=0 除外
+    y_pred[::89] = np.nan  # 欠損行の除外
+
+    values = engine.evaluate(y_true, y_pred, ("mape", "rmse", "mae", "r2"))
+    expected = MetricStats.from_arrays(y_true, y_pred).values()
+    for name, value in values.items():
+        assert value == pytest.approx(expected[name], rel=1e-9)
+
+
+def test_degenerate_inputs():
+    empty = engine.evaluate([], [])
+    assert all(math.isnan(v) for v in empty.values())
+    const = engine.evaluate([2.0, 2.0], [2.0, 2.0])
+    assert const["r2"] == 1.0 and const["mae"] == 0.0
+    assert engine.evaluate([2.0, 2.0], [1.0, 3.0])["r2"] == 0.0
+    with pytest.raises(ValueError):
+        engine.evaluate([1.0, 2.0], [1.0])
+
+
+def test_known_values():
+    y_true = [1.0, 2.0, 3.0, 2.0]
+    y_pred = [1.0, 3.0, 2.0, 1.0]
+    values = engine.evaluate(
+        y_true, y_pred, ("mase", "directional_accuracy", "pinball", "smape")
+    )
+    # MAE = 0.75 / 1 期前ナイーブの MAE = 1.0
+    assert values["mase"] == pytest.approx(0.75)
+    # 方向: 実測 (+, +, -) / 予測 (+, 0, -)
+    assert values["directional_accuracy"] == pytest.approx(2 / 3)
+    assert values["pinball"] == pytest.approx(0.5 * 0.75)
+    assert values["smape"] == pytest.approx(100 * (2 / 5 + 2 / 5 + 2 / 3) / 4)
+
+    q90 = engine.evaluate([1.0, 1.0], [0.0, 2.0], ["pinball"], quantile=0.9)["pinball"]
+    assert q90 == pytest.approx((0.9 + 0.1) / 2)
+    scaled = engine.evaluate(y_true, y_pred, ["mase"], y_train=[0.0, 2.0, 4.0])["mase"]
+    assert scaled == pytest.approx(0.75 / 2.0)
+
+
+def test_evaluate_many_matches_per_series():
+    rng = np.random.default_rng(1)
+    y_true = [rng.normal(size=n) for n in (5, 40, 17)]
+    y_pred = [y + rng.normal(scale=0.3, size=y.size) for y in y_true]
+
+    names = engine.available_metrics()
+    batch = engine.evaluate_many(y_true, y_pred, names)
+    for i, (yt, yp) in enumerate(zip(y_true, y_pred)):
+        single = engine.evaluate(yt, yp, names)
+        for name in names:
+            assert batch[name][i] == pytest.approx(single[name], rel=1e-9), name
+
+
+def test_register_custom_metric(monkeypatch):
+    monkeypatch.setattr(engine, "_REGISTRY", dict(engine._REGISTRY))
+
+    @engine.register_metric("max_error")
+    def _max_error(yt, yp, valid, **_):
+        return np.where(valid, np.abs(yp - yt), -np.inf).max(axis=-1)
+
+    assert engine.evaluate([1.0, 2.0], [1.5, 4.0], ["max_error"]) == {"max_error": 2.0}
+    assert "max_error" in engine.available_metrics()
+    assert not engine.higher_is_better("max_error")
+    with pytest.raises(ValueError):
+        engine.register_metric("mae")(_max_error)
+    with pytest.raises(KeyError):
+        engine.evaluate([1.0], [1.0], ["unknown"])
+    with pytest.raises(ValueError):  # MetricStats で計算できない指標に mergeable は付けられない
+        engine.register_metric("max_error2", mergeable=True)(_max_error)
+
+
+@pytest.mark.benchmark
+def test_engine_throughput():
+    y_true, y_pred = _data(1_000_000)
+    t0 = time.perf_counter()
+    engine.evaluate(y_true, y_pred, engine.available_metrics())
+    single = time.perf_counter() - t0
+
+    y_true, y_pred = _data(500 * 1_000, seed=2)
+    t0 = time.perf_counter()
+    engine.evaluate_many(y_true.reshape(500, -1), y_pred.reshape(500, -1))
+    many = time.perf_counter() - t0
+
+    assert single < 1.0, f"evaluate 1M rows took {single:.3f}s"
+    assert many < 1.0, f"evaluate_many 500x1000 took {many:.3f}s"
+
+
+def test_evaluate_segments_skewed_lengths_without_padding(monkeypatch):
+    rng = np.random.default_rng(3)
+    lengths = [200_000, 0, 1, 3, 3, 50, 3]  # 1 グループだけ巨大 + 空グループ
+    y_true = rng.normal(size=sum(lengths))
+    y_pred = y_true + rng.normal(scale=0.3, size=y_true.size)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+    shapes = []
+    many = engine.evaluate_many
+    monkeypatch.setattr(
+        engine, "evaluate_many", lambda yt, yp, *a, **kw: shapes.append(yt.shape) or many(yt, yp, *a, **kw)
+    )
+    names = engine.available_metrics()
+    got = engine.evaluate_segments(y_true, y_pred, bounds, names)
+
+    assert sum(r * c for r, c in shapes) == y_true.size  # 埋め草のセル無し
+    for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        single = engine.evaluate(y_true[lo:hi], y_pred[lo:hi], names)
+        for name in names:
+            assert got[name][i] == pytest.approx(single[name], rel=1e-9, nan_ok=True), name
@@ -0,0 +1,75 @@
+# tests/unit/test_metrics_ts.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.repository.metrics_ts import (
+    MemoryMetricsTS,
+    MetricPoint,
+    SQLiteMetricsTS,
+    record_metrics,
+)
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteMetricsTS(tmp_path / "ts.db")
+    return MemoryMetricsTS()
+
+
+def _series(store, plan):
+    # 2 日間 × 6 時間おき。挿入順は時刻と逆にしておく
+    points = [
+        MetricPoint(plan, "AAPL", "r2", T0 + timedelta(hours=6 * i), float(i), f"run-{i}")
+        for i in range(8)
+    ]
+    store.write(reversed(points))
+    return points
+
+
+def test_latest_range_and_upsert(store):
+    plan = f"plan-{uuid.uuid4().hex[:6]}"
+    points = _series(store, plan)
+
+    assert store.latest(plan, "AAPL", "r2") == points[-1]
+    assert store.latest(plan, "AAPL", "mae") is None
+
+    got = store.range(plan, "AAPL", "r2", T0 + timedelta(hours=6), T0 + timedelta(hours=18))
+    assert [p.value for p in got] == [1.0, 2.0]
+    assert [p.value for p in store.range(plan, "AAPL", "r2", limit=3)] == [0.0, 1.0, 2.0]
+
+    # 同じ ts は上書き
+    store.write([points[-1]._replace(value=99.0)])
+    assert store.latest(plan, "AAPL", "r2").value == 99.0
+    assert len(store.range(plan, "AAPL", "r2")) == 8
+
+
+def test_daily_rollup_and_purge(store):
+    plan = f"plan-{uuid.uuid4().hex[:6]}"
+    _series(store, plan)
+
+    rows = store.rollup(plan, "AAPL", "r2", bucket="day")
+    assert [(r.bucket, r.min, r.max, r.mean, r.count) for r in rows] == [
+        (T0, 0.0, 3.0, 1.5, 4),
+        (T0 + timedelta(days=1), 4.0, 7.0, 5.5, 4),
+    ]
+    with pytest.raises(ValueError):
+        store.rollup(plan, "AAPL", "r2", bucket="fortnight")
+
+    assert store.purge(T0 + timedelta(days=1)) >= 4
+    assert [p.value for p in store.range(plan, "AAPL", "r2")] == [4.0, 5.0, 6.0, 7.0]
+
+
+def test_memory_capacity_and_record_metrics():
+    store = MemoryMetricsTS(capacity=3)
+    plan = f"plan-{uuid.uuid4().hex[:6]}"
+    for i in range(5):
+        n = record_metrics(
+            store, plan, "", {"r2": i / 10, "passed": True, "note": "x"}, ts=T0 + timedelta(days=i)
+        )
+        assert n == 1  # bool / 文字列は記録しない
+    assert [p.value for p in store.range(plan, "", "r2")] == [0.2, 0.3, 0.4]
@@ -0,0 +1,41 @@
+# tests/unit/test_migrate.py
+import uuid
+
+from core.ops.migrate import Checkpoint, migrate_table
+from core.repository.memory_impl import MemoryRepository
+from core.repository.sqlite_impl import SQLiteRepository
+
+
+def test_migrate_preserves_order_and_resumes(tmp_path):
+    src = SQLiteRepository(tmp_path / "src.db", table="do")
+    for i in range(7):
+        src.create(f"do-{i}", {"n": i})
+    expected = src.list()
+    dst = MemoryRepository(table=f"mig_{uuid.uuid4().hex[:6]}")
+
+    ckpt = Checkpoint.load(tmp_path / "ckpt.json")
+    seen = []
+
+    def stop_after_two(stats, cursor):
+        ckpt.update("do", cursor, stats.rows, stats.done)
+        seen.append(stats.rows)
+        if stats.batches == 2:
+            raise KeyboardInterrupt
+
+    try:
+        migrate_table(src, dst, "do", batch=3, on_batch=stop_after_two)
+    except KeyboardInterrupt:
+        pass
+    assert len(dst.list()) == 6
+
+    state = Checkpoint.load(tmp_path / "ckpt.json").get("do")
+    assert state["rows"] == 6 and not state["done"]
+    stats = migrate_table(src, dst, "do", batch=3, cursor=state["cursor"])
+    assert stats.rows == 1 and stats.done
+
+    # 作成時刻ごと移るので新しい順の一覧が移行元と一致する
+    assert dst.list() == expected
+    back = SQLiteRepository(tmp_path / "back.db", table="do")
+    migrate_table(dst, back, "do", batch=4)
+    assert back.list() == expected
+    assert back.list_page(limit=2, order="asc").keys[0][1] == "do-0"
@@ -0,0 +1,82 @@
+# tests/unit/test_plan_loader_cache.py
+import copy
+import json
+import pickle
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from core.dsl import loader as dsl_loader  # noqa: E402
+
+
+def _plan(universe=("MSFT",)):
+    return {
+        "plan_id": "cache-demo",
+        "data": {"source": "yfinance", "universe": list(universe)},
+        "dates": {"train_start": "2023-01-01", "train_end": "2024-01-01"},
+    }
+
+
+@pytest.fixture()
+def loader(monkeypatch):
+    monkeypatch.setattr(dsl_loader, "_CACHE_SIZE", 2)
+    return dsl_loader.PlanLoader(validate=False)
+
+
+def test_same_content_is_compiled_once(loader, monkeypatch):
+    raw = _plan()
+    first = loader.load_dict(raw)
+
+    def boom(*args, **kwargs):
+        raise AssertionError("plan should not be recompiled")
+
+    monkeypatch.setattr(loader, "_compile", boom)
+    # キー順が違っても同じ内容ならヒット
+    again = loader.load_dict(dict(reversed(list(_plan().items()))))
+
+    assert again is first
+    assert (loader.hits, loader.misses) == (1, 1)
+    assert raw == _plan()  # 入力は書き換えない
+
+
+def test_lru_eviction(loader):
+    a = loader.load_dict(_plan(["A"]))
+    loader.load_dict(_plan(["B"]))
+    assert loader.load_dict(_plan(["A"])) is a  # A を最近使用に
+    loader.load_dict(_plan(["C"]))  # B が追い出される
+    assert loader.load_dict(_plan(["A"])) is a
+    assert loader.load_dict(_plan(["B"])) is not None
+    assert loader.misses == 4
+
+
+def test_compiled_plan_is_immutable(loader):
+    plan = loader.load_dict(_plan())
+    with pytest.raises(TypeError):
+        plan["plan_id"] = "other"
+    with pytest.raises(TypeError):
+        plan["data"]["universe"].append("AAPL")
+
+    thawed = dsl_loader.thaw(plan)
+    thawed["data"]["universe"].append("AAPL")
+    assert plan["data"]["universe"] == ["MSFT"]
+    assert type(copy.deepcopy(plan)["data"]) is dict
+    assert type(pickle.loads(pickle.dumps(plan))) is dict
+    assert json.loads(json.dumps(plan)) == dsl_loader.thaw(plan)
+    assert loader.legacy_dict(plan)["symbol"] == "MSFT"
+
+
+def test_defaults_version_is_part_of_key(loader, tmp_path):
+    key = loader.cache_key(_plan())
+    assert dsl_loader.PlanLoader(validate=False).cache_key(_plan()) == key
+
+    (tmp_path / "data_defaults.json").write_text('{"data": {"frequency": "1h"}}')
+    registry = dsl_loader.DefaultsRegistry(tmp_path, interval=0)
+    other = dsl_loader.PlanLoader(validate=False, registry=registry)
+    assert other.cache_key(_plan()) != key
+    assert other.load_dict(_plan())["data"]["frequency"] == "1h"
+
+    # ホットリロード後は新しい defaults でコンパイルし直す
+    (tmp_path / "data_defaults.json").write_text('{"data": {"frequency": "1d"}}  ')
+    assert registry.poll() is True
+    assert other.load_dict(_plan())["data"]["frequency"] == "1d"
@@ -0,0 +1,124 @@
+# tests/unit/test_repo_cache.py
+import asyncio
+import json
+import uuid
+
+from core.repository.cache import (
+    AsyncCachedRepository,
+    CacheConfig,
+    CachedRepository,
+    RepoCache,
+)
+from core.repository.memory_impl import MemoryRepository
+
+
+class _CountingRepo(MemoryRepository):
+    """get / get_many の呼び出し回数を数える"""
+
+    def __init__(self, table):
+        super().__init__(table=table)
+        self.reads = 0
+
+    def get(self, key):
+        self.reads += 1
+        return super().get(key)
+
+    def get_many(self, keys):
+        self.reads += 1
+        return super().get_many(keys)
+
+
+def _cached(**cfg):
+    inner = _CountingRepo(f"cache_{uuid.uuid4().hex[:6]}")
+    return inner, CachedRepository(inner, RepoCache(CacheConfig(tables=frozenset({"x"}), **cfg)))
+
+
+def test_read_through_and_invalidate_on_write():
+    inner, repo = _cached()
+    repo.create("p1", {"status": "PENDING"})
+    assert repo.get("p1") == {"status": "PENDING"}
+    got = repo.get("p1")
+    got["status"] = "mutated"  # 返り値の変更はキャッシュへ波及しない
+    assert repo.get("p1") == {"status": "PENDING"}
+    assert inner.reads == 1
+
+    repo.patch("p1", {"status": "DONE"})
+    assert repo.get("p1") == {"status": "DONE"}
+    assert inner.reads == 2
+    assert repo.cache.stats()["hits"] == 2
+
+
+def test_negative_cache_and_get_many_fetches_only_misses():
+    inner, repo = _cached()
+    assert repo.get("nope") is None
+    assert repo.exists("nope") is False
+    assert inner.reads == 1
+
+    repo.create_many({"a": {"v": 1}, "b": {"v": 2}})
+    assert repo.get("a") == {"v": 1}
+    assert repo.get_many(["a", "b", "nope"]) == {"a": {"v": 1}, "b": {"v": 2}}
+    assert inner.reads == 3  # get(nope) / get(a) / get_many([b])
+    repo.delete_many(["a"])
+    assert repo.get("a") is None
+
+
+def test_lru_bound_and_ttl(monkeypatch):
+    from core.repository import cache as cache_mod
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    inner, repo = _cached(max_entries=2, ttl=5.0)
+    for k in ("a", "b", "c"):
+        repo.create(k, {"k": k})
+        repo.get(k)
+    assert repo.cache.stats()["size"] == 2
+    reads = inner.reads
+    repo.get("c")
+    assert inner.reads == reads
+    now[0] += 6
+    repo.get("c")
+    assert inner.reads == reads + 1
+
+
+def test_stale_read_is_not_cached_after_concurrent_write():
+    inner, repo = _cached()
+    cache = repo.cache
+    inner.create("d1", {"status": "RUNNING"})
+    version = cache.version(repo.table, "d1")
+    stale = inner.get("d1")
+    repo.patch("d1", {"status": "DONE"})  # 読み込み中に書き込みが割り込む
+    cache.put(repo.table, "d1", stale, version)
+    assert repo.get("d1") == {"status": "DONE"}
+
+
+def test_remote_invalidation_message():
+    inner, repo = _cached()
+    repo.create("p1", {"v": 1})
+    repo.get("p1")
+    inner.create("p1", {"v": 2})  # 別プロセスが書いた想定
+    assert repo.get("p1") == {"v": 1}
+    msg = {"data": json.dumps({"o": "other-pod", "t": repo.table, "ids": ["p1"]})}
+    repo.cache._on_message(msg)
+    assert repo.get("p1") == {"v": 2}
+
+
+def test_async_cached_repo_and_factory(monkeypatch):
+    from core.repository import cache as cache_mod
+    from core.repository.factory import get_async_repo, get_repo
+
+    monkeypatch.setenv("DB_BACKEND", "memory")
+    monkeypatch.setenv("REPO_CACHE_TABLES", "plan_cached")
+    monkeypatch.setattr(cache_mod, "_CACHE", RepoCache(CacheConfig()))
+    assert isinstance(get_repo("plan_cached"), CachedRepository)
+    assert isinstance(get_repo("other"), MemoryRepository)
+
+    async def _run():
+        repo = get_async_repo("plan_cached")
+        assert isinstance(repo, AsyncCachedRepository)
+        await repo.create("k", {"v": 1})
+        assert await repo.get("k") == {"v": 1}
+        assert await repo.get("k") == {"v": 1}
+        await repo.delete("k")
+        return await repo.get("k")
+
+    assert asyncio.run(_run()) is None
@@ -20,3 +20,398 @@ def test_crud_cycle(mem_repo):
 
     mem_repo.delete(rec_id)
     assert mem_repo.get(rec_id) is None
+
+
+def test_patch_merges_top_level_keys(mem_repo):
+    rec_id = f"rec-{uuid.uuid4().hex[:6]}"
+    mem_repo.patch(rec_id, {"status": "PENDING", "result": None})
+    mem_repo.patch(rec_id, {"status": "DONE", "result": {"r2": 0.9}})
+    assert mem_repo.get(rec_id) == {"status": "DONE", "result": {"r2": 0.9}}
+
+
+def test_sqlite_patch_is_single_upsert(tmp_path):
+    from core.repository.sqlite_impl import SQLiteRepository
+
+    repo = SQLiteRepository(path=tmp_path / "t.db", table="do")
+    repo.patch("d1", {"do_id": "d1", "status": "PENDING", "result": None})
+    repo.patch("d1", {"status": "RUNNING", "meta": {"a": 1}})
+    repo.patch("d1", {"meta": {"b": 2}})
+
+    # null は保持し、ネスト dict は置換（dict.update と同じ意味）
+    assert repo.get("d1") == {
+        "do_id": "d1",
+        "status": "RUNNING",
+        "result": None,
+        "meta": {"b": 2},
+    }
+
+
+def test_async_memory_repo_shares_sync_store():
+    import asyncio
+
+    from core.repository.async_memory_impl import AsyncMemoryRepository
+
+    rec_id = f"rec-{uuid.uuid4().hex[:6]}"
+    sync_repo = get_repo("do")
+    async_repo = AsyncMemoryRepository(table="do")
+
+    async def _run():
+        sync_repo.create(rec_id, {"status": "PENDING"})
+        await async_repo.patch(rec_id, {"status": "DONE"})
+        return await async_repo.get(rec_id), await async_repo.exists("missing")
+
+    assert asyncio.run(_run()) == ({"status": "DONE"}, False)
+    assert sync_repo.get(rec_id) == {"status": "DONE"}
+
+
+def test_async_sqlite_patch(tmp_path):
+    pytest.importorskip("aiosqlite")
+    import asyncio
+
+    from core.repository.async_sqlite_impl import AsyncSQLiteRepository
+
+    async def _run():
+        repo = AsyncSQLiteRepository(path=tmp_path / "t.db", table="do")
+        await repo.patch("d1", {"status": "PENDING", "result": None})
+        await repo.patch("d1", {"status": "DONE"})
+        try:
+            return await repo.get("d1"), await repo.list()
+        finally:
+            await repo.aclose()
+
+    got, rows = asyncio.run(_run())
+    assert got == {"status": "DONE", "result": None}
+    assert rows == [got]
+
+
+
+def test_async_sqlite_concurrent_writes_are_isolated(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    import asyncio
+    import sqlite3
+
+    from core.repository import async_sqlite_impl
+    from core.repository.async_sqlite_impl import AsyncSQLiteRepository
+
+    # patch の native 文を必ず失敗させ、rollback 経路を他の書き込みと並走させる
+    def failing_stmt(quoted, tenant_id, obj_id, partial):
+        return (f"UPDATE {quoted} SET no_such_column = 1", ())
+
+    monkeypatch.setattr(async_sqlite_impl, "patch_statement", failing_stmt)
+    # commit 直前で制御を譲り、他コルーチンの rollback が割り込める状況を作る
+    commit = async_sqlite_impl.aiosqlite.Connection.commit
+
+    async def slow_commit(self):
+        await asyncio.sleep(0.001)
+        await commit(self)
+
+    monkeypatch.setattr(async_sqlite_impl.aiosqlite.Connection, "commit", slow_commit)
+
+    async def _run():
+        repo = AsyncSQLiteRepository(path=tmp_path / "t.db", table="do")
+        try:
+            await asyncio.gather(
+                *(repo.create(f"c{i}", {"i": i}) for i in range(20)),
+                *(repo.patch(f"p{i}", {"status": "DONE"}) for i in range(5)),
+            )
+            return await repo.get_many([f"c{i}" for i in range(20)] + ["p0"])
+        finally:
+            await repo.aclose()
+
+    try:
+        got = asyncio.run(_run())
+    except sqlite3.OperationalError:  # pragma: no cover - 旧 SQLite
+        pytest.skip("sqlite without JSON support")
+    assert len(got) == 21
+
+
+def _backend_repo(backend, table, tmp_path, request):
+    if backend == "redis":
+        request.getfixturevalue("fake_redis")
+        from core.repository.redis_impl import RedisRepository
+
+        repo = RedisRepository(table=table)
+        repo.reindex()  # デプロイ手順: 完了マーカーを立てて ZSET / 索引経路へ
+        return repo
+    if backend == "sqlite":
+        from core.repository.sqlite_impl import SQLiteRepository
+
+        return SQLiteRepository(path=tmp_path / "t.db", table=table)
+    from core.repository.memory_impl import MemoryRepository
+
+    return MemoryRepository(table=table)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_list_page_keyset_and_filters(backend, tmp_path, request):
+    table = f"page_{uuid.uuid4().hex[:6]}"
+    repo = _backend_repo(backend, table, tmp_path, request)
+    for i in range(5):
+        repo.create(f"d{i}", {"i": i, "status": "DONE" if i % 2 else "RUNNING"})
+
+    seen, cursor = [], None
+    while True:
+        page = repo.list_page(limit=2, cursor=cursor)
+        seen += [r["i"] for r in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [4, 3, 2, 1, 0]
+
+    # 上書きしても並び順（作成時刻）は変わらない
+    repo.create("d0", {"i": 0, "status": "DONE"})
+    assert [r["i"] for r in repo.list(filters={"status": "DONE"})] == [3, 1, 0]
+    assert [r["i"] for r in repo.list(order="asc", limit=2)] == [0, 1]
+
+    with pytest.raises(ValueError):
+        repo.list(filters={"bad key": 1})
+
+
+def test_sqlite_list_by_uses_secondary_index(tmp_path):
+    from core.repository.base import build_query
+    from core.repository.sqlite_impl import SQLiteRepository, list_statement
+
+    repo = SQLiteRepository(path=tmp_path / "t.db", table="do")
+    for i in range(6):
+        repo.create(f"d{i}", {"plan_id": f"p{i % 2}", "status": "RUNNING" if i < 4 else "DONE"})
+
+    assert [r["plan_id"] for r in repo.list_by(plan_id="p0", status="RUNNING")] == ["p0", "p0"]
+
+    sql, params = list_statement(
+        repo.quoted, repo.tenant_id,
+        build_query(10, None, {"plan_id": "p0", "status": "RUNNING"}, "desc"),
+    )
+    plan = " ".join(r[-1] for r in repo.conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert "ix_do__plan_id_status" in plan
+    assert "TEMP B-TREE" not in plan  # ORDER BY も索引順で読める
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_bulk_create_get_delete_many(backend, tmp_path, monkeypatch, request):
+    from core.repository import redis_impl, sqlite_impl
+
+    monkeypatch.setattr(sqlite_impl, "IN_BATCH", 3)  # IN (...) の分割も通す
+    monkeypatch.setattr(redis_impl, "_BATCH", 3)  # MGET / MSET / pipeline の分割も通す
+    table = f"bulk_{uuid.uuid4().hex[:6]}"
+    repo = _backend_repo(backend, table, tmp_path, request)
+    repo.create_many({f"k{i}": {"i": i} for i in range(7)})
+    repo.create_many({"k0": {"i": 100}})  # 上書き
+
+    got = repo.get_many(["k6", "missing", "k0", "k6"])
+    assert list(got) == ["k6", "k0"]
+    assert got["k0"] == {"i": 100}
+
+    repo.delete_many([f"k{i}" for i in range(5)] + ["missing"])
+    assert sorted(r["i"] for r in repo.list()) == [5, 6]
+    assert repo.get_many([]) == {}
+
+
+def test_sqlite_production_mode_thread_connections_and_group_commit(tmp_path, monkeypatch):
+    import threading
+
+    from core.repository import sqlite_impl
+
+    monkeypatch.setattr(sqlite_impl, "_GROUP_COMMIT_MS", 20.0)
+    path = str(tmp_path / "prod.db")
+    repo = sqlite_impl.SQLiteRepository(path=path, table="do", mode="production")
+    assert repo.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert repo.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    # 同じスレッド・同じファイルなら接続を共有
+    other = sqlite_impl.SQLiteRepository(path=path, table="plan", mode="production")
+    assert other.conn is repo.conn
+
+    def _worker(n):
+        repo.create(f"d{n}", {"status": "PENDING"})
+        repo.patch(f"d{n}", {"status": "DONE", "n": n})
+
+    threads = [threading.Thread(target=_worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(r["n"] for r in repo.list_by(status="DONE")) == list(range(8))
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """同期 / 非同期 Redis Repository を 1 つの fakeredis サーバへ繋ぐ"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from core.repository import async_redis_impl, redis_impl
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis_impl.redis, "from_url", lambda url, **kw: fakeredis.FakeRedis(server=server, **kw)
+    )
+    monkeypatch.setattr(
+        async_redis_impl.aioredis,
+        "from_url",
+        lambda url, **kw: fakeredis.FakeAsyncRedis(server=server, **kw),
+    )
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+def test_redis_legacy_keys_listed_until_reindex(fake_redis):
+    import asyncio
+    import json
+
+    from core.repository.async_redis_impl import AsyncRedisRepository
+    from core.repository.redis_impl import RedisRepository
+
+    # 索引導入前に書かれたキー（_ts / _idx に載っていない）
+    for i in range(2):
+        doc = {"do_id": f"old{i}", "status": "DONE", "created_at": f"2024-01-0{i + 1}T00:00:00+00:00"}
+        fake_redis.set(f"do:old{i}", json.dumps(doc))
+    repo = RedisRepository(table="do")
+    repo.create("new", {"do_id": "new", "status": "DONE", "created_at": "2024-02-01T00:00:00+00:00"})
+
+    # 最初の書き込みで時刻 ZSET ができても、reindex 完了までは旧キーも返す
+    assert sorted(r["do_id"] for r in repo.list()) == ["new", "old0", "old1"]
+    assert len(repo.list_by(status="DONE")) == 3
+
+    assert repo.reindex() == 3
+    assert fake_redis.exists("_reindexed:do")
+    assert [r["do_id"] for r in repo.list_by(status="DONE")] == ["new", "old1", "old0"]
+
+    async def _run():
+        arepo = AsyncRedisRepository(table="do")
+        try:
+            return [r["do_id"] for r in await arepo.list(filters={"status": "DONE"}, order="asc")]
+        finally:
+            await arepo.aclose()
+
+    assert asyncio.run(_run()) == ["old0", "old1", "new"]
+
+
+def test_redis_reindex_backfills_index_sets(fake_redis):
+    import json
+
+    from core.repository.redis_impl import RedisRepository, index_key
+
+    for i in range(4):
+        doc = {
+            "do_id": f"d{i}",
+            "plan_id": f"p{i % 2}",
+            "status": "DONE" if i < 3 else "RUNNING",
+            "created_at": f"2024-01-0{i + 1}T00:00:00+00:00",
+        }
+        fake_redis.set(f"do:d{i}", json.dumps(doc))
+    fake_redis.sadd(index_key("do", "status", "FAILED"), "d0")  # 古い索引の残骸
+
+    repo = RedisRepository(table="do")
+    assert repo.reindex() == 4
+    assert fake_redis.smembers(index_key("do", "plan_id", "p0")) == {"d0", "d2"}
+    assert fake_redis.smembers(index_key("do", "status", "DONE")) == {"d0", "d1", "d2"}
+    assert not fake_redis.exists(index_key("do", "status", "FAILED"))
+
+    # 索引経路（SINTER → ZMSCORE → MGET）で旧キーが引ける
+    assert [r["do_id"] for r in repo.list_by(plan_id="p0", status="DONE")] == ["d2", "d0"]
+    repo.patch("d2", {"status": "RUNNING"})
+    assert [r["do_id"] for r in repo.list_by(status="RUNNING", order="asc")] == ["d2", "d3"]
+
+
+def test_redis_index_sets_follow_writes_and_paging(fake_redis, monkeypatch):
+    from core.repository import redis_impl
+    from core.repository.redis_impl import RedisRepository, index_key
+
+    monkeypatch.setattr(redis_impl, "_BATCH", 2)  # ZMSCORE / MGET を複数往復に分割
+    repo = RedisRepository(table="do")
+    repo.reindex()
+    mget_sizes = []
+    mget = repo._r.mget
+    repo._r.mget = lambda keys: mget_sizes.append(len(keys)) or mget(keys)
+
+    repo.create_many({f"d{i}": {"plan_id": "p0", "status": "RUNNING", "i": i} for i in range(5)})
+    repo.patch("d1", {"status": "DONE"})
+    repo.delete("d4")
+    assert fake_redis.smembers(index_key("do", "status", "RUNNING")) == {"d0", "d2", "d3"}
+    assert fake_redis.smembers(index_key("do", "status", "DONE")) == {"d1"}
+    assert fake_redis.zrange("_ts:do", 0, -1) == ["d0", "d1", "d2", "d3"]
+
+    # 索引経路のキーセットページング（SINTER → ZMSCORE → limit+1 件ずつ MGET）
+    seen, cursor = [], None
+    while True:
+        page = repo.list_page(limit=2, cursor=cursor, filters={"plan_id": "p0", "status": "RUNNING"})
+        seen += [r["i"] for r in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [3, 2, 0]
+    assert max(mget_sizes) <= 2
+    assert repo.list_range(order="asc", limit=3) == repo.list(order="asc")[:3]
+    assert repo.count_range() == 4
+
+
+def test_redis_write_retries_on_watch_conflict(fake_redis):
+    from core.repository.redis_impl import RedisRepository, index_key
+
+    repo = RedisRepository(table="do")
+    repo.create("d1", {"status": "PENDING", "n": 0})
+    olds = []
+
+    def build(_id, old):
+        olds.append(old)
+        if len(olds) == 1:  # MULTI 中に別クライアントが書き換える → WatchError → 再試行
+            RedisRepository(table="do").patch("d1", {"status": "RUNNING", "n": 1})
+        return {**old, "n": old["n"] + 10}
+
+    repo._write_many(["d1"], build)
+    assert [o["n"] for o in olds] == [0, 1]
+    assert repo.get("d1") == {"status": "RUNNING", "n": 11}
+    assert fake_redis.smembers(index_key("do", "status", "RUNNING")) == {"d1"}
+    assert not fake_redis.exists(index_key("do", "status", "PENDING"))
+
+
+def test_redis_trim_and_expire(fake_redis, monkeypatch):
+    from core.repository.redis_impl import RedisRepository, index_key
+
+    monkeypatch.setenv("RETENTION_TTL_DAYS", "do=1,plan=2")
+    monkeypatch.setenv("RETENTION_REDIS_GRACE_DAYS", "0")
+    repo, plans = RedisRepository(table="do"), RedisRepository(table="plan")
+    repo.create_many({f"d{i}": {"status": "DONE"} for i in range(3)})
+    repo.patch("d0", {"status": "FAILED"})
+    plans.create("p1", {"name": "x"})  # 索引なしテーブルの高速経路
+    assert 0 < fake_redis.ttl("do:d0") <= 86400
+    assert 0 < fake_redis.ttl("do:d2") <= 86400
+    assert 86400 < fake_redis.ttl("plan:p1") <= 2 * 86400
+
+    fake_redis.delete("do:d0", "do:d1")  # EXPIRE で本体だけ消えた状態
+    assert repo.trim("2000-01-01T00:00:00+00:00") == 0
+    assert repo.trim("2999-01-01T00:00:00+00:00") == 2
+    assert fake_redis.zrange("_ts:do", 0, -1) == ["d2"]
+    assert fake_redis.smembers(index_key("do", "status", "DONE")) == {"d2"}
+    assert not fake_redis.exists(index_key("do", "status", "FAILED"))
+
+
+def test_async_redis_repo_shares_sync_keys(fake_redis, monkeypatch):
+    import asyncio
+
+    from core.repository import async_redis_impl
+    from core.repository.async_redis_impl import AsyncRedisRepository
+    from core.repository.redis_impl import RedisRepository, index_key
+
+    monkeypatch.setattr(async_redis_impl, "_BATCH", 2)
+    sync_repo = RedisRepository(table="do")
+    sync_repo.reindex()
+
+    async def _run():
+        repo = AsyncRedisRepository(table="do")
+        try:
+            await repo.create_many({f"d{i}": {"status": "RUNNING", "i": i} for i in range(5)})
+            await repo.patch("d1", {"status": "DONE"})
+            await repo.delete_many(["d4", "missing"])
+            pages, cursor = [], None
+            while True:
+                page = await repo.list_page(limit=2, cursor=cursor, filters={"status": "RUNNING"})
+                pages.append([r["i"] for r in page.items])
+                if page.next_cursor is None:
+                    break
+                cursor = page.next_cursor
+            return pages, await repo.get_many(["d0", "d4", "d1"])
+        finally:
+            await repo.aclose()
+
+    pages, got = asyncio.run(_run())
+    assert pages == [[3, 2], [0]]
+    assert list(got) == ["d0", "d1"]
+    assert fake_redis.smembers(index_key("do", "status", "DONE")) == {"d1"}
+    assert [r["i"] for r in sync_repo.list(order="asc")] == [0, 1, 2, 3]
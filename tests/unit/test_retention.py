@@ -0,0 +1,67 @@
+# tests/unit/test_retention.py
+import gzip
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from core.ops.retention import (
+    RetentionConfig,
+    key_ttl_seconds,
+    parse_ttls,
+    purge_table,
+)
+from core.repository.memory_impl import MemoryRepository
+from core.repository.sqlite_impl import SQLiteRepository
+
+
+def _read_archive(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).column("id").to_pylist()
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return [json.loads(line)["id"] for line in fh]
+
+
+def _fill(repo, n):
+    for i in range(n):
+        repo.create(f"do-{i}", {"do_id": f"do-{i}", "status": "DONE"})
+
+
+def test_purge_archives_then_deletes_in_batches(tmp_path):
+    for repo in (
+        MemoryRepository(table=f"ret_{uuid.uuid4().hex[:6]}"),
+        SQLiteRepository(tmp_path / "ret.db", table="do"),
+    ):
+        _fill(repo, 5)
+        cutoff = datetime.now(timezone.utc) + timedelta(seconds=1)
+        cfg = RetentionConfig(batch=2, archive_dir=tmp_path / "archive")
+
+        res = purge_table(repo, "do", cutoff, cfg)
+
+        assert res.deleted == 5 and not res.truncated
+        assert len(res.archives) == 3
+        archived = [i for p in res.archives for i in _read_archive(p)]
+        assert sorted(archived) == [f"do-{i}" for i in range(5)]
+        assert repo.list() == []
+
+
+def test_purge_respects_cutoff_and_max_rows(tmp_path):
+    repo = MemoryRepository(table=f"ret_{uuid.uuid4().hex[:6]}")
+    _fill(repo, 5)
+
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    assert purge_table(repo, "do", past, RetentionConfig(archive=False)).deleted == 0
+
+    cutoff = datetime.now(timezone.utc) + timedelta(seconds=1)
+    res = purge_table(repo, "do", cutoff, RetentionConfig(batch=2, max_rows=3, archive=False))
+    assert res.deleted == 3 and res.truncated and res.archives == []
+    assert len(repo.list()) == 2
+
+
+def test_ttl_parsing(monkeypatch):
+    assert parse_ttls("do=30, check=7.5,act=0,bad,x=y") == {"do": 30.0, "check": 7.5}
+    monkeypatch.setenv("RETENTION_TTL_DAYS", "do=2")
+    monkeypatch.setenv("RETENTION_REDIS_GRACE_DAYS", "1")
+    assert key_ttl_seconds("do") == 3 * 86400
+    assert key_ttl_seconds("plan") is None
@@ -0,0 +1,48 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【utils/admission.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   core/ops/admission.AdmissionController を FastAPI の依存注入として
+#   提供し、拒否を HTTP 429 / 503 + Retry-After ヘッダに変換します。
+#
+# 【主な役割】
+#   - require_admission("do") → Depends() に渡せる関数を返す
+#   - Eager モード（ブローカー無し）では判定をスキップ
+#
+# 【連携先・依存関係】
+#   - core/ops/admission.py
+#   - api/routers/do_api.py / check_api.py
+# ---------------------------------------------------------
+from __future__ import annotations
+
+from typing import Callable
+
+from fastapi import HTTPException
+
+from core.celery_app import celery_app
+from core.ops.admission import AdmissionRejected, get_admission_controller
+
+
+def require_admission(endpoint: str) -> Callable[[], None]:
+    """
+    Enqueue エンドポイント用の依存関数を生成する。
+
+    使い方::
+
+        @router.post("/{plan_id}", dependencies=[Depends(require_admission("do"))])
+    """
+
+    def _dependency() -> None:
+        if celery_app.conf.task_always_eager:
+            return
+        try:
+            get_admission_controller().admit(endpoint)
+        except AdmissionRejected as exc:
+            raise HTTPException(
+                status_code=exc.status_code,
+                detail=exc.detail,
+                headers={"Retry-After": str(exc.retry_after)},
+            ) from None
+
+    return _dependency
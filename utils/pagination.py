@@ -0,0 +1,71 @@
+# =========================================================
+# ASSIST_KEY: このファイルは【utils/pagination.py】に位置するユニットです
+# =========================================================
+#
+# 【概要】
+#   一覧系 GET エンドポイント共通のページング / フィルタ変換ヘルパ。
+#   Repository.list_page() の結果を返しつつ、次ページの位置を
+#   Link (rel="next") / X-Next-Cursor ヘッダで通知する。
+#
+# 【主な役割】
+#   - build_filters(since, until, status=...) → list_page 用 filters
+#   - fetch_page()  : list_page 呼び出し + ヘッダ付与 + 400 変換
+#
+# 【ルール遵守】
+#   1) レスポンスボディは従来どおり配列（既存クライアント互換）
+#   2) 不正なカーソル / フィルタは 400 Bad Request
+#
+# 【連携先・依存関係】
+#   - core/repository/base.py (Page / created_at__gte / created_at__lt)
+#   - api/routers/{plan,do,check,act}_api.py
+# ---------------------------------------------------------
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from core.repository.base import CREATED_GTE, CREATED_LT
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def build_filters(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    **eq: Any,
+) -> Dict[str, Any]:
+    """None の条件を落として list_page() の filters 形式にする"""
+    filters: Dict[str, Any] = {k: v for k, v in eq.items() if v is not None}
+    if since is not None:
+        filters[CREATED_GTE] = since
+    if until is not None:
+        filters[CREATED_LT] = until
+    return filters
+
+
+async def fetch_page(
+    repo: Any,
+    request: Request,
+    response: Response,
+    *,
+    limit: int,
+    cursor: Optional[str],
+    filters: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    非同期 Repository から 1 ページ取得し、次ページがあれば
+    ``Link: <...?cursor=...>; rel="next"`` と ``X-Next-Cursor`` を付与する。
+    """
+    try:
+        page = await repo.list_page(limit=limit, cursor=cursor, filters=filters)
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(exc)) from None
+
+    if page.next_cursor:
+        next_url = request.url.include_query_params(cursor=page.next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items